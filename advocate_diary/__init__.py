@@ -0,0 +1,26 @@
+"""
+Python tooling for the Advocate Diary API: a pooled client shared by the
+pytest suite and by scripted bulk work against the app.
+"""
+
+from advocate_diary.client import (
+    BASE_URL_ENV,
+    DEFAULT_BASE_URL,
+    AdvocateDiaryClient,
+    ApiError,
+    AuthenticationError,
+    CachedLogin,
+    LoginCache,
+    resolve_base_url,
+)
+
+__all__ = [
+    "BASE_URL_ENV",
+    "DEFAULT_BASE_URL",
+    "AdvocateDiaryClient",
+    "ApiError",
+    "AuthenticationError",
+    "CachedLogin",
+    "LoginCache",
+    "resolve_base_url",
+]
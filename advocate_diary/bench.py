@@ -0,0 +1,471 @@
+"""
+Load and throughput benchmark for the case and user API routes.
+
+Worker threads each hold their own pooled client, all signed in through
+one shared LoginCache, and loop over a weighted mix of operations modelled
+on the API tests. Concurrency is ramped through a list of stages and every
+stage reports p50/p95/p99 latency, requests/sec and error rate per route:
+
+    python -m advocate_diary.bench --base-url http://localhost:3000 \\
+        --stages 1,4,16 --duration 15 --scenario mixed
+
+The login scenario measures the credentials login instead. Each stage
+runs that many workers signing in over and over (csrf -> callback ->
+session, never from the cache) next to --readers workers on the read mix,
+and reports login throughput together with how far the readers' p95 moved
+from the stage without logins:
+
+    python -m advocate_diary.bench --scenario login --stages 0,4,16 --readers 4
+
+Results are written as JSON (for diffing before/after a deploy) and as a
+self-contained HTML page next to pytest-html's report.html. Use
+--base-url local to benchmark the in-process stand-in.
+"""
+
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from advocate_diary.client import AdvocateDiaryClient, LoginCache, resolve_base_url
+from advocate_diary.isolation import Namespace, RegistrationAllocator, ResourceTracker
+from advocate_diary.metrics import LatencyRecorder, Sample, summarize
+
+DEFAULT_JSON_REPORT = "bench_report.json"
+DEFAULT_HTML_REPORT = "bench_report.html"
+
+# Scenario that benchmarks the login flow rather than a weighted mix
+LOGIN_SCENARIO = "login"
+AUTH_PREFIX = "/api/auth/"
+
+# Operation weights per scenario
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "read": {"list_cases": 40, "get_case": 40, "list_users": 10, "case_counts": 10},
+    "write": {"create_delete_case": 100},
+    "mixed": {
+        "list_cases": 30,
+        "get_case": 30,
+        "list_users": 10,
+        "case_counts": 10,
+        "create_delete_case": 20,
+    },
+}
+
+
+class BenchmarkContext:
+    """State shared by the worker threads of one benchmark run"""
+
+    def __init__(self, case_ids: List[str], registrations: RegistrationAllocator, namespace: Namespace):
+        self.case_ids = case_ids
+        self.registrations = registrations
+        self.namespace = namespace
+
+
+def case_payload(namespace: Namespace, registration_num: Optional[int] = None) -> Dict[str, Any]:
+    """Case body shaped like the one in tests/test_case_operations.py"""
+    unique_id = namespace.unique()
+    payload = {
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "title": f"Bench Case {unique_id}",
+        "courtName": "Bench Court",
+        "petitioners": [{"name": f"Petitioner {unique_id}", "advocate": "Advocate P"}],
+        "respondents": [{"name": f"Respondent {unique_id}", "advocate": "Advocate R"}],
+    }
+    if registration_num is not None:
+        payload["registrationNum"] = registration_num
+    return payload
+
+
+def _list_cases(client: AdvocateDiaryClient, ctx: BenchmarkContext, rng: random.Random) -> None:
+    client.request("GET", "/api/cases")
+
+
+def _get_case(client: AdvocateDiaryClient, ctx: BenchmarkContext, rng: random.Random) -> None:
+    client.request("GET", f"/api/cases/{rng.choice(ctx.case_ids)}")
+
+
+def _list_users(client: AdvocateDiaryClient, ctx: BenchmarkContext, rng: random.Random) -> None:
+    client.request("GET", "/api/admin/users")
+
+
+def _case_counts(client: AdvocateDiaryClient, ctx: BenchmarkContext, rng: random.Random) -> None:
+    client.request("GET", "/api/admin/users/with-case-counts")
+
+
+def _create_delete_case(client: AdvocateDiaryClient, ctx: BenchmarkContext, rng: random.Random) -> None:
+    payload = case_payload(ctx.namespace, ctx.registrations.next())
+    response = client.request("POST", "/api/cases", json=payload)
+    if response.status_code == 201:
+        client.request("DELETE", f"/api/cases/{response.json()['id']}")
+
+
+OPERATIONS: Dict[str, Callable[[AdvocateDiaryClient, BenchmarkContext, random.Random], None]] = {
+    "list_cases": _list_cases,
+    "get_case": _get_case,
+    "list_users": _list_users,
+    "case_counts": _case_counts,
+    "create_delete_case": _create_delete_case,
+}
+
+
+def run_stage(
+    base_url: str,
+    credentials: Sequence[str],
+    login_cache: LoginCache,
+    ctx: BenchmarkContext,
+    weights: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Dict[str, Any]:
+    """Run `concurrency` workers for `duration` seconds and summarise the samples"""
+    recorder = LatencyRecorder()
+    names = list(weights)
+    name_weights = [weights[name] for name in names]
+    ready = threading.Barrier(concurrency + 1)
+    deadline: List[float] = []
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        with AdvocateDiaryClient(base_url, login_cache=login_cache, pool_maxsize=2) as client:
+            # Sign in before the clock starts; the cache makes this a cookie copy
+            try:
+                client.login(*credentials)
+            except Exception:
+                ready.abort()
+                raise
+            client.recorder = recorder
+            ready.wait()
+            while time.perf_counter() < deadline[0]:
+                name = rng.choices(names, weights=name_weights)[0]
+                try:
+                    OPERATIONS[name](client, ctx, rng)
+                except Exception:
+                    # Transport errors are already recorded as status 0
+                    pass
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, index) for index in range(concurrency)]
+        ready.wait()
+        started = time.perf_counter()
+        deadline.append(started + duration)
+        for future in futures:
+            future.result()
+        wall = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "duration_s": wall,
+        "routes": recorder.summary(wall),
+        "total": summarize(recorder.samples, wall),
+    }
+
+
+def run_login_stage(
+    base_url: str,
+    credentials: Sequence[str],
+    login_cache: LoginCache,
+    ctx: BenchmarkContext,
+    logins: int,
+    readers: int,
+    duration: float,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Run `logins` workers signing in repeatedly beside `readers` workers on
+    the read mix for `duration` seconds
+    """
+    recorder = LatencyRecorder()
+    flows = LatencyRecorder()
+    weights = SCENARIOS["read"]
+    names = list(weights)
+    name_weights = [weights[name] for name in names]
+    ready = threading.Barrier(logins + readers + 1)
+    deadline: List[float] = []
+
+    def reader(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        with AdvocateDiaryClient(base_url, login_cache=login_cache, pool_maxsize=2) as client:
+            try:
+                client.login(*credentials)
+            except Exception:
+                ready.abort()
+                raise
+            client.recorder = recorder
+            ready.wait()
+            while time.perf_counter() < deadline[0]:
+                try:
+                    OPERATIONS[rng.choices(names, weights=name_weights)[0]](client, ctx, rng)
+                except Exception:
+                    pass
+
+    def login_worker() -> None:
+        email, password = credentials[0], credentials[1]
+        # No login cache: every iteration is a full sign-in
+        with AdvocateDiaryClient(base_url, pool_maxsize=2) as client:
+            client.recorder = recorder
+            ready.wait()
+            while time.perf_counter() < deadline[0]:
+                client.logout()
+                started = time.perf_counter()
+                status = 200
+                try:
+                    client.login(email, password)
+                except Exception:
+                    status = 0
+                flows.record("POST", "login flow", status, time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=logins + readers) as pool:
+        futures = [pool.submit(reader, index) for index in range(readers)]
+        futures += [pool.submit(login_worker) for _ in range(logins)]
+        ready.wait()
+        started = time.perf_counter()
+        deadline.append(started + duration)
+        for future in futures:
+            future.result()
+        wall = time.perf_counter() - started
+
+    samples: List[Sample] = list(recorder.samples)
+    return {
+        "concurrency": logins,
+        "readers": readers,
+        "duration_s": wall,
+        "routes": recorder.summary(wall),
+        "total": summarize(samples, wall),
+        "logins": summarize(flows.samples, wall),
+        "reads": summarize((s for s in samples if AUTH_PREFIX not in s.route), wall),
+    }
+
+
+def run_login_benchmark(
+    base_url: Optional[str] = None,
+    stages: Sequence[int] = (0, 4, 16),
+    readers: int = 4,
+    duration: float = 10.0,
+    email: str = "admin@example.com",
+    password: str = "password123",
+    pool_cases: int = 20,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Ramp concurrent logins through `stages` while readers run the read mix;
+    each stage's reads_p95_ratio compares the readers' p95 with the first
+    stage (include 0 for a baseline without logins)
+    """
+    base_url = resolve_base_url(base_url)
+    credentials = (email, password, "ADMIN")
+    login_cache = LoginCache()
+    namespace = Namespace()
+    registrations = RegistrationAllocator()
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    with AdvocateDiaryClient(base_url, login_cache=login_cache) as admin:
+        admin.login(*credentials)
+        tracker = ResourceTracker(admin, registrations)
+        try:
+            case_ids = [tracker.create_case(case_payload(namespace))["id"] for _ in range(pool_cases)]
+            ctx = BenchmarkContext(case_ids, registrations, namespace)
+            results = [
+                run_login_stage(base_url, credentials, login_cache, ctx, logins, readers, duration, seed)
+                for logins in stages
+            ]
+        finally:
+            tracker.cleanup()
+
+    baseline = results[0]["reads"]["p95_ms"] if results else None
+    for stage in results:
+        p95 = stage["reads"]["p95_ms"]
+        stage["reads_p95_ratio"] = p95 / baseline if baseline and p95 is not None else None
+
+    return {
+        "base_url": base_url,
+        "scenario": LOGIN_SCENARIO,
+        "weights": SCENARIOS["read"],
+        "readers": readers,
+        "started_at": started_at,
+        "stages": results,
+    }
+
+
+def run_benchmark(
+    base_url: Optional[str] = None,
+    stages: Sequence[int] = (1, 4, 16),
+    duration: float = 10.0,
+    scenario: str = "mixed",
+    email: str = "admin@example.com",
+    password: str = "password123",
+    pool_cases: int = 20,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Seed a pool of cases, ramp through `stages` and clean up afterwards"""
+    base_url = resolve_base_url(base_url)
+    weights = SCENARIOS[scenario]
+    credentials = (email, password, "ADMIN")
+    login_cache = LoginCache()
+    namespace = Namespace()
+    registrations = RegistrationAllocator()
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    with AdvocateDiaryClient(base_url, login_cache=login_cache) as admin:
+        admin.login(*credentials)
+        tracker = ResourceTracker(admin, registrations)
+        try:
+            case_ids = [tracker.create_case(case_payload(namespace))["id"] for _ in range(pool_cases)]
+            ctx = BenchmarkContext(case_ids, registrations, namespace)
+            results = [
+                run_stage(base_url, credentials, login_cache, ctx, weights, concurrency, duration, seed)
+                for concurrency in stages
+            ]
+        finally:
+            tracker.cleanup()
+
+    return {
+        "base_url": base_url,
+        "scenario": scenario,
+        "weights": weights,
+        "started_at": started_at,
+        "stages": results,
+    }
+
+
+def _fmt(value: Any, digits: int = 1) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    """Self-contained HTML page with one latency table per concurrency stage"""
+    sections = []
+    for stage in report["stages"]:
+        rows = []
+        for route, stats in list(stage["routes"].items()) + [("All routes", stage["total"])]:
+            rows.append(
+                "<tr>"
+                f"<td>{html.escape(route)}</td>"
+                f"<td>{stats['count']}</td>"
+                f"<td>{_fmt(stats.get('rps'))}</td>"
+                f"<td>{_fmt(stats['p50_ms'])}</td>"
+                f"<td>{_fmt(stats['p95_ms'])}</td>"
+                f"<td>{_fmt(stats['p99_ms'])}</td>"
+                f"<td>{_fmt(stats['max_ms'])}</td>"
+                f"<td>{_fmt(stats['error_rate'] * 100, 2)}%</td>"
+                "</tr>"
+            )
+        login_line = ""
+        if "logins" in stage:
+            logins, reads = stage["logins"], stage["reads"]
+            login_line = (
+                f"<p>Logins: {logins['count']} ({_fmt(logins.get('rps'))}/s, "
+                f"p95 {_fmt(logins['p95_ms'])} ms) &middot; "
+                f"other routes: p95 {_fmt(reads['p95_ms'])} ms, "
+                f"{_fmt(stage['reads_p95_ratio'], 2)}&times; the first stage</p>"
+            )
+        label = "Concurrent logins" if "logins" in stage else "Concurrency"
+        sections.append(
+            f"<h2>{label} {stage['concurrency']} "
+            f"({_fmt(stage['duration_s'])} s)</h2>"
+            + login_line
+            + "<table><thead><tr><th>Route</th><th>Requests</th><th>Req/s</th>"
+            "<th>p50 ms</th><th>p95 ms</th><th>p99 ms</th><th>Max ms</th><th>Errors</th>"
+            "</tr></thead><tbody>" + "".join(rows) + "</tbody></table>"
+        )
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"/>"
+        "<title>Advocate Diary API benchmark</title>"
+        "<style>body{font-family:Helvetica,Arial,sans-serif;margin:2em;color:#1e293b}"
+        "table{border-collapse:collapse;margin-bottom:2em}"
+        "th,td{border:1px solid #cbd5e1;padding:4px 10px;text-align:right}"
+        "th:first-child,td:first-child{text-align:left}"
+        "thead{background:#f1f5f9}</style></head><body>"
+        "<h1>Advocate Diary API benchmark</h1>"
+        f"<p>Target: {html.escape(report['base_url'])} &middot; "
+        f"scenario: {html.escape(report['scenario'])} &middot; "
+        f"started: {html.escape(report['started_at'])}</p>"
+        + "".join(sections)
+        + "</body></html>"
+    )
+
+
+def write_reports(report: Dict[str, Any], json_path: Optional[str], html_path: Optional[str]) -> None:
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if html_path:
+        with open(html_path, "w", encoding="utf-8") as handle:
+            handle.write(render_html(report))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Advocate Diary API routes")
+    parser.add_argument("--base-url", help="Target URL, or 'local' for the in-process stand-in")
+    parser.add_argument(
+        "--stages",
+        help="Comma-separated concurrency levels (default 1,4,16; for the login scenario 0,4,16 logins)",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per stage")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS) + [LOGIN_SCENARIO], default="mixed")
+    parser.add_argument("--readers", type=int, default=4, help="Read workers beside the logins (login scenario)")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--pool-cases", type=int, default=20, help="Cases seeded for read operations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=DEFAULT_JSON_REPORT, help="JSON report path")
+    parser.add_argument("--html", default=DEFAULT_HTML_REPORT, help="HTML report path")
+    args = parser.parse_args(argv)
+
+    is_login = args.scenario == LOGIN_SCENARIO
+    stages = args.stages or ("0,4,16" if is_login else "1,4,16")
+    options: Dict[str, Any] = dict(
+        stages=[int(level) for level in stages.split(",") if level.strip()],
+        duration=args.duration,
+        email=args.email,
+        password=args.password,
+        pool_cases=args.pool_cases,
+        seed=args.seed,
+    )
+    if is_login:
+        options["readers"] = args.readers
+        run = run_login_benchmark
+    else:
+        options["scenario"] = args.scenario
+        run = run_benchmark
+
+    if args.base_url == "local":
+        from advocate_diary.standin import StandInServer
+
+        with StandInServer() as server:
+            report = run(server.url, **options)
+    else:
+        report = run(args.base_url, **options)
+
+    write_reports(report, args.json, args.html)
+    for stage in report["stages"]:
+        if is_login:
+            logins, reads = stage["logins"], stage["reads"]
+            print(
+                f"logins={stage['concurrency']:<4} login_rps={_fmt(logins.get('rps'))} "
+                f"login_p95={_fmt(logins['p95_ms'])}ms reads_p95={_fmt(reads['p95_ms'])}ms "
+                f"reads_p95_ratio={_fmt(stage['reads_p95_ratio'], 2)} "
+                f"login_errors={_fmt(logins['error_rate'] * 100, 2)}%"
+            )
+            continue
+        total = stage["total"]
+        print(
+            f"concurrency={stage['concurrency']:<4} rps={_fmt(total.get('rps'))} "
+            f"p50={_fmt(total['p50_ms'])}ms p95={_fmt(total['p95_ms'])}ms "
+            f"p99={_fmt(total['p99_ms'])}ms errors={_fmt(total['error_rate'] * 100, 2)}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
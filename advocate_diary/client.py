@@ -0,0 +1,809 @@
+"""
+HTTP client for the Advocate Diary API.
+
+The client keeps one pooled, keep-alive requests.Session per instance and
+signs in through the NextAuth credentials flow (csrf -> callback ->
+session). Successful logins are stored in a LoginCache keyed on
+(email, role) so that later clients can reuse the NextAuth session cookie
+until it expires instead of repeating the three round trips.
+
+    cache = LoginCache()
+    with AdvocateDiaryClient(login_cache=cache) as client:
+        client.login("admin@example.com", "password123", role="ADMIN")
+        cases = client.list_cases()
+
+A requests.Session is not safe to share between threads, so for scripted
+bulk work create one client per worker thread and share the LoginCache.
+"""
+
+import copy
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from advocate_diary.metrics import LatencyRecorder
+from advocate_diary.models import (
+    AdminStats,
+    BatchResult,
+    Case,
+    CaseInput,
+    CasePage,
+    CaseSummary,
+    ChangePage,
+    ChatMessage,
+    ExportJob,
+    Hearing,
+    HearingCalendar,
+    HearingPage,
+    Note,
+    NotePage,
+    ReassignJob,
+    SearchPage,
+    SimilarCase,
+    Upload,
+    UploadPage,
+    User,
+    UserInput,
+)
+from advocate_diary.timings import TimingCollector
+
+DEFAULT_BASE_URL = "https://advocate-diary.vercel.app"
+
+# Environment variable that points scripts and the test suite at a deployment
+BASE_URL_ENV = "ADVOCATE_DIARY_BASE_URL"
+
+# DEFAULT_PAGE_SIZE in src/lib/pagination.ts
+DEFAULT_CASE_LIST_PAGE_SIZE = 50
+
+# NextAuth prefixes the cookie with __Secure- when served over https
+SESSION_COOKIE_NAMES = (
+    "__Secure-next-auth.session-token",
+    "next-auth.session-token",
+)
+
+# Treat a cached login as expired slightly before the server does
+EXPIRY_LEEWAY_SECONDS = 60
+
+
+class ApiError(Exception):
+    """Raised when the API answers with a 4xx or 5xx status"""
+
+    def __init__(self, response: requests.Response):
+        self.response = response
+        self.status_code = response.status_code
+        try:
+            self.payload = response.json()
+        except ValueError:
+            self.payload = {"error": response.text}
+
+        message = None
+        if isinstance(self.payload, dict):
+            message = self.payload.get("error") or self.payload.get("message")
+        super().__init__(
+            f"{response.request.method} {response.url} -> "
+            f"{self.status_code}: {message or 'request failed'}"
+        )
+
+
+class AuthenticationError(Exception):
+    """Raised when the credentials flow does not yield a session"""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        # NextAuth's ?error= code, e.g. CredentialsSignin, or TooManyAttempts
+        # once src/lib/login-throttle.ts refuses the email or address
+        self.code = code
+
+
+class CachedLogin:
+    """A NextAuth session cookie together with the user it belongs to"""
+
+    def __init__(self, cookie, user: User, expires_at: Optional[float]):
+        self.cookie = cookie
+        self.user = user
+        self.expires_at = expires_at
+
+    def is_valid(self, now: Optional[float] = None) -> bool:
+        if self.expires_at is None:
+            return True
+        now = time.time() if now is None else now
+        return now < self.expires_at - EXPIRY_LEEWAY_SECONDS
+
+
+class LoginCache:
+    """Thread-safe store of logins keyed on (email, role)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._logins: Dict[Tuple[str, Optional[str]], CachedLogin] = {}
+
+    def get(self, email: str, role: Optional[str] = None) -> Optional[CachedLogin]:
+        with self._lock:
+            login = self._logins.get((email.lower(), role))
+            if login is not None and not login.is_valid():
+                del self._logins[(email.lower(), role)]
+                return None
+            return login
+
+    def put(self, email: str, role: Optional[str], login: CachedLogin) -> None:
+        with self._lock:
+            self._logins[(email.lower(), role)] = login
+
+    def invalidate(self, email: str, role: Optional[str] = None) -> None:
+        with self._lock:
+            self._logins.pop((email.lower(), role), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._logins.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._logins)
+
+
+def resolve_base_url(base_url: Optional[str] = None) -> str:
+    """Explicit URL, else $ADVOCATE_DIARY_BASE_URL, else the live deployment"""
+    return (base_url or os.environ.get(BASE_URL_ENV) or DEFAULT_BASE_URL).rstrip("/")
+
+
+def _wait_for_job(fetch: Callable[[str], Any], label: str, job_id: str, timeout: float, interval: float) -> Any:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = fetch(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{label} {job_id} is still {job['status']} after {timeout}s")
+        time.sleep(interval)
+
+
+def _parse_iso(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class AdvocateDiaryClient:
+    """Pooled, session-reusing client for the Advocate Diary API routes"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        login_cache: Optional[LoginCache] = None,
+        pool_maxsize: int = 10,
+        timeout: float = 30.0,
+        retries: int = 2,
+        recorder: Optional[LatencyRecorder] = None,
+        timings: Optional[TimingCollector] = None,
+    ):
+        self.base_url = resolve_base_url(base_url)
+        self.login_cache = login_cache
+        self.timeout = timeout
+        self.recorder = recorder
+        # Collects the Server-Timing phase breakdown of every response
+        self.timings = timings
+        self.user: Optional[User] = None
+
+        # Session reuses keep-alive connections from the adapter's pool
+        self.session = requests.Session()
+
+        # Only idempotent requests are retried; a POST that reached the
+        # server must never be replayed automatically
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self) -> "AdvocateDiaryClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    # ------------------------------------------------------------------
+    # Low-level helpers
+    # ------------------------------------------------------------------
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request and return the raw response without status checks"""
+        kwargs.setdefault("timeout", self.timeout)
+        if self.recorder is None:
+            response = self.session.request(method, self.url(path), **kwargs)
+        else:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, self.url(path), **kwargs)
+            except requests.RequestException:
+                self.recorder.record(method, path, 0, time.perf_counter() - started)
+                raise
+            # A streamed body is left for the caller to read; its size is not known yet
+            size = 0 if kwargs.get("stream") else len(response.content)
+            self.recorder.record(method, path, response.status_code, time.perf_counter() - started, size)
+        if self.timings is not None:
+            self.timings.add_response(method, path, response)
+        return response
+
+    def _json(self, method: str, path: str, **kwargs) -> Any:
+        response = self.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            raise ApiError(response)
+        return response.json()
+
+    # ------------------------------------------------------------------
+    # Authentication
+    # ------------------------------------------------------------------
+
+    def get_csrf_token(self) -> str:
+        data = self._json("GET", "/api/auth/csrf")
+        token = data.get("csrfToken")
+        if not token:
+            raise AuthenticationError("CSRF token missing from /api/auth/csrf")
+        return token
+
+    def get_session(self) -> Dict[str, Any]:
+        return self._json("GET", "/api/auth/session")
+
+    def get_providers(self) -> Dict[str, Any]:
+        return self._json("GET", "/api/auth/providers")
+
+    def login(self, email: str, password: str, role: Optional[str] = None) -> User:
+        """
+        Sign in with email/password, reusing a cached session cookie when the
+        login cache already holds a valid one for (email, role)
+        """
+        if self.login_cache is not None:
+            cached = self.login_cache.get(email, role)
+            if cached is not None:
+                self.session.cookies.set_cookie(copy.copy(cached.cookie))
+                self.user = cached.user
+                return cached.user
+
+        login = self._login_uncached(email, password)
+
+        if role is not None and login.user.get("role") != role:
+            self.logout()
+            raise AuthenticationError(
+                f"{email} signed in with role {login.user.get('role')}, expected {role}"
+            )
+
+        if self.login_cache is not None:
+            self.login_cache.put(email, role, login)
+        self.user = login.user
+        return login.user
+
+    def _login_uncached(self, email: str, password: str) -> CachedLogin:
+        csrf_token = self.get_csrf_token()
+        response = self.request(
+            "POST",
+            "/api/auth/callback/credentials",
+            data={
+                "csrfToken": csrf_token,
+                "email": email,
+                "password": password,
+                "callbackUrl": self.base_url,
+            },
+            # The redirect only leads to a page render; the cookie is
+            # already set on this response
+            allow_redirects=False,
+        )
+        if response.status_code not in (200, 302):
+            raise ApiError(response)
+
+        cookie = self._session_cookie()
+        if cookie is None:
+            location = urlsplit(response.headers.get("Location", ""))
+            code = (parse_qs(location.query).get("error") or [None])[0]
+            raise AuthenticationError(f"Login failed for {email}" + (f": {code}" if code else ""), code)
+
+        session_data = self.get_session()
+        user = session_data.get("user") or {}
+        if not user:
+            raise AuthenticationError(f"No session established for {email}")
+
+        expiries = [
+            value
+            for value in (cookie.expires, _parse_iso(session_data.get("expires")))
+            if value
+        ]
+        return CachedLogin(copy.copy(cookie), user, min(expiries) if expiries else None)
+
+    def _session_cookie(self):
+        for cookie in self.session.cookies:
+            if cookie.name in SESSION_COOKIE_NAMES:
+                return cookie
+        return None
+
+    def logout(self) -> None:
+        """Forget the session locally; cached logins stay usable by others"""
+        self.session.cookies.clear()
+        self.user = None
+
+    # ------------------------------------------------------------------
+    # Cases
+    # ------------------------------------------------------------------
+
+    def list_cases_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        include: Optional[List[str]] = None,
+        include_personal: bool = False,
+        **filters: Any,
+    ) -> CasePage:
+        """
+        One page of GET /api/cases. `filters` are passed through as query
+        parameters (court, caseType, isCompleted, userId, nextHearingFrom,
+        nextHearingTo); pass the returned nextCursor to get the next page.
+        """
+        params: Dict[str, Any] = {}
+        if cursor:
+            params["cursor"] = cursor
+        if limit:
+            params["limit"] = limit
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        if include is not None:
+            params["include"] = ",".join(include)
+        if include_personal:
+            params["includePERSONAL"] = "true"
+        for name, value in filters.items():
+            if value is not None:
+                params[name] = str(value).lower() if isinstance(value, bool) else value
+        page = self._json("GET", "/api/cases", params=params)
+        if isinstance(page, list):
+            # Deployments from before pagination return every case at once
+            return {"cases": page, "nextCursor": None}
+        return page
+
+    def iter_cases(self, **kwargs: Any) -> Iterator[Case]:
+        """Every case matching list_cases_page's arguments, fetched page by page"""
+        cursor = None
+        while True:
+            page = self.list_cases_page(cursor=cursor, **kwargs)
+            yield from page["cases"]
+            cursor = page["nextCursor"]
+            if not cursor:
+                return
+
+    def list_cases(self, include_personal: bool = False, **kwargs: Any) -> List[Case]:
+        return list(self.iter_cases(include_personal=include_personal, **kwargs))
+
+    def search_cases(
+        self,
+        query: str,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        include_personal: bool = False,
+    ) -> SearchPage:
+        """One page of ranked full-text results from GET /api/cases/search"""
+        params: Dict[str, Any] = {"q": query}
+        if cursor:
+            params["cursor"] = cursor
+        if limit:
+            params["limit"] = limit
+        if include_personal:
+            params["includePERSONAL"] = "true"
+        return self._json("GET", "/api/cases/search", params=params)
+
+    def similar_cases(
+        self, case_id: str, limit: Optional[int] = None, include_personal: bool = False
+    ) -> List[SimilarCase]:
+        """Cases most like `case_id`, best first, from GET /api/cases/[caseId]/similar"""
+        params: Dict[str, Any] = {}
+        if limit:
+            params["limit"] = limit
+        if include_personal:
+            params["includePERSONAL"] = "true"
+        return self._json("GET", f"/api/cases/{case_id}/similar", params=params)["results"]
+
+    def create_case(self, case: CaseInput) -> Case:
+        return self._json("POST", "/api/cases", json=case)
+
+    def create_cases(self, cases: List[CaseInput]) -> BatchResult:
+        """Create up to 500 cases in one request; see POST /api/cases/batch"""
+        return self._json("POST", "/api/cases/batch", json={"cases": cases})
+
+    def get_case(self, case_id: str) -> Case:
+        return self._json("GET", f"/api/cases/{case_id}")
+
+    def get_case_summary(self, case_id: str) -> CaseSummary:
+        """The case without its hearings list: the latest hearing and counts of hearings, notes and uploads"""
+        return self._json("GET", f"/api/cases/{case_id}", params={"summary": "true"})
+
+    def get_case_if_changed(
+        self, case_id: str, etag: Optional[str], summary: bool = False
+    ) -> Tuple[Optional[Case], Optional[str]]:
+        """
+        Conditional GET of a case. Returns (None, etag) while the case is
+        unchanged since `etag` (a 304, no body sent), otherwise the case and
+        its new ETag to pass next time.
+        """
+        headers = {"If-None-Match": etag} if etag else {}
+        params = {"summary": "true"} if summary else {}
+        response = self.request("GET", f"/api/cases/{case_id}", params=params, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code >= 400:
+            raise ApiError(response)
+        return response.json(), response.headers.get("ETag")
+
+    def update_case(
+        self, case_id: str, data: Dict[str, Any], version: Optional[str] = None
+    ) -> Case:
+        """
+        Edit a case. With `version` (the version or ETag of the copy the
+        edit was made on) the edit is sent with If-Match and the server
+        answers 409 if the case has changed since.
+        """
+        headers = {}
+        if version:
+            headers["If-Match"] = version if version.endswith('"') else f'"{version}"'
+        return self._json("PUT", f"/api/cases/{case_id}", json=data, headers=headers)
+
+    def set_case_completed(self, case_id: str, is_completed: bool) -> Dict[str, Any]:
+        return self._json(
+            "PATCH", f"/api/cases/{case_id}", json={"isCompleted": is_completed}
+        )
+
+    def delete_case(self, case_id: str) -> Dict[str, Any]:
+        return self._json("DELETE", f"/api/cases/{case_id}")
+
+    def assign_case(self, case_id: str, user_id: str) -> Dict[str, Any]:
+        return self._json(
+            "POST", f"/api/cases/{case_id}/assign", json={"userId": user_id}
+        )
+
+    # ------------------------------------------------------------------
+    # Hearings, notes and uploads
+    # ------------------------------------------------------------------
+
+    def list_hearings(self, case_id: str) -> List[Hearing]:
+        return self._json("GET", f"/api/cases/{case_id}/hearings")
+
+    def _case_list_page(self, path: str, cursor: Optional[str], limit: Optional[int]) -> Any:
+        # Sending limit is what asks these routes for a page rather than the whole list
+        params: Dict[str, Any] = {"limit": limit or DEFAULT_CASE_LIST_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        return self._json("GET", path, params=params)
+
+    def hearings_page(
+        self, case_id: str, cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> HearingPage:
+        """One page of a case's hearings, latest first; pass nextCursor for the next"""
+        return self._case_list_page(f"/api/cases/{case_id}/hearings", cursor, limit)
+
+    def add_hearing(
+        self,
+        case_id: str,
+        date: str,
+        notes: Optional[str] = None,
+        next_date: Optional[str] = None,
+        next_purpose: Optional[str] = None,
+    ) -> Hearing:
+        return self._json(
+            "POST",
+            f"/api/cases/{case_id}/hearings",
+            json={
+                "date": date,
+                "notes": notes,
+                "nextDate": next_date,
+                "nextPurpose": next_purpose,
+            },
+        )
+
+    @staticmethod
+    def _calendar_params(start: Optional[str], end: Optional[str], filters: Dict[str, Any]) -> Dict[str, Any]:
+        params: Dict[str, Any] = {}
+        for name, value in (("from", start), ("to", end), *filters.items()):
+            if value is not None:
+                params[name] = str(value).lower() if isinstance(value, bool) else value
+        return params
+
+    def hearing_calendar(self, start: Optional[str] = None, end: Optional[str] = None, **filters: Any) -> HearingCalendar:
+        """
+        Hearings of every visible case whose nextDate falls in [start, end),
+        from GET /api/hearings/calendar. `filters` are passed through as
+        query parameters (on, userId, isCompleted, includePERSONAL).
+        """
+        return self._json("GET", "/api/hearings/calendar", params=self._calendar_params(start, end, filters))
+
+    def hearing_calendar_ics(self, start: Optional[str] = None, end: Optional[str] = None, **filters: Any) -> str:
+        """The same window as an iCalendar feed"""
+        params = self._calendar_params(start, end, filters)
+        params["format"] = "ics"
+        response = self.request("GET", "/api/hearings/calendar", params=params)
+        if response.status_code >= 400:
+            raise ApiError(response)
+        return response.text
+
+    def list_notes(self, case_id: str) -> List[Note]:
+        return self._json("GET", f"/api/cases/{case_id}/notes")
+
+    def notes_page(
+        self, case_id: str, cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> NotePage:
+        """One page of a case's notes, newest first; pass nextCursor for the next"""
+        return self._case_list_page(f"/api/cases/{case_id}/notes", cursor, limit)
+
+    def list_uploads(self, case_id: str) -> List[Upload]:
+        return self._json("GET", f"/api/cases/{case_id}/upload")
+
+    def uploads_page(
+        self, case_id: str, cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> UploadPage:
+        """One page of a case's files, newest first; pass nextCursor for the next"""
+        return self._case_list_page(f"/api/cases/{case_id}/upload", cursor, limit)
+
+    def add_note(self, case_id: str, content: str) -> Note:
+        return self._json(
+            "POST", f"/api/cases/{case_id}/notes", json={"content": content}
+        )
+
+    def delete_note(self, note_id: str) -> Dict[str, Any]:
+        return self._json("DELETE", f"/api/notes/{note_id}")
+
+    def upload_file(
+        self,
+        case_id: str,
+        file_name: str,
+        content: Union[bytes, BinaryIO],
+        content_type: str = "application/pdf",
+    ) -> Upload:
+        data = self._json(
+            "POST",
+            f"/api/cases/{case_id}/upload",
+            files={"file": (file_name, content, content_type)},
+        )
+        return data["upload"]
+
+    def upload_files(
+        self, case_id: str, files: List[Tuple[str, Union[bytes, BinaryIO], str]]
+    ) -> Dict[str, Any]:
+        """
+        Upload several (file_name, content, content_type) files in one
+        request; returns { uploads, failed }
+        """
+        data = self._json(
+            "POST",
+            f"/api/cases/{case_id}/upload",
+            files=[("file", file) for file in files],
+        )
+        return {"uploads": data.get("uploads", [data["upload"]]), "failed": data.get("failed", [])}
+
+    def upload_file_resumable(
+        self,
+        case_id: str,
+        file_name: str,
+        content: BinaryIO,
+        size: int,
+        content_type: str = "application/pdf",
+        attempts: int = 3,
+    ) -> Upload:
+        """
+        Upload a seekable file through a resumable upload session, one chunk
+        in memory at a time. After a failed chunk the session's offset is
+        fetched and the upload continues from there.
+        """
+        session = self._json(
+            "POST",
+            f"/api/cases/{case_id}/upload/sessions",
+            json={"fileName": file_name, "fileType": content_type, "size": size},
+        )
+        path = f"/api/cases/{case_id}/upload/sessions/{session['sessionId']}"
+        offset = 0
+        failures = 0
+        while offset < size:
+            content.seek(offset)
+            chunk = content.read(session["chunkSize"])
+            try:
+                response = self.request("PATCH", path, data=chunk, headers={"Upload-Offset": str(offset)})
+            except requests.RequestException:
+                failures += 1
+                if failures >= attempts:
+                    raise
+                status = self._json("GET", path)
+                if "upload" in status:
+                    return status["upload"]
+                offset = status["offset"]
+                continue
+            if response.status_code == 409:
+                offset = response.json()["offset"]
+                continue
+            if response.status_code >= 400:
+                raise ApiError(response)
+            progress = response.json()
+            offset = progress["offset"]
+            if "upload" in progress:
+                return progress["upload"]
+        return self._json("GET", path)["upload"]
+
+    def rename_upload(self, upload_id: str, file_name: str) -> Upload:
+        data = self._json(
+            "PATCH", f"/api/uploads/{upload_id}/rename", json={"fileName": file_name}
+        )
+        return data["upload"]
+
+    def delete_upload(self, upload_id: str) -> Dict[str, Any]:
+        return self._json("DELETE", f"/api/uploads/{upload_id}")
+
+    # ------------------------------------------------------------------
+    # Exports
+    # ------------------------------------------------------------------
+
+    def changes(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> ChangePage:
+        """
+        One page of GET /api/changes: what changed in the user's cases after
+        `cursor`. Without a cursor only nextCursor is returned, to follow
+        from now; call again with nextCursor while hasMore. An expired
+        cursor raises ApiError with status 410.
+        """
+        params: Dict[str, Any] = {}
+        if cursor:
+            params["cursor"] = cursor
+        if limit:
+            params["limit"] = limit
+        return self._json("GET", "/api/changes", params=params)
+
+    def _download(self, path: str, params: Dict[str, Any]) -> bytes:
+        response = self.request("GET", path, params=params)
+        if response.status_code >= 400:
+            raise ApiError(response)
+        return response.content
+
+    def export_case(self, case_id: str, fmt: str = "pdf") -> bytes:
+        """One case file as PDF or CSV, rendered (and cached) by the server"""
+        return self._download(f"/api/cases/{case_id}/export", {"format": fmt})
+
+    def export_cases(
+        self,
+        kind: str = "docket",
+        fmt: str = "pdf",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        **filters: Any,
+    ) -> bytes:
+        """
+        A docket or a cause list for [start, end) from GET /api/cases/export.
+        `filters` are passed through as query parameters (userId, caseType,
+        isCompleted, includePERSONAL). Long lists are refused with 400; use
+        start_export for those.
+        """
+        params = self._calendar_params(start, end, filters)
+        params.update(kind=kind, format=fmt)
+        return self._download("/api/cases/export", params)
+
+    def start_export(
+        self,
+        kind: str = "docket",
+        fmt: str = "pdf",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        **filters: Any,
+    ) -> ExportJob:
+        """Queue the same export as a background job"""
+        body = {"kind": kind, "format": fmt, "from": start, "to": end, **filters}
+        return self._json("POST", "/api/exports", json={k: v for k, v in body.items() if v is not None})["job"]
+
+    def export_job(self, job_id: str) -> ExportJob:
+        return self._json("GET", f"/api/exports/{job_id}")["job"]
+
+    def wait_for_export(self, job_id: str, timeout: float = 120.0, interval: float = 0.5) -> ExportJob:
+        """Poll a job until it has completed or failed; raises TimeoutError otherwise"""
+        return _wait_for_job(self.export_job, "Export", job_id, timeout, interval)
+
+    def download_export(self, job: ExportJob) -> bytes:
+        """The file of a completed job, from its signed storage URL"""
+        response = self.session.get(job["downloadUrl"], timeout=self.timeout)
+        if response.status_code >= 400:
+            raise ApiError(response)
+        return response.content
+
+    # ------------------------------------------------------------------
+    # Legal assistant
+    # ------------------------------------------------------------------
+
+    def chat(self, messages: List[ChatMessage]) -> str:
+        """The assistant's complete answer to the last (user) message"""
+        return self._json("POST", "/api/chat", json={"messages": messages})["text"]
+
+    def chat_stream(self, messages: List[ChatMessage]) -> Iterator[str]:
+        """Yields the answer text as the server streams it"""
+        with self.request("POST", "/api/chat", json={"messages": messages, "stream": True}, stream=True) as response:
+            if response.status_code >= 400:
+                raise ApiError(response)
+            response.encoding = response.encoding or "utf-8"
+            for text in response.iter_content(chunk_size=None, decode_unicode=True):
+                if text:
+                    yield text
+
+    # ------------------------------------------------------------------
+    # Admin: users
+    # ------------------------------------------------------------------
+
+    def list_users(self) -> List[User]:
+        return self._json("GET", "/api/admin/users")
+
+    def list_users_with_case_counts(self) -> List[Dict[str, Any]]:
+        return self._json("GET", "/api/admin/users/with-case-counts")["users"]
+
+    def users_with_info_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        uploads: Optional[int] = None,
+        counts_only: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        One page of GET /api/admin/users-with-info: users in name order with
+        personal info, upload counts and up to `uploads` recent uploads each
+        """
+        params: Dict[str, Any] = {}
+        if cursor:
+            params["cursor"] = cursor
+        if limit:
+            params["limit"] = limit
+        if uploads is not None:
+            params["uploads"] = uploads
+        if counts_only:
+            params["counts"] = "true"
+        return self._json("GET", "/api/admin/users-with-info", params=params)
+
+    def admin_stats(self) -> AdminStats:
+        return self._json("GET", "/api/admin/stats")
+
+    def create_user(self, user: UserInput) -> User:
+        return self._json("POST", "/api/admin/users", json=user)["user"]
+
+    def get_user(self, user_id: str) -> User:
+        return self._json("GET", f"/api/admin/users/{user_id}")["user"]
+
+    def delete_user(self, user_id: str) -> Dict[str, Any]:
+        return self._json("DELETE", f"/api/admin/users/{user_id}")
+
+    def reassign_cases(self, source_user_id: Optional[str], target_user_id: str) -> Dict[str, Any]:
+        """
+        Start moving every case of source_user_id (None: the cases with no
+        owner) to target_user_id. The response carries the background job,
+        or count 0 and no job when there was nothing to move.
+        """
+        return self._json(
+            "POST",
+            "/api/admin/cases/reassign",
+            json={"sourceUserId": source_user_id, "targetUserId": target_user_id},
+        )
+
+    def reassign_job(self, job_id: str) -> ReassignJob:
+        return self._json("GET", f"/api/admin/cases/reassign/{job_id}")["job"]
+
+    def wait_for_reassign(self, job_id: str, timeout: float = 120.0, interval: float = 0.5) -> ReassignJob:
+        """Poll a reassignment until it has completed or failed; raises TimeoutError otherwise"""
+        return _wait_for_job(self.reassign_job, "Reassignment", job_id, timeout, interval)
@@ -0,0 +1,572 @@
+"""
+Synthetic large-firm datasets for performance testing.
+
+A dataset is a number of users with a number of cases each. Every case is
+generated as an eCourts-style record (the db.json shape) with parties, a
+chain of hearings, notes and upload metadata. Case types, courts and
+judges, hearing purposes, party counts and the gaps between hearings
+follow the distributions of a template file, db.json by default. Party
+and advocate names come from built-in pools.
+
+Generation is reproducible: case n of a dataset depends only on the seed,
+n and the --as-of date, so the same arguments always give the same data
+and a smaller dataset is a prefix of a larger one. Each case's hearings
+form a chain: every hearing's nextDate is the date of the one after it.
+The last nextDate lies ahead of --as-of for pending cases and is empty for
+completed ones.
+
+A dataset is written in one of two ways:
+
+- copy: one PostgreSQL COPY file per table plus load.sql, which loads
+  them with psql's \\copy in one transaction; the fast way to get a
+  100k-case dataset into a development database
+- api: through the app, cases with their hearings in parallel
+  POST /api/cases/batch requests (see importer.py), then notes and
+  completion per case. Upload metadata has no API of its own, so it is
+  only written by copy.
+
+    python -m advocate_diary.dataset --users 50 --cases-per-user 2000 --seed 7 copy datasets/100k
+    python -m advocate_diary.dataset --users 5 --cases-per-user 100 api --base-url http://localhost:3000
+"""
+
+import argparse
+import json
+import os
+import random
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from advocate_diary.client import AdvocateDiaryClient, ApiError, LoginCache
+from advocate_diary.importer import CaseImporter, CaseKey, RecordError, case_key, iter_records, map_record
+from advocate_diary.models import CaseInput
+
+DEFAULT_TEMPLATE = Path(__file__).resolve().parent.parent / "db.json"
+
+# Password of every generated user; the copy files carry its bcrypt hash
+# (cost 10, as prisma/seed.ts hashes it)
+PASSWORD = "password123"
+PASSWORD_HASH = "$2b$10$SblRKt1jBMzCz1jPMLfRx.CwQlfbNHUrgHb3xg0O35zbeplBHtzaq"
+
+# Registration numbers start here, well above real ones, so a dataset can
+# be loaded next to real data without hitting the unique key
+DEFAULT_REGISTRATION_START = 50_000
+
+STORAGE_URL = "https://storage.invalid/storage/v1/object/public"
+CASE_FILES_BUCKET = "case-files"
+
+# Ids are uuid5s of the seed, the kind of row and its position
+_ID_NAMESPACE = uuid.UUID("5f0c3c1e-9a52-4c1b-8d0e-6b7f8e0a2d41")
+
+FIRST_NAMES = (
+    "Aarav", "Aditi", "Amit", "Ananya", "Arjun", "Deepa", "Farhan", "Gurpreet", "Harish", "Ishita",
+    "Kavya", "Manoj", "Meera", "Nikhil", "Pooja", "Rahul", "Rekha", "Sandeep", "Sunita", "Vikram",
+)
+LAST_NAMES = (
+    "Agarwal", "Bansal", "Chauhan", "Das", "Gupta", "Iyer", "Jain", "Kapoor", "Khan", "Kumar",
+    "Malhotra", "Mehta", "Nair", "Reddy", "Saxena", "Sharma", "Singh", "Srivastava", "Verma", "Yadav",
+)
+PARTY_SUFFIXES = ("", "", "", " AND ORS.", " & ANR.")
+NOTE_TEMPLATES = (
+    "Client called about the {purpose} listing on {date}.",
+    "Filed reply; next listing {date} for {purpose}.",
+    "Documents pending from client before {date}.",
+    "Opposing counsel sought adjournment; {purpose} on {date}.",
+    "Prepare written submissions for {purpose}.",
+)
+UPLOAD_FILES = (
+    ("Vakalatnama.pdf", "application/pdf"),
+    ("Petition.pdf", "application/pdf"),
+    ("Written statement.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    ("Order sheet.pdf", "application/pdf"),
+    ("Evidence.jpg", "image/jpeg"),
+    ("Affidavit.doc", "application/msword"),
+)
+
+# Columns of the copy files, in the order of the migrated tables
+COPY_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "User": ("id", "email", "password", "name", "role", "createdAt", "updatedAt"),
+    "Case": (
+        "id", "caseType", "registrationYear", "registrationNum", "title", "courtName",
+        "createdAt", "updatedAt", "userId", "isCompleted",
+    ),
+    "Petitioner": ("id", "name", "advocate", "caseId"),
+    "Respondent": ("id", "name", "advocate", "caseId"),
+    "Hearing": ("id", "date", "notes", "nextDate", "nextPurpose", "createdAt", "updatedAt", "caseId"),
+    "Note": ("id", "content", "createdAt", "updatedAt", "caseId", "userId"),
+    "Upload": ("id", "fileName", "fileUrl", "fileType", "createdAt", "caseId", "userId"),
+}
+
+# Tables whose triggers maintain the search and similarity indexes
+_INDEXED_TABLES = ("Case", "Petitioner", "Respondent", "Hearing", "Note")
+
+
+def _ecourts_date(value: date) -> str:
+    return f"{value.day:02d}-{value.month:02d}-{value.year}"
+
+
+def _parse_ecourts_date(value: Optional[str]) -> Optional[date]:
+    try:
+        return datetime.strptime((value or "").strip(), "%d-%m-%Y").date()
+    except ValueError:
+        return None
+
+
+class Template:
+    """Distributions of case types, courts, purposes, party counts and hearing gaps"""
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        self.case_types: Counter = Counter()
+        self.courts: Counter = Counter()
+        self.purposes: Counter = Counter()
+        self.petitioner_counts: Counter = Counter()
+        self.respondent_counts: Counter = Counter()
+        self.hearing_gaps: List[int] = []
+        advocates = set()
+
+        for record in records:
+            self.case_types[(record.get("case_type") or "").strip()] += 1
+            court = (record.get("case_status") or {}).get("court") or {}
+            self.courts[(str(court.get("number", "")), court.get("judge", ""))] += 1
+            self.petitioner_counts[len(record.get("petitioners") or [])] += 1
+            self.respondent_counts[len(record.get("respondents") or [])] += 1
+            for party in (record.get("petitioners") or []) + (record.get("respondents") or []):
+                if party.get("advocate"):
+                    advocates.add(party["advocate"])
+            for entry in record.get("case_history") or []:
+                if entry.get("purpose"):
+                    self.purposes[entry["purpose"]] += 1
+                held = _parse_ecourts_date(entry.get("business_on_date"))
+                listed = _parse_ecourts_date(entry.get("hearing_date"))
+                if held and listed and listed > held:
+                    self.hearing_gaps.append((listed - held).days)
+
+        self.case_types.pop("", None)
+        self.petitioner_counts.pop(0, None)
+        self.respondent_counts.pop(0, None)
+        if not self.case_types or not self.courts:
+            raise RecordError("The template has no usable case records")
+        self.purposes = self.purposes or Counter({"Hearing": 1})
+        self.petitioner_counts = self.petitioner_counts or Counter({1: 1})
+        self.respondent_counts = self.respondent_counts or Counter({1: 1})
+        self.hearing_gaps = self.hearing_gaps or [60]
+        self.advocates = sorted(advocates)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "Template":
+        return cls(iter_records(str(path or DEFAULT_TEMPLATE)))
+
+
+def _pick(rng: random.Random, counts: Counter) -> Any:
+    return rng.choices(list(counts), weights=list(counts.values()))[0]
+
+
+class DatasetSpec:
+    """Scale and shape of a dataset; per-case counts are means"""
+
+    def __init__(
+        self,
+        users: int = 10,
+        cases_per_user: int = 100,
+        seed: int = 0,
+        hearings_per_case: float = 10.0,
+        notes_per_case: float = 2.0,
+        uploads_per_case: float = 1.0,
+        extra_parties: float = 1.0,
+        completed_share: float = 0.3,
+        personal_share: float = 0.02,
+        years: int = 8,
+        as_of: Optional[date] = None,
+        registration_start: int = DEFAULT_REGISTRATION_START,
+    ):
+        self.users = users
+        self.cases_per_user = cases_per_user
+        self.seed = seed
+        self.hearings_per_case = max(1.0, hearings_per_case)
+        self.notes_per_case = notes_per_case
+        self.uploads_per_case = uploads_per_case
+        self.extra_parties = extra_parties
+        self.completed_share = completed_share
+        self.personal_share = personal_share
+        self.years = years
+        self.as_of = as_of or date.today()
+        self.registration_start = registration_start
+
+    @property
+    def cases(self) -> int:
+        return self.users * self.cases_per_user
+
+
+class Dataset:
+    """Generates the users and case records of a spec from a template"""
+
+    def __init__(self, spec: DatasetSpec, template: Optional[Template] = None):
+        self.spec = spec
+        self.template = template or Template.load()
+        self.advocates = list(self.template.advocates)
+        rng = self._rng("advocates")
+        while len(self.advocates) < 40:
+            self.advocates.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+
+    def _rng(self, *key: Any) -> random.Random:
+        return random.Random(":".join(str(part) for part in (self.spec.seed,) + key))
+
+    def id(self, *key: Any) -> str:
+        return str(uuid.uuid5(_ID_NAMESPACE, ":".join(str(part) for part in (self.spec.seed,) + key)))
+
+    def users(self) -> Iterator[Dict[str, Any]]:
+        """The firm's advocates: name, email, password and role"""
+        for n in range(self.spec.users):
+            rng = self._rng("user", n)
+            yield {
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "email": f"perf.user{n}.s{self.spec.seed}@example.com",
+                "password": PASSWORD,
+                "role": "USER",
+            }
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Case records in the db.json shape, with owner (a user index),
+        is_completed, notes and uploads added
+        """
+        next_num: Dict[Tuple[str, int], int] = {}
+        for n in range(self.spec.cases):
+            record = self._record(n)
+            key = (record["case_type"], int(record["registration"]["number"].split("/")[1]))
+            num = next_num.get(key, self.spec.registration_start)
+            next_num[key] = num + 1
+            record["registration"]["number"] = f"{num}/{key[1]}"
+            yield record
+
+    def _party(self, rng: random.Random, with_advocate: bool) -> Dict[str, Any]:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}".upper() + rng.choice(PARTY_SUFFIXES)
+        return {"name": name, "advocate": rng.choice(self.advocates) if with_advocate else None}
+
+    def _party_count(self, rng: random.Random, counts: Counter) -> int:
+        count = _pick(rng, counts)
+        if self.spec.extra_parties > 0:
+            count += int(rng.expovariate(1 / self.spec.extra_parties))
+        return count
+
+    def _record(self, n: int) -> Dict[str, Any]:
+        spec, template = self.spec, self.template
+        rng = self._rng("case", n)
+        as_of = spec.as_of
+
+        registered = as_of - timedelta(days=rng.randrange(1, spec.years * 365))
+        filed = registered - timedelta(days=rng.randrange(1, 30))
+        personal = rng.random() < spec.personal_share
+        case_type = "PERSONAL" if personal else _pick(rng, template.case_types)
+        court_number, judge = _pick(rng, template.courts)
+        completed = rng.random() < spec.completed_share
+
+        # Hearings at most weekly over the life of the case, on average
+        # hearings_per_case of them
+        span = (as_of - registered).days
+        wanted = 1 + int(rng.expovariate(1 / spec.hearings_per_case)) if spec.hearings_per_case > 1 else 1
+        count = max(1, min(wanted, span // 7))
+        held = [registered] + sorted(registered + timedelta(days=d) for d in rng.sample(range(1, span), count - 1))
+        if completed:
+            listed: List[Optional[date]] = held[1:] + [None]
+        else:
+            listed = held[1:] + [as_of + timedelta(days=max(7, min(120, rng.choice(template.hearing_gaps))))]
+        history = [
+            {
+                "judge": judge,
+                "business_on_date": _ecourts_date(on),
+                "hearing_date": _ecourts_date(next_on) if next_on else "",
+                "purpose": _pick(rng, template.purposes),
+            }
+            for on, next_on in zip(held, listed)
+        ]
+
+        start = datetime.combine(registered, time())
+        notes = []
+        for _ in range(rng.randint(0, int(2 * spec.notes_per_case))):
+            entry = rng.choice(history)
+            written = start + timedelta(days=rng.randrange(0, span + 1), seconds=rng.randrange(86400))
+            notes.append({
+                "content": rng.choice(NOTE_TEMPLATES).format(
+                    purpose=entry["purpose"], date=entry["hearing_date"] or entry["business_on_date"]
+                ),
+                "created_at": written,
+            })
+        uploads = []
+        for _ in range(rng.randint(0, int(2 * spec.uploads_per_case))):
+            file_name, file_type = rng.choice(UPLOAD_FILES)
+            uploaded = start + timedelta(days=rng.randrange(0, span + 1), seconds=rng.randrange(86400))
+            uploads.append({"file_name": file_name, "file_type": file_type, "created_at": uploaded})
+
+        petitioners = [self._party(rng, True) for _ in range(self._party_count(rng, template.petitioner_counts))]
+        respondents = [
+            self._party(rng, rng.random() < 0.5) for _ in range(self._party_count(rng, template.respondent_counts))
+        ]
+        return {
+            "case_type": case_type,
+            "filing": {"number": f"{rng.randrange(1, 10000)}/{filed.year}", "date": _ecourts_date(filed)},
+            # The number is filled in by records(), which numbers cases per type and year
+            "registration": {"number": f"0/{registered.year}", "date": _ecourts_date(registered)},
+            "case_status": {
+                "first_hearing_date": history[0]["business_on_date"],
+                "next_hearing_date": history[-1]["hearing_date"],
+                "case_stage": history[-1]["purpose"],
+                "court": {"number": court_number, "judge": judge},
+            },
+            "petitioners": petitioners,
+            "respondents": respondents,
+            "case_history": history,
+            "owner": n // spec.cases_per_user,
+            "is_completed": completed,
+            "notes": notes,
+            "uploads": uploads,
+        }
+
+
+# ---------------------------------------------------------------------------
+# COPY files
+# ---------------------------------------------------------------------------
+
+
+def _copy_value(value: Any) -> str:
+    """One field in PostgreSQL's COPY text format"""
+    if type(value) is str:
+        if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+            return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+        return value
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(" ", "milliseconds")
+    if isinstance(value, date):
+        return f"{value.isoformat()} 00:00:00"
+    return str(value)
+
+
+def _iso_to_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value[:19]) if value else None
+
+
+class CopyWriter:
+    """Writes rows to one COPY file per table in a directory"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.counts: Dict[str, int] = {table: 0 for table in COPY_COLUMNS}
+        self._files: Dict[str, IO[str]] = {}
+
+    def __enter__(self) -> "CopyWriter":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for table in COPY_COLUMNS:
+            self._files[table] = open(self.directory / f"{table}.tsv", "w", encoding="utf-8", newline="\n")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for handle in self._files.values():
+            handle.close()
+
+    def row(self, table: str, values: Sequence[Any]) -> None:
+        self._files[table].write("\t".join(_copy_value(value) for value in values) + "\n")
+        self.counts[table] += 1
+
+
+def load_script(counts: Dict[str, int]) -> str:
+    """psql script that loads the copy files and rebuilds the search indexes once"""
+    lines = [
+        "-- Loads the synthetic dataset in this directory. Run from here:",
+        '--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f load.sql',
+        f"-- Rows: {', '.join(f'{table} {count}' for table, count in counts.items())}",
+        "BEGIN;",
+        # Row triggers would rebuild the search documents once per case
+        *(f'ALTER TABLE "{table}" DISABLE TRIGGER USER;' for table in _INDEXED_TABLES),
+    ]
+    for table, columns in COPY_COLUMNS.items():
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        lines.append(f"\\copy \"{table}\" ({column_list}) FROM '{table}.tsv'")
+    lines += [
+        *(f'ALTER TABLE "{table}" ENABLE TRIGGER USER;' for table in _INDEXED_TABLES),
+        'SELECT refresh_case_search(ARRAY(SELECT c."id" FROM "Case" c WHERE NOT EXISTS '
+        '(SELECT 1 FROM "CaseSearchDocument" d WHERE d."caseId" = c."id")));',
+        'SELECT refresh_case_similarity(ARRAY(SELECT c."id" FROM "Case" c WHERE NOT EXISTS '
+        '(SELECT 1 FROM "CaseSimilarityDocument" d WHERE d."caseId" = c."id")));',
+        "COMMIT;",
+        f"ANALYZE {', '.join(f'{chr(34)}{table}{chr(34)}' for table in COPY_COLUMNS)};",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_copy_files(dataset: Dataset, directory: str, storage_url: str = STORAGE_URL) -> Dict[str, int]:
+    """Writes the dataset as COPY files plus load.sql; returns rows per table"""
+    path = Path(directory)
+    created = datetime.combine(dataset.spec.as_of, time())
+    user_ids = []
+    with CopyWriter(path) as out:
+        for n, user in enumerate(dataset.users()):
+            user_ids.append(dataset.id("user", n))
+            out.row("User", (user_ids[-1], user["email"], PASSWORD_HASH, user["name"], user["role"], created, created))
+
+        for n, record in enumerate(dataset.records()):
+            case = map_record(record)
+            case_id = dataset.id("case", n)
+            user_id = user_ids[record["owner"]]
+            hearings = case["hearings"]
+            registered = _iso_to_datetime(hearings[0]["date"])
+            updated = max(
+                [_iso_to_datetime(hearing["date"]) for hearing in hearings]
+                + [note["created_at"] for note in record["notes"]]
+                + [upload["created_at"] for upload in record["uploads"]]
+            )
+            out.row("Case", (
+                case_id, case["caseType"], case["registrationYear"], case["registrationNum"], case["title"],
+                case["courtName"], registered, updated, user_id, record["is_completed"],
+            ))
+            for kind, parties in (("Petitioner", case["petitioners"]), ("Respondent", case["respondents"])):
+                for i, party in enumerate(parties):
+                    out.row(kind, (dataset.id(kind, n, i), party["name"], party.get("advocate"), case_id))
+            for i, hearing in enumerate(hearings):
+                held = _iso_to_datetime(hearing["date"])
+                out.row("Hearing", (
+                    dataset.id("hearing", n, i), held, hearing["notes"], _iso_to_datetime(hearing["nextDate"]),
+                    hearing["nextPurpose"], held, held, case_id,
+                ))
+            for i, note in enumerate(record["notes"]):
+                written = note["created_at"]
+                out.row("Note", (dataset.id("note", n, i), note["content"], written, written, case_id, user_id))
+            for i, upload in enumerate(record["uploads"]):
+                stamp = int(upload["created_at"].replace(tzinfo=timezone.utc).timestamp() * 1000)
+                file_url = f"{storage_url}/{CASE_FILES_BUCKET}/{case_id}/{stamp}-{upload['file_name']}"
+                out.row("Upload", (
+                    dataset.id("upload", n, i), upload["file_name"], file_url, upload["file_type"],
+                    upload["created_at"], case_id, user_id,
+                ))
+
+    (path / "load.sql").write_text(load_script(out.counts), encoding="utf-8")
+    return out.counts
+
+
+# ---------------------------------------------------------------------------
+# Through the API
+# ---------------------------------------------------------------------------
+
+
+def load_through_api(
+    dataset: Dataset,
+    base_url: Optional[str] = None,
+    credentials: Sequence[str] = ("admin@example.com", "password123", "ADMIN"),
+    batch_size: int = 100,
+    concurrency: int = 8,
+) -> Dict[str, Any]:
+    """
+    Creates the users, then the cases with their hearings in parallel
+    batches, then each new case's notes and completion. Users and cases
+    that already exist (from an earlier run of the same dataset) are kept.
+    """
+    login_cache = LoginCache()
+    importer = CaseImporter(
+        base_url,
+        credentials=credentials,
+        login_cache=login_cache,
+        batch_size=batch_size,
+        concurrency=concurrency,
+    )
+
+    with AdvocateDiaryClient(importer.base_url, login_cache=login_cache) as admin:
+        admin.login(*credentials)
+        existing = {user["email"]: user["id"] for user in admin.list_users()}
+        user_ids = []
+        for user in dataset.users():
+            if user["email"] not in existing:
+                existing[user["email"]] = admin.create_user(user)["id"]
+            user_ids.append(existing[user["email"]])
+
+    # Notes and completion of each case, written once the case exists
+    follow_ups: Dict[CaseKey, Tuple[List[str], bool]] = {}
+
+    def cases() -> Iterator[CaseInput]:
+        for record in dataset.records():
+            case = map_record(record, user_ids[record["owner"]])
+            if record["notes"] or record["is_completed"]:
+                follow_ups[case_key(case)] = ([note["content"] for note in record["notes"]], record["is_completed"])
+            yield case
+
+    summary = importer.run_cases(cases())
+
+    def follow_up(key: CaseKey) -> Tuple[int, Optional[str]]:
+        notes, completed = follow_ups[key]
+        case_id = summary.ids[key]
+        client = importer.client()
+        try:
+            for note in notes:
+                client.add_note(case_id, note)
+            if completed:
+                client.set_case_completed(case_id, True)
+        except ApiError as error:
+            return 0, str(error)
+        return len(notes), None
+
+    written = 0
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            created = [key for key in summary.ids if key in follow_ups]
+            for key, (count, error) in zip(created, pool.map(follow_up, created)):
+                written += count
+                if error:
+                    summary.failed.append((key, error))
+    finally:
+        importer.close()
+
+    return {**summary.as_dict(), "users": len(user_ids), "notes": written}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic firm for performance testing")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--cases-per-user", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hearings-per-case", type=float, default=10.0, help="Mean hearings per case")
+    parser.add_argument("--notes-per-case", type=float, default=2.0, help="Mean notes per case")
+    parser.add_argument("--uploads-per-case", type=float, default=1.0, help="Mean uploads per case (copy only)")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="Date the dataset is generated for (default today)")
+    parser.add_argument("--template", default=str(DEFAULT_TEMPLATE), help="eCourts records to draw distributions from")
+    targets = parser.add_subparsers(dest="target", required=True)
+    copy_parser = targets.add_parser("copy", help="Write COPY files and load.sql to a directory")
+    copy_parser.add_argument("directory")
+    copy_parser.add_argument("--storage-url", default=os.environ.get("SUPABASE_STORAGE_URL", STORAGE_URL))
+    api_parser = targets.add_parser("api", help="Create the dataset through the app's API")
+    api_parser.add_argument("--base-url")
+    api_parser.add_argument("--email", default="admin@example.com")
+    api_parser.add_argument("--password", default="password123")
+    api_parser.add_argument("--batch-size", type=int, default=100)
+    api_parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(
+        users=args.users,
+        cases_per_user=args.cases_per_user,
+        seed=args.seed,
+        hearings_per_case=args.hearings_per_case,
+        notes_per_case=args.notes_per_case,
+        uploads_per_case=args.uploads_per_case,
+        as_of=args.as_of,
+    )
+    dataset = Dataset(spec, Template.load(args.template))
+    if args.target == "copy":
+        result: Dict[str, Any] = write_copy_files(dataset, args.directory, args.storage_url)
+    else:
+        result = load_through_api(
+            dataset,
+            args.base_url,
+            credentials=(args.email, args.password, "ADMIN"),
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+        )
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Streaming bulk importer for eCourts-style case records (the db.json shape).
+
+Records are read one at a time from a JSON array or JSON Lines file, so
+memory stays bounded by the batch size rather than the file size. Each
+record is mapped the same way prisma/seed.ts maps db.json:
+
+- "138/2024" registration numbers become registrationNum/registrationYear
+- petitioners/respondents become Petitioner/Respondent rows
+- case_history entries become Hearing rows (business_on_date -> date,
+  hearing_date -> nextDate, purpose -> nextPurpose)
+
+Each batch is one POST /api/cases/batch request, which creates the cases
+together with their hearings in a transaction. At most `concurrency`
+batches are in flight, one pooled client per worker thread. The import
+is idempotent on the (caseType, registrationYear, registrationNum) unique
+key: the server reports cases that already exist, or that appear earlier
+in the same file, as conflicts and they are counted as skipped.
+
+    python -m advocate_diary.importer db.json --base-url http://localhost:3000
+"""
+
+import argparse
+import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from advocate_diary.client import AdvocateDiaryClient, ApiError, LoginCache, resolve_base_url
+from advocate_diary.models import BatchResult, CaseInput, HearingInput
+
+CaseKey = Tuple[str, int, int]
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Largest batch POST /api/cases/batch accepts
+MAX_BATCH_SIZE = 500
+
+# Longest JSON token that can still be cut off by the end of a read chunk
+# (-Infinity); a decode error further back cannot be fixed by reading more
+LONGEST_PARTIAL_TOKEN = 9
+
+
+class RecordError(ValueError):
+    """A source record that cannot be mapped onto the Case model"""
+
+
+def _iter_json_array(handle: IO[str], chunk_size: int) -> Iterator[Dict[str, Any]]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    # UTF-8 bytes of the file before buffer[0], for error messages
+    base = 0
+    eof = False
+    started = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, base, eof
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        base += len(buffer[:position].encode("utf-8"))
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def offset(index: int) -> int:
+        return base + len(buffer[:index].encode("utf-8"))
+
+    while True:
+        # Skip whitespace and separators, pulling more input as needed
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or not fill():
+                break
+
+        if position >= len(buffer):
+            raise RecordError("Unexpected end of file: JSON array is not closed")
+
+        char = buffer[position]
+        if not started:
+            if char != "[":
+                raise RecordError(f"Expected a JSON array of case records at byte {offset(position)}")
+            started = True
+            position += 1
+            continue
+        if char == "]":
+            return
+        if char != "{":
+            raise RecordError(f"Expected a case object at byte {offset(position)}, found {char!r}")
+
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError as error:
+                # Only an open string or a token running into the end of the
+                # buffer can be completed by the next chunk; anything else is
+                # reported now instead of after reading the rest of the file
+                if not error.msg.startswith("Unterminated string") and error.pos < len(buffer) - LONGEST_PARTIAL_TOKEN:
+                    raise RecordError(f"Malformed case record at byte {offset(error.pos)}: {error.msg}") from None
+                if eof or not fill():
+                    raise RecordError(f"Truncated case record at end of file (from byte {offset(position)})")
+        position = end
+        yield record
+
+
+def iter_records(source: Union[str, IO[str]], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield case records one by one from a JSON array (db.json) or JSON Lines
+    file without loading the whole file
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as handle:
+            yield from iter_records(handle, chunk_size)
+        return
+
+    first = ""
+    while not first:
+        first = source.read(1)
+        if not first:
+            return
+        if first.isspace():
+            first = ""
+
+    if first == "[":
+        yield from _iter_json_array(_Prepended(first, source), chunk_size)
+        return
+
+    # JSON Lines: one record per line
+    line = first + source.readline()
+    while line:
+        if line.strip():
+            yield json.loads(line)
+        line = source.readline()
+
+
+class _Prepended:
+    """File wrapper that replays characters already consumed while sniffing"""
+
+    def __init__(self, prefix: str, handle: IO[str]):
+        self.prefix = prefix
+        self.handle = handle
+
+    def read(self, size: int) -> str:
+        if self.prefix:
+            data, self.prefix = self.prefix, ""
+            return data + self.handle.read(max(0, size - len(data)))
+        return self.handle.read(size)
+
+
+def parse_registration(value: Optional[str]) -> Tuple[int, int]:
+    """Split an eCourts "138/2024" registration into (number, year)"""
+    parts = (value or "").split("/")
+    if len(parts) != 2:
+        raise RecordError(f"Invalid registration number: {value!r}")
+    try:
+        return int(parts[0]), int(parts[1])
+    except ValueError:
+        raise RecordError(f"Invalid registration number: {value!r}")
+
+
+def parse_date(value: Optional[str]) -> Optional[str]:
+    """Convert an eCourts DD-MM-YYYY date to ISO 8601, or None if blank/invalid"""
+    if not value:
+        return None
+    # Split by hand: strptime dominates the cost of mapping large files
+    parts = value.strip().split("-")
+    if len(parts) != 3 or len(parts[2]) != 4:
+        return None
+    try:
+        parsed = date(int(parts[2]), int(parts[1]), int(parts[0]))
+    except ValueError:
+        return None
+    return f"{parsed.isoformat()}T00:00:00.000Z"
+
+
+def map_record(record: Dict[str, Any], user_id: Optional[str] = None) -> CaseInput:
+    """Map one db.json record onto a CaseInput carrying its hearings"""
+    case_type = (record.get("case_type") or "").strip()
+    if not case_type:
+        raise RecordError("Missing case_type")
+    num, year = parse_registration((record.get("registration") or {}).get("number"))
+
+    petitioners = [
+        {"name": p["name"], "advocate": p.get("advocate")}
+        for p in record.get("petitioners") or []
+        if p.get("name")
+    ]
+    respondents = [
+        {"name": r["name"], "advocate": r.get("advocate")}
+        for r in record.get("respondents") or []
+        if r.get("name")
+    ]
+    if not petitioners or not respondents:
+        raise RecordError(f"{case_type} {num}/{year} needs at least one petitioner and respondent")
+
+    court = (record.get("case_status") or {}).get("court") or {}
+    case: CaseInput = {
+        "caseType": case_type,
+        "registrationNum": num,
+        "registrationYear": year,
+        "title": f"{petitioners[0]['name']} vs {respondents[0]['name']}",
+        "courtName": f"Court {court.get('number', '')} - {court.get('judge', '')}",
+        "petitioners": petitioners,
+        "respondents": respondents,
+    }
+    if user_id:
+        case["userId"] = user_id
+
+    hearings: List[HearingInput] = []
+    for entry in record.get("case_history") or []:
+        date = parse_date(entry.get("business_on_date"))
+        if date is None:
+            continue
+        hearings.append({
+            "date": date,
+            "nextDate": parse_date(entry.get("hearing_date")),
+            "nextPurpose": entry.get("purpose"),
+            "notes": f"Hearing before {entry['judge']}" if entry.get("judge") else None,
+        })
+
+    case["hearings"] = hearings
+    return case
+
+
+def case_key(case: Dict[str, Any]) -> CaseKey:
+    return (case["caseType"], int(case["registrationYear"]), int(case["registrationNum"]))
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportSummary:
+    def __init__(self):
+        self.created: List[str] = []
+        self.skipped = 0
+        self.invalid = 0
+        self.failed: List[Tuple[CaseKey, str]] = []
+        self.hearings = 0
+        # Id of every created case by its unique key
+        self.ids: Dict[CaseKey, str] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "created": len(self.created),
+            "hearings": self.hearings,
+            "skipped": self.skipped,
+            "invalid": self.invalid,
+            "failed": len(self.failed),
+        }
+
+
+class CaseImporter:
+    """Submits mapped records in batches with at most `concurrency` batches in flight"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        credentials: Sequence[str] = ("admin@example.com", "password123", "ADMIN"),
+        login_cache: Optional[LoginCache] = None,
+        batch_size: int = 100,
+        concurrency: int = 8,
+        user_id: Optional[str] = None,
+    ):
+        self.base_url = resolve_base_url(base_url)
+        self.credentials = credentials
+        self.login_cache = login_cache or LoginCache()
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.concurrency = concurrency
+        self.user_id = user_id
+        self._local = threading.local()
+        self._clients: List[AdvocateDiaryClient] = []
+        self._lock = threading.Lock()
+
+    def client(self) -> AdvocateDiaryClient:
+        """Pooled client for the calling thread, signed in via the shared cache"""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = AdvocateDiaryClient(self.base_url, login_cache=self.login_cache)
+            client.login(*self.credentials)
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        return client
+
+    def run(self, records: Iterable[Dict[str, Any]]) -> ImportSummary:
+        summary = ImportSummary()
+
+        def mapped() -> Iterator[CaseInput]:
+            for record in records:
+                try:
+                    yield map_record(record, self.user_id)
+                except RecordError:
+                    summary.invalid += 1
+
+        return self.run_cases(mapped(), summary)
+
+    def run_cases(self, cases: Iterable[CaseInput], summary: Optional[ImportSummary] = None) -> ImportSummary:
+        """Submits already mapped cases, e.g. ones carrying their own userId"""
+        summary = summary or ImportSummary()
+        # Executor.map would drain the whole file up front, so keep an
+        # explicit window of in-flight batches instead
+        in_flight = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                for batch in batched(cases, self.batch_size):
+                    if len(in_flight) >= self.concurrency:
+                        self._tally(summary, *in_flight.popleft().result())
+                    in_flight.append(pool.submit(self._submit, batch))
+                while in_flight:
+                    self._tally(summary, *in_flight.popleft().result())
+        finally:
+            self.close()
+        return summary
+
+    def close(self) -> None:
+        """Closes the clients of the worker threads; later calls sign in afresh"""
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+        self._local = threading.local()
+
+    def _submit(self, batch: List[CaseInput]) -> Tuple[List[CaseInput], Optional[BatchResult], Optional[str]]:
+        try:
+            return batch, self.client().create_cases(batch), None
+        except ApiError as error:
+            return batch, None, str(error)
+
+    @staticmethod
+    def _tally(summary: ImportSummary, batch: List[CaseInput], result: Optional[BatchResult], error: Optional[str]) -> None:
+        if result is None:
+            summary.failed.extend((case_key(case), error) for case in batch)
+            return
+
+        for item in result["results"]:
+            case = batch[item["index"]]
+            status = item["status"]
+            if status == "created":
+                summary.created.append(item["id"])
+                summary.ids[case_key(case)] = item["id"]
+                summary.hearings += len(case.get("hearings", []))
+            elif status == "conflict":
+                summary.skipped += 1
+            elif status == "invalid":
+                summary.invalid += 1
+            else:
+                summary.failed.append((case_key(case), item.get("error", status)))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import eCourts-style case records")
+    parser.add_argument("path", help="JSON array (like db.json) or JSON Lines file")
+    parser.add_argument("--base-url")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--assign-to", help="User id that should own the imported cases")
+    args = parser.parse_args(argv)
+
+    importer = CaseImporter(
+        args.base_url,
+        credentials=(args.email, args.password, "ADMIN"),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        user_id=args.assign_to,
+    )
+    summary = importer.run(iter_records(args.path))
+    for key, error in summary.failed:
+        print(f"FAILED {key[0]} {key[2]}/{key[1]}: {error}")
+    print(json.dumps(summary.as_dict()))
+
+
+if __name__ == "__main__":
+    main()
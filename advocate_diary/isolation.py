@@ -0,0 +1,169 @@
+"""
+Helpers that let several processes (pytest-xdist workers, bulk scripts)
+write to one deployment at the same time without colliding.
+
+Every process gets a Namespace derived from the run id and its worker id,
+a RegistrationAllocator that hands out case registration numbers from a
+block reserved for that worker, and ResourceTrackers that delete whatever
+they created when a test or script finishes, even after a failure.
+"""
+
+import hashlib
+import itertools
+import os
+import re
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from advocate_diary.client import AdvocateDiaryClient, ApiError
+from advocate_diary.models import Case, CaseInput, User, UserInput
+
+# Set by pytest-xdist in every worker process
+XDIST_WORKER_ENV = "PYTEST_XDIST_WORKER"
+XDIST_RUN_ENV = "PYTEST_XDIST_TESTRUNUID"
+
+# Case.registrationNum is a PostgreSQL int4
+MAX_REGISTRATION_NUM = 2**31 - 1
+REGISTRATION_BLOCK = 100_000
+
+_process_run_id = uuid.uuid4().hex
+
+
+def worker_id() -> str:
+    """xdist worker id ("gw0", "gw1", ...) or "main" outside xdist"""
+    return os.environ.get(XDIST_WORKER_ENV, "main")
+
+
+def worker_index(worker: Optional[str] = None) -> int:
+    match = re.search(r"(\d+)$", worker or worker_id())
+    return int(match.group(1)) if match else 0
+
+
+def run_id() -> str:
+    """Id shared by all workers of one pytest run, or unique to this process"""
+    return os.environ.get(XDIST_RUN_ENV) or _process_run_id
+
+
+class Namespace:
+    """Prefix that makes fixture data from one worker of one run recognisable"""
+
+    def __init__(self, run: Optional[str] = None, worker: Optional[str] = None):
+        self.run = (run or run_id())[:8]
+        self.worker = worker or worker_id()
+        self.prefix = f"pytest-{self.run}-{self.worker}"
+
+    def unique(self) -> str:
+        return f"{self.prefix}-{uuid.uuid4().hex[:8]}"
+
+    def email(self, local_part: str = "test.user") -> str:
+        return f"{local_part}.{self.unique()}@example.com"
+
+
+class RegistrationAllocator:
+    """
+    Thread-safe source of case registration numbers.
+
+    Numbers come from a block of REGISTRATION_BLOCK values chosen by hashing
+    the run id and offsetting by the worker index, so workers of one run
+    never overlap and concurrent runs almost never do. Callers that still hit
+    the (caseType, registrationYear, registrationNum) unique key simply ask
+    for the next number.
+    """
+
+    def __init__(self, run: Optional[str] = None, worker: Optional[str] = None, block: int = REGISTRATION_BLOCK):
+        slots = MAX_REGISTRATION_NUM // block
+        run_slot = int(hashlib.sha1((run or run_id()).encode()).hexdigest(), 16) % slots
+        # Slot 0 is skipped so small, real-looking numbers stay untouched
+        slot = 1 + (run_slot + worker_index(worker)) % (slots - 1)
+        self.start = slot * block
+        self.stop = self.start + block
+        self._counter = itertools.count(self.start)
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            value = next(self._counter)
+        if value >= self.stop:
+            raise RuntimeError("Registration number block exhausted")
+        return value
+
+
+class ResourceTracker:
+    """Creates cases and users through a client and deletes them on cleanup"""
+
+    def __init__(self, client: AdvocateDiaryClient, registrations: Optional[RegistrationAllocator] = None):
+        self.client = client
+        self.registrations = registrations or RegistrationAllocator()
+        self.case_ids: List[str] = []
+        self.user_ids: List[str] = []
+
+    def track_case(self, case_id: str) -> str:
+        self.case_ids.append(case_id)
+        return case_id
+
+    def track_user(self, user_id: str) -> str:
+        self.user_ids.append(user_id)
+        return user_id
+
+    def create_case(
+        self, case: CaseInput, attempts: int = 3, client: Optional[AdvocateDiaryClient] = None
+    ) -> Case:
+        """
+        Create a case, allocating its registration number when the caller did
+        not pick one and retrying with a fresh number on a key collision.
+        `client` creates it as another user; cleanup still uses the tracker's.
+        """
+        data: Dict[str, Any] = dict(case)
+        allocate = "registrationNum" not in data
+        for attempt in range(attempts):
+            if allocate:
+                data["registrationNum"] = self.registrations.next()
+            try:
+                created = (client or self.client).create_case(data)
+            except ApiError as error:
+                # The route reports the unique key violation as a 500
+                if allocate and error.status_code in (409, 500) and attempt < attempts - 1:
+                    continue
+                raise
+            self.track_case(created["id"])
+            return created
+        raise AssertionError("unreachable")
+
+    def create_cases(self, cases: List[CaseInput], client: Optional[AdvocateDiaryClient] = None) -> List[str]:
+        """
+        Create cases in one batch request, allocating the registration numbers
+        the caller did not pick; returns the ids of the cases created
+        """
+        data = [dict(case) for case in cases]
+        for item in data:
+            if "registrationNum" not in item:
+                item["registrationNum"] = self.registrations.next()
+        result = (client or self.client).create_cases(data)
+        return [self.track_case(item["id"]) for item in result["results"] if item["status"] == "created"]
+
+    def create_user(self, user: UserInput) -> User:
+        created = self.client.create_user(user)
+        self.track_user(created["id"])
+        return created
+
+    def cleanup(self) -> None:
+        """Delete everything tracked; already-deleted resources are ignored"""
+        errors: List[ApiError] = []
+        # Cases first, so deleting a user never reassigns them to an admin
+        for case_id in reversed(self.case_ids):
+            self._delete(self.client.delete_case, case_id, errors)
+        for user_id in reversed(self.user_ids):
+            self._delete(self.client.delete_user, user_id, errors)
+        self.case_ids.clear()
+        self.user_ids.clear()
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _delete(delete, resource_id: str, errors: List[ApiError]) -> None:
+        try:
+            delete(resource_id)
+        except ApiError as error:
+            if error.status_code != 404:
+                errors.append(error)
@@ -0,0 +1,118 @@
+"""
+Per-route latency bookkeeping shared by the benchmark harness and the
+test tooling.
+
+A LatencyRecorder can be handed to AdvocateDiaryClient(recorder=...) to
+capture every call the client makes; summaries group samples by route
+template (/api/cases/[caseId] rather than the concrete id).
+"""
+
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+_UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+
+# Dynamic segment names used by the app router (src/app/api/**/[param])
+_PARAM_NAMES = {
+    "cases": "caseId",
+    "users": "userId",
+    "notes": "noteId",
+    "uploads": "uploadId",
+    "tasks": "taskId",
+    "sessions": "sessionId",
+    "exports": "jobId",
+    "reassign": "jobId",
+}
+# Collections whose every child segment is an id, whatever it looks like
+_OPAQUE_IDS = {"sessions", "exports", "reassign"}
+
+
+def route_template(path: str) -> str:
+    """Map a concrete API path onto its app-router route, e.g. /api/cases/[caseId]"""
+    segments = path.split("?")[0].rstrip("/").split("/")
+    for index, segment in enumerate(segments):
+        if index and (_UUID.match(segment) or segment.isdigit() or segments[index - 1] in _OPAQUE_IDS):
+            segments[index] = f"[{_PARAM_NAMES.get(segments[index - 1], 'id')}]"
+    return "/".join(segments) or "/"
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class Sample:
+    __slots__ = ("route", "status", "seconds", "bytes")
+
+    def __init__(self, route: str, status: int, seconds: float, size: int):
+        self.route = route
+        self.status = status
+        self.seconds = seconds
+        self.bytes = size
+
+    @property
+    def is_error(self) -> bool:
+        return self.status == 0 or self.status >= 500
+
+
+def summarize(samples: Iterable[Sample], wall_seconds: Optional[float] = None) -> Dict[str, float]:
+    """Count, error rate, throughput and latency percentiles (ms) for samples"""
+    samples = list(samples)
+    latencies = sorted(s.seconds * 1000 for s in samples)
+    errors = sum(1 for s in samples if s.is_error)
+    summary = {
+        "count": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+        "mean_bytes": sum(s.bytes for s in samples) / len(samples) if samples else None,
+    }
+    if wall_seconds:
+        summary["rps"] = len(samples) / wall_seconds
+    return summary
+
+
+class LatencyRecorder:
+    """Thread-safe collection of request samples"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: List[Sample] = []
+
+    def record(self, method: str, path: str, status: int, seconds: float, size: int = 0) -> None:
+        sample = Sample(f"{method.upper()} {route_template(path)}", status, seconds, size)
+        with self._lock:
+            self.samples.append(sample)
+
+    def merge(self, samples: Iterable[Sample]) -> None:
+        """Adds samples recorded elsewhere, e.g. by another test worker"""
+        samples = list(samples)
+        with self._lock:
+            self.samples.extend(samples)
+
+    def by_route(self) -> Dict[str, List[Sample]]:
+        with self._lock:
+            samples = list(self.samples)
+        grouped: Dict[str, List[Sample]] = {}
+        for sample in samples:
+            grouped.setdefault(sample.route, []).append(sample)
+        return grouped
+
+    def summary(self, wall_seconds: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        return {
+            route: summarize(samples, wall_seconds)
+            for route, samples in sorted(self.by_route().items())
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.samples.clear()
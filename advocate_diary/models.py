@@ -0,0 +1,241 @@
+"""
+Typed shapes of the JSON payloads exchanged with the Advocate Diary API.
+
+These mirror the Prisma models in prisma/schema.prisma and the request
+bodies accepted by the route handlers under src/app/api.
+"""
+
+from typing import Any, Dict, List, Optional, TypedDict
+
+
+class PartyInput(TypedDict, total=False):
+    name: str
+    advocate: Optional[str]
+
+
+class Party(PartyInput):
+    id: str
+    caseId: str
+
+
+class HearingInput(TypedDict, total=False):
+    date: str
+    notes: Optional[str]
+    nextDate: Optional[str]
+    nextPurpose: Optional[str]
+
+
+class CaseInput(TypedDict, total=False):
+    caseType: str
+    registrationNum: int
+    registrationYear: int
+    title: str
+    courtName: str
+    userId: str
+    petitioners: List[PartyInput]
+    respondents: List[PartyInput]
+    hearings: List[HearingInput]
+
+
+class Hearing(TypedDict, total=False):
+    id: str
+    date: str
+    notes: Optional[str]
+    nextDate: Optional[str]
+    nextPurpose: Optional[str]
+    createdAt: str
+    updatedAt: str
+    caseId: str
+
+
+class Case(TypedDict, total=False):
+    id: str
+    caseType: str
+    registrationNum: int
+    registrationYear: int
+    title: str
+    courtName: str
+    userId: Optional[str]
+    isCompleted: bool
+    createdAt: str
+    updatedAt: str
+    petitioners: List[Party]
+    respondents: List[Party]
+    hearings: List[Hearing]
+
+
+class CasePage(TypedDict):
+    cases: List[Case]
+    nextCursor: Optional[str]
+
+
+class CaseCounts(TypedDict):
+    hearings: int
+    notes: int
+    uploads: int
+
+
+class CaseSummary(Case, total=False):
+    """GET /api/cases/[caseId]?summary=true: no hearings list, the latest one and counts instead"""
+    user: Optional[Dict[str, Any]]
+    latestHearing: Optional[Hearing]
+    counts: CaseCounts
+
+
+class HearingPage(TypedDict):
+    hearings: List[Hearing]
+    nextCursor: Optional[str]
+
+
+class CalendarHearing(Hearing):
+    case: Case
+
+
+class HearingCalendar(TypedDict):
+    hearings: List[CalendarHearing]
+    on: str  # nextDate | date
+    truncated: bool
+
+
+class SearchResult(Case):
+    rank: float
+
+
+class SearchPage(TypedDict):
+    results: List[SearchResult]
+    nextCursor: Optional[str]
+    fuzzy: bool
+
+
+class SimilarCase(TypedDict, total=False):
+    id: str
+    caseType: str
+    registrationNum: int
+    registrationYear: int
+    title: str
+    courtName: str
+    isCompleted: bool
+    score: float
+    lastHearing: Optional[Dict[str, Any]]
+
+
+class BatchItemResult(TypedDict, total=False):
+    index: int
+    status: str  # created | conflict | invalid | error
+    id: str
+    error: str
+
+
+class BatchResult(TypedDict):
+    results: List[BatchItemResult]
+    summary: Dict[str, int]
+
+
+class UserCaseStats(TypedDict):
+    id: str
+    name: str
+    email: str
+    role: str
+    caseCount: int
+    activeCount: int
+    completedCount: int
+
+
+class AdminStats(TypedDict):
+    generatedAt: str
+    totals: Dict[str, int]
+    casesByUser: List[UserCaseStats]
+    casesByCourt: List[Dict[str, Any]]
+    casesByType: List[Dict[str, Any]]
+
+
+class UserInput(TypedDict, total=False):
+    name: str
+    email: str
+    password: str
+    role: str
+
+
+class User(TypedDict, total=False):
+    id: str
+    name: str
+    email: str
+    role: str
+    createdAt: str
+    updatedAt: str
+
+
+class Note(TypedDict, total=False):
+    id: str
+    content: str
+    createdAt: str
+    updatedAt: str
+    caseId: str
+    userId: Optional[str]
+
+
+class Upload(TypedDict, total=False):
+    id: str
+    fileName: str
+    fileUrl: str
+    fileType: str
+    createdAt: str
+    caseId: Optional[str]
+    userId: Optional[str]
+
+
+class NotePage(TypedDict):
+    notes: List[Note]
+    nextCursor: Optional[str]
+
+
+class UploadPage(TypedDict):
+    uploads: List[Upload]
+    nextCursor: Optional[str]
+
+
+class Tombstone(TypedDict):
+    type: str  # "case", "hearing", "note" or "upload"
+    id: str
+    caseId: str
+    reason: str  # "deleted" or "reassigned"
+
+
+class ChangePage(TypedDict, total=False):
+    cases: List[Case]
+    hearings: List[Hearing]
+    notes: List[Note]
+    uploads: List[Upload]
+    deleted: List[Tombstone]
+    nextCursor: str
+    hasMore: bool
+
+
+class ChatMessage(TypedDict):
+    role: str  # "user" or "assistant"
+    content: str
+
+
+class ExportJob(TypedDict, total=False):
+    id: str
+    kind: str  # "docket" or "causelist"
+    format: str  # "pdf" or "csv"
+    status: str  # "queued", "running", "completed" or "failed"
+    rows: int
+    error: Optional[str]
+    createdAt: str
+    completedAt: Optional[str]
+    downloadUrl: Optional[str]
+
+
+class ReassignJob(TypedDict, total=False):
+    id: str
+    status: str  # "queued", "running", "completed" or "failed"
+    sourceUserId: Optional[str]  # None: cases that had no owner
+    targetUserId: str
+    excludePersonal: bool
+    total: int
+    moved: int
+    error: Optional[str]
+    createdAt: str
+    completedAt: Optional[str]
@@ -0,0 +1,163 @@
+"""
+Minimal PDF writer and text extractor for case exports.
+
+minimal_pdf() is what the stand-in serves for PDF exports: the same lines
+the app draws, one per row on A4 pages in plain Helvetica, with no layout,
+tables or embedded fonts. Characters outside WinAnsi come out as "?", so
+checks of how the app draws them (src/lib/pdf-writer.ts) only run against
+a real deployment.
+
+extract_text() reads the text back out of such a file or of the app's own
+exports, for checking them in tests and scripts; it understands the
+content these writers produce, not arbitrary PDFs.
+"""
+
+import re
+import zlib
+from typing import List, Sequence, Tuple
+
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 50
+FONT_SIZE = 10
+LEADING = 14
+LINES_PER_PAGE = int((PAGE_HEIGHT - 2 * MARGIN) // LEADING)
+
+# Typographic characters outside Latin-1 that WinAnsiEncoding has
+WIN_ANSI = {
+    "…": 0x85,
+    "‘": 0x91,
+    "’": 0x92,
+    "“": 0x93,
+    "”": 0x94,
+    "•": 0x95,
+    "–": 0x96,
+    "—": 0x97,
+    "€": 0x80,
+}
+_FROM_WIN_ANSI = {chr(code): char for char, code in WIN_ANSI.items()}
+
+
+def to_win_ansi(text: str) -> str:
+    """Maps text onto WinAnsi codes; characters Helvetica cannot show become "?" """
+    out = []
+    for char in text:
+        code = ord(char)
+        if char in "\t\r\n":
+            out.append(" ")
+        elif 32 <= code <= 126 or 160 <= code <= 255:
+            out.append(char)
+        elif char in WIN_ANSI:
+            out.append(chr(WIN_ANSI[char]))
+        else:
+            out.append("?")
+    return "".join(out)
+
+
+def _escape(text: str) -> str:
+    return re.sub(r"([\\()])", r"\\\1", text)
+
+
+def minimal_pdf(title: str, lines: Sequence[str]) -> bytes:
+    """A4 pages with one line of text per entry of `lines`"""
+    chunks: List[bytes] = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+    offsets: List[int] = []
+
+    def write_object(body: bytes) -> int:
+        offsets.append(sum(map(len, chunks)))
+        chunks.append(b"%d 0 obj\n" % len(offsets) + body + b"\nendobj\n")
+        return len(offsets)
+
+    # Objects 1 to 3; the page tree is written last, once the pages are known
+    write_object(b"<< /Type /Catalog /Pages 3 0 R >>")
+    write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    offsets.append(0)
+
+    page_ids = []
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    for page in pages:
+        operations = [
+            f"BT /F1 {FONT_SIZE} Tf {MARGIN} {PAGE_HEIGHT - MARGIN - (i + 1) * LEADING:.2f} Td "
+            f"({_escape(to_win_ansi(line))}) Tj ET"
+            for i, line in enumerate(page)
+        ]
+        content = zlib.compress("\n".join(operations).encode("latin-1"))
+        content_id = write_object(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream"
+        )
+        page_ids.append(write_object(
+            f"<< /Type /Page /Parent 3 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 2 0 R >> >> /Contents {content_id} 0 R >>".encode("latin-1")
+        ))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    offsets[2] = sum(map(len, chunks))
+    chunks.append(f"3 0 obj\n<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>\nendobj\n".encode("latin-1"))
+    info_id = write_object(f"<< /Title ({_escape(to_win_ansi(title))}) /Producer (Advocate Diary) >>".encode("latin-1"))
+
+    xref = sum(map(len, chunks))
+    entries = "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    chunks.append(
+        f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n{entries}"
+        f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R /Info {info_id} 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n".encode("latin-1")
+    )
+    return b"".join(chunks)
+
+
+_STREAM = re.compile(rb"/Length (\d+) /Filter /FlateDecode >>\nstream\n")
+# Tokens of the text objects the writers draw: each line or cell is one
+# BT ... ET, positioned once, with runs in the standard fonts (literal
+# strings) or the app's fallback fonts (whose text is read from the ActualText)
+_TOKEN = re.compile(
+    r"(?P<begin>\bBT\b)"
+    r"|/Span << /ActualText <FEFF(?P<actual>[0-9A-F]*)> >> BDC (?P<span>.*?) EMC"
+    r"|\((?P<literal>(?:\\.|[^\\)])*)\) Tj"
+    r"|[\d.]+ (?P<y>[\d.]+) Td"
+    r"|(?P<end>\bET\b)"
+)
+_POSITION = re.compile(r"[\d.]+ ([\d.]+) Td")
+
+
+def _text_objects(content: str) -> List[Tuple[float, str]]:
+    """(baseline, text) of each text object in a content stream"""
+    objects: List[Tuple[float, str]] = []
+    y, parts = None, []
+    for token in _TOKEN.finditer(content):
+        if token.group("begin"):
+            y, parts = None, []
+        elif token.group("actual") is not None:
+            parts.append(bytes.fromhex(token.group("actual")).decode("utf-16-be"))
+            position = _POSITION.search(token.group("span"))
+            if position:
+                y = float(position.group(1))
+        elif token.group("literal") is not None:
+            text = re.sub(r"\\(.)", r"\1", token.group("literal"))
+            parts.append("".join(_FROM_WIN_ANSI.get(c, c) for c in text))
+        elif token.group("y"):
+            y = float(token.group("y"))
+        elif token.group("end") and y is not None:
+            objects.append((y, "".join(parts)))
+    return objects
+
+
+def extract_text(data: bytes) -> List[List[str]]:
+    """
+    The text of each page as lines, top to bottom; cells of one table row
+    are joined with " | "
+    """
+    pages = []
+    for match in _STREAM.finditer(data):
+        start = match.end()
+        content = zlib.decompress(data[start:start + int(match.group(1))]).decode("latin-1")
+        if content.startswith("/CIDInit"):
+            # A fallback font's ToUnicode map, not a page
+            continue
+        lines: List[Tuple[float, List[str]]] = []
+        for y, text in _text_objects(content):
+            if lines and lines[-1][0] == float(y):
+                lines[-1][1].append(text)
+            else:
+                lines.append((float(y), [text]))
+        pages.append([" | ".join(cells) for _, cells in lines])
+    return pages
@@ -0,0 +1,245 @@
+"""
+pytest plugin that turns the API test run into a latency check.
+
+Every client the test fixtures create records its calls in one session
+LatencyRecorder (the latency_recorder fixture), so a run knows how long
+each route took and how much it returned. At the end of the run the
+per-route table is printed in the terminal summary and embedded in the
+pytest-html report, and, given --latency-baseline, compared with a
+baseline file from an earlier run:
+
+    # once, against a known-good deploy
+    python -m pytest --api-url https://... --latency-baseline latency_baseline.json
+    # every later run compares its median latencies with it
+    python -m pytest --api-url https://... --latency-baseline latency_baseline.json --latency-fail
+
+A missing baseline file is created from the run; --latency-update-baseline
+rewrites an existing one. A route regresses when its median latency is
+more than --latency-threshold (a fraction, default 0.5) above the
+baseline's and at least --latency-min-ms (default 5) slower; routes with
+fewer than MIN_SAMPLES calls on either side are not compared. Regressions are
+reported as warnings, or fail the run with --latency-fail.
+
+Under pytest-xdist each worker records its own calls and hands them to
+the controller, which reports on the whole run. A baseline only means
+something for the target it was recorded against.
+"""
+
+import html
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from advocate_diary.metrics import LatencyRecorder, Sample
+
+LATENCY_BASELINE_ENV = "ADVOCATE_DIARY_LATENCY_BASELINE"
+PLUGIN_NAME = "advocate-diary-latency"
+
+DEFAULT_THRESHOLD = 0.5
+# Below these a difference is noise rather than a regression
+DEFAULT_MIN_REGRESSION_MS = 5.0
+MIN_SAMPLES = 3
+
+# Key of the samples a worker hands to the controller (config.workeroutput)
+_WORKER_OUTPUT_KEY = "latency_samples"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("latency", "per-route latency of the API calls")
+    group.addoption(
+        "--latency-baseline",
+        default=os.environ.get(LATENCY_BASELINE_ENV),
+        help=(
+            "Baseline file to compare route latencies with, created if missing "
+            f"(default: ${LATENCY_BASELINE_ENV})"
+        ),
+    )
+    group.addoption(
+        "--latency-update-baseline",
+        action="store_true",
+        help="Rewrite the baseline file with this run's latencies",
+    )
+    group.addoption(
+        "--latency-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed rise of a route's median latency over the baseline (default {DEFAULT_THRESHOLD})",
+    )
+    group.addoption(
+        "--latency-min-ms",
+        type=float,
+        default=DEFAULT_MIN_REGRESSION_MS,
+        help=f"Smallest rise of a median, in ms, that counts as a regression (default {DEFAULT_MIN_REGRESSION_MS:g})",
+    )
+    group.addoption(
+        "--latency-fail",
+        action="store_true",
+        help="Fail the run when a route regresses instead of warning",
+    )
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(LatencyPlugin(config), PLUGIN_NAME)
+
+
+@pytest.fixture(scope="session")
+def latency_recorder(pytestconfig) -> LatencyRecorder:
+    """Recorder that every API client of the run should be given"""
+    return pytestconfig.pluginmanager.get_plugin(PLUGIN_NAME).recorder
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def write_baseline(path: str, routes: Dict[str, Dict[str, Any]]) -> None:
+    baseline = {"created_at": datetime.now(timezone.utc).isoformat(), "routes": routes}
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(baseline, handle, indent=2)
+
+
+def find_regressions(
+    routes: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_ms: float = DEFAULT_MIN_REGRESSION_MS,
+) -> Dict[str, str]:
+    """Routes whose median latency rose past the threshold, with a description of the change"""
+    regressions = {}
+    for route, current in routes.items():
+        before = baseline.get(route)
+        if not before or min(current["count"], before["count"]) < MIN_SAMPLES:
+            continue
+        was, now = before["p50_ms"], current["p50_ms"]
+        if now > was * (1 + threshold) and now - was >= min_ms:
+            regressions[route] = f"median {was:.1f}ms -> {now:.1f}ms (+{(now - was) / was:.0%})"
+    return regressions
+
+
+def _fmt(value: Optional[float], digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def _change(route: str, field: str, routes, baseline) -> str:
+    before = (baseline or {}).get(route)
+    if not before or not before.get(field):
+        return "-"
+    return f"{(routes[route][field] - before[field]) / before[field]:+.0%}"
+
+
+def render_html_table(
+    routes: Dict[str, Dict[str, Any]],
+    baseline: Optional[Dict[str, Dict[str, Any]]] = None,
+    regressions: Optional[Dict[str, str]] = None,
+) -> str:
+    """The per-route latency table for the pytest-html summary"""
+    regressions = regressions or {}
+    rows = []
+    for route, summary in routes.items():
+        style = ' style="color:#b91c1c;font-weight:bold"' if route in regressions else ""
+        cells = [
+            html.escape(route),
+            str(summary["count"]),
+            _fmt(summary["p50_ms"]),
+            _fmt(summary["p95_ms"]),
+            _fmt(summary["max_ms"]),
+            _fmt(summary["mean_bytes"], 0),
+            _fmt(summary["error_rate"] * 100),
+            _change(route, "p50_ms", routes, baseline),
+        ]
+        rows.append(f"<tr{style}>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    columns = ("Route", "Calls", "p50 ms", "p95 ms", "Max ms", "Mean bytes", "Errors %", "p50 vs baseline")
+    header = "".join(f"<th>{name}</th>" for name in columns)
+    return (
+        "<h2>Route latency</h2>"
+        '<table class="latency" style="border-collapse:collapse;margin-bottom:1em">'
+        f"<thead><tr>{header}</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+    )
+
+
+class LatencyPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.recorder = LatencyRecorder()
+        self.is_worker = hasattr(config, "workerinput")
+        self._results: Optional[Dict[str, Any]] = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """Controller side of pytest-xdist: collects a finished worker's samples"""
+        samples = getattr(node, "workeroutput", {}).get(_WORKER_OUTPUT_KEY, [])
+        self.recorder.merge(Sample(*sample) for sample in samples)
+
+    def results(self) -> Dict[str, Any]:
+        """The run's route summaries, the baseline's and the regressions, worked out once"""
+        if self._results is None:
+            routes = self.recorder.summary()
+            path = self.config.getoption("latency_baseline")
+            baseline = load_baseline(path) if path else None
+            previous = baseline["routes"] if baseline else None
+            regressions = (
+                find_regressions(
+                    routes,
+                    previous,
+                    self.config.getoption("latency_threshold"),
+                    self.config.getoption("latency_min_ms"),
+                )
+                if previous
+                else {}
+            )
+            self._results = {
+                "routes": routes,
+                "baseline": previous,
+                "regressions": regressions,
+                "written": None,
+            }
+            if path and routes and (baseline is None or self.config.getoption("latency_update_baseline")):
+                write_baseline(path, routes)
+                self._results["written"] = path
+        return self._results
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session):
+        if self.is_worker:
+            self.config.workeroutput[_WORKER_OUTPUT_KEY] = [
+                (s.route, s.status, s.seconds, s.bytes)
+                for samples in self.recorder.by_route().values()
+                for s in samples
+            ]
+            return
+        failing = self.results()["regressions"] and self.config.getoption("latency_fail")
+        if failing and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_html_results_summary(self, prefix, summary, postfix, session):
+        results = self.results()
+        if results["routes"]:
+            prefix.append(render_html_table(results["routes"], results["baseline"], results["regressions"]))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker:
+            return
+        results = self.results()
+        if not results["routes"]:
+            return
+        width = max(len(route) for route in results["routes"])
+        terminalreporter.write_sep("-", "route latency")
+        terminalreporter.write_line(f"{'route':<{width}} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>8}")
+        for route, summary in results["routes"].items():
+            terminalreporter.write_line(
+                f"{route:<{width}} {summary['count']:>6} {_fmt(summary['p50_ms']):>8} "
+                f"{_fmt(summary['p95_ms']):>8} {_fmt(summary['mean_bytes'], 0):>8}"
+            )
+        if results["written"]:
+            terminalreporter.write_line(f"latency baseline written to {results['written']}")
+        failing = self.config.getoption("latency_fail")
+        for route, change in results["regressions"].items():
+            label = "FAIL" if failing else "WARNING"
+            terminalreporter.write_line(f"{label}: {route} regressed, {change}", red=failing, yellow=not failing)
@@ -0,0 +1,389 @@
+"""
+Query-plan regression checks for the hot route queries.
+
+Each HotQuery is the SQL Prisma sends for one route query (the case list,
+a case's parties, hearings, notes and uploads, the hearing calendar and
+the upload lookups), together with the index it is meant to use. The
+checks apply prisma/migrations to a scratch schema of a local PostgreSQL
+database, seed it with a large synthetic firm, and run every query under
+EXPLAIN ANALYZE. A query fails its check when the plan reads one of its
+tables with a sequential scan, does not use its index, or runs over its
+latency budget; a schema or query change that drops an index shows up as
+a failing test rather than a slow page.
+
+    python -m advocate_diary.query_plans --database-url postgresql://localhost/advocate_plans
+
+The scratch schema is dropped afterwards, so any database the role may
+create schemas in will do; never point this at production. psycopg (3)
+is needed only here and is imported on first use.
+"""
+
+import argparse
+import os
+import secrets
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DATABASE_URL_ENV = "QUERY_PLAN_DATABASE_URL"
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "prisma" / "migrations"
+
+# Default synthetic firm: 200 users with 250 cases each, so 50,000 cases,
+# 250,000 hearings, 150,000 parties, 100,000 notes and 50,000 uploads
+DEFAULT_USERS = 200
+DEFAULT_CASES_PER_USER = 250
+HEARINGS_PER_CASE = 5
+PARTIES_PER_CASE = 3
+NOTES_PER_CASE = 2
+UPLOADS_PER_CASE = 1
+
+# Budget for one warm execution of a hot query, as EXPLAIN ANALYZE reports it
+DEFAULT_BUDGET_MS = 25.0
+# Executions per query; the fastest is compared with the budget
+RUNS = 3
+
+# Reading any of these with a Seq Scan fails the check
+LARGE_TABLES = ("Case", "Hearing", "Note", "Upload", "Petitioner", "Respondent")
+
+# Parameters of the seeded data the queries run against
+BUSY_USER = "plan-user-2"
+SAMPLE_CASE = "plan-case-1234"
+SAMPLE_CASES = ["plan-case-1234", "plan-case-2345", "plan-case-3456"]
+
+
+class HotQuery:
+    __slots__ = ("name", "route", "sql", "params", "index", "budget_ms")
+
+    def __init__(
+        self,
+        name: str,
+        route: str,
+        sql: str,
+        params: Sequence[Any],
+        index: str,
+        budget_ms: float = DEFAULT_BUDGET_MS,
+    ):
+        self.name = name
+        self.route = route
+        self.sql = sql
+        self.params = tuple(params)
+        self.index = index
+        self.budget_ms = budget_ms
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery(
+        "case_list_for_user",
+        "GET /api/cases",
+        'SELECT "id", "updatedAt", "title" FROM "Case" WHERE "userId" = %s '
+        'ORDER BY "updatedAt" DESC, "id" DESC LIMIT 51',
+        [BUSY_USER],
+        "Case_userId_updatedAt_id_idx",
+    ),
+    HotQuery(
+        "case_list_for_admin",
+        "GET /api/cases",
+        'SELECT "id", "updatedAt", "title" FROM "Case" WHERE "caseType" <> %s '
+        'ORDER BY "updatedAt" DESC, "id" DESC LIMIT 51',
+        ["PERSONAL"],
+        "Case_updatedAt_id_idx",
+    ),
+    HotQuery(
+        "case_list_by_type",
+        "GET /api/cases?caseType=",
+        'SELECT "id", "updatedAt", "title" FROM "Case" WHERE "caseType" = %s '
+        'ORDER BY "updatedAt" DESC, "id" DESC LIMIT 51',
+        ["WRIT"],
+        "Case_caseType_updatedAt_id_idx",
+    ),
+    HotQuery(
+        "personal_cases_of_user",
+        "GET /api/admin/personal-files",
+        'SELECT "id" FROM "Case" WHERE "userId" = %s AND "caseType" = %s',
+        [BUSY_USER, "PERSONAL"],
+        "Case_userId_caseType_idx",
+    ),
+    HotQuery(
+        "case_petitioners",
+        "GET /api/cases/[caseId]",
+        'SELECT "id", "name", "advocate", "caseId" FROM "Petitioner" WHERE "caseId" IN (%s)',
+        [SAMPLE_CASE],
+        "Petitioner_caseId_idx",
+    ),
+    HotQuery(
+        "case_respondents",
+        "GET /api/cases/[caseId]",
+        'SELECT "id", "name", "advocate", "caseId" FROM "Respondent" WHERE "caseId" IN (%s)',
+        [SAMPLE_CASE],
+        "Respondent_caseId_idx",
+    ),
+    HotQuery(
+        "case_hearings",
+        "GET /api/cases/[caseId]/hearings",
+        'SELECT * FROM "Hearing" WHERE "caseId" = %s ORDER BY "date" DESC',
+        [SAMPLE_CASE],
+        "Hearing_caseId_date_idx",
+    ),
+    HotQuery(
+        "case_hearings_page",
+        "GET /api/cases/[caseId]/hearings?cursor=",
+        'SELECT * FROM "Hearing" WHERE "caseId" = %s '
+        'AND ("date" < now() OR ("date" = now() AND "id" < %s)) '
+        'ORDER BY "date" DESC, "id" DESC LIMIT 51',
+        [SAMPLE_CASE, "~"],
+        "Hearing_caseId_date_idx",
+    ),
+    HotQuery(
+        "latest_hearing_of_listed_cases",
+        "GET /api/cases",
+        'SELECT * FROM "Hearing" WHERE "caseId" = ANY(%s) ORDER BY "caseId", "date" DESC',
+        [SAMPLE_CASES],
+        "Hearing_caseId_date_idx",
+    ),
+    HotQuery(
+        "hearing_calendar",
+        "GET /api/hearings/calendar",
+        'SELECT "id", "caseId", "nextDate" FROM "Hearing" '
+        'WHERE "nextDate" >= now() AND "nextDate" < now() + interval \'7 days\' '
+        'ORDER BY "nextDate" LIMIT 1001',
+        [],
+        "Hearing_nextDate_idx",
+    ),
+    HotQuery(
+        "case_notes",
+        "GET /api/cases/[caseId]/notes",
+        'SELECT * FROM "Note" WHERE "caseId" = %s ORDER BY "createdAt" DESC',
+        [SAMPLE_CASE],
+        "Note_caseId_createdAt_idx",
+    ),
+    HotQuery(
+        "case_uploads",
+        "GET /api/admin/personal-files",
+        'SELECT * FROM "Upload" WHERE "caseId" = ANY(%s) ORDER BY "createdAt" DESC',
+        [SAMPLE_CASES],
+        "Upload_caseId_createdAt_idx",
+    ),
+    HotQuery(
+        "uploads_of_user",
+        "GET /api/admin/users-with-info",
+        'SELECT * FROM "Upload" WHERE "userId" = %s ORDER BY "createdAt" DESC LIMIT 20',
+        [BUSY_USER],
+        "Upload_userId_createdAt_idx",
+    ),
+]
+
+# Seeded with set-based INSERT ... SELECT, so a 50,000 case firm with its
+# indexes takes well under a minute. Ids are predictable (plan-user-N,
+# plan-case-N) so the queries above can name them. Case c belongs to user
+# 1 + c % users and is that user's (c / users)th case, which spreads types
+# and PERSONAL cases (one in 50) evenly over the users.
+_SEED_STATEMENTS = (
+    """
+    INSERT INTO "User" ("id", "email", "password", "name", "role", "createdAt", "updatedAt")
+    SELECT 'plan-user-' || u, 'plan.user' || u || '@example.com', 'x', 'Plan User ' || u,
+           (CASE WHEN u = 1 THEN 'ADMIN' ELSE 'USER' END)::"Role", now(), now()
+    FROM generate_series(1, %(users)s) AS u
+    """,
+    """
+    INSERT INTO "Case" ("id", "caseType", "registrationYear", "registrationNum", "title", "courtName",
+                        "createdAt", "updatedAt", "userId", "isCompleted")
+    SELECT 'plan-case-' || c,
+           CASE WHEN (c / %(users)s) %% 50 = 0 THEN 'PERSONAL'
+                ELSE (ARRAY['CIVIL', 'CRIMINAL', 'WRIT', 'APPEAL', 'ARBITRATION'])[1 + (c / %(users)s) %% 5] END,
+           2000 + c %% 25, c, 'Plan Case ' || c,
+           (ARRAY['High Court', 'District Court', 'Supreme Court', 'Family Court'])[1 + c %% 4],
+           now() - c * interval '1 minute', now() - c * interval '1 minute',
+           'plan-user-' || (1 + c %% %(users)s), c %% 3 = 0
+    FROM generate_series(1, %(cases)s) AS c
+    """,
+    """
+    INSERT INTO "Petitioner" ("id", "name", "advocate", "caseId")
+    SELECT 'plan-petitioner-' || c || '-' || p, 'Petitioner ' || p, 'Advocate ' || p, 'plan-case-' || c
+    FROM generate_series(1, %(cases)s) AS c, generate_series(1, %(parties)s) AS p
+    """,
+    """
+    INSERT INTO "Respondent" ("id", "name", "advocate", "caseId")
+    SELECT 'plan-respondent-' || c || '-' || p, 'Respondent ' || p, NULL, 'plan-case-' || c
+    FROM generate_series(1, %(cases)s) AS c, generate_series(1, %(parties)s) AS p
+    """,
+    # A case's hearings are 30 days apart, each nextDate the date of the one
+    # after; the latest hearing's nextDate lies ahead for one case in 13
+    """
+    INSERT INTO "Hearing" ("id", "date", "notes", "nextDate", "nextPurpose", "createdAt", "updatedAt", "caseId")
+    SELECT 'plan-hearing-' || c || '-' || h,
+           now() - ((c %% 400) + (h - 1) * 30) * interval '1 day', NULL,
+           now() - ((c %% 400) + (h - 2) * 30) * interval '1 day', 'Arguments',
+           now(), now(), 'plan-case-' || c
+    FROM generate_series(1, %(cases)s) AS c, generate_series(1, %(hearings)s) AS h
+    """,
+    """
+    INSERT INTO "Note" ("id", "content", "createdAt", "updatedAt", "caseId", "userId")
+    SELECT 'plan-note-' || c || '-' || n, 'Note ' || n,
+           now() - n * interval '1 hour', now(), 'plan-case-' || c, 'plan-user-' || (1 + c %% %(users)s)
+    FROM generate_series(1, %(cases)s) AS c, generate_series(1, %(notes)s) AS n
+    """,
+    """
+    INSERT INTO "Upload" ("id", "fileName", "fileUrl", "fileType", "createdAt", "caseId", "userId")
+    SELECT 'plan-upload-' || c || '-' || f, 'file-' || f || '.pdf',
+           'https://storage.example/plan-case-' || c || '/file-' || f || '.pdf', 'application/pdf',
+           now() - c * interval '1 minute', 'plan-case-' || c, 'plan-user-' || (1 + c %% %(users)s)
+    FROM generate_series(1, %(cases)s) AS c, generate_series(1, %(uploads)s) AS f
+    """,
+)
+
+# Tables with triggers (the search and similarity indexes) that the seed
+# bypasses; the hot queries do not read what the triggers maintain
+_TRIGGER_TABLES = ("Case", "Petitioner", "Respondent", "Hearing")
+
+
+def connect(database_url: str):
+    try:
+        import psycopg
+    except ImportError as error:
+        raise RuntimeError("Query plan checks need psycopg: pip install 'psycopg[binary]'") from error
+    return psycopg.connect(database_url, autocommit=True)
+
+
+def migration_files(directory: Path = MIGRATIONS_DIR) -> List[Path]:
+    """prisma/migrations/*/migration.sql in the order Prisma applies them"""
+    return sorted(directory.glob("*/migration.sql"), key=lambda path: path.parent.name)
+
+
+def declared_indexes(directory: Path = MIGRATIONS_DIR) -> List[str]:
+    """Names of the indexes the migrations create"""
+    names = []
+    for path in migration_files(directory):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            words = line.split()
+            if line.startswith("CREATE") and "INDEX" in words:
+                after = words[words.index("INDEX") + 1:]
+                if after[:3] == ["IF", "NOT", "EXISTS"]:
+                    after = after[3:]
+                names.append(after[0].strip('"'))
+    return names
+
+
+class PlanDatabase:
+    """A scratch schema holding the migrated tables and the synthetic firm"""
+
+    def __init__(self, conn, schema: Optional[str] = None):
+        self.conn = conn
+        self.schema = schema or f"query_plans_{secrets.token_hex(4)}"
+
+    def __enter__(self) -> "PlanDatabase":
+        self.conn.execute(f'CREATE SCHEMA "{self.schema}"')
+        # public stays on the path for extensions installed there (pg_trgm)
+        self.conn.execute(f'SET search_path TO "{self.schema}", public')
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.conn.execute(f'DROP SCHEMA IF EXISTS "{self.schema}" CASCADE')
+
+    def migrate(self, directory: Path = MIGRATIONS_DIR) -> None:
+        for path in migration_files(directory):
+            self.conn.execute(path.read_text(encoding="utf-8"))
+
+    def seed(self, users: int = DEFAULT_USERS, cases_per_user: int = DEFAULT_CASES_PER_USER) -> None:
+        for table in _TRIGGER_TABLES:
+            self.conn.execute(f'ALTER TABLE "{table}" DISABLE TRIGGER USER')
+        try:
+            params = {
+                "users": users,
+                "cases": users * cases_per_user,
+                "parties": PARTIES_PER_CASE,
+                "hearings": HEARINGS_PER_CASE,
+                "notes": NOTES_PER_CASE,
+                "uploads": UPLOADS_PER_CASE,
+            }
+            with self.conn.transaction():
+                for statement in _SEED_STATEMENTS:
+                    self.conn.execute(statement, params)
+        finally:
+            for table in _TRIGGER_TABLES:
+                self.conn.execute(f'ALTER TABLE "{table}" ENABLE TRIGGER USER')
+        # Fresh statistics, as autovacuum would have after a real import
+        self.conn.execute("ANALYZE " + ", ".join(f'"{table}"' for table in ("User",) + LARGE_TABLES))
+
+    def explain(self, query: HotQuery) -> Dict[str, Any]:
+        """The EXPLAIN ANALYZE JSON of one run of the query"""
+        row = self.conn.execute(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.sql, query.params or None
+        ).fetchone()
+        plan = row[0]
+        return plan[0] if isinstance(plan, list) else plan
+
+
+def plan_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+class PlanCheck:
+    __slots__ = ("query", "plan", "execution_ms", "indexes", "seq_scans")
+
+    def __init__(self, query: HotQuery, plan: Dict[str, Any], execution_ms: float):
+        self.query = query
+        self.plan = plan
+        self.execution_ms = execution_ms
+        nodes = list(plan_nodes(plan["Plan"]))
+        self.indexes = sorted({node["Index Name"] for node in nodes if "Index Name" in node})
+        self.seq_scans = sorted({
+            node.get("Relation Name", "")
+            for node in nodes
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES
+        })
+
+    @property
+    def problems(self) -> List[str]:
+        found = []
+        if self.seq_scans:
+            found.append(f"sequential scan of {', '.join(self.seq_scans)}")
+        if self.query.index not in self.indexes:
+            used = ", ".join(self.indexes) or "no index"
+            found.append(f"expected {self.query.index}, plan uses {used}")
+        if self.execution_ms > self.query.budget_ms:
+            found.append(f"{self.execution_ms:.1f}ms is over the {self.query.budget_ms:.0f}ms budget")
+        return found
+
+
+def check_query(db: PlanDatabase, query: HotQuery, runs: int = RUNS) -> PlanCheck:
+    """Runs the query under EXPLAIN ANALYZE and keeps its fastest run"""
+    best: Optional[Tuple[float, Dict[str, Any]]] = None
+    for _ in range(runs):
+        plan = db.explain(query)
+        elapsed = plan["Execution Time"]
+        if best is None or elapsed < best[0]:
+            best = (elapsed, plan)
+    return PlanCheck(query, best[1], best[0])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check the plans of the hot route queries")
+    parser.add_argument("--database-url", default=os.environ.get(DATABASE_URL_ENV))
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--cases-per-user", type=int, default=DEFAULT_CASES_PER_USER)
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error(f"--database-url or ${DATABASE_URL_ENV} is required")
+
+    failed = 0
+    with connect(args.database_url) as conn, PlanDatabase(conn) as db:
+        db.migrate()
+        db.seed(args.users, args.cases_per_user)
+        for query in HOT_QUERIES:
+            check = check_query(db, query)
+            problems = check.problems
+            failed += bool(problems)
+            print(
+                f"{'FAIL' if problems else 'ok':<5} {query.name:<32} {check.execution_ms:7.2f}ms "
+                f"{', '.join(check.indexes) or '-'}"
+            )
+            for problem in problems:
+                print(f"      {problem}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Local replica of the cases a user can see, kept up to date from the
+change feed (GET /api/changes, src/lib/change-feed.ts).
+
+The first sync takes a feed cursor, then loads every case with its
+hearings, notes and uploads; every later sync only asks the feed what
+changed since and applies it: changed rows replace their copies, and a
+tombstone drops its row (a case's tombstone drops its hearings, notes and
+uploads too). When the cursor is too old for the feed (410) the replica
+is loaded again from scratch.
+
+The replica can be kept in a JSON state file between runs, so a reporting
+script only pays for a full load once:
+
+    python -m advocate_diary.replica --base-url http://localhost:3000 --state replica.json
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from advocate_diary.client import AdvocateDiaryClient, ApiError
+from advocate_diary.models import Case, ChangePage, Hearing, Note, Upload
+
+# Relations of the case rows the feed sends (GET /api/cases with user)
+CASE_INCLUDES = ["petitioners", "respondents", "hearings", "user"]
+
+_TABLES = {"case": "cases", "hearing": "hearings", "note": "notes", "upload": "uploads"}
+
+
+class CaseReplica:
+    """Cases, hearings, notes and uploads by id, and the feed cursor they are current to"""
+
+    def __init__(self):
+        self.cursor: Optional[str] = None
+        self.cases: Dict[str, Case] = {}
+        self.hearings: Dict[str, Hearing] = {}
+        self.notes: Dict[str, Note] = {}
+        self.uploads: Dict[str, Upload] = {}
+
+    def clear(self) -> None:
+        self.cursor = None
+        for table in _TABLES.values():
+            getattr(self, table).clear()
+
+    def load(self, client: AdvocateDiaryClient) -> None:
+        """Replaces the replica with a full load, from a cursor taken before it"""
+        self.clear()
+        cursor = client.changes()["nextCursor"]
+        for case in client.iter_cases(include=CASE_INCLUDES, include_personal=True):
+            self.cases[case["id"]] = case
+            self.hearings.update((row["id"], row) for row in client.list_hearings(case["id"]))
+            self.notes.update((row["id"], row) for row in client.list_notes(case["id"]))
+            self.uploads.update((row["id"], row) for row in client.list_uploads(case["id"]))
+        self.cursor = cursor
+
+    def apply(self, page: ChangePage) -> None:
+        """Applies one page of the feed and moves the cursor on"""
+        for table in _TABLES.values():
+            rows = getattr(self, table)
+            rows.update((row["id"], row) for row in page.get(table, []))
+        for tombstone in page.get("deleted", []):
+            getattr(self, _TABLES[tombstone["type"]]).pop(tombstone["id"], None)
+            if tombstone["type"] == "case":
+                self._drop_children(tombstone["id"])
+        self.cursor = page["nextCursor"]
+
+    def _drop_children(self, case_id: str) -> None:
+        for table in (self.hearings, self.notes, self.uploads):
+            for row_id in [row_id for row_id, row in table.items() if row.get("caseId") == case_id]:
+                del table[row_id]
+
+    def sync(self, client: AdvocateDiaryClient, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Brings the replica up to date: a full load the first time (or when
+        the cursor expired), the feed's pages since the cursor otherwise
+        """
+        if self.cursor is None:
+            self.load(client)
+            return {"full": True, "pages": 0, "changed": 0, "deleted": 0}
+        summary = {"full": False, "pages": 0, "changed": 0, "deleted": 0}
+        while True:
+            try:
+                page = client.changes(self.cursor, limit)
+            except ApiError as error:
+                if error.status_code != 410:
+                    raise
+                self.load(client)
+                return {**summary, "full": True}
+            self.apply(page)
+            summary["pages"] += 1
+            summary["changed"] += sum(len(page.get(table, [])) for table in _TABLES.values())
+            summary["deleted"] += len(page.get("deleted", []))
+            if not page.get("hasMore"):
+                return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "cursor": self.cursor,
+            **{table: list(getattr(self, table).values()) for table in _TABLES.values()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CaseReplica":
+        replica = cls()
+        replica.cursor = data.get("cursor")
+        for table in _TABLES.values():
+            getattr(replica, table).update((row["id"], row) for row in data.get(table, []))
+        return replica
+
+    def save(self, path: str) -> None:
+        """Writes the state file atomically, so an interrupted run keeps the last one"""
+        partial = f"{path}.partial"
+        with open(partial, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle)
+        os.replace(partial, path)
+
+    @classmethod
+    def open(cls, path: str) -> "CaseReplica":
+        """The replica saved at `path`, or an empty one if there is none yet"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Keep a local replica of the cases in sync with the change feed")
+    parser.add_argument("--base-url")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--state", default="replica.json", help="State file of the replica (default replica.json)")
+    parser.add_argument("--limit", type=int, help="Changes per feed page (server default 500)")
+    args = parser.parse_args(argv)
+
+    replica = CaseReplica.open(args.state)
+    with AdvocateDiaryClient(args.base_url) as client:
+        client.login(args.email, args.password)
+        summary = replica.sync(client, args.limit)
+    replica.save(args.state)
+    counts = {table: len(getattr(replica, table)) for table in _TABLES.values()}
+    print(json.dumps({**summary, **counts}))
+
+
+if __name__ == "__main__":
+    main()
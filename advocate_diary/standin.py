@@ -0,0 +1,2780 @@
+"""
+In-process stand-in for the Advocate Diary API.
+
+Implements the NextAuth csrf/callback/session/providers endpoints and the
+/api/cases and /api/admin/users contracts of the route handlers under
+src/app/api against an in-memory store, so the API test suite can run
+offline and the contract can be load-tested locally:
+
+    python -m advocate_diary.standin --port 3000
+
+Status codes and error bodies follow the Next.js handlers, including
+their quirks (e.g. non-admins get 401 from the admin routes and a unique
+key clash on case creation surfaces as a 500).
+"""
+
+import argparse
+import base64
+import json
+import math
+import os
+import re
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from email.parser import BytesParser
+from email.policy import HTTP
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timedelta, timezone
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from zoneinfo import ZoneInfo
+
+from advocate_diary.pdf import minimal_pdf
+from advocate_diary.timings import format_server_timing
+
+SESSION_COOKIE = "next-auth.session-token"
+CSRF_COOKIE = "next-auth.csrf-token"
+SESSION_MAX_AGE = 30 * 24 * 60 * 60  # NextAuth default: 30 days
+
+# Failed-login throttling, matching src/lib/login-throttle.ts
+LOGIN_THROTTLE_WINDOW_SECONDS = 15 * 60
+LOGIN_MAX_EMAIL_FAILURES = 5
+LOGIN_MAX_ACCOUNT_FAILURES = 50
+LOGIN_MAX_IP_FAILURES = 100
+TRUSTED_PROXY_HOPS = 1
+LOGIN_THROTTLED = "TooManyAttempts"
+
+# Seeded accounts, matching prisma/seed.ts
+SEED_USERS = (
+    ("admin@example.com", "Admin User", "ADMIN"),
+    ("user1@example.com", "Test User 1", "USER"),
+    ("user2@example.com", "Test User 2", "USER"),
+)
+SEED_PASSWORD = "password123"
+
+# Same limit as MAX_BATCH_SIZE in src/app/api/cases/batch/route.ts
+MAX_BATCH_SIZE = 500
+
+# CaseVersionConflictError's message in src/lib/case-edit.ts
+CASE_VERSION_CONFLICT = "The case was changed by someone else. Reload it and try again."
+
+# Page sizes and selectable columns of GET /api/cases (src/lib/pagination.ts)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+CASE_FIELDS = (
+    "id",
+    "caseType",
+    "registrationYear",
+    "registrationNum",
+    "title",
+    "courtName",
+    "createdAt",
+    "updatedAt",
+    "userId",
+    "isCompleted",
+)
+CASE_INCLUDES = ("petitioners", "respondents", "hearings", "user")
+DEFAULT_CASE_INCLUDES = ("petitioners", "respondents", "hearings")
+
+# GET /api/cases/search (src/lib/case-search.ts): ts_rank weights for the
+# A (title), B (parties), C (court/type/number) and D (notes) sections
+SEARCH_WEIGHTS = (1.0, 0.4, 0.2, 0.1)
+MAX_SEARCH_TERMS = 10
+MAX_SEARCH_OFFSET = 1000
+TRIGRAM_THRESHOLD = 0.6  # pg_trgm.word_similarity_threshold default
+SEARCH_RESULT_FIELDS = (
+    "id",
+    "caseType",
+    "registrationYear",
+    "registrationNum",
+    "title",
+    "courtName",
+    "userId",
+    "updatedAt",
+    "isCompleted",
+)
+_WORD = re.compile(r"[^\W_]+")
+
+# GET /api/cases/[caseId]/similar (src/lib/case-similarity.ts)
+SIMILARITY_BOOSTS = {"title": 3.0, "party": 2.0, "hearing": 1.0, "note": 1.0}
+DEFAULT_SIMILAR_CASES = 5
+MAX_SIMILAR_CASES = 20
+MAX_TERM_DF_RATIO = 0.1
+MIN_TERM_DF_CAP = 50
+
+# GET /api/hearings/calendar (src/lib/hearing-calendar.ts)
+DEFAULT_CALENDAR_DAYS = 30
+MAX_CALENDAR_DAYS = 92
+MAX_CALENDAR_ENTRIES = 1000
+CALENDAR_FIELDS = ("nextDate", "date")
+# All-day iCalendar events fall on the hearing's day in the firm's timezone
+FIRM_TIMEZONE = ZoneInfo(os.environ.get("FIRM_TIMEZONE") or "Asia/Kolkata")
+
+# Exports (src/lib/case-export.ts, src/lib/export-jobs.ts)
+EXPORT_FORMATS = ("pdf", "csv")
+EXPORT_KINDS = ("docket", "causelist")
+EXPORT_CONTENT_TYPES = {"pdf": "application/pdf", "csv": "text/csv; charset=utf-8"}
+MAX_SYNC_EXPORT_ROWS = 2000
+EXPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+EXPORT_PROGRESS_EVERY_ROWS = 100
+EXPORT_DOWNLOAD_TTL_SECONDS = 60 * 60
+EXPORT_STALE_JOB_SECONDS = 5 * 60
+EXPORTS_BUCKET = "case-exports"
+LETTERHEAD = (
+    "Just Chambers Legal Services",
+    "123 Law Street, Legal District, City - 100001",
+    "Tel: (555) 123-4567 | Email: contact@supremelegal.com",
+)
+DOCKET_HEADINGS = (
+    "Case No", "Title", "Court", "Advocate", "Petitioners", "Respondents",
+    "Status", "Last Hearing", "Next Hearing", "Purpose",
+)
+DOCKET_PDF_HEADINGS = ("Case No", "Title", "Court", "Next Hearing", "Purpose", "Status")
+CAUSE_LIST_HEADINGS = ("Date", "Court", "Case No", "Title", "Purpose", "Advocate")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# POST /api/admin/cases/reassign (src/lib/reassign-jobs.ts)
+REASSIGN_CHUNK_SIZE = 500
+
+# GET /api/changes (src/lib/change-feed.ts)
+DEFAULT_CHANGE_LIMIT = 500
+MAX_CHANGE_LIMIT = 1000
+CHANGE_RETENTION_DAYS = 30
+
+# GET /api/admin/users-with-info (getUsersWithInfo in src/lib/db.ts)
+DEFAULT_UPLOADS_PER_USER = 20
+MAX_UPLOADS_PER_USER = 100
+
+# Case uploads (src/lib/case-uploads.ts)
+RESUMABLE_CHUNK_SIZE = 6 * 1024 * 1024
+UPLOAD_SESSION_TTL = timedelta(days=1)
+MAX_FILES_PER_REQUEST = 20
+MAX_UPLOAD_SIZE = 1024 * 1024 * 1024
+ALLOWED_UPLOAD_TYPES = (
+    "image/jpeg",
+    "image/png",
+    "application/pdf",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+)
+STORAGE_URL = "http://storage.standin/storage/v1/object/public"
+
+# GET /api/admin/stats (src/lib/admin-stats.ts): hearings due counts next dates
+# from the start of today up to this many days ahead
+ADMIN_HEARING_WINDOW_DAYS = 7
+
+# POST /api/chat (src/lib/chat.ts)
+CHAT_HISTORY_MAX_MESSAGES = 12
+CHAT_HISTORY_MAX_CHARS = 12_000
+CHAT_MAX_MESSAGE_CHARS = 8_000
+CHAT_SUMMARY_MAX_QUESTIONS = 5
+CHAT_SUMMARY_QUESTION_CHARS = 200
+CHAT_CONTEXT_CASES = 3
+CHAT_CACHE_TTL_SECONDS = 6 * 60 * 60
+CHAT_CACHE_MAX_ENTRIES = 500
+CHAT_SYSTEM_PROMPT = (
+    "You are a legal assistant your answers should be based primarily on the origin country (INDIA), "
+    "and you solve queries related to the country's laws, regulations, and procedures."
+)
+_CHAT_NON_WORD = re.compile(r"[^\w\s]|_")
+
+
+def now_iso() -> str:
+    """Serialise the current time the way JSON.stringify(new Date()) does"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def parse_iso(value: Any) -> Optional[datetime]:
+    """Parse a date string the way new Date(value) would, or None if invalid"""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def case_etag(version: str) -> str:
+    """The ETag of a case version, as caseETag in src/lib/case-version.ts"""
+    return f'"{version}"'
+
+
+def case_version_headers(version: str) -> Dict[str, str]:
+    """Mirrors caseVersionHeaders in src/lib/case-version.ts"""
+    return {
+        "ETag": case_etag(version),
+        "Last-Modified": format_datetime(parse_iso(version), usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def case_not_modified(request: "Request", version: str) -> bool:
+    """Whether the request's If-None-Match (or else If-Modified-Since) still matches the case's version"""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        etag = case_etag(version)
+        return any(tag.strip() in ("*", etag, f"W/{etag}") for tag in if_none_match.split(","))
+    try:
+        since = as_utc(parsedate_to_datetime(request.headers.get("If-Modified-Since") or ""))
+    except (TypeError, ValueError):
+        return False
+    return parse_iso(version).replace(microsecond=0) <= since
+
+
+def later_stamp(previous: str) -> str:
+    """Now, or a millisecond after `previous` if that is not earlier, as nextCaseVersion does"""
+    stamp = now_iso()
+    if stamp <= previous:
+        later = parse_iso(previous) + timedelta(milliseconds=1)
+        stamp = later.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    return stamp
+
+
+def if_match_version(request: "Request") -> Optional[datetime]:
+    """The case version an edit's If-Match asks for, as ifMatchVersion does; 400 if it is not one"""
+    header = (request.headers.get("If-Match") or "").strip()
+    if not header or header == "*":
+        return None
+    version = parse_iso(re.sub(r'^"(.*)"$', r"\1", re.sub(r"^W/", "", header)))
+    if version is None:
+        raise HttpError(400, {"error": "If-Match must be a case ETag"})
+    return version
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC, as new Date("YYYY-MM-DD") does"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def ical_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def ical_fold(line: str) -> str:
+    """Fold an iCalendar content line at 75 octets"""
+    parts: List[str] = []
+    current = ""
+    octets = 0
+    for char in line:
+        size = len(char.encode("utf-8"))
+        if octets + size > (74 if parts else 75):
+            parts.append(current)
+            current, octets = "", 0
+        current += char
+        octets += size
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def format_date(value: Any) -> str:
+    """03 Jun 2025 in UTC, like formatDate in src/lib/case-export.ts"""
+    day = parse_iso(value) if isinstance(value, str) else value
+    if day is None:
+        return ""
+    day = as_utc(day)
+    return f"{day.day:02d} {_MONTHS[day.month - 1]} {day.year}"
+
+
+def table_row(cells) -> str:
+    """A table row as one PDF line; extract_text reads the app's rows back the same way"""
+    return " | ".join(cell for cell in cells if cell)
+
+
+def csv_line(cells) -> str:
+    """One CSV line; cells a spreadsheet would read as a formula get an apostrophe"""
+    out = []
+    for cell in cells:
+        text = "" if cell is None else str(cell)
+        if text[:1] in ("=", "+", "-", "@"):
+            text = "'" + text
+        if re.search(r'[",\r\n]', text):
+            text = '"' + text.replace('"', '""') + '"'
+        out.append(text)
+    return ",".join(out) + "\r\n"
+
+
+def case_number(case: Dict[str, Any]) -> str:
+    return f"{case['caseType']} {case['registrationNum']}/{case['registrationYear']}"
+
+
+def party_list(parties: List[Dict[str, Any]]) -> str:
+    return "; ".join(f"{p['name']} (Adv. {p['advocate']})" if p.get("advocate") else p["name"] for p in parties)
+
+
+def encode_cursor(updated_at: str, row_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{updated_at}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Optional[Tuple[str, str]]:
+    """(updatedAt, id) from a cursor token, or None if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        return None
+    updated_at, _, row_id = raw.partition("|")
+    if not row_id or not parse_iso(updated_at):
+        return None
+    return updated_at, row_id
+
+
+def encode_change_cursor(xid: int, seq: int, issued_at_ms: Optional[int] = None) -> str:
+    issued = int(time.time() * 1000) if issued_at_ms is None else issued_at_ms
+    return base64.urlsafe_b64encode(f"{xid}|{seq}|{issued}".encode()).decode().rstrip("=")
+
+
+def decode_change_cursor(token: str) -> Optional[Tuple[int, int, int]]:
+    """(xid, seq, issuedAt in ms) from a change feed cursor, or None if malformed"""
+    try:
+        parts = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode().split("|")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    xid, seq, issued_at = (int(part) for part in parts)
+    return xid, seq, issued_at
+
+
+def encode_name_cursor(name: str, row_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([name, row_id]).encode()).decode().rstrip("=")
+
+
+def decode_name_cursor(token: str) -> Optional[Tuple[str, str]]:
+    try:
+        name, row_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(name, str) or not isinstance(row_id, str) or not row_id:
+        return None
+    return name, row_id
+
+
+def encode_offset_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset|{offset}".encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(token: str) -> Optional[int]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        return None
+    kind, _, value = raw.partition("|")
+    if kind != "offset" or not value.isdigit() or int(value) > MAX_SEARCH_OFFSET:
+        return None
+    return int(value)
+
+
+def search_terms(text: str, limit: Optional[int] = MAX_SEARCH_TERMS) -> List[str]:
+    """Lowercase runs of letters/digits, like searchTerms in src/lib/case-search.ts"""
+    return _WORD.findall(text.lower())[:limit]
+
+
+def trigrams(word: str) -> set:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """pg_trgm similarity() of two single words"""
+    left, right = trigrams(a), trigrams(b)
+    return len(left & right) / len(left | right) if left and right else 0.0
+
+
+def weighted_terms(fields: List[Tuple[str, float]]) -> Dict[str, float]:
+    """1 + ln(boosted term count) per term, as case_similarity_terms() computes it"""
+    counts: Dict[str, float] = {}
+    for text, boost in fields:
+        for term in search_terms(text or "", limit=None):
+            if len(term) > 1:
+                counts[term] = counts.get(term, 0.0) + boost
+    return {term: 1 + math.log(count) for term, count in counts.items()}
+
+
+def chat_prompt(messages: List[Dict[str, str]], context: Optional[str] = None) -> List[Dict[str, str]]:
+    """Recent turns behind the system prompt, as buildPrompt in src/lib/chat.ts"""
+    kept: List[Dict[str, str]] = []
+    chars = 0
+    for message in reversed(messages):
+        if kept and (
+            len(kept) >= CHAT_HISTORY_MAX_MESSAGES
+            or chars + len(message["content"]) > CHAT_HISTORY_MAX_CHARS
+        ):
+            break
+        kept.insert(0, message)
+        chars += len(message["content"])
+    while len(kept) > 1 and kept[0]["role"] == "assistant":
+        kept.pop(0)
+
+    system = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    if context:
+        system.append({
+            "role": "system",
+            "content": "Cases in the user's diary that may relate to the question "
+            "(refer to them only where relevant):\n" + context,
+        })
+    earlier = [
+        " ".join(m["content"][:CHAT_SUMMARY_QUESTION_CHARS].split())
+        for m in messages[:len(messages) - len(kept)]
+        if m["role"] == "user"
+    ][-CHAT_SUMMARY_MAX_QUESTIONS:]
+    if earlier:
+        system.append({
+            "role": "system",
+            "content": "Earlier in this conversation the user asked:\n" + "\n".join(f"- {q}" for q in earlier),
+        })
+    return system + kept
+
+
+def chat_cache_key(messages: List[Dict[str, str]], case_ids: List[str]) -> Optional[str]:
+    """Normalised question of a single-question conversation plus its context cases, else None"""
+    questions = [m for m in messages if m["role"] == "user"]
+    if len(questions) != 1:
+        return None
+    key = " ".join(_CHAT_NON_WORD.sub(" ", questions[0]["content"].lower()).split())
+    if not key:
+        return None
+    return f"{key}|{','.join(case_ids)}" if case_ids else key
+
+
+class AnswerCache:
+    """TTL + least-recently-used answer cache, like AnswerCache in src/lib/chat.ts"""
+
+    def __init__(self, max_entries: int = CHAT_CACHE_MAX_ENTRIES, ttl: float = CHAT_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            self.entries[key] = entry
+            return entry[0]
+
+    def set(self, key: str, text: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (text, time.monotonic() + self.ttl)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class CaseFileCache:
+    """Rendered case files by (case, format), valid for one version; least
+    recently used entries are evicted past max_bytes, like the case file
+    cache in src/lib/case-export.ts"""
+
+    def __init__(self, max_bytes: int = EXPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+
+    def get(self, case_id: str, fmt: str, version: str) -> Optional[bytes]:
+        with self.lock:
+            entry = self.entries.get((case_id, fmt))
+            if entry is None or entry[0] != version:
+                return None
+            self.entries.move_to_end((case_id, fmt))
+            return entry[1]
+
+    def set(self, case_id: str, fmt: str, version: str, body: bytes) -> None:
+        with self.lock:
+            previous = self.entries.pop((case_id, fmt), None)
+            if previous is not None:
+                self.bytes -= len(previous[1])
+            if len(body) <= self.max_bytes:
+                self.entries[(case_id, fmt)] = (version, body)
+                self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+
+def parse_limit(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return DEFAULT_PAGE_SIZE
+    if not value.isdigit() or int(value) < 1:
+        return None
+    return min(int(value), MAX_PAGE_SIZE)
+
+
+def parse_list(value: Optional[str], allowed: Tuple[str, ...], fallback: Tuple[str, ...]):
+    """Comma-separated selector; returns the values, or the unknown names as a string"""
+    if value is None:
+        return list(fallback)
+    values = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [v for v in values if v not in allowed]
+    return ", ".join(unknown) if unknown else values
+
+
+def is_integer(value: Any) -> bool:
+    """Number.isInteger(Number(value)) for the values clients actually send"""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit())
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, body: Dict[str, Any]):
+        super().__init__(body)
+        self.status = status
+        self.body = body
+
+
+class Response:
+    def __init__(
+        self,
+        status: int = 200,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        cookies: Optional[List[str]] = None,
+    ):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.cookies = cookies or []
+
+
+class Request:
+    def __init__(self, method: str, path: str, query: Dict[str, List[str]], headers, body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.params: Dict[str, str] = {}
+        self.user: Optional[Dict[str, Any]] = None
+
+        cookie = SimpleCookie()
+        cookie.load(headers.get("Cookie", ""))
+        self.cookies = {key: morsel.value for key, morsel in cookie.items()}
+
+    def arg(self, name: str) -> Optional[str]:
+        values = self.query.get(name)
+        return values[0] if values else None
+
+    @property
+    def client_ip(self) -> str:
+        """Caller address from the proxy headers, as clientIp() in src/lib/login-throttle.ts"""
+        hops = [hop.strip() for hop in (self.headers.get("X-Forwarded-For") or "").split(",") if hop.strip()]
+        forwarded = hops[max(0, len(hops) - TRUSTED_PROXY_HOPS)] if hops else None
+        return forwarded or (self.headers.get("X-Real-IP") or "").strip() or "unknown"
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            raise HttpError(400, {"error": "Invalid JSON body"})
+
+    def files(self, field: str) -> List[Tuple[str, str, bytes]]:
+        """(filename, content type, data) of each multipart file in `field`"""
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/form-data"):
+            raise HttpError(400, {"message": "Expected multipart form data"})
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + self.body
+        )
+        return [
+            (part.get_filename(), part.get_content_type(), part.get_payload(decode=True) or b"")
+            for part in message.iter_parts()
+            if part.get_param("name", header="content-disposition") == field and part.get_filename()
+        ]
+
+    def form(self) -> Dict[str, str]:
+        parsed = parse_qs(self.body.decode("utf-8"))
+        return {key: values[0] for key, values in parsed.items()}
+
+
+class MemoryStore:
+    """In-memory copy of the Prisma models the stand-in routes touch"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.cases: Dict[str, Dict[str, Any]] = {}
+        # Case id -> version, the CaseVersion table
+        self.case_versions: Dict[str, str] = {}
+        self.hearings: Dict[str, Dict[str, Any]] = {}
+        self.notes: Dict[str, Dict[str, Any]] = {}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        # Storage buckets: object path -> bytes, and in-progress resumable uploads
+        self.objects: Dict[str, bytes] = {}
+        self.upload_sessions: Dict[str, Dict[str, Any]] = {}
+        self.export_jobs: Dict[str, Dict[str, Any]] = {}
+        self.reassign_jobs: Dict[str, Dict[str, Any]] = {}
+        # Signed download URLs: token -> (object path, expiry as a UTC timestamp)
+        self.signed_urls: Dict[str, Tuple[str, float]] = {}
+        self.sessions: Dict[str, Tuple[str, datetime]] = {}
+        self.csrf_tokens = set()
+        # Failed logins: "email:..." / "ip:..." -> [count, window end as a monotonic time]
+        self.login_failures: Dict[str, List[float]] = {}
+        # Change feed rows; every write is its own transaction, so xid = seq
+        self.changes: List[Dict[str, Any]] = []
+
+        for email, name, role in SEED_USERS:
+            self.add_user(name, email, SEED_PASSWORD, role)
+
+    # Users
+
+    def add_user(self, name: str, email: str, password: str, role: str) -> Dict[str, Any]:
+        stamp = now_iso()
+        user = {
+            "id": new_id(),
+            "email": email,
+            "password": password,
+            "name": name,
+            "role": role,
+            "createdAt": stamp,
+            "updatedAt": stamp,
+        }
+        self.users[user["id"]] = user
+        return user
+
+    def user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return next((u for u in self.users.values() if u["email"] == email), None)
+
+    # Cases
+
+    def case_key_taken(self, case_type: str, year: int, num: int) -> bool:
+        return any(
+            c["caseType"] == case_type
+            and c["registrationYear"] == year
+            and c["registrationNum"] == num
+            for c in self.cases.values()
+        )
+
+    def case_hearings(self, case_id: str) -> List[Dict[str, Any]]:
+        hearings = [h for h in self.hearings.values() if h["caseId"] == case_id]
+        return sorted(hearings, key=lambda h: h["date"], reverse=True)
+
+    def touch_case(self, case_id: str, previous_user_id: Optional[str] = None) -> None:
+        """Record a write to the case row: updatedAt, its version and the change feed"""
+        case = self.cases[case_id]
+        case["updatedAt"] = later_stamp(case["updatedAt"])
+        self.touch_case_version(case_id)
+        self.record_change("case", case_id, case_id, "upsert", case["userId"], previous_user_id)
+
+    def touch_case_version(self, case_id: str) -> None:
+        """Move the case's version on, as touch_cases does for any write to the case or its children"""
+        self.case_versions[case_id] = later_stamp(self.case_versions[case_id])
+
+    # Change feed
+
+    def record_change(
+        self,
+        entity: str,
+        row_id: str,
+        case_id: str,
+        op: str,
+        user_id: Optional[str],
+        previous_user_id: Optional[str] = None,
+    ) -> None:
+        """Append a Change row, as the triggers of the change_feed migration do"""
+        seq = len(self.changes) + 1
+        self.changes.append({
+            "seq": seq,
+            "xid": seq,
+            "entity": entity,
+            "entityId": row_id,
+            "caseId": case_id,
+            "op": op,
+            "userId": user_id,
+            "previousUserId": previous_user_id if previous_user_id != user_id else None,
+            "changedAt": now_iso(),
+        })
+
+
+class StandInApp:
+    """Routes requests to handlers mirroring src/app/api"""
+
+    def __init__(self, store: Optional[MemoryStore] = None):
+        self.store = store or MemoryStore()
+        self.chat_cache = AnswerCache()
+        self.case_file_cache = CaseFileCache()
+        self.routes: List[Tuple[str, "re.Pattern[str]", Callable[[Request], Response]]] = []
+        self.base_url = "http://localhost"
+        self._register_routes()
+
+    def route(self, method: str, pattern: str, handler: Callable[[Request], Response]) -> None:
+        regex = re.compile("^" + re.sub(r"\[(\w+)\]", r"(?P<\1>[^/]+)", pattern) + "$")
+        self.routes.append((method, regex, handler))
+
+    def _register_routes(self) -> None:
+        self.route("GET", "/", self.index)
+        self.route("GET", "/api/auth/csrf", self.auth_csrf)
+        self.route("GET", "/api/auth/providers", self.auth_providers)
+        self.route("POST", "/api/auth/callback/credentials", self.auth_callback)
+        self.route("GET", "/api/auth/session", self.auth_session)
+        self.route("POST", "/api/auth/signout", self.auth_signout)
+
+        self.route("GET", "/api/cases", self.list_cases)
+        self.route("POST", "/api/cases", self.create_case)
+        self.route("POST", "/api/cases/batch", self.create_cases_batch)
+        self.route("GET", "/api/cases/search", self.search_cases)
+        self.route("GET", "/api/cases/export", self.export_cases)
+        self.route("GET", "/api/cases/[caseId]", self.get_case)
+        self.route("PUT", "/api/cases/[caseId]", self.update_case)
+        self.route("PATCH", "/api/cases/[caseId]", self.patch_case)
+        self.route("DELETE", "/api/cases/[caseId]", self.delete_case)
+        self.route("POST", "/api/cases/[caseId]/assign", self.assign_case)
+        self.route("GET", "/api/cases/[caseId]/similar", self.find_similar_cases)
+        self.route("GET", "/api/cases/[caseId]/export", self.export_case)
+        self.route("GET", "/api/cases/[caseId]/hearings", self.list_hearings)
+        self.route("POST", "/api/cases/[caseId]/hearings", self.create_hearing)
+        self.route("GET", "/api/hearings/calendar", self.hearing_calendar)
+        self.route("GET", "/api/cases/[caseId]/upload", self.list_uploads)
+        self.route("POST", "/api/cases/[caseId]/upload", self.upload_files)
+        self.route("POST", "/api/cases/[caseId]/upload/sessions", self.start_upload_session)
+        self.route("GET", "/api/cases/[caseId]/upload/sessions/[sessionId]", self.upload_session_status)
+        self.route("PATCH", "/api/cases/[caseId]/upload/sessions/[sessionId]", self.upload_chunk)
+        self.route("PATCH", "/api/uploads/[uploadId]/rename", self.rename_upload)
+        self.route("GET", "/api/cases/[caseId]/notes", self.list_notes)
+        self.route("POST", "/api/cases/[caseId]/notes", self.create_note)
+        self.route("DELETE", "/api/notes/[noteId]", self.delete_note)
+        self.route("GET", "/api/changes", self.list_changes)
+
+        self.route("POST", "/api/exports", self.start_export)
+        self.route("GET", "/api/exports/[jobId]", self.get_export_job)
+        self.route("GET", f"/storage/v1/object/sign/{EXPORTS_BUCKET}/[userId]/[fileName]", self.signed_download)
+
+        self.route("POST", "/api/chat", self.chat)
+
+        self.route("GET", "/api/admin/users", self.list_users)
+        self.route("POST", "/api/admin/users", self.create_user)
+        self.route("GET", "/api/admin/users/with-case-counts", self.users_with_case_counts)
+        self.route("GET", "/api/admin/users-with-info", self.users_with_info)
+        self.route("GET", "/api/admin/stats", self.admin_stats)
+        self.route("GET", "/api/admin/users/[userId]", self.get_user)
+        self.route("DELETE", "/api/admin/users/[userId]", self.delete_user)
+        self.route("POST", "/api/admin/cases/reassign", self.reassign_cases)
+        self.route("GET", "/api/admin/cases/reassign/[jobId]", self.get_reassign_job)
+
+    def dispatch(self, request: Request) -> Response:
+        path_matched = False
+        for method, regex, handler in self.routes:
+            match = regex.match(request.path)
+            if not match:
+                continue
+            path_matched = True
+            if method != request.method:
+                continue
+            request.params = match.groupdict()
+            started = time.perf_counter()
+            request.user = self.session_user(request)
+            auth_ms = (time.perf_counter() - started) * 1000
+            try:
+                with self.store.lock:
+                    response = handler(request)
+            except HttpError as error:
+                response = Response(error.status, error.body)
+            if request.path.startswith("/api/"):
+                # Like the traced handlers; the store has no queries to time
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = format_server_timing({"auth": (auth_ms, 1)}, total_ms)
+                response.headers = {**response.headers, "Server-Timing": timing}
+            return response
+        if path_matched:
+            return Response(405, {"error": "Method not allowed"})
+        return Response(404, {"error": "Not found"})
+
+    # ------------------------------------------------------------------
+    # Session helpers
+    # ------------------------------------------------------------------
+
+    def session_user(self, request: Request) -> Optional[Dict[str, Any]]:
+        token = request.cookies.get(SESSION_COOKIE)
+        if not token:
+            return None
+        with self.store.lock:
+            entry = self.store.sessions.get(token)
+            if entry is None:
+                return None
+            user_id, expires = entry
+            if expires <= datetime.now(timezone.utc):
+                del self.store.sessions[token]
+                return None
+            return self.store.users.get(user_id)
+
+    @staticmethod
+    def require_user(request: Request, key: str = "error") -> Dict[str, Any]:
+        if request.user is None:
+            raise HttpError(401, {key: "Unauthorized"})
+        return request.user
+
+    @staticmethod
+    def require_admin(request: Request) -> Dict[str, Any]:
+        if request.user is None or request.user["role"] != "ADMIN":
+            raise HttpError(401, {"error": "Unauthorized"})
+        return request.user
+
+    def case_for(self, request: Request, action: str, key: str = "error") -> Dict[str, Any]:
+        """Load the case in the URL and check the session user may touch it"""
+        user = self.require_user(request, key)
+        case = self.store.cases.get(request.params["caseId"])
+        if case is None:
+            raise HttpError(404, {key: "Case not found"})
+        if user["role"] != "ADMIN" and case["userId"] != user["id"]:
+            raise HttpError(403, {key: f"You don't have permission to {action} this case"})
+        return case
+
+    # ------------------------------------------------------------------
+    # NextAuth
+    # ------------------------------------------------------------------
+
+    def index(self, request: Request) -> Response:
+        return Response(200, {"ok": True})
+
+    def auth_csrf(self, request: Request) -> Response:
+        token = request.cookies.get(CSRF_COOKIE, "").split("|")[0]
+        if token not in self.store.csrf_tokens:
+            token = secrets.token_hex(32)
+            self.store.csrf_tokens.add(token)
+        cookie = f"{CSRF_COOKIE}={token}|stand-in; Path=/; HttpOnly; SameSite=Lax"
+        return Response(200, {"csrfToken": token}, cookies=[cookie])
+
+    def auth_providers(self, request: Request) -> Response:
+        return Response(200, {
+            "credentials": {
+                "id": "credentials",
+                "name": "Credentials",
+                "type": "credentials",
+                "signinUrl": f"{self.base_url}/api/auth/signin/credentials",
+                "callbackUrl": f"{self.base_url}/api/auth/callback/credentials",
+            }
+        })
+
+    def auth_callback(self, request: Request) -> Response:
+        form = request.form()
+        csrf_cookie = request.cookies.get(CSRF_COOKIE, "").split("|")[0]
+        if not form.get("csrfToken") or form.get("csrfToken") != csrf_cookie:
+            return Response(302, headers={"Location": f"{self.base_url}/login?csrf=true"})
+
+        email = form.get("email", "")
+        account = f"email:{email.strip().lower()}"
+        keys = (f"{account}|ip:{request.client_ip}", account, f"ip:{request.client_ip}")
+        if self.login_retry_after(keys) > 0:
+            return Response(302, headers={"Location": f"{self.base_url}/login?error={LOGIN_THROTTLED}"})
+
+        user = self.store.user_by_email(email)
+        if user is None or user["password"] != form.get("password"):
+            self.record_login_failure(keys)
+            return Response(302, headers={"Location": f"{self.base_url}/login?error=CredentialsSignin"})
+        self.store.login_failures.pop(keys[0], None)
+
+        token = secrets.token_urlsafe(32)
+        expires = datetime.now(timezone.utc) + timedelta(seconds=SESSION_MAX_AGE)
+        self.store.sessions[token] = (user["id"], expires)
+        cookie = (
+            f"{SESSION_COOKIE}={token}; Path=/; HttpOnly; SameSite=Lax; "
+            f"Max-Age={SESSION_MAX_AGE}"
+        )
+        return Response(302, headers={"Location": f"{self.base_url}/"}, cookies=[cookie])
+
+    def login_retry_after(self, keys: Tuple[str, str, str]) -> float:
+        """Seconds until the email may try again from the IP in `keys`, 0 if it may now"""
+        now = time.monotonic()
+        blocked_until = 0.0
+        for key, limit in zip(keys, (LOGIN_MAX_EMAIL_FAILURES, LOGIN_MAX_ACCOUNT_FAILURES, LOGIN_MAX_IP_FAILURES)):
+            count, reset_at = self.store.login_failures.get(key, (0, 0.0))
+            if reset_at > now and count >= limit:
+                blocked_until = max(blocked_until, reset_at)
+        return max(0.0, blocked_until - now)
+
+    def record_login_failure(self, keys: Tuple[str, str, str]) -> None:
+        now = time.monotonic()
+        for key in keys:
+            entry = self.store.login_failures.get(key)
+            if entry is None or entry[1] <= now:
+                entry = self.store.login_failures[key] = [0, now + LOGIN_THROTTLE_WINDOW_SECONDS]
+            entry[0] += 1
+
+    def auth_session(self, request: Request) -> Response:
+        user = request.user
+        if user is None:
+            return Response(200, {})
+        token = request.cookies[SESSION_COOKIE]
+        expires = self.store.sessions[token][1]
+        return Response(200, {
+            "user": {
+                "name": user["name"],
+                "email": user["email"],
+                "id": user["id"],
+                "role": user["role"],
+            },
+            "expires": expires.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        })
+
+    def auth_signout(self, request: Request) -> Response:
+        self.store.sessions.pop(request.cookies.get(SESSION_COOKIE, ""), None)
+        cookie = f"{SESSION_COOKIE}=; Path=/; Max-Age=0"
+        return Response(302, headers={"Location": f"{self.base_url}/"}, cookies=[cookie])
+
+    # ------------------------------------------------------------------
+    # /api/cases
+    # ------------------------------------------------------------------
+
+    def serialize_case(self, case: Dict[str, Any], hearings: Optional[int] = None) -> Dict[str, Any]:
+        data = dict(case)
+        data["hearings"] = self.store.case_hearings(case["id"])[:hearings]
+        return data
+
+    def list_cases(self, request: Request) -> Response:
+        user = self.require_user(request)
+        is_admin = user["role"] == "ADMIN"
+        include_personal = request.arg("includePERSONAL") == "true"
+
+        limit = parse_limit(request.arg("limit"))
+        if limit is None:
+            raise HttpError(400, {"error": "limit must be a positive integer"})
+        cursor_token = request.arg("cursor")
+        cursor = decode_cursor(cursor_token) if cursor_token else None
+        if cursor_token and cursor is None:
+            raise HttpError(400, {"error": "Invalid cursor"})
+
+        fields = parse_list(request.arg("fields"), CASE_FIELDS, CASE_FIELDS)
+        includes = parse_list(request.arg("include"), CASE_INCLUDES, DEFAULT_CASE_INCLUDES)
+        if isinstance(fields, str) or isinstance(includes, str):
+            unknown = fields if isinstance(fields, str) else includes
+            raise HttpError(400, {"error": f"Unknown field: {unknown}"})
+
+        hearing_from = request.arg("nextHearingFrom")
+        hearing_to = request.arg("nextHearingTo")
+        if (hearing_from and not parse_iso(hearing_from)) or (hearing_to and not parse_iso(hearing_to)):
+            raise HttpError(400, {"error": "Invalid next hearing date"})
+        is_completed = request.arg("isCompleted")
+        if is_completed not in (None, "true", "false"):
+            raise HttpError(400, {"error": "isCompleted must be true or false"})
+        case_type = request.arg("caseType")
+        court = (request.arg("court") or "").lower()
+        user_id = request.arg("userId")
+
+        def matches(case: Dict[str, Any]) -> bool:
+            if not is_admin:
+                if case["userId"] != user["id"]:
+                    return False
+            else:
+                if not include_personal and case_type != "PERSONAL" and case["caseType"] == "PERSONAL":
+                    return False
+                if user_id and case["userId"] != user_id:
+                    return False
+            if case_type and case["caseType"] != case_type:
+                return False
+            if court and court not in (case.get("courtName") or "").lower():
+                return False
+            if is_completed is not None and case["isCompleted"] != (is_completed == "true"):
+                return False
+            if hearing_from or hearing_to:
+                low = parse_iso(hearing_from) if hearing_from else None
+                high = parse_iso(hearing_to) if hearing_to else None
+                if not any(
+                    h["nextDate"]
+                    and (low is None or parse_iso(h["nextDate"]) >= low)
+                    and (high is None or parse_iso(h["nextDate"]) <= high)
+                    for h in self.store.case_hearings(case["id"])
+                ):
+                    return False
+            if cursor and (case["updatedAt"], case["id"]) >= cursor:
+                return False
+            return True
+
+        cases = [c for c in self.store.cases.values() if matches(c)]
+        cases.sort(key=lambda c: (c["updatedAt"], c["id"]), reverse=True)
+        page = cases[:limit]
+
+        items = []
+        for case in page:
+            item = {k: case[k] for k in ("id", "updatedAt", *fields)}
+            for relation in includes:
+                if relation == "hearings":
+                    item["hearings"] = self.store.case_hearings(case["id"])[:1]
+                elif relation == "user":
+                    owner = self.store.users.get(case["userId"])
+                    item["user"] = (
+                        {"id": owner["id"], "name": owner["name"], "email": owner["email"]} if owner else None
+                    )
+                else:
+                    item[relation] = case[relation]
+            items.append(item)
+
+        next_cursor = encode_cursor(page[-1]["updatedAt"], page[-1]["id"]) if len(cases) > limit else None
+        return Response(200, {"cases": items, "nextCursor": next_cursor})
+
+    def search_document(self, case: Dict[str, Any]) -> List[Tuple[float, List[str]]]:
+        """Weighted token lists matching the CaseSearchDocument tsvector"""
+        parties = " ".join(
+            f"{p['name']} {p.get('advocate') or ''}" for p in case["petitioners"] + case["respondents"]
+        )
+        registration = f"{case.get('courtName') or ''} {case['caseType']} {case['registrationNum']} {case['registrationYear']}"
+        notes = " ".join(n["content"] for n in self.store.notes.values() if n["caseId"] == case["id"])
+        return [
+            (weight, search_terms(text, limit=None))
+            for weight, text in zip(SEARCH_WEIGHTS, (case["title"] or "", parties, registration, notes))
+        ]
+
+    def search_cases(self, request: Request) -> Response:
+        user = self.require_user(request)
+        terms = search_terms(request.arg("q") or "")
+        if not terms:
+            raise HttpError(400, {"error": "Search query is required"})
+        limit = parse_limit(request.arg("limit"))
+        if limit is None:
+            raise HttpError(400, {"error": "limit must be a positive integer"})
+        cursor_token = request.arg("cursor")
+        offset = decode_offset_cursor(cursor_token) if cursor_token else 0
+        if offset is None:
+            raise HttpError(400, {"error": "Invalid cursor"})
+
+        is_admin = user["role"] == "ADMIN"
+        include_personal = request.arg("includePERSONAL") == "true"
+        visible = [
+            case for case in self.store.cases.values()
+            if (case["userId"] == user["id"] if not is_admin
+                else include_personal or case["caseType"] != "PERSONAL")
+        ]
+
+        ranked = []
+        for case in visible:
+            # Every term must prefix-match a token; it scores the best field it hits
+            document = self.search_document(case)
+            rank = 0.0
+            for term in terms:
+                hits = [weight for weight, tokens in document if any(t.startswith(term) for t in tokens)]
+                if not hits:
+                    break
+                rank += max(hits)
+            else:
+                ranked.append((rank, case["id"], case))
+
+        # Nothing matched exactly: fall back to trigram near-misses on the first page
+        fuzzy = not ranked and offset == 0
+        if fuzzy:
+            for case in visible:
+                tokens = [t for _, field in self.search_document(case) for t in field]
+                score = sum(max((trigram_similarity(term, t) for t in tokens), default=0.0) for term in terms)
+                score /= len(terms)
+                if score >= TRIGRAM_THRESHOLD:
+                    ranked.append((score, case["id"], case))
+            ranked.sort(key=lambda r: (r[0], r[1]), reverse=True)
+            ranked = ranked[:limit]
+
+        ranked.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        page = ranked[offset:offset + limit]
+        results = []
+        for rank, _, case in page:
+            result = {k: case[k] for k in SEARCH_RESULT_FIELDS}
+            for relation in ("petitioners", "respondents"):
+                result[relation] = [{"name": p["name"], "advocate": p.get("advocate")} for p in case[relation]]
+            result["hearings"] = self.store.case_hearings(case["id"])[:1]
+            result["rank"] = rank
+            results.append(result)
+
+        next_offset = offset + limit
+        has_more = len(ranked) > next_offset and next_offset <= MAX_SEARCH_OFFSET
+        return Response(200, {
+            "results": results,
+            "nextCursor": encode_offset_cursor(next_offset) if has_more else None,
+            "fuzzy": fuzzy,
+        })
+
+    def similarity_terms(self, case: Dict[str, Any]) -> Dict[str, float]:
+        """A case's CaseSimilarityTerm rows"""
+        fields = [(case["title"], SIMILARITY_BOOSTS["title"])]
+        fields += [
+            (f"{p['name']} {p.get('advocate') or ''}", SIMILARITY_BOOSTS["party"])
+            for p in case["petitioners"] + case["respondents"]
+        ]
+        fields += [
+            (f"{h.get('notes') or ''} {h.get('nextPurpose') or ''}", SIMILARITY_BOOSTS["hearing"])
+            for h in self.store.case_hearings(case["id"])
+        ]
+        fields += [
+            (n["content"], SIMILARITY_BOOSTS["note"])
+            for n in self.store.notes.values() if n["caseId"] == case["id"]
+        ]
+        return weighted_terms(fields)
+
+    def similar_cases(
+        self,
+        query: Dict[str, float],
+        user: Dict[str, Any],
+        limit: int,
+        include_personal: bool = False,
+        exclude_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank visible cases against weighted query terms like rankCases in
+        src/lib/case-similarity.ts. The stand-in rebuilds the vectors per
+        request instead of keeping the trigger-maintained tables.
+        """
+        vectors = {case_id: self.similarity_terms(case) for case_id, case in self.store.cases.items()}
+        corpus = max(len(vectors), 1)
+        df: Dict[str, int] = {}
+        for vector in vectors.values():
+            for term in vector:
+                df[term] = df.get(term, 0) + 1
+        df_cap = max(MIN_TERM_DF_CAP, corpus * MAX_TERM_DF_RATIO)
+        weights = {
+            term: weight * math.log(1 + corpus / df[term]) ** 2
+            for term, weight in query.items()
+            if 0 < df.get(term, 0) <= df_cap
+        }
+
+        is_admin = user["role"] == "ADMIN"
+        ranked = []
+        for case_id, vector in vectors.items():
+            case = self.store.cases[case_id]
+            if case_id == exclude_id:
+                continue
+            if not is_admin and case["userId"] != user["id"]:
+                continue
+            if is_admin and not include_personal and case["caseType"] == "PERSONAL":
+                continue
+            shared = [term for term in weights if term in vector]
+            if not shared:
+                continue
+            norm = math.sqrt(sum(w * w for w in vector.values()))
+            ranked.append((-sum(weights[t] * vector[t] for t in shared) / norm, case_id))
+        ranked.sort()
+
+        results = []
+        for score, case_id in ranked[:limit]:
+            case = self.store.cases[case_id]
+            hearings = self.store.case_hearings(case_id)
+            results.append({
+                **{k: case[k] for k in (
+                    "id", "caseType", "registrationNum", "registrationYear", "title", "courtName", "isCompleted",
+                )},
+                "score": -score,
+                "lastHearing": {k: hearings[0][k] for k in ("date", "nextDate", "nextPurpose")} if hearings else None,
+            })
+        return results
+
+    def find_similar_cases(self, request: Request) -> Response:
+        case = self.case_for(request, "view")
+        limit_arg = request.arg("limit")
+        if limit_arg is not None and (not limit_arg.isdigit() or int(limit_arg) < 1):
+            raise HttpError(400, {"error": "limit must be a positive integer"})
+        limit = min(int(limit_arg) if limit_arg else DEFAULT_SIMILAR_CASES, MAX_SIMILAR_CASES)
+        results = self.similar_cases(
+            self.similarity_terms(case),
+            request.user,
+            limit,
+            include_personal=request.arg("includePERSONAL") == "true",
+            exclude_id=case["id"],
+        )
+        return Response(200, {"results": results})
+
+    @staticmethod
+    def describe_cases(cases: List[Dict[str, Any]]) -> str:
+        """describeCases in src/lib/case-similarity.ts"""
+        lines = []
+        for case in cases:
+            parts = [
+                f"{case['title']} ({case['caseType']} {case['registrationNum']}/{case['registrationYear']})",
+                case["courtName"],
+            ]
+            hearing = case["lastHearing"]
+            if hearing and hearing.get("nextDate"):
+                purpose = f" for {hearing['nextPurpose']}" if hearing.get("nextPurpose") else ""
+                parts.append(f"next hearing {as_utc(parse_iso(hearing['nextDate'])):%Y-%m-%d}{purpose}")
+            if case["isCompleted"]:
+                parts.append("completed")
+            lines.append("- " + "; ".join(parts))
+        return "\n".join(lines)
+
+    @staticmethod
+    def validate_case_input(data: Any) -> Optional[str]:
+        """Mirrors validateCaseInput in src/lib/case-input.ts"""
+        if not isinstance(data, dict):
+            return "Case data must be an object"
+        if not data.get("caseType") or not data.get("registrationNum") or not data.get("registrationYear"):
+            return "Case type, registration number, and year are required"
+        if not all(is_integer(data[k]) for k in ("registrationNum", "registrationYear")):
+            return "Registration number and year must be integers"
+        if not data.get("petitioners") or not data.get("respondents"):
+            return "At least one petitioner and one respondent are required"
+        if any(not (party or {}).get("name") for party in data["petitioners"] + data["respondents"]):
+            return "Every petitioner and respondent needs a name"
+        hearings = data.get("hearings")
+        if hearings is not None:
+            if not isinstance(hearings, list):
+                return "Hearings must be an array"
+            for hearing in hearings:
+                if not isinstance(hearing, dict) or not parse_iso(hearing.get("date")):
+                    return "Hearing date is required"
+                if hearing.get("nextDate") and not parse_iso(hearing["nextDate"]):
+                    return "Hearing next date is invalid"
+        return None
+
+    def insert_case(self, data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """Create a validated case (with any hearings), like caseCreateData"""
+        title = data.get("title") or f"{data['petitioners'][0]['name']} vs {data['respondents'][0]['name']}"
+        case_id = new_id()
+        stamp = now_iso()
+        case = {
+            "id": case_id,
+            "caseType": data["caseType"],
+            "registrationYear": int(data["registrationYear"]),
+            "registrationNum": int(data["registrationNum"]),
+            "title": title,
+            "courtName": data.get("courtName"),
+            "createdAt": stamp,
+            "updatedAt": stamp,
+            "userId": user_id,
+            "isCompleted": False,
+            "petitioners": [
+                {"id": new_id(), "name": p["name"], "advocate": p.get("advocate"), "caseId": case_id}
+                for p in data["petitioners"]
+            ],
+            "respondents": [
+                {"id": new_id(), "name": r["name"], "advocate": r.get("advocate"), "caseId": case_id}
+                for r in data["respondents"]
+            ],
+        }
+        self.store.cases[case_id] = case
+        self.store.case_versions[case_id] = stamp
+        self.store.record_change("case", case_id, case_id, "upsert", user_id)
+        for hearing in data.get("hearings") or []:
+            hearing_id = new_id()
+            self.store.record_change("hearing", hearing_id, case_id, "upsert", user_id)
+            self.store.hearings[hearing_id] = {
+                "id": hearing_id,
+                "date": hearing["date"],
+                "notes": hearing.get("notes"),
+                "nextDate": hearing.get("nextDate"),
+                "nextPurpose": hearing.get("nextPurpose"),
+                "createdAt": stamp,
+                "updatedAt": stamp,
+                "caseId": case_id,
+            }
+        return case
+
+    def create_case(self, request: Request) -> Response:
+        user = self.require_user(request)
+        data = request.json() or {}
+
+        error = self.validate_case_input(data)
+        if error:
+            raise HttpError(400, {"error": error})
+
+        # Mirrors the @@unique([caseType, registrationYear, registrationNum])
+        # violation, which the route reports as a generic 500
+        if self.store.case_key_taken(data["caseType"], int(data["registrationYear"]), int(data["registrationNum"])):
+            raise HttpError(500, {"error": "An error occurred while creating the case"})
+
+        is_admin = user["role"] == "ADMIN"
+        user_id = data["userId"] if is_admin and data.get("userId") else user["id"]
+        return Response(201, dict(self.insert_case(data, user_id)))
+
+    def create_cases_batch(self, request: Request) -> Response:
+        user = self.require_user(request)
+        records = (request.json() or {}).get("cases")
+        if not isinstance(records, list) or not records:
+            raise HttpError(400, {"error": "A non-empty cases array is required"})
+        if len(records) > MAX_BATCH_SIZE:
+            raise HttpError(400, {"error": f"At most {MAX_BATCH_SIZE} cases can be created per request"})
+
+        is_admin = user["role"] == "ADMIN"
+        results: List[Dict[str, Any]] = []
+        pending = []
+        batch_keys = set()
+        for index, data in enumerate(records):
+            error = self.validate_case_input(data)
+            if error:
+                results.append({"index": index, "status": "invalid", "error": error})
+                continue
+            key = (data["caseType"], int(data["registrationYear"]), int(data["registrationNum"]))
+            if key in batch_keys:
+                results.append({"index": index, "status": "conflict", "error": "Duplicate case in batch"})
+                continue
+            batch_keys.add(key)
+            user_id = data["userId"] if is_admin and data.get("userId") else user["id"]
+            if user_id not in self.store.users:
+                results.append({"index": index, "status": "invalid", "error": "User not found"})
+            elif self.store.case_key_taken(*key):
+                results.append({"index": index, "status": "conflict", "error": "Case already exists"})
+            else:
+                results.append(None)
+                pending.append((index, data, user_id))
+
+        # Everything was validated first; the writes happen under the store lock
+        for index, data, user_id in pending:
+            results[index] = {"index": index, "status": "created", "id": self.insert_case(data, user_id)["id"]}
+
+        summary = {"created": 0, "conflict": 0, "invalid": 0, "error": 0}
+        for result in results:
+            summary[result["status"]] += 1
+        return Response(200, {"results": results, "summary": summary})
+
+    def get_case(self, request: Request) -> Response:
+        case = self.case_for(request, "view")
+        version = self.store.case_versions[case["id"]]
+        headers = case_version_headers(version)
+        if case_not_modified(request, version):
+            return Response(304, headers=headers)
+
+        owner = self.store.users.get(case["userId"])
+        user = {"id": owner["id"], "name": owner["name"], "email": owner["email"]} if owner else None
+        if request.arg("summary") == "true":
+            hearings = self.store.case_hearings(case["id"])
+            counts = {
+                "hearings": len(hearings),
+                "notes": sum(1 for n in self.store.notes.values() if n["caseId"] == case["id"]),
+                "uploads": sum(1 for u in self.store.uploads.values() if u["caseId"] == case["id"]),
+            }
+            data = {
+                **case,
+                "version": version,
+                "user": user,
+                "latestHearing": hearings[0] if hearings else None,
+                "counts": counts,
+            }
+            return Response(200, data, headers=headers)
+
+        data = self.serialize_case(case)
+        data["version"] = version
+        data["user"] = user
+        return Response(200, data, headers=headers)
+
+    def update_case(self, request: Request) -> Response:
+        case = self.case_for(request, "update")
+        expected = if_match_version(request)
+        data = request.json() or {}
+        is_admin = request.user["role"] == "ADMIN"
+
+        kinds = ("petitioners", "respondents")
+        lists = [data.get(kind, []) for kind in kinds] + [data.get(f"{kind}ToDelete", []) for kind in kinds]
+        if not all(isinstance(value, list) for value in lists):
+            raise HttpError(400, {"error": "Parties must be arrays"})
+        if any(not (party or {}).get("name") for party in lists[0] + lists[1]):
+            raise HttpError(400, {"error": "Every petitioner and respondent needs a name"})
+        if expected is not None and expected != parse_iso(self.store.case_versions[case["id"]]):
+            raise HttpError(409, {"error": CASE_VERSION_CONFLICT})
+
+        for field in ("caseType", "registrationYear", "registrationNum", "title", "courtName"):
+            if data.get(field) is not None:
+                case[field] = data[field]
+        if is_admin and data.get("isCompleted") is not None:
+            case["isCompleted"] = data["isCompleted"]
+
+        for kind in kinds:
+            added, changed, removed = self.diff_parties(case[kind], data.get(kind), data.get(f"{kind}ToDelete"))
+            parties = [p for p in case[kind] if p["id"] not in removed]
+            for party in parties:
+                party.update(changed.get(party["id"], {}))
+            parties.extend({"id": new_id(), **party, "caseId": case["id"]} for party in added)
+            case[kind] = parties
+
+        self.store.touch_case(case["id"])
+        version = self.store.case_versions[case["id"]]
+        body = {k: v for k, v in case.items() if k not in ("petitioners", "respondents")}
+        return Response(200, {**body, "version": version}, headers=case_version_headers(version))
+
+    @staticmethod
+    def diff_parties(existing, submitted, to_delete):
+        """Mirrors diffParties: (added, changed by id, removed ids) for one kind of party"""
+        current = {party["id"]: party for party in existing}
+        removed = {party_id for party_id in to_delete or [] if party_id in current}
+        added: List[Dict[str, Any]] = []
+        changed: Dict[str, Dict[str, Any]] = {}
+        for party in submitted or []:
+            if party.get("isNew"):
+                added.append({"name": party["name"], "advocate": party.get("advocate") or None})
+                continue
+            row = current.get(party.get("id"))
+            if row is None or row["id"] in removed:
+                continue
+            advocate = party.get("advocate") or row.get("advocate")
+            if party["name"] != row["name"] or advocate != row.get("advocate"):
+                changed[row["id"]] = {"name": party["name"], "advocate": advocate}
+        return added, changed, removed
+
+    def patch_case(self, request: Request) -> Response:
+        user = self.require_user(request)
+        if user["role"] != "ADMIN":
+            raise HttpError(403, {"error": "Only admins can update case completion status"})
+        case = self.store.cases.get(request.params["caseId"])
+        if case is None:
+            raise HttpError(404, {"error": "Case not found"})
+        is_completed = (request.json() or {}).get("isCompleted")
+        if not isinstance(is_completed, bool):
+            raise HttpError(400, {"error": "isCompleted must be a boolean value"})
+        case["isCompleted"] = is_completed
+        self.store.touch_case(case["id"])
+        return Response(200, {"id": case["id"], "isCompleted": is_completed})
+
+    def assign_case(self, request: Request) -> Response:
+        user = self.require_user(request)
+        if user["role"] != "ADMIN":
+            raise HttpError(403, {"error": "Only admins can assign cases"})
+        user_id = (request.json() or {}).get("userId")
+        if not user_id:
+            raise HttpError(400, {"error": "userId is required"})
+        case = self.store.cases.get(request.params["caseId"])
+        if case is None:
+            raise HttpError(404, {"error": "Case not found"})
+        owner = self.store.users.get(user_id)
+        if owner is None:
+            raise HttpError(404, {"error": "User not found"})
+
+        summary = {"id": owner["id"], "name": owner["name"], "email": owner["email"]}
+        if case["userId"] == user_id:
+            return Response(200, {
+                "success": True,
+                "message": "Case is already assigned to this user",
+                "case": {**case, "user": summary},
+            })
+
+        previous = case["userId"]
+        case["userId"] = user_id
+        self.store.touch_case(case["id"], previous_user_id=previous)
+        notes = sum(1 for n in self.store.notes.values() if n["caseId"] == case["id"] and n["userId"] != user_id)
+        files = sum(1 for u in self.store.uploads.values() if u["caseId"] == case["id"] and u["userId"] != user_id)
+        preserved = ""
+        if notes or files:
+            preserved = (
+                f"Previous content preserved: {notes} notes and {files} files "
+                "from former assignees remain accessible."
+            )
+        return Response(200, {
+            "success": True,
+            "message": f"Case assigned successfully. {preserved}",
+            "case": {**case, "user": summary},
+            "preservedItems": {"notes": notes, "files": files},
+        })
+
+    def delete_case(self, request: Request) -> Response:
+        case = self.case_for(request, "delete")
+        del self.store.cases[case["id"]]
+        del self.store.case_versions[case["id"]]
+        self.store.record_change("case", case["id"], case["id"], "delete", case["userId"])
+        for table in (self.store.hearings, self.store.notes, self.store.uploads):
+            for row_id in [k for k, v in table.items() if v["caseId"] == case["id"]]:
+                del table[row_id]
+        return Response(200, {"success": True})
+
+    # ------------------------------------------------------------------
+    # Uploads
+    # ------------------------------------------------------------------
+
+    def upload_case(self, request: Request) -> Dict[str, Any]:
+        """The case in the URL, if the session user may upload to it"""
+        user = self.require_user(request, "message")
+        case = self.store.cases.get(request.params["caseId"])
+        if case is None:
+            raise HttpError(404, {"message": "Case not found"})
+        if user["role"] != "ADMIN" and case["userId"] != user["id"]:
+            raise HttpError(403, {"message": "Forbidden"})
+        return case
+
+    def record_upload(self, case_id: str, user_id: str, file_name: str, file_type: str, path: str) -> Dict[str, Any]:
+        file_url = f"{STORAGE_URL}/case-files/{path}"
+        existing = next((u for u in self.store.uploads.values() if u["fileUrl"] == file_url), None)
+        if existing:
+            return existing
+        upload = {
+            "id": new_id(),
+            "fileName": file_name,
+            "fileUrl": file_url,
+            "fileType": file_type,
+            "createdAt": now_iso(),
+            "caseId": case_id,
+            "userId": user_id,
+        }
+        self.store.uploads[upload["id"]] = upload
+        self.store.record_change("upload", upload["id"], case_id, "upsert", self.store.cases[case_id]["userId"])
+        self.store.touch_case_version(case_id)
+        return upload
+
+    @staticmethod
+    def object_path(case_id: str, file_name: str) -> str:
+        return f"{case_id}/{secrets.token_hex(8)}_{file_name}"
+
+    def upload_files(self, request: Request) -> Response:
+        case = self.upload_case(request)
+        files = request.files("file")
+        if not files:
+            raise HttpError(400, {"message": "No file provided"})
+        if len(files) > MAX_FILES_PER_REQUEST:
+            raise HttpError(400, {"message": f"At most {MAX_FILES_PER_REQUEST} files can be uploaded per request"})
+        for file_name, file_type, data in files:
+            if file_type not in ALLOWED_UPLOAD_TYPES:
+                raise HttpError(400, {
+                    "message": f"Invalid file type: {file_type}. Only JPG, PNG, PDF, DOC, and DOCX files are allowed.",
+                })
+            if len(data) > MAX_UPLOAD_SIZE:
+                raise HttpError(400, {"message": f"{file_name} exceeds the maximum upload size"})
+
+        uploads = []
+        for file_name, file_type, data in files:
+            path = self.object_path(case["id"], file_name)
+            self.store.objects[path] = data
+            uploads.append(self.record_upload(case["id"], request.user["id"], file_name, file_type, path))
+        return Response(200, {
+            "message": "File uploaded successfully" if len(uploads) == 1 else f"{len(uploads)} files uploaded successfully",
+            "upload": uploads[0],
+            "uploads": uploads,
+            "failed": [],
+        })
+
+    def start_upload_session(self, request: Request) -> Response:
+        case = self.upload_case(request)
+        data = request.json() or {}
+        file_name, file_type, size = data.get("fileName"), data.get("fileType"), data.get("size")
+        if not file_name or not isinstance(file_name, str):
+            raise HttpError(400, {"message": "fileName is required"})
+        if file_type not in ALLOWED_UPLOAD_TYPES:
+            raise HttpError(400, {
+                "message": f"Invalid file type: {file_type}. Only JPG, PNG, PDF, DOC, and DOCX files are allowed.",
+            })
+        if not isinstance(size, int) or isinstance(size, bool) or not 1 <= size <= MAX_UPLOAD_SIZE:
+            raise HttpError(400, {"message": "size must be a positive number of bytes within the upload limit"})
+
+        session_id = secrets.token_urlsafe(24)
+        self.store.upload_sessions[session_id] = {
+            "caseId": case["id"],
+            "userId": request.user["id"],
+            "fileName": file_name,
+            "fileType": file_type,
+            "size": size,
+            "path": self.object_path(case["id"], file_name),
+            "expiresAt": datetime.now(timezone.utc) + UPLOAD_SESSION_TTL,
+            "data": bytearray(),
+        }
+        return Response(201, {"sessionId": session_id, "offset": 0, "size": size, "chunkSize": RESUMABLE_CHUNK_SIZE})
+
+    def upload_session(self, request: Request) -> Dict[str, Any]:
+        """Mirrors loadSession: the caller must still be able to upload to the case"""
+        case = self.upload_case(request)
+        session = self.store.upload_sessions.get(request.params["sessionId"])
+        if session is None or session["caseId"] != case["id"] or session["userId"] != request.user["id"]:
+            raise HttpError(404, {"message": "Upload session not found"})
+        if session["expiresAt"] <= datetime.now(timezone.utc):
+            raise HttpError(410, {"message": "Upload session expired; start a new one"})
+        return session
+
+    def session_progress(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        offset = len(session["data"])
+        body: Dict[str, Any] = {"offset": offset, "size": session["size"]}
+        if offset == session["size"]:
+            self.store.objects[session["path"]] = bytes(session["data"])
+            body["upload"] = self.record_upload(
+                session["caseId"], session["userId"], session["fileName"], session["fileType"], session["path"]
+            )
+        return body
+
+    def upload_session_status(self, request: Request) -> Response:
+        return Response(200, self.session_progress(self.upload_session(request)))
+
+    def upload_chunk(self, request: Request) -> Response:
+        session = self.upload_session(request)
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+        except ValueError:
+            offset = -1
+        length = len(request.body)
+        is_last = offset + length == session["size"]
+        if (
+            offset < 0
+            or offset % RESUMABLE_CHUNK_SIZE
+            or length < 1
+            or (length != RESUMABLE_CHUNK_SIZE and not is_last)
+            or offset + length > session["size"]
+        ):
+            raise HttpError(400, {
+                "message": f"Chunks must be {RESUMABLE_CHUNK_SIZE} bytes at a chunk boundary, except the last",
+            })
+        # Storage rejects writes that do not continue from its offset
+        if offset != len(session["data"]):
+            raise HttpError(409, {
+                "message": "Chunk was not stored; resume from offset",
+                "offset": len(session["data"]),
+                "size": session["size"],
+            })
+        session["data"] += request.body
+        return Response(200, self.session_progress(session))
+
+    def rename_upload(self, request: Request) -> Response:
+        user = self.require_user(request)
+        upload = self.store.uploads.get(request.params["uploadId"])
+        if upload is None:
+            raise HttpError(404, {"error": "File not found"})
+        file_name = (request.json() or {}).get("fileName")
+        if not isinstance(file_name, str) or not file_name.strip():
+            raise HttpError(400, {"error": "Valid file name is required"})
+        case = self.store.cases.get(upload["caseId"]) if upload["caseId"] else None
+        owner_id = case["userId"] if case is not None else upload["userId"]
+        if user["role"] != "ADMIN" and owner_id != user["id"]:
+            raise HttpError(403, {"error": "You don't have permission to rename this file"})
+        upload["fileName"] = file_name.strip()
+        if case is not None:
+            self.store.record_change("upload", upload["id"], case["id"], "upsert", case["userId"])
+            self.store.touch_case_version(case["id"])
+        return Response(200, {"success": True, "upload": upload})
+
+    # ------------------------------------------------------------------
+    # Hearings and notes
+    # ------------------------------------------------------------------
+
+    def list_hearings(self, request: Request) -> Response:
+        case = self.case_for(request, "view hearings for")
+        hearings = [h for h in self.store.hearings.values() if h["caseId"] == case["id"]]
+        return self.case_list_response(request, case, "hearings", hearings, "date")
+
+    def case_list_response(
+        self, request: Request, case: Dict[str, Any], name: str, rows: List[Dict[str, Any]],
+        date_field: str, key: str = "error",
+    ) -> Response:
+        """
+        A list under a case, latest first by (date_field, id): the whole list,
+        or with limit/cursor one page as {name: [...], nextCursor}. Mirrors
+        parseCaseListPage / checkCaseVersion / toPageBy.
+        """
+        limit_arg, cursor_token = request.arg("limit"), request.arg("cursor")
+        limit = parse_limit(limit_arg)
+        if limit is None:
+            raise HttpError(400, {key: "limit must be a positive integer"})
+        cursor = decode_cursor(cursor_token) if cursor_token else None
+        if cursor_token and cursor is None:
+            raise HttpError(400, {key: "Invalid cursor"})
+
+        version = self.store.case_versions[case["id"]]
+        headers = case_version_headers(version)
+        if case_not_modified(request, version):
+            return Response(304, headers=headers)
+
+        rows = sorted(rows, key=lambda row: (row[date_field], row["id"]), reverse=True)
+        if cursor:
+            rows = [row for row in rows if (row[date_field], row["id"]) < cursor]
+        if limit_arg is None and cursor_token is None:
+            return Response(200, rows, headers=headers)
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1][date_field], page[-1]["id"]) if len(rows) > limit else None
+        return Response(200, {name: page, "nextCursor": next_cursor}, headers=headers)
+
+    def create_hearing(self, request: Request) -> Response:
+        case = self.case_for(request, "add hearings to")
+        data = request.json() or {}
+        if not data.get("date"):
+            raise HttpError(400, {"error": "Hearing date is required"})
+        stamp = now_iso()
+        hearing = {
+            "id": new_id(),
+            "date": data["date"],
+            "notes": data.get("notes"),
+            "nextDate": data.get("nextDate"),
+            "nextPurpose": data.get("nextPurpose"),
+            "createdAt": stamp,
+            "updatedAt": stamp,
+            "caseId": case["id"],
+        }
+        self.store.hearings[hearing["id"]] = hearing
+        self.store.record_change("hearing", hearing["id"], case["id"], "upsert", case["userId"])
+        self.store.touch_case_version(case["id"])
+        return Response(201, hearing)
+
+    @staticmethod
+    def calendar_window(from_arg: Optional[str], to_arg: Optional[str]) -> Tuple[datetime, datetime]:
+        """Mirrors parseCalendarWindow in src/lib/hearing-calendar.ts"""
+        today = datetime.now(FIRM_TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+        start = parse_iso(from_arg) if from_arg else today
+        if start is None:
+            raise HttpError(400, {"error": "from must be a valid date"})
+        start = as_utc(start)
+        end = parse_iso(to_arg) if to_arg else start + timedelta(days=DEFAULT_CALENDAR_DAYS)
+        if end is None:
+            raise HttpError(400, {"error": "to must be a valid date"})
+        end = as_utc(end)
+        if end <= start:
+            raise HttpError(400, {"error": "to must be after from"})
+        if end - start > timedelta(days=MAX_CALENDAR_DAYS):
+            raise HttpError(400, {"error": f"The window can span at most {MAX_CALENDAR_DAYS} days"})
+        return start, end
+
+    def hearing_calendar(self, request: Request) -> Response:
+        user = self.require_user(request)
+        is_admin = user["role"] == "ADMIN"
+        start, end = self.calendar_window(request.arg("from"), request.arg("to"))
+
+        on = request.arg("on") or "nextDate"
+        if on not in CALENDAR_FIELDS:
+            raise HttpError(400, {"error": "on must be nextDate or date"})
+        is_completed = request.arg("isCompleted")
+        if is_completed not in (None, "true", "false"):
+            raise HttpError(400, {"error": "isCompleted must be true or false"})
+        fmt = request.arg("format") or "json"
+        if fmt not in ("json", "ics"):
+            raise HttpError(400, {"error": "format must be json or ics"})
+        include_personal = request.arg("includePERSONAL") == "true"
+        owner_id = request.arg("userId")
+
+        def visible(case: Dict[str, Any]) -> bool:
+            if not is_admin:
+                if case["userId"] != user["id"]:
+                    return False
+            else:
+                if not include_personal and case["caseType"] == "PERSONAL":
+                    return False
+                if owner_id and case["userId"] != owner_id:
+                    return False
+            return is_completed is None or case["isCompleted"] == (is_completed == "true")
+
+        rows = []
+        for hearing in self.store.hearings.values():
+            day = parse_iso(hearing.get(on))
+            if day is None or not start <= as_utc(day) < end:
+                continue
+            case = self.store.cases.get(hearing["caseId"])
+            if case is None or not visible(case):
+                continue
+            owner = self.store.users.get(case["userId"])
+            rows.append((as_utc(day), {
+                **{k: hearing[k] for k in ("id", "date", "notes", "nextDate", "nextPurpose", "caseId")},
+                "case": {
+                    **{k: case[k] for k in (
+                        "id", "title", "caseType", "registrationNum", "registrationYear",
+                        "courtName", "isCompleted", "userId",
+                    )},
+                    "user": {"id": owner["id"], "name": owner["name"]} if owner else None,
+                },
+            }))
+        rows.sort(key=lambda row: (row[0], row[1]["id"]))
+        hearings = [entry for _, entry in rows[:MAX_CALENDAR_ENTRIES]]
+
+        if fmt == "ics":
+            return Response(200, self.render_ical(hearings, on), headers={
+                "Content-Type": "text/calendar; charset=utf-8",
+                "Content-Disposition": 'attachment; filename="hearings.ics"',
+                "Cache-Control": "private, no-store",
+                "X-Calendar-Truncated": "true" if len(rows) > MAX_CALENDAR_ENTRIES else "false",
+            })
+        return Response(200, {
+            "hearings": hearings,
+            "from": start.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "to": end.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "on": on,
+            "truncated": len(rows) > MAX_CALENDAR_ENTRIES,
+        })
+
+    @staticmethod
+    def render_ical(hearings: List[Dict[str, Any]], on: str) -> str:
+        """iCalendar feed of all-day events, as toICalendar renders it"""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        lines = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//Advocate Diary//Hearings//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            "X-WR-CALNAME:Hearings",
+        ]
+        for entry in hearings:
+            day = as_utc(parse_iso(entry[on])).astimezone(FIRM_TIMEZONE).date()
+            case = entry["case"]
+            purpose = entry["nextPurpose"] if on == "nextDate" else entry["notes"]
+            summary = f"{case['title']} ({case['caseType']} {case['registrationNum']}/{case['registrationYear']})"
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{entry['id']}-{on}@advocate-diary",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+                f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+                f"SUMMARY:{ical_text(summary)}",
+                f"LOCATION:{ical_text(case['courtName'])}",
+            ]
+            if purpose:
+                lines.append(f"DESCRIPTION:{ical_text(purpose)}")
+            lines.append("END:VEVENT")
+        lines.append("END:VCALENDAR")
+        return "\r\n".join(ical_fold(line) for line in lines) + "\r\n"
+
+    # Exports
+
+    @staticmethod
+    def export_format(value: Optional[str]) -> str:
+        fmt = "pdf" if value is None else value
+        if fmt not in EXPORT_FORMATS:
+            raise HttpError(400, {"error": "format must be pdf or csv"})
+        return fmt
+
+    @classmethod
+    def export_filters(cls, param: Callable[[str], Optional[str]], user: Dict[str, Any]) -> Dict[str, Any]:
+        """Mirrors parseExportFilters in src/lib/case-export.ts"""
+        kind = param("kind")
+        kind = "docket" if kind is None else kind
+        if kind not in EXPORT_KINDS:
+            raise HttpError(400, {"error": f"kind must be one of {', '.join(EXPORT_KINDS)}"})
+        is_completed = param("isCompleted")
+        if is_completed not in (None, "true", "false"):
+            raise HttpError(400, {"error": "isCompleted must be true or false"})
+        is_admin = user["role"] == "ADMIN"
+        filters = {
+            "kind": kind,
+            "userId": user["id"],
+            "isAdmin": is_admin,
+            "ownerId": param("userId") if is_admin else None,
+            "caseType": param("caseType"),
+            "isCompleted": None if is_completed is None else is_completed == "true",
+            "includePERSONAL": param("includePERSONAL") == "true",
+        }
+        if kind == "causelist":
+            filters["window"] = cls.calendar_window(param("from"), param("to"))
+        return filters
+
+    @staticmethod
+    def export_visible(filters: Dict[str, Any], case: Dict[str, Any]) -> bool:
+        if not filters["isAdmin"]:
+            if case["userId"] != filters["userId"]:
+                return False
+        else:
+            if not filters["includePERSONAL"] and filters["caseType"] != "PERSONAL" and case["caseType"] == "PERSONAL":
+                return False
+            if filters["ownerId"] and case["userId"] != filters["ownerId"]:
+                return False
+        if filters["caseType"] and case["caseType"] != filters["caseType"]:
+            return False
+        return filters["isCompleted"] is None or case["isCompleted"] == filters["isCompleted"]
+
+    def export_rows(self, filters: Dict[str, Any]) -> List[Tuple[list, list]]:
+        """(CSV cells, PDF cells) of each row of a docket or cause list, in order"""
+        def owner_name(case: Dict[str, Any]) -> Optional[str]:
+            owner = self.store.users.get(case["userId"])
+            return owner["name"] if owner else None
+
+        if filters["kind"] == "causelist":
+            start, end = filters["window"]
+            entries = []
+            for hearing in self.store.hearings.values():
+                day = parse_iso(hearing.get("nextDate"))
+                case = self.store.cases.get(hearing["caseId"])
+                if day is None or case is None or not start <= as_utc(day) < end:
+                    continue
+                if self.export_visible(filters, case):
+                    entries.append((as_utc(day), hearing["id"], hearing, case))
+            entries.sort(key=lambda entry: entry[:2])
+            rows = []
+            for _, _, hearing, case in entries:
+                cells = [
+                    format_date(hearing["nextDate"]), case["courtName"] or "", case_number(case), case["title"],
+                    hearing.get("nextPurpose") or "", owner_name(case) or "",
+                ]
+                rows.append((cells, cells))
+            return rows
+
+        cases = [c for c in self.store.cases.values() if self.export_visible(filters, c)]
+        cases.sort(key=lambda c: (c["caseType"], c["registrationYear"], c["registrationNum"]))
+        rows = []
+        for case in cases:
+            hearings = self.store.case_hearings(case["id"])
+            hearing = hearings[0] if hearings else {}
+            status = "Completed" if case["isCompleted"] else "Pending"
+            rows.append((
+                [
+                    case_number(case), case["title"], case["courtName"], owner_name(case),
+                    party_list(case["petitioners"]), party_list(case["respondents"]), status,
+                    format_date(hearing.get("date")), format_date(hearing.get("nextDate")), hearing.get("nextPurpose"),
+                ],
+                [
+                    case_number(case), case["title"], case["courtName"] or "",
+                    format_date(hearing.get("nextDate")), hearing.get("nextPurpose") or "", status,
+                ],
+            ))
+        return rows
+
+    @staticmethod
+    def render_list(
+        filters: Dict[str, Any],
+        fmt: str,
+        rows: List[Tuple[list, list]],
+        on_row: Optional[Callable[[int], None]] = None,
+    ) -> Iterator[bytes]:
+        """Renders rows as renderList in src/lib/case-export.ts does, chunk by chunk"""
+        is_cause_list = filters["kind"] == "causelist"
+        if fmt == "csv":
+            headings = CAUSE_LIST_HEADINGS if is_cause_list else DOCKET_HEADINGS
+            yield ("\ufeff" + csv_line(headings)).encode("utf-8")
+            for count, (cells, _) in enumerate(rows, 1):
+                yield csv_line(cells).encode("utf-8")
+                if on_row:
+                    on_row(count)
+            return
+
+        if is_cause_list:
+            start, end = filters["window"]
+            title = f"Cause List: {format_date(start)} to {format_date(end - timedelta(milliseconds=1))}"
+        else:
+            title = "Docket"
+        headings = CAUSE_LIST_HEADINGS if is_cause_list else DOCKET_PDF_HEADINGS
+
+        lines = [
+            LETTERHEAD[0], title, f"Generated on {format_date(datetime.now(timezone.utc))}", table_row(headings),
+        ]
+        for count, (_, cells) in enumerate(rows, 1):
+            lines.append(table_row(cells))
+            if on_row:
+                on_row(count)
+        if not rows:
+            lines.append("Nothing to list.")
+        yield minimal_pdf(title, lines)
+
+    def export_cases(self, request: Request) -> Response:
+        """GET /api/cases/export: a docket or cause list, streamed while rendered"""
+        user = self.require_user(request)
+        fmt = self.export_format(request.arg("format"))
+        filters = self.export_filters(request.arg, user)
+        rows = self.export_rows(filters)
+        if len(rows) > MAX_SYNC_EXPORT_ROWS:
+            raise HttpError(400, {
+                "error": (
+                    f"This export has {len(rows)} rows; lists over {MAX_SYNC_EXPORT_ROWS} rows "
+                    "must be exported with POST /api/exports"
+                ),
+                "rows": len(rows),
+            })
+        return Response(200, self.render_list(filters, fmt, rows), headers={
+            "Content-Type": EXPORT_CONTENT_TYPES[fmt],
+            "Content-Disposition": f'attachment; filename="{filters["kind"]}.{fmt}"',
+            "Cache-Control": "private, no-store",
+            "X-Export-Rows": str(len(rows)),
+        })
+
+    def case_file_version(self, case: Dict[str, Any]) -> str:
+        """Mirrors caseFileVersion: the case's version, as milliseconds"""
+        return str(int(parse_iso(self.store.case_versions[case["id"]]).timestamp() * 1000))
+
+    def render_case_file(self, case: Dict[str, Any], fmt: str) -> bytes:
+        """Mirrors renderCaseFile in src/lib/case-export.ts"""
+        hearings = self.store.case_hearings(case["id"])
+        status = "Completed" if case["isCompleted"] else "Pending"
+        if fmt == "csv":
+            lines = ["\ufeff" + csv_line(["Case No", "Title", "Court", "Status", "Hearing Date", "Notes", "Next Date", "Purpose"])]
+            for h in hearings:
+                lines.append(csv_line([
+                    case_number(case), case["title"], case["courtName"], status,
+                    format_date(h["date"]), h.get("notes"), format_date(h.get("nextDate")), h.get("nextPurpose"),
+                ]))
+            if not hearings:
+                lines.append(csv_line([case_number(case), case["title"], case["courtName"], status]))
+            return "".join(lines).encode("utf-8")
+
+        owner = self.store.users.get(case["userId"])
+        notes = sorted(
+            (n for n in self.store.notes.values() if n["caseId"] == case["id"]),
+            key=lambda n: n["createdAt"],
+            reverse=True,
+        )
+        uploads = sorted(
+            (u for u in self.store.uploads.values() if u["caseId"] == case["id"]),
+            key=lambda u: u["createdAt"],
+            reverse=True,
+        )
+
+        lines = [
+            *LETTERHEAD,
+            f"{case['caseType']} Case Details",
+            f"{case['registrationNum']}/{case['registrationYear']}",
+            f"Title: {case['title']}",
+            f"Court: {case['courtName'] or 'N/A'}",
+            f"Filed By: {owner['name'] if owner else 'Not assigned'}",
+            f"Status: {status}",
+        ]
+        for heading, parties in (("Petitioners", case["petitioners"]), ("Respondents", case["respondents"])):
+            lines.append(heading.upper())
+            for i, party in enumerate(parties, 1):
+                advocate = f" (Advocate: {party['advocate']})" if party.get("advocate") else ""
+                lines.append(f"{i}. {party['name']}{advocate}")
+
+        lines.append("HEARING HISTORY")
+        if hearings:
+            lines.append(table_row(["Date", "Notes", "Next Date", "Purpose"]))
+            for h in hearings:
+                lines.append(table_row([
+                    format_date(h["date"]), h.get("notes") or "-",
+                    format_date(h.get("nextDate")) or "-", h.get("nextPurpose") or "-",
+                ]))
+        else:
+            lines.append("No hearings recorded for this case.")
+
+        if notes:
+            lines.append("CASE NOTES")
+            for note in notes:
+                author = self.store.users.get(note.get("userId"))
+                lines.append(f"By: {author['name'] if author else 'Unknown'}, {format_date(note['createdAt'])}")
+                lines.append(note["content"])
+
+        if uploads:
+            lines.append("ATTACHED DOCUMENTS")
+            for upload in uploads:
+                lines.append(f"{upload['fileName']} (added {format_date(upload['createdAt'])})")
+
+        lines.append(f"Generated on {format_date(datetime.now(timezone.utc))}")
+        return minimal_pdf(f"Case: {case['title']}", lines)
+
+    def export_case(self, request: Request) -> Response:
+        """GET /api/cases/[caseId]/export: one case file, cached per case version"""
+        self.require_user(request)
+        fmt = self.export_format(request.arg("format"))
+        case = self.case_for(request, "view")
+        version = self.case_file_version(case)
+        etag = f'"{fmt}-{version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(304, headers={"ETag": etag})
+
+        body = self.case_file_cache.get(case["id"], fmt, version)
+        cache = "hit" if body is not None else "miss"
+        if body is None:
+            body = self.render_case_file(case, fmt)
+            self.case_file_cache.set(case["id"], fmt, version, body)
+        return Response(200, body, headers={
+            "Content-Type": EXPORT_CONTENT_TYPES[fmt],
+            "Content-Disposition": f'attachment; filename="case-{case["id"]}.{fmt}"',
+            "Cache-Control": "private, no-cache",
+            "ETag": etag,
+            "X-Export-Cache": cache,
+        })
+
+    def start_export(self, request: Request) -> Response:
+        """POST /api/exports: queue a background export; it runs on a thread"""
+        user = self.require_user(request)
+        body = request.json()
+        if not isinstance(body, dict):
+            raise HttpError(400, {"error": "Body must be a JSON object"})
+
+        def param(name: str) -> Optional[str]:
+            value = body.get(name)
+            if value is None:
+                return None
+            return str(value).lower() if isinstance(value, bool) else str(value)
+
+        fmt = self.export_format(param("format"))
+        filters = self.export_filters(param, user)
+        stamp = now_iso()
+        job = {
+            "id": new_id(),
+            "userId": user["id"],
+            "kind": filters["kind"],
+            "format": fmt,
+            "filters": filters,
+            "status": "queued",
+            "rows": 0,
+            "path": None,
+            "error": None,
+            "createdAt": stamp,
+            "updatedAt": stamp,
+            "completedAt": None,
+        }
+        self.store.export_jobs[job["id"]] = job
+        threading.Thread(target=self.run_export_job, args=(job["id"],), daemon=True).start()
+        return Response(202, {"job": self.describe_export_job(job)})
+
+    def run_export_job(self, job_id: str) -> None:
+        """Mirrors runExportJob in src/lib/export-jobs.ts"""
+        lock = self.store.lock
+        with lock:
+            job = self.store.export_jobs.get(job_id)
+            if job is None or job["status"] != "queued":
+                return
+            job.update(status="running", updatedAt=now_iso())
+            rows = self.export_rows(job["filters"])
+
+        def progress(count: int) -> None:
+            if count % EXPORT_PROGRESS_EVERY_ROWS == 0:
+                with lock:
+                    job.update(rows=count, updatedAt=now_iso())
+
+        try:
+            data = b"".join(self.render_list(job["filters"], job["format"], rows, progress))
+            path = f"{job['userId']}/{job['id']}.{job['format']}"
+            with lock:
+                self.store.objects[f"{EXPORTS_BUCKET}/{path}"] = data
+                stamp = now_iso()
+                job.update(status="completed", rows=len(rows), path=path, completedAt=stamp, updatedAt=stamp)
+        except Exception as error:
+            with lock:
+                stamp = now_iso()
+                job.update(status="failed", error=str(error), completedAt=stamp, updatedAt=stamp)
+
+    def describe_export_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Mirrors describeExportJob, signing a download URL once the job has completed"""
+        if job["status"] in ("queued", "running"):
+            idle = datetime.now(timezone.utc) - parse_iso(job["updatedAt"])
+            if idle > timedelta(seconds=EXPORT_STALE_JOB_SECONDS):
+                stamp = now_iso()
+                job.update(
+                    status="failed",
+                    error="The export was interrupted; please start it again",
+                    completedAt=stamp,
+                    updatedAt=stamp,
+                )
+
+        download_url = None
+        if job["status"] == "completed" and job["path"]:
+            token = secrets.token_urlsafe(16)
+            self.store.signed_urls[token] = (job["path"], time.time() + EXPORT_DOWNLOAD_TTL_SECONDS)
+            download_url = f"{self.base_url}/storage/v1/object/sign/{EXPORTS_BUCKET}/{job['path']}?token={token}"
+        return {
+            **{k: job[k] for k in ("id", "kind", "format", "status", "rows", "error", "createdAt", "completedAt")},
+            "downloadUrl": download_url,
+        }
+
+    def get_export_job(self, request: Request) -> Response:
+        user = self.require_user(request)
+        job = self.store.export_jobs.get(request.params["jobId"])
+        if job is None or job["userId"] != user["id"]:
+            raise HttpError(404, {"error": "Export not found"})
+        return Response(200, {"job": self.describe_export_job(job)})
+
+    def signed_download(self, request: Request) -> Response:
+        """Supabase storage's signed object URLs, for export downloads"""
+        path = f"{request.params['userId']}/{request.params['fileName']}"
+        signed = self.store.signed_urls.get(request.arg("token") or "")
+        if signed is None or signed[0] != path or signed[1] < time.time():
+            raise HttpError(400, {"error": "Invalid signature"})
+        data = self.store.objects.get(f"{EXPORTS_BUCKET}/{path}")
+        if data is None:
+            raise HttpError(404, {"error": "Object not found"})
+        fmt = path.rsplit(".", 1)[-1]
+        return Response(200, data, headers={
+            "Content-Type": EXPORT_CONTENT_TYPES.get(fmt, "application/octet-stream"),
+            "Content-Disposition": f'attachment; filename="{request.params["fileName"]}"',
+        })
+
+    # Legal assistant
+
+    def chat(self, request: Request) -> Response:
+        """
+        POST /api/chat with the offline model (CHAT_MODEL=fake): the answer
+        quotes the question and the size of the prompt the model was given
+        """
+        body = request.json()
+        messages = self.parse_chat_messages(body.get("messages") if isinstance(body, dict) else None)
+        stream = isinstance(body, dict) and bool(body.get("stream"))
+        related = []
+        if request.user is not None:
+            question = weighted_terms([(messages[-1]["content"], 1.0)])
+            related = self.similar_cases(question, request.user, CHAT_CONTEXT_CASES)
+        case_ids = [case["id"] for case in related]
+
+        key = chat_cache_key(messages, case_ids)
+        text = self.chat_cache.get(key) if key else None
+        headers = {"X-Chat-Cache": "miss" if text is None else "hit", "X-Chat-Cases": ",".join(case_ids)}
+        if text is None:
+            prompt = chat_prompt(messages, self.describe_cases(related) if related else None)
+            text = f"This is a test answer to: {messages[-1]['content']} ({len(prompt)} messages in context)"
+            if key:
+                self.chat_cache.set(key, text)
+
+        if not stream:
+            return Response(200, {"text": text}, headers=headers)
+        headers["Content-Type"] = "text/plain; charset=utf-8"
+        if headers["X-Chat-Cache"] == "hit":
+            return Response(200, text, headers=headers)
+        # A fresh answer arrives word by word, as streamText delivers it
+        return Response(200, iter(re.findall(r"\S+\s*", text)), headers=headers)
+
+    @staticmethod
+    def parse_chat_messages(messages: Any) -> List[Dict[str, str]]:
+        if not isinstance(messages, list) or not messages:
+            raise HttpError(400, {"error": "messages must be a non-empty array"})
+        parsed = []
+        for message in messages:
+            if not isinstance(message, dict) or not isinstance(message.get("content"), str):
+                raise HttpError(400, {"error": "Every message needs string content"})
+            if len(message["content"]) > CHAT_MAX_MESSAGE_CHARS:
+                raise HttpError(400, {"error": f"Messages are limited to {CHAT_MAX_MESSAGE_CHARS} characters"})
+            parsed.append({
+                "role": "user" if message.get("role") == "user" else "assistant",
+                "content": message["content"],
+            })
+        if parsed[-1]["role"] != "user":
+            raise HttpError(400, {"error": "The last message must be from the user"})
+        return parsed
+
+    def list_notes(self, request: Request) -> Response:
+        case = self.case_for(request, "view", key="message")
+        notes = [n for n in self.store.notes.values() if n["caseId"] == case["id"]]
+        return self.case_list_response(request, case, "notes", notes, "createdAt", key="message")
+
+    def list_uploads(self, request: Request) -> Response:
+        case = self.upload_case(request)
+        uploads = [u for u in self.store.uploads.values() if u["caseId"] == case["id"]]
+        return self.case_list_response(request, case, "uploads", uploads, "createdAt", key="message")
+
+    def create_note(self, request: Request) -> Response:
+        case = self.case_for(request, "add notes to", key="message")
+        content = (request.json() or {}).get("content")
+        if not isinstance(content, str) or not content.strip():
+            raise HttpError(400, {"message": "Note content is required"})
+        stamp = now_iso()
+        note = {
+            "id": new_id(),
+            "content": content,
+            "createdAt": stamp,
+            "updatedAt": stamp,
+            "caseId": case["id"],
+            "userId": request.user["id"],
+        }
+        self.store.notes[note["id"]] = note
+        self.store.record_change("note", note["id"], case["id"], "upsert", case["userId"])
+        self.store.touch_case_version(case["id"])
+        return Response(200, note)
+
+    def delete_note(self, request: Request) -> Response:
+        user = self.require_user(request)
+        note = self.store.notes.get(request.params["noteId"])
+        if note is None:
+            raise HttpError(404, {"error": "Note not found"})
+        case = self.store.cases.get(note["caseId"])
+        allowed = (
+            user["role"] == "ADMIN"
+            or note["userId"] == user["id"]
+            or (case is not None and case["userId"] == user["id"])
+        )
+        if not allowed:
+            raise HttpError(403, {"error": "You don't have permission to delete this note"})
+        del self.store.notes[note["id"]]
+        if case is not None:
+            self.store.record_change("note", note["id"], case["id"], "delete", case["userId"])
+            self.store.touch_case_version(case["id"])
+        return Response(200, {"success": True})
+
+    # ------------------------------------------------------------------
+    # /api/changes
+    # ------------------------------------------------------------------
+
+    def user_summary(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        owner = self.store.users.get(user_id)
+        return {"id": owner["id"], "name": owner["name"], "email": owner["email"]} if owner else None
+
+    def list_changes(self, request: Request) -> Response:
+        """Mirrors readChanges: the rows that changed after the cursor and tombstones"""
+        user = self.require_user(request)
+        is_admin = user["role"] == "ADMIN"
+        limit_arg = request.arg("limit")
+        try:
+            limit = DEFAULT_CHANGE_LIMIT if not limit_arg else int(limit_arg)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise HttpError(400, {"error": "limit must be a positive integer"})
+        limit = min(limit, MAX_CHANGE_LIMIT)
+
+        # Every write commits at once here, so everything recorded is readable
+        horizon = len(self.store.changes) + 1
+        token = request.arg("cursor")
+        if not token:
+            return Response(200, {"nextCursor": encode_change_cursor(horizon, 0)})
+        cursor = decode_change_cursor(token)
+        if cursor is None:
+            raise HttpError(400, {"error": "Invalid cursor"})
+        if time.time() * 1000 - cursor[2] > CHANGE_RETENTION_DAYS * 24 * 60 * 60 * 1000:
+            raise HttpError(410, {"error": "Cursor expired; reload the cases and start over"})
+
+        changes = [
+            change
+            for change in self.store.changes
+            if (change["xid"], change["seq"]) > cursor[:2]
+            and (is_admin or user["id"] in (change["userId"], change["previousUserId"]))
+        ]
+        has_more = len(changes) > limit
+        read = changes[:limit]
+        position = (read[-1]["xid"], read[-1]["seq"]) if has_more else max(cursor[:2], (horizon, 0))
+
+        latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for change in read:
+            latest.pop((change["entity"], change["entityId"]), None)
+            latest[(change["entity"], change["entityId"])] = change
+        arrived = {
+            change["entityId"]
+            for change in read
+            if not is_admin and change["entity"] == "case" and change["userId"] == user["id"] and change["previousUserId"]
+        }
+
+        deleted: List[Dict[str, Any]] = []
+        ids: Dict[str, List[str]] = {"case": [], "hearing": [], "note": [], "upload": []}
+        moved_in = set()
+        for change in latest.values():
+            tombstone = {"type": change["entity"], "id": change["entityId"], "caseId": change["caseId"]}
+            if change["op"] == "delete":
+                deleted.append({**tombstone, "reason": "deleted"})
+            elif not is_admin and change["entity"] == "case" and change["userId"] != user["id"]:
+                deleted.append({**tombstone, "reason": "reassigned"})
+            else:
+                ids[change["entity"]].append(change["entityId"])
+                if change["entity"] == "case" and change["entityId"] in arrived:
+                    moved_in.add(change["entityId"])
+
+        def visible(case_id: Optional[str]) -> bool:
+            case = self.store.cases.get(case_id)
+            return case is not None and (is_admin or case["userId"] == user["id"])
+
+        # A hearing change sends its case again, for the latest hearing its list row shows
+        case_ids = list(dict.fromkeys(
+            ids["case"] + [change["caseId"] for change in latest.values() if change["entity"] == "hearing"]
+        ))
+        cases = [
+            {
+                **self.store.cases[case_id],
+                "hearings": self.store.case_hearings(case_id)[:1],
+                "user": self.user_summary(self.store.cases[case_id]["userId"]),
+            }
+            for case_id in case_ids
+            if visible(case_id)
+        ]
+
+        def children(table: Dict[str, Dict[str, Any]], wanted: List[str]) -> List[Dict[str, Any]]:
+            wanted_ids = set(wanted)
+            return [
+                row
+                for row in table.values()
+                if (row["id"] in wanted_ids or row["caseId"] in moved_in) and visible(row["caseId"])
+            ]
+
+        notes = [{**note, "user": self.user_summary(note["userId"])} for note in children(self.store.notes, ids["note"])]
+        return Response(200, {
+            "cases": cases,
+            "hearings": children(self.store.hearings, ids["hearing"]),
+            "notes": notes,
+            "uploads": children(self.store.uploads, ids["upload"]),
+            "deleted": deleted,
+            "nextCursor": encode_change_cursor(*position),
+            "hasMore": has_more,
+        }, headers={"Cache-Control": "private, no-store"})
+
+    # ------------------------------------------------------------------
+    # /api/admin/users
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def public_user(user: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in user.items() if k != "password"}
+
+    def list_users(self, request: Request) -> Response:
+        self.require_admin(request)
+        users = sorted(self.store.users.values(), key=lambda u: u["name"])
+        return Response(200, [
+            {"id": u["id"], "name": u["name"], "email": u["email"], "role": u["role"]}
+            for u in users
+        ])
+
+    def create_user(self, request: Request) -> Response:
+        self.require_admin(request)
+        data = request.json() or {}
+        name, email, password, role = (data.get(k) for k in ("name", "email", "password", "role"))
+
+        if not name or not email or not password:
+            raise HttpError(400, {"error": "Name, email, and password are required"})
+        if len(password) < 8:
+            raise HttpError(400, {"error": "Password must be at least 8 characters"})
+        if role not in ("USER", "ADMIN"):
+            raise HttpError(400, {"error": "Invalid role. Must be USER or ADMIN"})
+        if self.store.user_by_email(email) is not None:
+            raise HttpError(400, {"error": "A user with this email already exists"})
+
+        user = self.store.add_user(name, email, password, role)
+        return Response(201, {"user": self.public_user(user)})
+
+    def get_user(self, request: Request) -> Response:
+        self.require_admin(request)
+        user = self.store.users.get(request.params["userId"])
+        if user is None:
+            raise HttpError(404, {"error": "User not found"})
+        data = self.public_user(user)
+        data["personalInfo"] = None
+        data["uploads"] = []
+        return Response(200, {"user": data})
+
+    def delete_user(self, request: Request) -> Response:
+        admin = self.require_admin(request)
+        user_id = request.params["userId"]
+        if user_id == admin["id"]:
+            raise HttpError(400, {"error": "You cannot delete your own account"})
+        user = self.store.users.get(user_id)
+        if user is None:
+            raise HttpError(404, {"error": "User not found"})
+
+        admins = [u for u in self.store.users.values() if u["role"] == "ADMIN"]
+        if user["role"] == "ADMIN" and len(admins) <= 1:
+            raise HttpError(400, {"error": "Cannot delete the last admin user"})
+
+        heir = next((u for u in admins if u["id"] != user_id), None)
+        for case in list(self.store.cases.values()):
+            if case["userId"] != user_id:
+                continue
+            if heir is not None:
+                case["userId"] = heir["id"]
+                self.store.record_change("case", case["id"], case["id"], "upsert", heir["id"], user_id)
+            else:
+                del self.store.cases[case["id"]]
+                del self.store.case_versions[case["id"]]
+                self.store.record_change("case", case["id"], case["id"], "delete", user_id)
+        del self.store.users[user_id]
+
+        return Response(200, {
+            "success": True,
+            "message": "User deleted successfully and all cases reassigned to an admin"
+            if heir else "User deleted successfully and all associated cases removed",
+        })
+
+    @staticmethod
+    def require_admin_message(request: Request) -> Dict[str, Any]:
+        """Admin check of the routes that answer with { message } bodies"""
+        user = request.user
+        if user is None:
+            raise HttpError(401, {"message": "Unauthorized"})
+        if user["role"] != "ADMIN":
+            raise HttpError(403, {"message": "Forbidden: Requires admin privileges"})
+        return user
+
+    def compute_admin_stats(self) -> Dict[str, Any]:
+        """The AdminStats shape of src/lib/admin-stats.ts, computed without a cache"""
+        now = datetime.now(timezone.utc)
+        start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        window_end = start_of_today + timedelta(days=ADMIN_HEARING_WINDOW_DAYS)
+
+        firm_cases = {
+            case_id: case for case_id, case in self.store.cases.items()
+            if case["caseType"] != "PERSONAL"
+        }
+        counts: Dict[str, Dict[str, int]] = {}
+        by_court: Dict[str, int] = {}
+        by_type: Dict[str, int] = {}
+        for case in firm_cases.values():
+            entry = counts.setdefault(case["userId"], {"active": 0, "completed": 0})
+            entry["completed" if case["isCompleted"] else "active"] += 1
+            by_court[case["courtName"]] = by_court.get(case["courtName"], 0) + 1
+            by_type[case["caseType"]] = by_type.get(case["caseType"], 0) + 1
+
+        # "Closed Cases" counts completed PERSONAL cases too
+        closed = sum(1 for case in self.store.cases.values() if case["isCompleted"])
+
+        hearings_due = 0
+        for hearing in self.store.hearings.values():
+            case = firm_cases.get(hearing["caseId"])
+            next_date = parse_iso(hearing.get("nextDate"))
+            if case is None or case["isCompleted"] or next_date is None:
+                continue
+            if next_date.tzinfo is None:
+                next_date = next_date.replace(tzinfo=timezone.utc)
+            if start_of_today <= next_date < window_end:
+                hearings_due += 1
+
+        active = sum(c["active"] for c in counts.values())
+        completed = sum(c["completed"] for c in counts.values())
+        users = sorted(self.store.users.values(), key=lambda u: u["name"])
+        cases_by_user = []
+        for u in users:
+            entry = counts.get(u["id"], {"active": 0, "completed": 0})
+            cases_by_user.append({
+                "id": u["id"],
+                "name": u["name"],
+                "email": u["email"],
+                "role": u["role"],
+                "caseCount": entry["active"] + entry["completed"],
+                "activeCount": entry["active"],
+                "completedCount": entry["completed"],
+            })
+
+        return {
+            "generatedAt": now_iso(),
+            "totals": {
+                "users": len(users),
+                "cases": active + completed,
+                "activeCases": active,
+                "completedCases": completed,
+                "closedCases": closed,
+                "hearingsDueThisWeek": hearings_due,
+            },
+            "casesByUser": cases_by_user,
+            "casesByCourt": sorted(
+                ({"courtName": name, "count": n} for name, n in by_court.items()),
+                key=lambda row: -row["count"],
+            ),
+            "casesByType": sorted(
+                ({"caseType": name, "count": n} for name, n in by_type.items()),
+                key=lambda row: -row["count"],
+            ),
+        }
+
+    def users_with_info(self, request: Request) -> Response:
+        self.require_admin(request)
+        limit = parse_limit(request.arg("limit"))
+        if limit is None:
+            raise HttpError(400, {"error": "limit must be a positive integer"})
+        cursor_token = request.arg("cursor")
+        after = decode_name_cursor(cursor_token) if cursor_token else None
+        if cursor_token and after is None:
+            raise HttpError(400, {"error": "Invalid cursor"})
+        uploads_arg = request.arg("uploads")
+        if uploads_arg is not None and not uploads_arg.isdigit():
+            raise HttpError(400, {"error": "uploads must be a non-negative integer"})
+        per_user = min(int(uploads_arg) if uploads_arg is not None else DEFAULT_UPLOADS_PER_USER, MAX_UPLOADS_PER_USER)
+        counts_only = request.arg("counts") == "true"
+
+        users = sorted(self.store.users.values(), key=lambda u: (u["name"], u["id"]))
+        if after:
+            users = [u for u in users if (u["name"], u["id"]) > after]
+        page = users[:limit]
+
+        items = []
+        for user in page:
+            # Newest first; uploads in the same millisecond keep insertion order reversed
+            uploads = sorted(
+                (u for u in self.store.uploads.values() if u["userId"] == user["id"]),
+                key=lambda u: u["createdAt"],
+            )[::-1]
+            personal = 0
+            rows = []
+            for upload in uploads:
+                case = self.store.cases.get(upload["caseId"]) if upload["caseId"] else None
+                if upload["caseId"] is None or (case and case["caseType"] == "PERSONAL"):
+                    personal += 1
+                rows.append({
+                    **upload,
+                    "case": {"id": case["id"], "caseType": case["caseType"], "title": case["title"]} if case else None,
+                })
+            items.append({
+                **{k: user[k] for k in ("id", "name", "email", "role")},
+                "personalInfo": None,
+                "uploadCount": len(uploads),
+                "personalFileCount": personal,
+                "uploads": [] if counts_only else rows[:per_user],
+            })
+
+        next_cursor = encode_name_cursor(page[-1]["name"], page[-1]["id"]) if len(users) > limit else None
+        return Response(200, {"users": items, "nextCursor": next_cursor})
+
+    def admin_stats(self, request: Request) -> Response:
+        self.require_admin_message(request)
+        return Response(200, self.compute_admin_stats())
+
+    def users_with_case_counts(self, request: Request) -> Response:
+        self.require_admin_message(request)
+        return Response(200, {"users": [
+            {key: u[key] for key in ("id", "name", "email", "role", "caseCount")}
+            for u in self.compute_admin_stats()["casesByUser"]
+            if u["role"] in ("ADMIN", "USER")
+        ]})
+
+
+    # ------------------------------------------------------------------
+    # /api/admin/cases/reassign
+    # ------------------------------------------------------------------
+
+    def cases_to_move(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Mirrors sourceCondition in src/lib/reassign-jobs.ts"""
+        return [
+            c for c in self.store.cases.values()
+            if c["userId"] == job["sourceUserId"]
+            and not (job["excludePersonal"] and c["caseType"] == "PERSONAL")
+        ]
+
+    def reassign_cases(self, request: Request) -> Response:
+        """POST /api/admin/cases/reassign: queue a bulk reassignment; it runs on a thread"""
+        admin = self.require_admin_message(request)
+        data = request.json() or {}
+        source_id, target_id = data.get("sourceUserId"), data.get("targetUserId")
+
+        if not target_id:
+            raise HttpError(400, {"message": "Target user ID is required"})
+        if source_id == target_id:
+            raise HttpError(400, {"message": "Source and target users must be different"})
+        target = self.store.users.get(target_id)
+        if target is None:
+            raise HttpError(404, {"message": "Target user not found"})
+        source_name = "unassigned"
+        if source_id is not None:
+            source = self.store.users.get(source_id)
+            if source is None:
+                raise HttpError(404, {"message": "Source user not found"})
+            source_name = source["name"]
+
+        stamp = now_iso()
+        job = {
+            "id": new_id(),
+            "userId": admin["id"],
+            "sourceUserId": source_id,
+            "targetUserId": target_id,
+            # Unassigned cases never include PERSONAL ones, and an admin
+            # transferring their own cases keeps their PERSONAL cases
+            "excludePersonal": source_id is None or source_id == admin["id"],
+            "status": "queued",
+            "total": 0,
+            "moved": 0,
+            "error": None,
+            "createdAt": stamp,
+            "updatedAt": stamp,
+            "completedAt": None,
+        }
+        total = len(self.cases_to_move(job))
+        if total == 0:
+            return Response(200, {
+                "message": f"No unassigned cases found to assign to {target['name']}"
+                if source_id is None else f"{source_name} has no cases to reassign",
+                "count": 0,
+            })
+
+        job["total"] = total
+        self.store.reassign_jobs[job["id"]] = job
+        threading.Thread(target=self.run_reassign_job, args=(job["id"],), daemon=True).start()
+        return Response(202, {
+            "message": f"Assigning {total} unassigned case(s) to {target['name']}"
+            if source_id is None else f"Reassigning {total} case(s) from {source_name} to {target['name']}",
+            "job": self.describe_reassign_job(job),
+        })
+
+    def run_reassign_job(self, job_id: str) -> None:
+        """Mirrors runReassignJob: one chunk of cases per turn of the lock"""
+        lock = self.store.lock
+        with lock:
+            job = self.store.reassign_jobs.get(job_id)
+            if job is None or job["status"] != "queued":
+                return
+            job.update(status="running", updatedAt=now_iso())
+
+        while True:
+            with lock:
+                chunk = self.cases_to_move(job)[:REASSIGN_CHUNK_SIZE]
+                stamp = now_iso()
+                if not chunk:
+                    job.update(status="completed", completedAt=stamp, updatedAt=stamp)
+                    return
+                for case in chunk:
+                    previous = case["userId"]
+                    case["userId"] = job["targetUserId"]
+                    self.store.touch_case(case["id"], previous_user_id=previous)
+                job.update(moved=job["moved"] + len(chunk), updatedAt=stamp)
+
+    @staticmethod
+    def describe_reassign_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        keys = (
+            "id", "status", "sourceUserId", "targetUserId", "excludePersonal",
+            "total", "moved", "error", "createdAt", "completedAt",
+        )
+        return {k: job[k] for k in keys}
+
+    def get_reassign_job(self, request: Request) -> Response:
+        self.require_admin_message(request)
+        job = self.store.reassign_jobs.get(request.params["jobId"])
+        if job is None:
+            raise HttpError(404, {"message": "Reassignment not found"})
+        return Response(200, {"job": self.describe_reassign_job(job)})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse sockets
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    app: StandInApp
+
+    def _handle(self) -> None:
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        query = parse_qs(parts.query, keep_blank_values=True)
+        request = Request(self.command, parts.path.rstrip("/") or "/", query, self.headers, body)
+        response = self.app.dispatch(request)
+
+        if response.body is not None and not isinstance(response.body, (str, bytes, dict, list)):
+            self._stream(response)
+            return
+        if isinstance(response.body, bytes):
+            payload = response.body
+        elif isinstance(response.body, str):
+            payload = response.body.encode("utf-8")
+        else:
+            payload = b"" if response.body is None else json.dumps(response.body).encode("utf-8")
+        self.send_response(response.status)
+        if response.body is not None and "Content-Type" not in response.headers:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        for cookie in response.cookies:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, response: Response) -> None:
+        """Sends an iterable of text or byte chunks with chunked transfer encoding"""
+        self.send_response(response.status)
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        for chunk in response.body:
+            data = chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+            if data:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class StandInServer:
+    """Runs a StandInApp on a background thread; port 0 picks a free port"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, app: Optional[StandInApp] = None):
+        self.app = app or StandInApp()
+        handler = type("StandInHandler", (_Handler,), {"app": self.app})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.app.base_url = self.url
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the Advocate Diary API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.host, args.port)
+    print(f"Advocate Diary stand-in listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
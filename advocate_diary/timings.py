@@ -0,0 +1,251 @@
+"""
+Per-route breakdowns of where API request time goes.
+
+The traced route handlers (src/lib/tracing.ts) time the work each request
+does in four phases - auth (session decode, case authorisation), db (every
+Prisma query), storage (Supabase calls) and ai (model calls) - and report
+the totals in a Server-Timing header on every response:
+
+    Server-Timing: auth;dur=2.1;desc="2 steps", db;dur=14.8;desc="3 queries", total;dur=19.6
+
+Requests slower than TRACE_SLOW_MS, and a TRACE_SAMPLE_RATE share of the
+rest, are also logged as one JSON line of type "request-trace".
+
+A TimingCollector gathers either source: hand it to
+AdvocateDiaryClient(timings=...) to collect the header of every call the
+client makes, or feed it server logs (other lines are skipped). Its
+breakdown gives, per route, the latency percentiles and the mean time and
+share of each phase; "other" is what is left of the total (handler code,
+serialisation). Logs mostly hold the slow requests, so their breakdown
+describes those rather than typical traffic.
+
+    python -m advocate_diary.timings server.log
+    npm start | tee server.log | python -m advocate_diary.timings - --json
+"""
+
+import argparse
+import json
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from advocate_diary.metrics import percentile, route_template
+
+PHASES = ("auth", "db", "storage", "ai")
+TRACE_LOG_TYPE = "request-trace"
+
+_UNITS = {"auth": ("step", "steps"), "db": ("query", "queries"), "storage": ("call", "calls"), "ai": ("call", "calls")}
+
+
+def format_server_timing(phases: Dict[str, Tuple[float, int]], total_ms: float) -> str:
+    """A Server-Timing value in the format src/lib/tracing.ts sends"""
+    entries = []
+    for phase in PHASES:
+        if phase in phases:
+            ms, count = phases[phase]
+            unit = _UNITS[phase][0 if count == 1 else 1]
+            entries.append(f'{phase};dur={round(ms, 1)};desc="{count} {unit}"')
+    entries.append(f"total;dur={round(total_ms, 1)}")
+    return ", ".join(entries)
+
+
+def parse_server_timing(value: str) -> Dict[str, Dict[str, Any]]:
+    """Metrics of a Server-Timing value by name, e.g. {"db": {"dur": 14.8, "desc": "3 queries"}}"""
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for entry in value.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        if not name:
+            continue
+        metric: Dict[str, Any] = {"dur": None, "desc": None}
+        for param in params:
+            key, _, raw = param.partition("=")
+            raw = raw.strip().strip('"')
+            if key.strip() == "dur":
+                try:
+                    metric["dur"] = float(raw)
+                except ValueError:
+                    pass
+            elif key.strip() == "desc":
+                metric["desc"] = raw
+        metrics[name] = metric
+    return metrics
+
+
+def _count(desc: Optional[str]) -> int:
+    """The leading number of a phase description ("3 queries"), else 1"""
+    head = (desc or "").split(" ", 1)[0]
+    return int(head) if head.isdigit() else 1
+
+
+class RequestTiming:
+    __slots__ = ("route", "status", "total_ms", "phases")
+
+    def __init__(self, route: str, status: int, total_ms: float, phases: Dict[str, Tuple[float, int]]):
+        self.route = route
+        self.status = status
+        self.total_ms = total_ms
+        # phase -> (milliseconds, number of spans)
+        self.phases = phases
+
+    @property
+    def other_ms(self) -> float:
+        return max(0.0, self.total_ms - sum(ms for ms, _ in self.phases.values()))
+
+
+class TimingCollector:
+    """Thread-safe collection of per-request phase timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: List[RequestTiming] = []
+
+    def add(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        total_ms: float,
+        phases: Dict[str, Tuple[float, int]],
+    ) -> None:
+        timing = RequestTiming(f"{method.upper()} {route_template(path)}", status, total_ms, phases)
+        with self._lock:
+            self.timings.append(timing)
+
+    def add_server_timing(self, method: str, path: str, status: int, value: str) -> bool:
+        """Adds a request from its Server-Timing header; False if it has no total"""
+        metrics = parse_server_timing(value)
+        total = metrics.get("total", {}).get("dur")
+        if total is None:
+            return False
+        phases = {
+            phase: (metrics[phase]["dur"], _count(metrics[phase]["desc"]))
+            for phase in PHASES
+            if phase in metrics and metrics[phase]["dur"] is not None
+        }
+        self.add(method, path, status, total, phases)
+        return True
+
+    def add_response(self, method: str, path: str, response) -> bool:
+        """Adds a requests.Response; untraced responses are skipped"""
+        value = response.headers.get("Server-Timing")
+        return bool(value) and self.add_server_timing(method, path, response.status_code, value)
+
+    def add_log_line(self, line: str) -> bool:
+        """Adds a request-trace log line; anything else is skipped"""
+        line = line.strip()
+        if not line.startswith("{"):
+            return False
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return False
+        if not isinstance(entry, dict) or entry.get("type") != TRACE_LOG_TYPE:
+            return False
+        phases = {
+            phase: (float(value.get("ms", 0)), int(value.get("count", 1)))
+            for phase, value in (entry.get("phases") or {}).items()
+            if phase in PHASES
+        }
+        self.add(
+            entry.get("method", "GET"),
+            entry.get("route", "/"),
+            int(entry.get("status", 0)),
+            float(entry["ms"]),
+            phases,
+        )
+        return True
+
+    def read_log(self, lines: Iterable[str]) -> int:
+        """Adds every request-trace line and returns how many there were"""
+        return sum(self.add_log_line(line) for line in lines)
+
+    def by_route(self) -> Dict[str, List[RequestTiming]]:
+        with self._lock:
+            timings = list(self.timings)
+        grouped: Dict[str, List[RequestTiming]] = {}
+        for timing in timings:
+            grouped.setdefault(timing.route, []).append(timing)
+        return grouped
+
+    def breakdown(self) -> Dict[str, Dict[str, Any]]:
+        return {route: summarize_timings(timings) for route, timings in sorted(self.by_route().items())}
+
+    def clear(self) -> None:
+        with self._lock:
+            self.timings.clear()
+
+
+def summarize_timings(timings: List[RequestTiming]) -> Dict[str, Any]:
+    """Latency percentiles (ms) and the mean time, span count and share of each phase"""
+    totals = sorted(timing.total_ms for timing in timings)
+    overall = sum(totals)
+    count = len(timings)
+
+    def part(values: List[float]) -> Dict[str, float]:
+        spent = sum(values)
+        return {"mean_ms": spent / count, "share": spent / overall if overall else 0.0}
+
+    phases: Dict[str, Dict[str, float]] = {}
+    for phase in PHASES:
+        seen = [timing.phases[phase] for timing in timings if phase in timing.phases]
+        if seen:
+            phases[phase] = {
+                **part([ms for ms, _ in seen]),
+                "mean_count": sum(spans for _, spans in seen) / count,
+            }
+    return {
+        "count": count,
+        "mean_ms": overall / count if count else None,
+        "p50_ms": percentile(totals, 50),
+        "p95_ms": percentile(totals, 95),
+        "max_ms": totals[-1] if totals else None,
+        "phases": phases,
+        "other": part([timing.other_ms for timing in timings]),
+    }
+
+
+def render_table(breakdown: Dict[str, Dict[str, Any]]) -> str:
+    """The breakdown as a text table, slowest routes (by p95) first"""
+    columns = ["route", "count", "p50", "p95"] + list(PHASES) + ["other"]
+    rows = [columns]
+    for route, summary in sorted(breakdown.items(), key=lambda item: -(item[1]["p95_ms"] or 0)):
+        cells = [route, str(summary["count"]), f"{summary['p50_ms']:.1f}", f"{summary['p95_ms']:.1f}"]
+        for part in [summary["phases"].get(phase) for phase in PHASES] + [summary["other"]]:
+            cells.append(f"{part['mean_ms']:.1f} ({part['share']:.0%})" if part else "-")
+        rows.append(cells)
+    widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
+
+
+def _read(paths: List[str], stdin: TextIO, collector: TimingCollector) -> None:
+    for path in paths:
+        if path == "-":
+            collector.read_log(stdin)
+        else:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                collector.read_log(handle)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Break API request time down by route and phase")
+    parser.add_argument("logs", nargs="+", help="Server log files with request-trace lines, or - for stdin")
+    parser.add_argument("--json", action="store_true", help="Print the breakdown as JSON")
+    args = parser.parse_args(argv)
+
+    collector = TimingCollector()
+    _read(args.logs, sys.stdin, collector)
+    breakdown = collector.breakdown()
+    if args.json:
+        print(json.dumps(breakdown, indent=2))
+    elif breakdown:
+        print(render_table(breakdown))
+    else:
+        print("No request-trace lines found")
+
+
+if __name__ == "__main__":
+    main()
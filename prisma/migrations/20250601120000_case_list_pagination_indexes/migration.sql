@@ -0,0 +1,14 @@
+-- CreateIndex
+CREATE INDEX "Case_updatedAt_id_idx" ON "Case"("updatedAt", "id");
+
+-- CreateIndex
+CREATE INDEX "Case_userId_updatedAt_id_idx" ON "Case"("userId", "updatedAt", "id");
+
+-- CreateIndex
+CREATE INDEX "Case_isCompleted_updatedAt_idx" ON "Case"("isCompleted", "updatedAt");
+
+-- CreateIndex
+CREATE INDEX "Hearing_caseId_date_idx" ON "Hearing"("caseId", "date");
+
+-- CreateIndex
+CREATE INDEX "Hearing_nextDate_idx" ON "Hearing"("nextDate");
@@ -0,0 +1,115 @@
+-- Full-text search index over cases, their parties and notes.
+--
+-- Every case has one CaseSearchDocument row holding the concatenated
+-- searchable text (for trigram matching) and a weighted tsvector:
+--   A  title
+--   B  petitioner/respondent names and advocates
+--   C  court name, case type and registration number
+--   D  note content
+-- Triggers on Case, Petitioner, Respondent and Note keep the row in sync
+-- on every write, whichever code path performs it.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- CreateTable
+CREATE TABLE "CaseSearchDocument" (
+    "caseId" TEXT NOT NULL,
+    "content" TEXT NOT NULL,
+    "document" tsvector NOT NULL,
+
+    CONSTRAINT "CaseSearchDocument_pkey" PRIMARY KEY ("caseId")
+);
+
+-- CreateIndex
+CREATE INDEX "CaseSearchDocument_document_idx" ON "CaseSearchDocument" USING GIN ("document");
+
+-- CreateIndex
+CREATE INDEX "CaseSearchDocument_content_idx" ON "CaseSearchDocument" USING GIN ("content" gin_trgm_ops);
+
+-- AddForeignKey
+ALTER TABLE "CaseSearchDocument" ADD CONSTRAINT "CaseSearchDocument_caseId_fkey" FOREIGN KEY ("caseId") REFERENCES "Case"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Rebuilds the search documents of the given cases. Cases that no longer
+-- exist are skipped; their documents go away with the FK cascade.
+CREATE OR REPLACE FUNCTION refresh_case_search(case_ids TEXT[]) RETURNS void AS $$
+BEGIN
+  INSERT INTO "CaseSearchDocument" ("caseId", "content", "document")
+  SELECT
+    c."id",
+    concat_ws(' ', c."title", parties.text, c."courtName", c."caseType",
+              c."registrationNum" || '/' || c."registrationYear", notes.text),
+    setweight(to_tsvector('simple', coalesce(c."title", '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(parties.text, '')), 'B') ||
+    setweight(to_tsvector('simple', concat_ws(' ', c."courtName", c."caseType",
+              c."registrationNum", c."registrationYear")), 'C') ||
+    setweight(to_tsvector('simple', coalesce(notes.text, '')), 'D')
+  FROM "Case" c
+  LEFT JOIN LATERAL (
+    SELECT string_agg(concat_ws(' ', p."name", p."advocate"), ' ') AS text
+    FROM (
+      SELECT "name", "advocate" FROM "Petitioner" WHERE "caseId" = c."id"
+      UNION ALL
+      SELECT "name", "advocate" FROM "Respondent" WHERE "caseId" = c."id"
+    ) p
+  ) parties ON true
+  LEFT JOIN LATERAL (
+    SELECT string_agg(n."content", ' ') AS text FROM "Note" n WHERE n."caseId" = c."id"
+  ) notes ON true
+  WHERE c."id" = ANY(case_ids)
+  ON CONFLICT ("caseId") DO UPDATE
+    SET "content" = EXCLUDED."content", "document" = EXCLUDED."document";
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION case_search_case_trigger() RETURNS trigger AS $$
+BEGIN
+  PERFORM refresh_case_search(ARRAY[NEW."id"]);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level so that a PUT replacing every party of a case, or a
+-- createMany, rebuilds each affected document once
+CREATE OR REPLACE FUNCTION case_search_child_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_case_search(ARRAY(SELECT DISTINCT "caseId" FROM new_rows));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM refresh_case_search(ARRAY(
+      SELECT "caseId" FROM new_rows UNION SELECT "caseId" FROM old_rows
+    ));
+  ELSE
+    PERFORM refresh_case_search(ARRAY(SELECT DISTINCT "caseId" FROM old_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Case_search_insert" AFTER INSERT ON "Case"
+  FOR EACH ROW EXECUTE FUNCTION case_search_case_trigger();
+CREATE TRIGGER "Case_search_update" AFTER UPDATE OF "title", "courtName", "caseType", "registrationNum", "registrationYear" ON "Case"
+  FOR EACH ROW EXECUTE FUNCTION case_search_case_trigger();
+
+CREATE TRIGGER "Petitioner_search_insert" AFTER INSERT ON "Petitioner"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+CREATE TRIGGER "Petitioner_search_update" AFTER UPDATE ON "Petitioner"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+CREATE TRIGGER "Petitioner_search_delete" AFTER DELETE ON "Petitioner"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+
+CREATE TRIGGER "Respondent_search_insert" AFTER INSERT ON "Respondent"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+CREATE TRIGGER "Respondent_search_update" AFTER UPDATE ON "Respondent"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+CREATE TRIGGER "Respondent_search_delete" AFTER DELETE ON "Respondent"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+
+CREATE TRIGGER "Note_search_insert" AFTER INSERT ON "Note"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+CREATE TRIGGER "Note_search_update" AFTER UPDATE ON "Note"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+CREATE TRIGGER "Note_search_delete" AFTER DELETE ON "Note"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_search_child_trigger();
+
+-- Backfill existing cases
+SELECT refresh_case_search(ARRAY(SELECT "id" FROM "Case"));
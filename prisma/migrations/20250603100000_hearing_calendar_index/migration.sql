@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "Hearing_date_idx" ON "Hearing"("date");
@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "Upload_userId_createdAt_idx" ON "Upload"("userId", "createdAt");
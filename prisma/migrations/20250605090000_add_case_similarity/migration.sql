@@ -0,0 +1,166 @@
+-- TF-IDF index for finding similar cases (see src/lib/case-similarity.ts).
+--
+-- CaseSimilarityTerm holds each case's weighted term frequencies:
+--   weight = 1 + ln(sum of field boost * occurrences)
+-- with boosts of 3 for the title, 2 for petitioner/respondent names and
+-- advocates and 1 for hearing notes, hearing purposes and note content.
+-- CaseSimilarityTermStat counts the cases each term appears in and
+-- CaseSimilarityDocument keeps the length of each case's term vector, so
+-- inverse document frequencies are applied at query time and a write only
+-- ever touches the rows of the cases it changed.
+--
+-- Triggers on Case, Petitioner, Respondent, Hearing and Note keep all three
+-- tables in sync on every write, whichever code path performs it. There are
+-- no foreign keys: a deleted case is removed by its trigger, which also
+-- takes its terms out of the document frequencies.
+
+-- CreateTable
+CREATE TABLE "CaseSimilarityTerm" (
+    "caseId" TEXT NOT NULL,
+    "term" TEXT NOT NULL,
+    "weight" DOUBLE PRECISION NOT NULL,
+
+    CONSTRAINT "CaseSimilarityTerm_pkey" PRIMARY KEY ("caseId","term")
+);
+
+-- CreateTable
+CREATE TABLE "CaseSimilarityTermStat" (
+    "term" TEXT NOT NULL,
+    "df" INTEGER NOT NULL,
+
+    CONSTRAINT "CaseSimilarityTermStat_pkey" PRIMARY KEY ("term")
+);
+
+-- CreateTable
+CREATE TABLE "CaseSimilarityDocument" (
+    "caseId" TEXT NOT NULL,
+    "norm" DOUBLE PRECISION NOT NULL,
+
+    CONSTRAINT "CaseSimilarityDocument_pkey" PRIMARY KEY ("caseId")
+);
+
+-- CreateIndex
+CREATE INDEX "CaseSimilarityTerm_term_idx" ON "CaseSimilarityTerm"("term");
+
+-- Weighted terms of the given cases as they are now. Children are joined
+-- through "Case" so a case deleted in this transaction yields nothing, even
+-- before its rows are removed by the FK cascade.
+CREATE OR REPLACE FUNCTION case_similarity_terms(case_ids TEXT[])
+RETURNS TABLE ("caseId" TEXT, "term" TEXT, "weight" DOUBLE PRECISION) AS $$
+  SELECT f."caseId", v.lexeme, 1 + ln(sum(f.boost * coalesce(array_length(v.positions, 1), 1)))
+  FROM (
+    SELECT c."id" AS "caseId", c."title" AS text, 3.0 AS boost
+    FROM "Case" c WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", concat_ws(' ', p."name", p."advocate"), 2.0
+    FROM "Case" c JOIN "Petitioner" p ON p."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", concat_ws(' ', r."name", r."advocate"), 2.0
+    FROM "Case" c JOIN "Respondent" r ON r."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", concat_ws(' ', h."notes", h."nextPurpose"), 1.0
+    FROM "Case" c JOIN "Hearing" h ON h."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", n."content", 1.0
+    FROM "Case" c JOIN "Note" n ON n."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+  ) f
+  CROSS JOIN LATERAL unnest(to_tsvector('simple', coalesce(f.text, ''))) AS v
+  WHERE length(v.lexeme) > 1
+  GROUP BY f."caseId", v.lexeme
+$$ LANGUAGE sql STABLE;
+
+-- Re-indexes the given cases: their old terms leave the document
+-- frequencies, their current terms enter them. Frequency rows are updated
+-- in term order so concurrent refreshes lock them in the same order.
+CREATE OR REPLACE FUNCTION refresh_case_similarity(case_ids TEXT[]) RETURNS void AS $$
+BEGIN
+  INSERT INTO "CaseSimilarityTermStat" ("term", "df")
+  SELECT t."term", -count(*) FROM "CaseSimilarityTerm" t
+  WHERE t."caseId" = ANY(case_ids)
+  GROUP BY t."term" ORDER BY t."term"
+  ON CONFLICT ("term") DO UPDATE SET "df" = "CaseSimilarityTermStat"."df" + EXCLUDED."df";
+
+  DELETE FROM "CaseSimilarityTerm" WHERE "caseId" = ANY(case_ids);
+  DELETE FROM "CaseSimilarityDocument" WHERE "caseId" = ANY(case_ids);
+
+  INSERT INTO "CaseSimilarityTerm" ("caseId", "term", "weight")
+  SELECT * FROM case_similarity_terms(case_ids);
+
+  INSERT INTO "CaseSimilarityTermStat" ("term", "df")
+  SELECT t."term", count(*) FROM "CaseSimilarityTerm" t
+  WHERE t."caseId" = ANY(case_ids)
+  GROUP BY t."term" ORDER BY t."term"
+  ON CONFLICT ("term") DO UPDATE SET "df" = "CaseSimilarityTermStat"."df" + EXCLUDED."df";
+
+  INSERT INTO "CaseSimilarityDocument" ("caseId", "norm")
+  SELECT t."caseId", sqrt(sum(t."weight" * t."weight")) FROM "CaseSimilarityTerm" t
+  WHERE t."caseId" = ANY(case_ids)
+  GROUP BY t."caseId";
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION case_similarity_case_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    PERFORM refresh_case_similarity(ARRAY[OLD."id"]);
+  ELSE
+    PERFORM refresh_case_similarity(ARRAY[NEW."id"]);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level, like the search triggers, so a PUT replacing every
+-- party of a case or a createMany re-indexes each affected case once
+CREATE OR REPLACE FUNCTION case_similarity_child_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_case_similarity(ARRAY(SELECT DISTINCT "caseId" FROM new_rows));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM refresh_case_similarity(ARRAY(
+      SELECT "caseId" FROM new_rows UNION SELECT "caseId" FROM old_rows
+    ));
+  ELSE
+    PERFORM refresh_case_similarity(ARRAY(SELECT DISTINCT "caseId" FROM old_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Case_similarity_insert" AFTER INSERT ON "Case"
+  FOR EACH ROW EXECUTE FUNCTION case_similarity_case_trigger();
+CREATE TRIGGER "Case_similarity_update" AFTER UPDATE OF "title" ON "Case"
+  FOR EACH ROW EXECUTE FUNCTION case_similarity_case_trigger();
+CREATE TRIGGER "Case_similarity_delete" AFTER DELETE ON "Case"
+  FOR EACH ROW EXECUTE FUNCTION case_similarity_case_trigger();
+
+CREATE TRIGGER "Petitioner_similarity_insert" AFTER INSERT ON "Petitioner"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Petitioner_similarity_update" AFTER UPDATE ON "Petitioner"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Petitioner_similarity_delete" AFTER DELETE ON "Petitioner"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+
+CREATE TRIGGER "Respondent_similarity_insert" AFTER INSERT ON "Respondent"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Respondent_similarity_update" AFTER UPDATE ON "Respondent"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Respondent_similarity_delete" AFTER DELETE ON "Respondent"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+
+CREATE TRIGGER "Hearing_similarity_insert" AFTER INSERT ON "Hearing"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Hearing_similarity_update" AFTER UPDATE ON "Hearing"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Hearing_similarity_delete" AFTER DELETE ON "Hearing"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+
+CREATE TRIGGER "Note_similarity_insert" AFTER INSERT ON "Note"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Note_similarity_update" AFTER UPDATE ON "Note"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+CREATE TRIGGER "Note_similarity_delete" AFTER DELETE ON "Note"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_child_trigger();
+
+-- Backfill existing cases
+SELECT refresh_case_similarity(ARRAY(SELECT "id" FROM "Case"));
@@ -0,0 +1,23 @@
+-- CreateTable
+CREATE TABLE "ReassignJob" (
+    "id" TEXT NOT NULL,
+    "userId" TEXT NOT NULL,
+    "sourceUserId" TEXT,
+    "targetUserId" TEXT NOT NULL,
+    "excludePersonal" BOOLEAN NOT NULL DEFAULT false,
+    "status" TEXT NOT NULL DEFAULT 'queued',
+    "total" INTEGER NOT NULL DEFAULT 0,
+    "moved" INTEGER NOT NULL DEFAULT 0,
+    "error" TEXT,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+    "completedAt" TIMESTAMP(3),
+
+    CONSTRAINT "ReassignJob_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "ReassignJob_createdAt_idx" ON "ReassignJob"("createdAt");
+
+-- AddForeignKey
+ALTER TABLE "ReassignJob" ADD CONSTRAINT "ReassignJob_userId_fkey" FOREIGN KEY ("userId") REFERENCES "User"("id") ON DELETE CASCADE ON UPDATE CASCADE;
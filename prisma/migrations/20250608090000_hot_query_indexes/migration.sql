@@ -0,0 +1,22 @@
+-- Indexes for the route queries checked by tests/test_query_plans.py
+
+-- CreateIndex
+CREATE INDEX "Case_userId_caseType_idx" ON "Case"("userId", "caseType");
+
+-- CreateIndex
+CREATE INDEX "Case_caseType_updatedAt_id_idx" ON "Case"("caseType", "updatedAt", "id");
+
+-- CreateIndex
+CREATE INDEX "Petitioner_caseId_idx" ON "Petitioner"("caseId");
+
+-- CreateIndex
+CREATE INDEX "Respondent_caseId_idx" ON "Respondent"("caseId");
+
+-- CreateIndex
+CREATE INDEX "Note_caseId_createdAt_idx" ON "Note"("caseId", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "Note_userId_idx" ON "Note"("userId");
+
+-- CreateIndex
+CREATE INDEX "Upload_caseId_createdAt_idx" ON "Upload"("caseId", "createdAt");
@@ -0,0 +1,54 @@
+-- Case versions (src/lib/case-version.ts): writing a hearing, note or
+-- upload moves its case's updatedAt on, so the case's ETag covers them too
+
+CREATE OR REPLACE FUNCTION touch_cases(case_ids TEXT[]) RETURNS void AS $$
+BEGIN
+  -- Always forward, like nextCaseVersion, even within one millisecond
+  UPDATE "Case"
+  SET "updatedAt" = GREATEST(
+    date_trunc('milliseconds', clock_timestamp() AT TIME ZONE 'UTC'),
+    "updatedAt" + interval '1 millisecond'
+  )
+  WHERE "id" = ANY(case_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level, like the search triggers, so a createMany of hearings
+-- (e.g. a batch import) touches each affected case once
+CREATE OR REPLACE FUNCTION case_version_child_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM touch_cases(ARRAY(SELECT DISTINCT "caseId" FROM new_rows WHERE "caseId" IS NOT NULL));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM touch_cases(ARRAY(
+      SELECT "caseId" FROM new_rows WHERE "caseId" IS NOT NULL
+      UNION SELECT "caseId" FROM old_rows WHERE "caseId" IS NOT NULL
+    ));
+  ELSE
+    PERFORM touch_cases(ARRAY(SELECT DISTINCT "caseId" FROM old_rows WHERE "caseId" IS NOT NULL));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Hearing_version_insert" AFTER INSERT ON "Hearing"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+CREATE TRIGGER "Hearing_version_update" AFTER UPDATE ON "Hearing"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+CREATE TRIGGER "Hearing_version_delete" AFTER DELETE ON "Hearing"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+
+CREATE TRIGGER "Note_version_insert" AFTER INSERT ON "Note"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+CREATE TRIGGER "Note_version_update" AFTER UPDATE ON "Note"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+CREATE TRIGGER "Note_version_delete" AFTER DELETE ON "Note"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+
+CREATE TRIGGER "Upload_version_insert" AFTER INSERT ON "Upload"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+CREATE TRIGGER "Upload_version_update" AFTER UPDATE ON "Upload"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+CREATE TRIGGER "Upload_version_delete" AFTER DELETE ON "Upload"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_child_trigger();
+
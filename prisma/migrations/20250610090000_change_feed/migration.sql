@@ -0,0 +1,95 @@
+-- Change feed (src/lib/change-feed.ts, GET /api/changes): one row per
+-- write to a case, hearing, note or upload, recorded by statement-level
+-- triggers so that raw SQL (bulk reassignment) and cascades are covered.
+--
+-- Rows are read in (xid, seq) order and only up to the oldest transaction
+-- still running: a transaction that started earlier but commits later can
+-- then never land behind a reader's cursor.
+
+-- CreateTable
+CREATE TABLE "Change" (
+    "seq" BIGSERIAL NOT NULL,
+    "xid" xid8 NOT NULL DEFAULT pg_current_xact_id(),
+    "entity" TEXT NOT NULL,
+    "entityId" TEXT NOT NULL,
+    "caseId" TEXT NOT NULL,
+    "op" TEXT NOT NULL,
+    "userId" TEXT,
+    "previousUserId" TEXT,
+    "changedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "Change_pkey" PRIMARY KEY ("seq")
+);
+
+-- CreateIndex
+CREATE INDEX "Change_xid_seq_idx" ON "Change"("xid", "seq");
+
+-- CreateIndex
+CREATE INDEX "Change_changedAt_idx" ON "Change"("changedAt");
+
+-- A case row carries its owner; previousUserId is set when an update moved
+-- it to another one, so the old owner's feed can drop it
+CREATE OR REPLACE FUNCTION change_feed_case_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO "Change" ("entity", "entityId", "caseId", "op", "userId")
+    SELECT 'case', "id", "id", 'upsert', "userId" FROM new_rows;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO "Change" ("entity", "entityId", "caseId", "op", "userId", "previousUserId")
+    SELECT 'case', n."id", n."id", 'upsert', n."userId",
+      CASE WHEN o."userId" IS DISTINCT FROM n."userId" THEN o."userId" END
+    FROM new_rows n JOIN old_rows o ON o."id" = n."id";
+  ELSE
+    INSERT INTO "Change" ("entity", "entityId", "caseId", "op", "userId")
+    SELECT 'case', "id", "id", 'delete', "userId" FROM old_rows;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Hearings, notes and uploads carry their case's owner. Rows deleted along
+-- with their case (ON DELETE CASCADE) no longer find it and are skipped:
+-- the case's own tombstone covers them. Uploads without a case are not
+-- part of the feed.
+CREATE OR REPLACE FUNCTION change_feed_child_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO "Change" ("entity", "entityId", "caseId", "op", "userId")
+    SELECT TG_ARGV[0], o."id", o."caseId", 'delete', c."userId"
+    FROM old_rows o JOIN "Case" c ON c."id" = o."caseId";
+  ELSE
+    INSERT INTO "Change" ("entity", "entityId", "caseId", "op", "userId")
+    SELECT TG_ARGV[0], n."id", n."caseId", 'upsert', c."userId"
+    FROM new_rows n JOIN "Case" c ON c."id" = n."caseId";
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Case_change_insert" AFTER INSERT ON "Case"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_case_trigger();
+CREATE TRIGGER "Case_change_update" AFTER UPDATE ON "Case"
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_case_trigger();
+CREATE TRIGGER "Case_change_delete" AFTER DELETE ON "Case"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_case_trigger();
+
+CREATE TRIGGER "Hearing_change_insert" AFTER INSERT ON "Hearing"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('hearing');
+CREATE TRIGGER "Hearing_change_update" AFTER UPDATE ON "Hearing"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('hearing');
+CREATE TRIGGER "Hearing_change_delete" AFTER DELETE ON "Hearing"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('hearing');
+
+CREATE TRIGGER "Note_change_insert" AFTER INSERT ON "Note"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('note');
+CREATE TRIGGER "Note_change_update" AFTER UPDATE ON "Note"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('note');
+CREATE TRIGGER "Note_change_delete" AFTER DELETE ON "Note"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('note');
+
+CREATE TRIGGER "Upload_change_insert" AFTER INSERT ON "Upload"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('upload');
+CREATE TRIGGER "Upload_change_update" AFTER UPDATE ON "Upload"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('upload');
+CREATE TRIGGER "Upload_change_delete" AFTER DELETE ON "Upload"
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION change_feed_child_trigger('upload');
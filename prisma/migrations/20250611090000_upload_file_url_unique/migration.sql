@@ -0,0 +1,6 @@
+-- Resumable upload sessions record their Upload row with an upsert on
+-- fileUrl. Storage paths carry a random suffix and storage refuses to
+-- overwrite an object, so existing rows are already unique.
+
+-- CreateIndex
+CREATE UNIQUE INDEX "Upload_fileUrl_key" ON "Upload"("fileUrl");
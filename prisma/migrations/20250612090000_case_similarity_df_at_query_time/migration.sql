@@ -0,0 +1,127 @@
+-- Document frequencies move from the triggers to query time.
+--
+-- Keeping CaseSimilarityTermStat.df current made every write to a case
+-- update one shared row per term the case contains, so writers on cases
+-- with common terms queued on the same rows, and transactions touching
+-- several cases could deadlock on them. rankCases (src/lib/case-similarity.ts)
+-- now counts the postings of the query's terms in CaseSimilarityTerm_term_idx,
+-- and the triggers only write the changed case's own CaseSimilarityTerm and
+-- CaseSimilarityDocument rows.
+--
+-- CaseSimilarityTerm also keeps the boosted frequency behind each weight
+-- (weight = 1 + ln(frequency)), so a new hearing or note adds its terms to
+-- the case's vector instead of re-reading every field of the case. Edits and
+-- deletes still re-index the case, from its own rows.
+
+DROP TABLE "CaseSimilarityTermStat";
+
+-- The vectors are rebuilt below with their frequencies
+TRUNCATE "CaseSimilarityTerm", "CaseSimilarityDocument";
+ALTER TABLE "CaseSimilarityTerm" ADD COLUMN "frequency" DOUBLE PRECISION NOT NULL;
+
+-- Boosted term frequencies of the given cases as they are now. Children are
+-- joined through "Case" so a case deleted in this transaction yields
+-- nothing, even before its rows are removed by the FK cascade.
+DROP FUNCTION case_similarity_terms(TEXT[]);
+CREATE FUNCTION case_similarity_terms(case_ids TEXT[])
+RETURNS TABLE ("caseId" TEXT, "term" TEXT, "frequency" DOUBLE PRECISION) AS $$
+  SELECT f."caseId", v.lexeme, sum(f.boost * coalesce(array_length(v.positions, 1), 1))
+  FROM (
+    SELECT c."id" AS "caseId", c."title" AS text, 3.0 AS boost
+    FROM "Case" c WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", concat_ws(' ', p."name", p."advocate"), 2.0
+    FROM "Case" c JOIN "Petitioner" p ON p."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", concat_ws(' ', r."name", r."advocate"), 2.0
+    FROM "Case" c JOIN "Respondent" r ON r."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", concat_ws(' ', h."notes", h."nextPurpose"), 1.0
+    FROM "Case" c JOIN "Hearing" h ON h."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+    UNION ALL
+    SELECT c."id", n."content", 1.0
+    FROM "Case" c JOIN "Note" n ON n."caseId" = c."id" WHERE c."id" = ANY(case_ids)
+  ) f
+  CROSS JOIN LATERAL unnest(to_tsvector('simple', coalesce(f.text, ''))) AS v
+  WHERE length(v.lexeme) > 1
+  GROUP BY f."caseId", v.lexeme
+$$ LANGUAGE sql STABLE;
+
+-- Sets the vector lengths of the given cases from their current terms
+CREATE FUNCTION case_similarity_norms(case_ids TEXT[]) RETURNS void AS $$
+BEGIN
+  DELETE FROM "CaseSimilarityDocument" WHERE "caseId" = ANY(case_ids);
+
+  INSERT INTO "CaseSimilarityDocument" ("caseId", "norm")
+  SELECT t."caseId", sqrt(sum(t."weight" * t."weight")) FROM "CaseSimilarityTerm" t
+  WHERE t."caseId" = ANY(case_ids)
+  GROUP BY t."caseId";
+END;
+$$ LANGUAGE plpgsql;
+
+-- Re-indexes the given cases from scratch
+CREATE OR REPLACE FUNCTION refresh_case_similarity(case_ids TEXT[]) RETURNS void AS $$
+BEGIN
+  DELETE FROM "CaseSimilarityTerm" WHERE "caseId" = ANY(case_ids);
+
+  INSERT INTO "CaseSimilarityTerm" ("caseId", "term", "frequency", "weight")
+  SELECT s."caseId", s."term", s."frequency", 1 + ln(s."frequency")
+  FROM case_similarity_terms(case_ids) s;
+
+  PERFORM case_similarity_norms(case_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Adds text written to the given cases (texts[i] to case_ids[i]) to their
+-- vectors with the given boost, leaving their other terms alone
+CREATE FUNCTION add_case_similarity_text(case_ids TEXT[], texts TEXT[], boost DOUBLE PRECISION)
+RETURNS void AS $$
+BEGIN
+  INSERT INTO "CaseSimilarityTerm" AS t ("caseId", "term", "frequency", "weight")
+  SELECT a."caseId", a."term", a."frequency", 1 + ln(a."frequency")
+  FROM (
+    SELECT c."id" AS "caseId", v.lexeme AS "term", sum(boost * coalesce(array_length(v.positions, 1), 1)) AS "frequency"
+    FROM unnest(case_ids, texts) AS f("caseId", text)
+    JOIN "Case" c ON c."id" = f."caseId"
+    CROSS JOIN LATERAL unnest(to_tsvector('simple', coalesce(f.text, ''))) AS v
+    WHERE length(v.lexeme) > 1
+    GROUP BY c."id", v.lexeme
+  ) a
+  ON CONFLICT ("caseId", "term") DO UPDATE SET
+    "frequency" = t."frequency" + EXCLUDED."frequency",
+    "weight" = 1 + ln(t."frequency" + EXCLUDED."frequency");
+
+  PERFORM case_similarity_norms(ARRAY(SELECT DISTINCT unnest(case_ids)));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level, so a createMany of hearings or notes updates each
+-- affected case once
+CREATE FUNCTION case_similarity_append_trigger() RETURNS trigger AS $$
+DECLARE
+  case_ids TEXT[];
+  texts TEXT[];
+BEGIN
+  IF TG_TABLE_NAME = 'Hearing' THEN
+    SELECT array_agg(n."caseId"), array_agg(concat_ws(' ', n."notes", n."nextPurpose"))
+    INTO case_ids, texts FROM new_rows n;
+  ELSE
+    SELECT array_agg(n."caseId"), array_agg(n."content")
+    INTO case_ids, texts FROM new_rows n;
+  END IF;
+  -- Hearing and note text both carry a boost of 1
+  PERFORM add_case_similarity_text(case_ids, texts, 1.0);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER "Hearing_similarity_insert" ON "Hearing";
+CREATE TRIGGER "Hearing_similarity_insert" AFTER INSERT ON "Hearing"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_append_trigger();
+
+DROP TRIGGER "Note_similarity_insert" ON "Note";
+CREATE TRIGGER "Note_similarity_insert" AFTER INSERT ON "Note"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_similarity_append_trigger();
+
+-- Backfill existing cases
+SELECT refresh_case_similarity(ARRAY(SELECT "id" FROM "Case"));
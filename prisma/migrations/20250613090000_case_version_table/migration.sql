@@ -0,0 +1,56 @@
+-- Case versions (src/lib/case-version.ts) move from "Case"."updatedAt" to
+-- their own table.
+--
+-- touch_cases used to move the case row's updatedAt on every hearing, note
+-- and upload write. That reordered the case lists sorted by updatedAt, made
+-- each child write an UPDATE of the case row (firing the change feed's case
+-- trigger), and held the case row lock until commit, so an edit taking it
+-- with NOWAIT failed with 409 while a note was being added. The version now
+-- lives in "CaseVersion": every write to a case or its children moves it
+-- on, and "Case"."updatedAt" again changes only when the case row does.
+
+-- CreateTable
+CREATE TABLE "CaseVersion" (
+    "caseId" TEXT NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "CaseVersion_pkey" PRIMARY KEY ("caseId")
+);
+
+-- AddForeignKey
+ALTER TABLE "CaseVersion" ADD CONSTRAINT "CaseVersion_caseId_fkey" FOREIGN KEY ("caseId") REFERENCES "Case"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+INSERT INTO "CaseVersion" ("caseId", "updatedAt")
+SELECT "id", "updatedAt" FROM "Case";
+
+CREATE OR REPLACE FUNCTION touch_cases(case_ids TEXT[]) RETURNS void AS $$
+BEGIN
+  -- Always forward, like nextCaseVersion, even within one millisecond
+  UPDATE "CaseVersion"
+  SET "updatedAt" = GREATEST(
+    date_trunc('milliseconds', clock_timestamp() AT TIME ZONE 'UTC'),
+    "updatedAt" + interval '1 millisecond'
+  )
+  WHERE "caseId" = ANY(case_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- A new case starts at its updatedAt; any later write to the case row
+-- moves the version on (the child triggers of 20250609090000_case_version
+-- call touch_cases as before)
+CREATE FUNCTION case_version_case_trigger() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO "CaseVersion" ("caseId", "updatedAt")
+    SELECT "id", "updatedAt" FROM new_rows;
+  ELSE
+    PERFORM touch_cases(ARRAY(SELECT "id" FROM new_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Case_version_insert" AFTER INSERT ON "Case"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_case_trigger();
+CREATE TRIGGER "Case_version_update" AFTER UPDATE ON "Case"
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION case_version_case_trigger();
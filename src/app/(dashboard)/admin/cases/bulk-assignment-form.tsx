@@ -4,6 +4,7 @@ import { useState } from "react";
 import { useRouter } from "next/navigation";
 import { useSession } from "next-auth/react";
 import { AlertCircle, RotateCw } from "lucide-react";
+import { reassignCases, waitForReassignJob } from "@/lib/api-service";
 
 interface UserData {
   id: string;
@@ -29,6 +30,7 @@ export default function BulkCaseAssignmentForm({
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [error, setError] = useState("");
   const [successMessage, setSuccessMessage] = useState("");
+  const [progress, setProgress] = useState("");
   const [mode, setMode] = useState<"transfer-user" | "assign-unassigned">(
     "transfer-user"
   );
@@ -87,27 +89,27 @@ export default function BulkCaseAssignmentForm({
     }
 
     try {
-      const response = await fetch("/api/admin/cases/reassign", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          sourceUserId: mode === "assign-unassigned" ? null : sourceUserId,
-          targetUserId,
-        }),
+      const result = await reassignCases({
+        sourceUserId: mode === "assign-unassigned" ? null : sourceUserId,
+        targetUserId,
       });
-
-      if (!response.ok) {
-        const data = await response.json();
-        throw new Error(data.error || "Failed to reassign cases");
+      if (result.error || !result.data) {
+        throw new Error(result.error || "Failed to reassign cases");
       }
 
-      const data = await response.json();
-      setSuccessMessage(
-        data.message ||
-          `${data.count} case(s) have been reassigned successfully`
-      );
+      // The cases move in the background; follow the job to the end
+      let message = result.data.message;
+      const job = result.data.job;
+      if (job) {
+        const done = await waitForReassignJob(job.id, (current) =>
+          setProgress(`${result.data!.message}: ${current.moved} of ${current.total} moved`)
+        );
+        if (done.error || done.data?.status === "failed") {
+          throw new Error(done.error || done.data?.error || "Failed to reassign cases");
+        }
+        message = `${done.data!.moved} case(s) have been reassigned successfully`;
+      }
+      setSuccessMessage(message);
 
       // Reset form
       if (mode === "transfer-user") {
@@ -124,6 +126,7 @@ export default function BulkCaseAssignmentForm({
         setError("An error occurred");
       }
     } finally {
+      setProgress("");
       setIsSubmitting(false);
     }
   };
@@ -137,6 +140,13 @@ export default function BulkCaseAssignmentForm({
         </div>
       )}
 
+      {progress && (
+        <div className="mb-4 rounded-md bg-slate-50 p-3 text-sm text-slate-600 border border-slate-200 flex items-start">
+          <RotateCw className="h-5 w-5 text-slate-500 mr-2 flex-shrink-0 animate-spin" />
+          <p>{progress}</p>
+        </div>
+      )}
+
       {error && (
         <div className="mb-4 rounded-md bg-red-50 p-3 text-sm text-red-600 border border-red-200 flex items-start">
           <AlertCircle className="h-5 w-5 text-red-500 mr-2 flex-shrink-0" />
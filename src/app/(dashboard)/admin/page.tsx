@@ -3,7 +3,7 @@ import { getServerSession } from "next-auth";
 import { authOptions } from "@/lib/auth";
 import Link from "next/link";
 import { Users, Briefcase, Layout, FileText, BarChart3 } from "lucide-react";
-import { prisma } from "@/lib/db";
+import { getAdminStats } from "@/lib/admin-stats";
 
 // Define types for our data structures
 type StatCard = {
@@ -29,35 +29,26 @@ export default async function AdminPage() {
     redirect("/");
   }
 
-  // Fetch data for statistics
-  const usersCount = await prisma.user.count();
-  const activeCases = await prisma.case.count({
-    where: {
-      isCompleted: false,
-      NOT: { caseType: "PERSONAL" },
-    },
-  });
-  const closedCases = await prisma.case.count({
-    where: { isCompleted: true },
-  });
+  // Fetch data for statistics (grouped aggregates, cached briefly)
+  const { totals } = await getAdminStats();
 
   // Define statistics cards
   const stats: StatCard[] = [
     {
       label: "Total Advocates",
-      value: usersCount,
+      value: totals.users,
       color: "blue",
       icon: <Users size={20} className="text-blue-500" />,
     },
     {
       label: "Active Cases",
-      value: activeCases,
+      value: totals.activeCases,
       color: "red",
       icon: <Briefcase size={20} className="text-red-500" />,
     },
     {
       label: "Closed Cases",
-      value: closedCases,
+      value: totals.closedCases,
       color: "green",
       icon: <BarChart3 size={20} className="text-green-500" />,
     },
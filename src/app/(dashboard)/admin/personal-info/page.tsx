@@ -41,6 +41,8 @@ type User = {
   role: string;
   personalInfo: PersonalInfo | null;
   uploads: Array<Upload>;
+  uploadCount?: number;
+  personalFileCount?: number;
 };
 
 export default function PersonalInfoManagement() {
@@ -53,20 +55,29 @@ export default function PersonalInfoManagement() {
     const fetchUsers = async () => {
       try {
         setLoading(true);
-        console.log("Fetching users with personal info...");
-        const response = await fetch("/api/admin/users-with-info");
+        // The list only shows file counts, so skip the upload rows and
+        // walk the pages of users
+        const fetched: User[] = [];
+        let cursor: string | null = null;
+        do {
+          const params = new URLSearchParams({ counts: "true", limit: "200" });
+          if (cursor) params.set("cursor", cursor);
+          const response = await fetch(`/api/admin/users-with-info?${params.toString()}`);
 
-        if (!response.ok) {
-          const errorData = await response.json();
-          throw new Error(
-            errorData.error ||
-              `Server responded with status: ${response.status}`
-          );
-        }
+          if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(
+              errorData.error ||
+                `Server responded with status: ${response.status}`
+            );
+          }
 
-        const data = await response.json();
-        console.log(`Fetched ${data.users.length} users`);
-        setUsers(data.users);
+          const data = await response.json();
+          fetched.push(...data.users);
+          cursor = data.nextCursor;
+        } while (cursor);
+
+        setUsers(fetched);
       } catch (error) {
         console.error("Error fetching users:", error);
         toast.error("Error fetching users. Please try again later.");
@@ -78,24 +89,7 @@ export default function PersonalInfoManagement() {
     fetchUsers();
   }, []);
 
-  const personalFilesCount = (user: User) => {
-    try {
-      // Personal files are those that are associated with a case of type "PERSONAL"
-      return (
-        user.uploads?.filter(
-          (upload) =>
-            // Check if the upload has case information
-            upload.case?.caseType === "PERSONAL" ||
-            // For backwards compatibility, also check caseId
-            // This will be removed once all records have proper case relations
-            upload.caseId === null
-        )?.length || 0
-      );
-    } catch (error) {
-      console.error("Error counting personal files:", error);
-      return 0;
-    }
-  };
+  const personalFilesCount = (user: User) => user.personalFileCount ?? 0;
 
   // For a cleaner UI display of contact info
   const getFormattedContactInfo = (info: PersonalInfo | null) => {
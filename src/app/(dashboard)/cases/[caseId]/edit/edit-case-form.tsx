@@ -28,6 +28,7 @@ interface Case {
   title: string;
   courtName: string;
   userId: string;
+  version: { updatedAt: Date | string } | null;
 }
 
 interface EditCaseFormProps {
@@ -163,6 +164,10 @@ export default function EditCaseForm({
         method: "PUT",
         headers: {
           "Content-Type": "application/json",
+          // Refused with 409 if the case or anything under it changed since it was loaded
+          ...(caseDetail.version
+            ? { "If-Match": `"${new Date(caseDetail.version.updatedAt).toISOString()}"` }
+            : {}),
         },
         body: JSON.stringify({
           ...formData,
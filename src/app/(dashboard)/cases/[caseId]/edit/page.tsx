@@ -26,6 +26,7 @@ export default async function EditCasePage({
     include: {
       petitioners: true,
       respondents: true,
+      version: { select: { updatedAt: true } },
     },
   });
 
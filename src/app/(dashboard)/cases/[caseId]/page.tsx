@@ -166,33 +166,7 @@ export default async function CaseDetailPage({
             />
 
             {/* Print button - available to all users */}
-            <CasePrintButton
-              caseDetail={{
-                caseType: caseDetail.caseType,
-                registrationYear: caseDetail.registrationYear,
-                registrationNum: caseDetail.registrationNum,
-                title: caseDetail.title,
-                courtName: caseDetail.courtName,
-                isCompleted: caseDetail.isCompleted,
-                user: caseDetail.user,
-                notes: caseDetail.notes.map((note) => ({
-                  id: note.id,
-                  content: note.content,
-                  createdAt: note.createdAt,
-                  user: note.user ? { name: note.user.name } : null,
-                })),
-                uploads: caseDetail.uploads.map((file) => ({
-                  id: file.id,
-                  fileName: file.fileName,
-                  fileUrl: file.fileUrl,
-                  fileType: file.fileType,
-                  createdAt: file.createdAt,
-                })),
-              }}
-              formattedHearings={formattedHearings}
-              petitioners={petitioners}
-              respondents={respondents}
-            />
+            <CasePrintButton caseId={caseId} title={caseDetail.title} />
 
             {/* Edit button - only visible to admins */}
             {isAdmin && (
@@ -4,6 +4,7 @@ import { redirect } from "next/navigation";
 import { authOptions } from "@/lib/auth";
 import FilteredCases from "@/components/cases/filtered-cases";
 import { Case } from "@/types/case";
+import { currentChangeCursor } from "@/lib/change-feed";
 import Link from "next/link";
 import { PlusCircle } from "lucide-react"; // Import the icon
 
@@ -16,6 +17,10 @@ export default async function CasesPage() {
 
   const isAdmin = session.user?.role === "ADMIN";
 
+  // The list keeps itself up to date from the change feed, starting from
+  // a cursor taken before the cases are read
+  const changeCursor = await currentChangeCursor();
+
   // Get cases:
   // - Admins see all non-PERSONAL cases
   // - Regular users see only their cases (including PERSONAL)
@@ -85,6 +90,7 @@ export default async function CasesPage() {
       )}
       <FilteredCases
         initialCases={cases as Case[]}
+        changeCursor={changeCursor}
         isAdmin={isAdmin}
         userId={session.user?.id || ""}
       />
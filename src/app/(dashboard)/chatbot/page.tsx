@@ -85,13 +85,14 @@ export default function ChatbotPage() {
     setError(null);
 
     try {
-      // Send the user's message to the server
+      // Send the user's message to the server and stream the answer back
       const response = await fetch("/api/chat", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
         },
         body: JSON.stringify({
+          stream: true,
           messages: [...messages, userMessage].map((msg) => ({
             role: msg.role,
             content: msg.content,
@@ -99,19 +100,32 @@ export default function ChatbotPage() {
         }),
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error("Failed to fetch response from the server.");
       }
 
-      const data = await response.json();
+      // Show the assistant's message as soon as the first tokens arrive
+      const assistantId = `${Date.now()}-assistant`;
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let text = "";
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        const started = text.length > 0;
+        text += decoder.decode(value, { stream: true });
+        if (!text) continue;
+        const content = text;
+        setMessages((prev) =>
+          started
+            ? prev.map((msg) => (msg.id === assistantId ? { ...msg, content } : msg))
+            : [...prev, { id: assistantId, role: "assistant", content }]
+        );
+      }
 
-      // Add the assistant's response to the chat
-      const assistantMessage = {
-        id: Date.now().toString(),
-        role: "assistant",
-        content: data.text,
-      };
-      setMessages((prev) => [...prev, assistantMessage]);
+      if (!text.trim()) {
+        throw new Error("The assistant returned an empty response.");
+      }
     } catch (err) {
       console.error("Error fetching chat response:", err);
       setError("Something went wrong. Please try again.");
@@ -219,7 +233,8 @@ export default function ChatbotPage() {
           </div>
         ))}
 
-        {isLoading && (
+        {/* Typing indicator until the streamed answer starts */}
+        {isLoading && messages[messages.length - 1]?.role === "user" && (
           <div className="flex justify-start">
             <div className="bg-white text-slate-800 rounded-lg px-3 py-2 border border-slate-200 rounded-bl-none shadow-sm">
               <div className="flex space-x-1 items-center h-5">
@@ -0,0 +1,51 @@
+import { NextResponse, after } from "next/server";
+import { prisma } from "@/lib/db";
+import { authenticate } from "@/lib/request-context";
+import { describeReassignJob, isStaleJob, runReassignJob } from "@/lib/reassign-jobs";
+import { traced } from "@/lib/tracing";
+
+// GET /api/admin/cases/reassign/[jobId] - Progress of a bulk reassignment
+//
+// Responds with { job }: its status (queued, running, completed or failed)
+// and how many of its total cases have moved so far. A job that stopped
+// making progress, e.g. because its instance was recycled, is picked up
+// again from where it stopped.
+export const GET = traced("/api/admin/cases/reassign/[jobId]", async function GET(
+  request: Request,
+  { params }: { params: { jobId: string } }
+) {
+  const auth = await authenticate(request, "message");
+  if (auth.response) {
+    return auth.response;
+  }
+
+  if (auth.user.role !== "ADMIN") {
+    return NextResponse.json(
+      { message: "Forbidden: Requires admin privileges" },
+      { status: 403 }
+    );
+  }
+
+  try {
+    const { jobId } = await params;
+    const job = await prisma.reassignJob.findUnique({ where: { id: jobId } });
+    if (!job) {
+      return NextResponse.json(
+        { message: "Reassignment not found" },
+        { status: 404 }
+      );
+    }
+
+    if (isStaleJob(job)) {
+      after(() => runReassignJob(job.id));
+    }
+
+    return NextResponse.json({ job: describeReassignJob(job) });
+  } catch (error) {
+    console.error("Error fetching reassignment:", error);
+    return NextResponse.json(
+      { message: "An error occurred while fetching the reassignment" },
+      { status: 500 }
+    );
+  }
+});
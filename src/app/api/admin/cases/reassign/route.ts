@@ -1,18 +1,31 @@
-import { NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
+import { NextResponse, after } from "next/server";
 import { prisma } from "@/lib/db";
-import { authOptions } from "@/lib/auth";
+import { authenticate } from "@/lib/request-context";
+import {
+  countCasesToMove,
+  createReassignJob,
+  describeReassignJob,
+  runReassignJob,
+} from "@/lib/reassign-jobs";
+import { traced } from "@/lib/tracing";
 
 // POST /api/admin/cases/reassign - Bulk reassign cases to a user
-export async function POST(request: Request) {
+//
+// Body: { sourceUserId, targetUserId }; a null sourceUserId assigns the
+// cases that have no owner. Responds 202 with { message, job } and moves
+// the cases in chunks after the response is sent (see
+// src/lib/reassign-jobs.ts); poll GET /api/admin/cases/reassign/[jobId]
+// until the job's status is completed or failed. When there is nothing to
+// move it answers 200 with count 0 and no job.
+export const POST = traced("/api/admin/cases/reassign", async function POST(request: Request) {
   // Verify user is authenticated and is an admin
-  const session = await getServerSession(authOptions);
-
-  if (!session || !session.user) {
-    return NextResponse.json({ message: "Unauthorized" }, { status: 401 });
+  const auth = await authenticate(request, "message");
+  if (auth.response) {
+    return auth.response;
   }
+  const { user } = auth;
 
-  if (session.user.role !== "ADMIN") {
+  if (user.role !== "ADMIN") {
     return NextResponse.json(
       { message: "Forbidden: Requires admin privileges" },
       { status: 403 }
@@ -31,6 +44,13 @@ export async function POST(request: Request) {
       );
     }
 
+    if (sourceUserId === targetUserId) {
+      return NextResponse.json(
+        { message: "Source and target users must be different" },
+        { status: 400 }
+      );
+    }
+
     // Verify target user exists
     const targetUser = await prisma.user.findUnique({
       where: { id: targetUserId },
@@ -43,39 +63,8 @@ export async function POST(request: Request) {
       );
     }
 
-    // Handle reassignment based on source
-    if (sourceUserId === null) {
-      // Use Prisma's raw query to find unassigned cases (excluding PERSONAL)
-      const unassignedCaseIds = await prisma.$queryRaw`
-        SELECT id FROM "Case" WHERE "userId" IS NULL AND "caseType" != 'PERSONAL'
-      `;
-
-      // No unassigned cases found
-      if (!Array.isArray(unassignedCaseIds) || unassignedCaseIds.length === 0) {
-        return NextResponse.json({
-          message: `No unassigned cases found to assign to ${targetUser.name}`,
-          count: 0,
-        });
-      }
-
-      // Extract the IDs
-      const caseIds = unassignedCaseIds.map((c: any) => c.id);
-
-      // Update each unassigned case
-      const result = await prisma.case.updateMany({
-        where: {
-          id: {
-            in: caseIds,
-          },
-        },
-        data: { userId: targetUserId },
-      });
-
-      return NextResponse.json({
-        message: `${result.count} unassigned case(s) have been assigned to ${targetUser.name}`,
-        count: result.count,
-      });
-    } else {
+    let sourceName = "unassigned";
+    if (sourceUserId !== null) {
       // Verify source user exists
       const sourceUser = await prisma.user.findUnique({
         where: { id: sourceUserId },
@@ -87,48 +76,40 @@ export async function POST(request: Request) {
           { status: 404 }
         );
       }
+      sourceName = sourceUser.name;
+    }
 
-      // Special handling when admin is transferring their own cases
-      const isAdminTransferringOwnCases = sourceUserId === session.user.id;
-
-      // Get total count of cases before transfer (for reporting)
-      const totalCasesCount = await prisma.case.count({
-        where: { userId: sourceUserId },
-      });
-
-      let result;
-
-      // Determine if we need to filter out PERSONAL cases
-      if (isAdminTransferringOwnCases) {
-        // If admin is transferring their own cases, exclude PERSONAL cases
-        result = await prisma.case.updateMany({
-          where: {
-            userId: sourceUserId,
-            caseType: { not: "PERSONAL" },
-          },
-          data: { userId: targetUserId },
-        });
-      } else {
-        // Standard transfer of all cases
-        result = await prisma.case.updateMany({
-          where: { userId: sourceUserId },
-          data: { userId: targetUserId },
-        });
-      }
-
-      // Create appropriate message based on whether PERSONAL cases were excluded
-      const message = `${result.count} case(s) have been reassigned from ${sourceUser.name} to ${targetUser.name}`;
+    // Unassigned cases never include PERSONAL ones, and an admin
+    // transferring their own cases keeps their PERSONAL cases
+    const source = {
+      sourceUserId: sourceUserId ?? null,
+      excludePersonal: sourceUserId === null || sourceUserId === user.id,
+    };
+    const total = await countCasesToMove(source);
 
-      // Return success response
+    if (total === 0) {
       return NextResponse.json({
-        message,
-        count: result.count,
-        totalCasesCount,
-        excludedPersonalCases: isAdminTransferringOwnCases
-          ? totalCasesCount - result.count
-          : 0,
+        message:
+          sourceUserId === null
+            ? `No unassigned cases found to assign to ${targetUser.name}`
+            : `${sourceName} has no cases to reassign`,
+        count: 0,
       });
     }
+
+    const job = await createReassignJob({ ...source, userId: user.id, targetUserId, total });
+    after(() => runReassignJob(job.id));
+
+    return NextResponse.json(
+      {
+        message:
+          sourceUserId === null
+            ? `Assigning ${total} unassigned case(s) to ${targetUser.name}`
+            : `Reassigning ${total} case(s) from ${sourceName} to ${targetUser.name}`,
+        job: describeReassignJob(job),
+      },
+      { status: 202 }
+    );
   } catch (error) {
     console.error("Error reassigning cases:", error);
     return NextResponse.json(
@@ -136,4 +117,4 @@ export async function POST(request: Request) {
       { status: 500 }
     );
   }
-}
+});
@@ -1,14 +1,13 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
 import { prisma } from "@/lib/db";
+import { getRequestUser } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
-export async function GET(req: NextRequest) {
+export const GET = traced("/api/admin/personal-files", async function GET(req: NextRequest) {
   try {
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(req);
 
-    if (!session || session.user?.role !== "ADMIN") {
-      console.log("Unauthorized access attempt to personal files");
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json(
         { error: "Unauthorized" },
         { status: 401 }
@@ -19,15 +18,12 @@ export async function GET(req: NextRequest) {
     const userId = req.nextUrl.searchParams.get("userId");
     
     if (!userId) {
-      console.log("Missing userId parameter in request");
       return NextResponse.json(
         { error: "User ID is required" },
         { status: 400 }
       );
     }
 
-    console.log(`Fetching personal files for user: ${userId}`);
-
     // First, find all PERSONAL cases for this user
     const personalCases = await prisma.case.findMany({
       where: {
@@ -39,10 +35,7 @@ export async function GET(req: NextRequest) {
       }
     });
 
-    console.log(`Found ${personalCases.length} personal cases for user ${userId}`);
-    
     if (personalCases.length === 0) {
-      console.log(`No personal cases found for user ${userId}`);
       return NextResponse.json({ 
         personalFiles: [],
       });
@@ -50,7 +43,6 @@ export async function GET(req: NextRequest) {
     
     // Get the case IDs
     const personalCaseIds = personalCases.map(c => c.id);
-    console.log(`Personal case IDs: ${personalCaseIds.join(', ')}`);
     
     // Find all uploads associated with these PERSONAL cases
     const personalFiles = await prisma.upload.findMany({
@@ -73,8 +65,6 @@ export async function GET(req: NextRequest) {
       }
     });
 
-    console.log(`Found ${personalFiles.length} personal files for user ${userId}`);
-
     return NextResponse.json({ 
       personalFiles,
     });
@@ -85,4 +75,4 @@ export async function GET(req: NextRequest) {
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
@@ -0,0 +1,37 @@
+import { NextResponse } from 'next/server';
+import { getAdminStats } from '@/lib/admin-stats';
+import { authenticate } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
+
+// GET /api/admin/stats - Aggregate firm statistics for the admin dashboard
+//
+// Cases per user, per court and per case type, active vs completed, and
+// hearings due in the next seven days. Served from a short-TTL cache that
+// case and user writes invalidate.
+export const GET = traced("/api/admin/stats", async function GET(request: Request) {
+  // Verify user is authenticated and is an admin
+  const auth = await authenticate(request, 'message');
+  if (auth.response) {
+    return auth.response;
+  }
+
+  if (auth.user.role !== 'ADMIN') {
+    return NextResponse.json(
+      { message: 'Forbidden: Requires admin privileges' },
+      { status: 403 }
+    );
+  }
+
+  try {
+    const stats = await getAdminStats();
+    return NextResponse.json(stats, {
+      headers: { 'Cache-Control': 'private, no-store' },
+    });
+  } catch (error) {
+    console.error('Error computing admin statistics:', error);
+    return NextResponse.json(
+      { message: 'An error occurred while computing statistics' },
+      { status: 500 }
+    );
+  }
+});
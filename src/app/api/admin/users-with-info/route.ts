@@ -1,26 +1,55 @@
-import { getServerSession } from "next-auth";
-import { NextResponse } from "next/server";
-import { authOptions } from "@/lib/auth";
-import { prisma, getUsersWithInfo } from "@/lib/db";
+import { NextRequest, NextResponse } from "next/server";
+import { getUsersWithInfo } from "@/lib/db";
+import { decodeNameCursor, parseLimit } from "@/lib/pagination";
+import { getRequestUser } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
-export async function GET() {
+// GET /api/admin/users-with-info - A page of users with personal info and uploads
+//
+// Query parameters:
+//   limit, cursor          page size (default 50, max 200) and nextCursor from the previous page
+//   uploads                most recent uploads returned per user (default 20, max 100)
+//   counts=true            return only uploadCount / personalFileCount, no upload rows
+//
+// Responds with { users, nextCursor }, users in name order.
+export const GET = traced("/api/admin/users-with-info", async function GET(request: NextRequest) {
   try {
-    console.log("Starting GET /api/admin/users-with-info request");
-    
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(request);
 
-    if (!session || session.user?.role !== "ADMIN") {
-      console.log("Unauthorized access attempt to users-with-info endpoint");
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json(
         { error: "Unauthorized" },
         { status: 401 }
       );
     }
 
-    const users = await getUsersWithInfo();
-    console.log(`Successfully retrieved ${users.length} users with their data`);
+    const params = new URL(request.url).searchParams;
 
-    return NextResponse.json({ users });
+    const limit = parseLimit(params.get("limit"));
+    if (limit === null) {
+      return NextResponse.json({ error: "limit must be a positive integer" }, { status: 400 });
+    }
+
+    const cursorToken = params.get("cursor");
+    const after = cursorToken ? decodeNameCursor(cursorToken) : null;
+    if (cursorToken && !after) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const uploadsParam = params.get("uploads");
+    const uploadsPerUser = uploadsParam === null ? undefined : Number(uploadsParam);
+    if (uploadsPerUser !== undefined && (!Number.isInteger(uploadsPerUser) || uploadsPerUser < 0)) {
+      return NextResponse.json({ error: "uploads must be a non-negative integer" }, { status: 400 });
+    }
+
+    const page = await getUsersWithInfo({
+      limit,
+      after,
+      uploadsPerUser,
+      countsOnly: params.get("counts") === "true",
+    });
+
+    return NextResponse.json(page);
   } catch (error) {
     console.error("Error fetching users with info:", error);
     return NextResponse.json(
@@ -28,4 +57,4 @@ export async function GET() {
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+});
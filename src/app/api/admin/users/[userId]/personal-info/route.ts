@@ -1,16 +1,16 @@
-import { getServerSession } from "next-auth";
 import { NextResponse } from "next/server";
-import { authOptions } from "@/lib/auth";
 import { prisma } from "@/lib/db";
+import { getRequestUser } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
-export async function POST(
+export const POST = traced("/api/admin/users/[userId]/personal-info", async function POST(
   request: Request,
   { params }: { params: { userId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(request);
 
-    if (!session || session.user?.role !== "ADMIN") {
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json(
         { error: "Unauthorized" },
         { status: 401 }
@@ -98,4 +98,4 @@ export async function POST(
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
@@ -1,25 +1,26 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
 import { prisma } from "@/lib/db";
-import { authOptions } from "@/lib/auth";
+import { invalidateAdminStats } from "@/lib/admin-stats";
+import { getRequestUser, invalidateCaseAccess } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
 // DELETE /api/admin/users/[userId] - Delete a user
-export async function DELETE(
+export const DELETE = traced("/api/admin/users/[userId]", async function DELETE(
   request: NextRequest,
   { params }: { params: { userId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(request);
 
     // Check if user is authenticated and is an admin
-    if (!session || session.user?.role !== "ADMIN") {
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
     }
 
     const { userId } = await Promise.resolve(params);
 
     // Don't allow deleting yourself
-    if (userId === session.user.id) {
+    if (userId === currentUser.id) {
       return NextResponse.json(
         { error: "You cannot delete your own account" },
         { status: 400 }
@@ -82,6 +83,8 @@ export async function DELETE(
         where: { id: userId },
       });
     });
+    invalidateAdminStats();
+    invalidateCaseAccess();
 
     return NextResponse.json({
       success: true,
@@ -96,16 +99,16 @@ export async function DELETE(
       { status: 500 }
     );
   }
-}
+});
 
-export async function GET(
+export const GET = traced("/api/admin/users/[userId]", async function GET(
   request: Request,
   { params }: { params: { userId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(request);
 
-    if (!session || session.user?.role !== "ADMIN") {
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
     }
 
@@ -141,4 +144,4 @@ export async function GET(
       { status: 500 }
     );
   }
-}
+});
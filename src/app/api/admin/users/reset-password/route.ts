@@ -1,15 +1,15 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
 import { prisma } from "@/lib/db";
-import { authOptions } from "@/lib/auth";
-import bcrypt from "bcrypt";
+import { hashPassword } from "@/lib/auth-utils";
+import { getRequestUser } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
-export async function POST(request: NextRequest) {
+export const POST = traced("/api/admin/users/reset-password", async function POST(request: NextRequest) {
   try {
     // Get the authenticated user
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(request);
 
-    if (!session || !session.user) {
+    if (!currentUser) {
       return NextResponse.json(
         { error: "Authentication required" },
         { status: 401 }
@@ -17,7 +17,7 @@ export async function POST(request: NextRequest) {
     }
 
     // Check if user is admin
-    if (session.user.role !== "ADMIN") {
+    if (currentUser.role !== "ADMIN") {
       return NextResponse.json(
         { error: "Admin privileges required" },
         { status: 403 }
@@ -52,7 +52,7 @@ export async function POST(request: NextRequest) {
     }
 
     // Hash the new password
-    const hashedPassword = await bcrypt.hash(newPassword, 10);
+    const hashedPassword = await hashPassword(newPassword);
 
     // Update the user's password
     await prisma.user.update({
@@ -71,4 +71,4 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
+});
@@ -1,16 +1,17 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import * as bcrypt from "bcrypt";
+import { hashPassword } from "@/lib/auth-utils";
 import { prisma } from "@/lib/db";
-import { authOptions } from "@/lib/auth"; 
+import { invalidateAdminStats } from "@/lib/admin-stats";
+import { getRequestUser } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
 // POST /api/admin/users - Create a new user
-export async function POST(request: NextRequest) {
+export const POST = traced("/api/admin/users", async function POST(request: NextRequest) {
   try {
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(request);
     
     // Check if user is authenticated and is an admin
-    if (!session || session.user?.role !== "ADMIN") {
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json(
         { error: "Unauthorized" },
         { status: 401 }
@@ -54,7 +55,7 @@ export async function POST(request: NextRequest) {
     }
     
     // Hash the password
-    const hashedPassword = await bcrypt.hash(password, 10);
+    const hashedPassword = await hashPassword(password);
     
     // Create the user
     const user = await prisma.user.create({
@@ -65,6 +66,7 @@ export async function POST(request: NextRequest) {
         role,
       },
     });
+    invalidateAdminStats();
     
     // Return the user without the password
     return NextResponse.json({
@@ -84,16 +86,13 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
+});
 
 // GET /api/admin/users - Get all users
-export async function GET(request: NextRequest) {
+export const GET = traced("/api/admin/users", async function GET(request: NextRequest) {
   try {
-    console.log("Starting GET /api/admin/users request");
-    
-    const session = await getServerSession(authOptions);
-    if (!session || session.user?.role !== "ADMIN") {
-      console.log("Unauthorized access attempt to users list");
+    const currentUser = await getRequestUser(request);
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json(
         { error: "Unauthorized" },
         { status: 401 }
@@ -112,8 +111,6 @@ export async function GET(request: NextRequest) {
       },
     });
     
-    console.log(`Successfully retrieved ${users.length} users`);
-    
     // Return the users array directly, not wrapped in an object
     return NextResponse.json(users);
   } catch (error) {
@@ -123,4 +120,4 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
@@ -1,8 +1,9 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
 import { prisma, createPersonalFileUpload } from "@/lib/db";
-import { supabaseAdmin, initializeStorage } from "@/lib/supabase";
+import { supabaseAdmin, ensureStorage } from "@/lib/supabase";
+import { getRequestUser } from "@/lib/request-context";
+import { removeObjects } from "@/lib/case-uploads";
+import { traced } from "@/lib/tracing";
 
 // Helper to get current Unix timestamp to ensure unique filenames
 const getUniqueFileName = (originalName: string) => {
@@ -31,11 +32,11 @@ const getUniqueFileName = (originalName: string) => {
   }
 };
 
-export async function POST(req: NextRequest) {
+export const POST = traced("/api/admin/users/upload", async function POST(req: NextRequest) {
   try {
     // Get the authenticated user
-    const session = await getServerSession(authOptions);
-    if (!session || session.user?.role !== "ADMIN") {
+    const currentUser = await getRequestUser(req);
+    if (!currentUser || currentUser.role !== "ADMIN") {
       return NextResponse.json(
         { message: "Unauthorized" },
         { status: 401 }
@@ -61,8 +62,6 @@ export async function POST(req: NextRequest) {
       );
     }
 
-    console.log(`Processing upload for user ${userId}. File: ${file.name}, Size: ${file.size}, Type: ${file.type}`);
-
     // Check if user exists
     const user = await prisma.user.findUnique({
       where: { id: userId },
@@ -78,7 +77,6 @@ export async function POST(req: NextRequest) {
     // Validate file type
     const allowedTypes = ["image/jpeg", "image/png", "application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"];
     if (!allowedTypes.includes(file.type)) {
-      console.log(`File type rejected: ${file.type}`);
       return NextResponse.json(
         { message: `Invalid file type: ${file.type}. Only JPG, PNG, PDF, DOC, and DOCX files are allowed.` },
         { status: 400 }
@@ -88,7 +86,6 @@ export async function POST(req: NextRequest) {
     // Validate file size (max 10MB)
     const maxSize = 10 * 1024 * 1024; // 10MB
     if (file.size > maxSize) {
-      console.log(`File size too large: ${file.size} bytes`);
       return NextResponse.json(
         { message: `File size exceeds the maximum limit of 10MB. Current size: ${Math.round(file.size / (1024 * 1024))}MB` },
         { status: 400 }
@@ -96,17 +93,14 @@ export async function POST(req: NextRequest) {
     }
 
     try {
-      // Initialize storage bucket
-      await initializeStorage();
-      console.log("Storage buckets initialized");
+      // Buckets are checked once per server process
+      await ensureStorage();
 
       // Create a unique file name
       const fileName = getUniqueFileName(file.name);
-      console.log(`Generated unique filename: ${fileName}`);
       
       // Get file buffer
       const buffer = await file.arrayBuffer();
-      console.log(`File buffer created, size: ${buffer.byteLength} bytes`);
 
       // Upload to Supabase Storage in a 'personal-files' folder with the userId as a subfolder
       const { data, error } = await supabaseAdmin.storage
@@ -123,8 +117,6 @@ export async function POST(req: NextRequest) {
         );
       }
 
-      console.log(`File uploaded to Supabase, path: ${userId}/${fileName}`);
-
       // Get public URL
       const { data: publicURLData } = supabaseAdmin.storage
         .from("personal-files")
@@ -138,17 +130,20 @@ export async function POST(req: NextRequest) {
         );
       }
 
-      console.log(`Public URL generated: ${publicURLData.publicUrl}`);
-
       // Use our custom helper to create the personal file upload
-      const upload = await createPersonalFileUpload({
-        fileName: file.name,
-        fileUrl: publicURLData.publicUrl,
-        fileType: file.type,
-        userId: userId
-      });
-
-      console.log(`Upload record created in database with ID: ${upload.id}`);
+      let upload;
+      try {
+        upload = await createPersonalFileUpload({
+          fileName: file.name,
+          fileUrl: publicURLData.publicUrl,
+          fileType: file.type,
+          userId: userId
+        });
+      } catch (dbError) {
+        // Don't leave a stored file that no upload record points at
+        await removeObjects("personal-files", [`${userId}/${fileName}`]);
+        throw dbError;
+      }
 
       return NextResponse.json({ 
         message: "File uploaded successfully",
@@ -168,4 +163,4 @@ export async function POST(req: NextRequest) {
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
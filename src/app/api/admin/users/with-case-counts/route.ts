@@ -1,20 +1,16 @@
 import { NextResponse } from 'next/server';
-import { getServerSession } from 'next-auth';
-import { prisma } from '@/lib/db';
-import { authOptions } from '@/lib/auth';
+import { getAdminStats } from '@/lib/admin-stats';
+import { authenticate } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
-export async function GET() {
+export const GET = traced("/api/admin/users/with-case-counts", async function GET(request: Request) {
   // Verify user is authenticated and is an admin
-  const session = await getServerSession(authOptions);
-  
-  if (!session || !session.user) {
-    return NextResponse.json(
-      { message: 'Unauthorized' },
-      { status: 401 }
-    );
+  const auth = await authenticate(request, 'message');
+  if (auth.response) {
+    return auth.response;
   }
-  
-  if (session.user.role !== 'ADMIN') {
+
+  if (auth.user.role !== 'ADMIN') {
     return NextResponse.json(
       { message: 'Forbidden: Requires admin privileges' },
       { status: 403 }
@@ -22,49 +18,18 @@ export async function GET() {
   }
   
   try {
-    // Get all users with their case counts, excluding PERSONAL cases
-    const users = await prisma.user.findMany({
-      where: {
-        role: { 
-          in: ['ADMIN', 'USER'] 
-        }
-      },
-      include: {
-        cases: {
-          where: {
-            caseType: {
-              not: 'PERSONAL'
-            }
-          },
-          select: {
-            id: true
-          }
-        },
-        _count: {
-          select: {
-            cases: {
-              where: {
-                caseType: {
-                  not: 'PERSONAL'
-                }
-              }
-            }
-          }
-        }
-      },
-      orderBy: {
-        name: 'asc'
-      }
-    });
-    
-    // Transform the data to include caseCount (excluding PERSONAL cases)
-    const usersWithCounts = users.map(user => ({
-      id: user.id,
-      name: user.name,
-      email: user.email,
-      role: user.role,
-      caseCount: user._count.cases
-    }));
+    // Case counts (excluding PERSONAL cases) come from the grouped,
+    // cached admin statistics rather than loading every case id
+    const stats = await getAdminStats();
+    const usersWithCounts = stats.casesByUser
+      .filter(user => ['ADMIN', 'USER'].includes(user.role))
+      .map(user => ({
+        id: user.id,
+        name: user.name,
+        email: user.email,
+        role: user.role,
+        caseCount: user.caseCount
+      }));
     
     return NextResponse.json({ users: usersWithCounts });
   } catch (error) {
@@ -74,4 +39,4 @@ export async function GET() {
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
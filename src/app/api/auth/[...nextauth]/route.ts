@@ -1,5 +1,7 @@
 import NextAuth from "next-auth";
 import { authOptions } from "@/lib/auth";
+import { traced } from "@/lib/tracing";
 
 const handler = NextAuth(authOptions);
-export { handler as GET, handler as POST };
+export const GET = traced("/api/auth/[...nextauth]", handler);
+export const POST = traced("/api/auth/[...nextauth]", handler);
@@ -1,26 +1,23 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
 import { prisma } from "@/lib/db";
-import { authOptions } from "@/lib/auth";
+import { invalidateAdminStats } from "@/lib/admin-stats";
+import { authenticate, invalidateCaseAccess } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
 // POST /api/cases/[caseId]/assign - Assign a case to a different user
-export async function POST(
+export const POST = traced("/api/cases/[caseId]/assign", async function POST(
   request: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-    
     // Check if user is authenticated and is an admin
-    if (!session || !session.user) {
-      return NextResponse.json(
-        { error: "Unauthorized" },
-        { status: 401 }
-      );
+    const auth = await authenticate(request);
+    if (auth.response) {
+      return auth.response;
     }
 
     // Only admins can assign cases
-    if (session.user.role !== "ADMIN") {
+    if (auth.user.role !== "ADMIN") {
       return NextResponse.json(
         { error: "Only admins can assign cases" },
         { status: 403 }
@@ -100,6 +97,8 @@ export async function POST(
         },
       }
     });
+    invalidateAdminStats();
+    invalidateCaseAccess(caseId);
     
     // Get counts of preserved notes and files
     const preservedNotesCount = await prisma.note.count({
@@ -137,4 +136,4 @@ export async function POST(
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
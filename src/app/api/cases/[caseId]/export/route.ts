@@ -0,0 +1,78 @@
+import { NextRequest, NextResponse } from "next/server";
+import { authoriseCase } from "@/lib/request-context";
+import {
+  CONTENT_TYPES,
+  caseFileVersion,
+  getCachedCaseFile,
+  loadCaseFile,
+  parseExportFormat,
+  renderCaseFile,
+  setCachedCaseFile,
+} from "@/lib/case-export";
+import { traced } from "@/lib/tracing";
+
+// GET /api/cases/[caseId]/export?format=pdf|csv - Download one case file
+//
+// The case with its parties, hearing history, notes and attached documents,
+// as a printable PDF (default) or a CSV of its hearings. Rendered files are
+// cached per case version: the ETag is that version, so an unchanged case
+// answers If-None-Match with 304, and X-Export-Cache says whether the file
+// was rendered for this request (miss) or served from the cache (hit).
+export const GET = traced("/api/cases/[caseId]/export", async function GET(
+  request: NextRequest,
+  { params }: { params: { caseId: string } }
+) {
+  try {
+    const { caseId } = await params;
+    const auth = await authoriseCase(request, caseId, { action: "view" });
+    if (auth.response) {
+      return auth.response;
+    }
+
+    const format = parseExportFormat(new URL(request.url).searchParams.get("format"));
+    if (!format) {
+      return NextResponse.json({ error: "format must be pdf or csv" }, { status: 400 });
+    }
+
+    const current = await caseFileVersion(caseId);
+    if (!current) {
+      return NextResponse.json(
+        { error: "Case not found" },
+        { status: 404 }
+      );
+    }
+
+    const etag = `"${format}-${current.version}"`;
+    const headers: Record<string, string> = {
+      "Content-Type": CONTENT_TYPES[format],
+      "Content-Disposition": `attachment; filename="case-${caseId}.${format}"`,
+      "Cache-Control": "private, no-cache",
+      ETag: etag,
+    };
+    if (request.headers.get("if-none-match") === etag) {
+      return new NextResponse(null, { status: 304, headers: { ETag: etag } });
+    }
+
+    let body = getCachedCaseFile(caseId, format, current.version);
+    headers["X-Export-Cache"] = body ? "hit" : "miss";
+    if (!body) {
+      const caseFile = await loadCaseFile(caseId);
+      if (!caseFile) {
+        return NextResponse.json(
+          { error: "Case not found" },
+          { status: 404 }
+        );
+      }
+      body = renderCaseFile(caseFile, format);
+      setCachedCaseFile(caseId, format, current.version, body);
+    }
+
+    return new NextResponse(new Uint8Array(body), { headers });
+  } catch (error) {
+    console.error("Error exporting case:", error);
+    return NextResponse.json(
+      { error: "An error occurred while exporting the case" },
+      { status: 500 }
+    );
+  }
+});
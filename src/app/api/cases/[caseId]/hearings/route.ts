@@ -1,49 +1,23 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
 import { prisma } from "@/lib/db";
+import { invalidateAdminStats } from "@/lib/admin-stats";
+import { authoriseCase } from "@/lib/request-context";
+import { checkCaseVersion } from "@/lib/case-version";
+import { parseCaseListPage, toPageBy } from "@/lib/pagination";
+import { traced } from "@/lib/tracing";
 
 // POST /api/cases/[caseId]/hearings - Create a new hearing
-export async function POST(
+export const POST = traced("/api/cases/[caseId]/hearings", async function POST(
   request: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-
-    // Check if user is authenticated
-    if (!session || !session.user) {
-      return NextResponse.json(
-        { error: "Unauthorized" },
-        { status: 401 }
-      );
-    }
-
     const caseId = params.caseId;
-    
-    // Fetch the case to check if it exists
-    const caseDetail = await prisma.case.findUnique({
-      where: { id: caseId },
-    });
-
-    // Check if case exists
-    if (!caseDetail) {
-      return NextResponse.json(
-        { error: "Case not found" },
-        { status: 404 }
-      );
-    }
 
-    // Check if user has access to the case
-    const isAdmin = session.user.role === "ADMIN";
-    const isOwner = caseDetail.userId === session.user.id;
-    
     // Only admin or owner can add hearings
-    if (!isAdmin && !isOwner) {
-      return NextResponse.json(
-        { error: "You don't have permission to add hearings to this case" },
-        { status: 403 }
-      );
+    const auth = await authoriseCase(request, caseId, { action: "add hearings to" });
+    if (auth.response) {
+      return auth.response;
     }
 
     const data = await request.json();
@@ -66,6 +40,7 @@ export async function POST(
         caseId,
       },
     });
+    invalidateAdminStats();
 
     return NextResponse.json(hearing, { status: 201 });
   } catch (error) {
@@ -75,58 +50,56 @@ export async function POST(
       { status: 500 }
     );
   }
-}
+});
 
-// GET /api/cases/[caseId]/hearings - Get all hearings for a case
-export async function GET(
+// GET /api/cases/[caseId]/hearings - Get all hearings for a case, latest first
+//
+// With limit and/or cursor, responds with one page as { hearings, nextCursor }
+// instead. Carries the case's version as ETag / Last-Modified and answers
+// a matching If-None-Match / If-Modified-Since with 304.
+export const GET = traced("/api/cases/[caseId]/hearings", async function GET(
   request: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
+    const caseId = params.caseId;
 
-    // Check if user is authenticated
-    if (!session || !session.user) {
-      return NextResponse.json(
-        { error: "Unauthorized" },
-        { status: 401 }
-      );
+    // Only admin or owner can view hearings
+    const auth = await authoriseCase(request, caseId, { action: "view hearings for" });
+    if (auth.response) {
+      return auth.response;
     }
 
-    const caseId = params.caseId;
-    
-    // Fetch the case to check if it exists
-    const caseDetail = await prisma.case.findUnique({
-      where: { id: caseId },
-    });
-
-    // Check if case exists
-    if (!caseDetail) {
-      return NextResponse.json(
-        { error: "Case not found" },
-        { status: 404 }
-      );
+    const page = parseCaseListPage(new URL(request.url).searchParams);
+    if ("error" in page) {
+      return NextResponse.json({ error: page.error }, { status: 400 });
     }
 
-    // Check if user has access to the case
-    const isAdmin = session.user.role === "ADMIN";
-    const isOwner = caseDetail.userId === session.user.id;
-    
-    // Only admin or owner can view hearings
-    if (!isAdmin && !isOwner) {
-      return NextResponse.json(
-        { error: "You don't have permission to view hearings for this case" },
-        { status: 403 }
-      );
+    const version = await checkCaseVersion(request, caseId);
+    if (!version) {
+      return NextResponse.json({ error: "Case not found" }, { status: 404 });
+    }
+    if (version.notModified) {
+      return version.notModified;
     }
 
-    // Fetch all hearings for the case
+    const { cursor } = page;
     const hearings = await prisma.hearing.findMany({
-      where: { caseId },
-      orderBy: { date: 'desc' },
+      where: {
+        caseId,
+        ...(cursor
+          ? { OR: [{ date: { lt: cursor.updatedAt } }, { date: cursor.updatedAt, id: { lt: cursor.id } }] }
+          : {}),
+      },
+      orderBy: [{ date: "desc" }, { id: "desc" }],
+      ...(page.paged ? { take: page.limit + 1 } : {}),
     });
 
-    return NextResponse.json(hearings);
+    if (!page.paged) {
+      return NextResponse.json(hearings, { headers: version.headers });
+    }
+    const { items, nextCursor } = toPageBy(hearings, page.limit, (hearing) => hearing.date);
+    return NextResponse.json({ hearings: items, nextCursor }, { headers: version.headers });
   } catch (error) {
     console.error("Error fetching hearings:", error);
     return NextResponse.json(
@@ -134,4 +107,4 @@ export async function GET(
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
@@ -1,64 +1,31 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
 import { prisma } from "@/lib/db";
+import { authoriseCase } from "@/lib/request-context";
+import { checkCaseVersion } from "@/lib/case-version";
+import { parseCaseListPage, toPageBy } from "@/lib/pagination";
+import { traced } from "@/lib/tracing";
 
 // Add this temporary test endpoint
-export async function POST(
+export const POST = traced("/api/cases/[caseId]/notes", async function POST(
   req: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    console.log(`Starting POST to add note to case: ${params.caseId}`);
-    
-    // Get the authenticated user
-    const session = await getServerSession(authOptions);
-    if (!session || !session.user) {
-      console.log("Unauthorized - No valid session");
-      return NextResponse.json(
-        { message: "Unauthorized" },
-        { status: 401 }
-      );
-    }
-
-    console.log(`Authenticated user: ${session.user.id} (${session.user.name})`);
-    
     // Get the caseId from params
     const { caseId } = params;
 
-    // Get the case and verify it exists
-    const caseData = await prisma.case.findUnique({
-      where: { id: caseId },
-    });
-
-    if (!caseData) {
-      console.log(`Case not found: ${caseId}`);
-      return NextResponse.json(
-        { message: "Case not found" },
-        { status: 404 }
-      );
-    }
-
-    console.log(`Case found: ${caseData.id}, userId: ${caseData.userId}`);
-    
     // Check if user has permission to add notes to this case
-    const isAdmin = session.user.role === "ADMIN";
-    if (!isAdmin && caseData.userId !== session.user.id) {
-      console.log(`Forbidden - User ${session.user.id} doesn't own case ${caseId}`);
-      return NextResponse.json(
-        { message: "Forbidden" },
-        { status: 403 }
-      );
+    const auth = await authoriseCase(req, caseId, { action: "add notes to", key: "message", forbidden: "Forbidden" });
+    if (auth.response) {
+      return auth.response;
     }
+    const { user } = auth;
 
     // Parse request body
     const body = await req.json();
     const { content } = body;
     
-    console.log(`Received note content: ${content ? 'Valid content' : 'Empty content'}`);
-    
     if (!content || typeof content !== "string" || content.trim() === "") {
-      console.log("Invalid note content");
       return NextResponse.json(
         { message: "Note content is required" },
         { status: 400 }
@@ -66,12 +33,11 @@ export async function POST(
     }
 
     // Create the note
-    console.log("Creating note in database");
     const note = await prisma.note.create({
       data: {
         content,
         caseId,
-        userId: session.user.id,
+        userId: user.id,
       },
       include: {
         user: {
@@ -83,7 +49,6 @@ export async function POST(
       },
     });
 
-    console.log(`Note created successfully with ID: ${note.id}`);
     return NextResponse.json(note);
   } catch (error) {
     console.error("Error adding note:", error);
@@ -92,50 +57,48 @@ export async function POST(
       { status: 500 }
     );
   }
-}
+});
 
-export async function GET(
+// GET /api/cases/[caseId]/notes - Get all notes for a case, newest first
+//
+// With limit and/or cursor, responds with one page as { notes, nextCursor }
+// instead. Carries the case's version as ETag / Last-Modified and answers
+// a matching If-None-Match / If-Modified-Since with 304.
+export const GET = traced("/api/cases/[caseId]/notes", async function GET(
   req: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    // Get the authenticated user
-    const session = await getServerSession(authOptions);
-    if (!session || !session.user) {
-      return NextResponse.json(
-        { message: "Unauthorized" },
-        { status: 401 }
-      );
-    }
-
     // Get the caseId from params
     const { caseId } = params;
 
-    // Get the case
-    const caseData = await prisma.case.findUnique({
-      where: { id: caseId },
-    });
+    // Check if user has permission to view this case
+    const auth = await authoriseCase(req, caseId, { action: "view", key: "message", forbidden: "Forbidden" });
+    if (auth.response) {
+      return auth.response;
+    }
 
-    if (!caseData) {
-      return NextResponse.json(
-        { message: "Case not found" },
-        { status: 404 }
-      );
+    const page = parseCaseListPage(new URL(req.url).searchParams);
+    if ("error" in page) {
+      return NextResponse.json({ message: page.error }, { status: 400 });
     }
 
-    // Check if user has permission to view this case
-    const isAdmin = session.user.role === "ADMIN";
-    if (!isAdmin && caseData.userId !== session.user.id) {
-      return NextResponse.json(
-        { message: "Forbidden" },
-        { status: 403 }
-      );
+    const version = await checkCaseVersion(req, caseId);
+    if (!version) {
+      return NextResponse.json({ message: "Case not found" }, { status: 404 });
+    }
+    if (version.notModified) {
+      return version.notModified;
     }
 
-    // Get all notes for the case
+    // Get the notes for the case
+    const { cursor } = page;
     const notes = await prisma.note.findMany({
       where: {
         caseId,
+        ...(cursor
+          ? { OR: [{ createdAt: { lt: cursor.updatedAt } }, { createdAt: cursor.updatedAt, id: { lt: cursor.id } }] }
+          : {}),
       },
       include: {
         user: {
@@ -146,12 +109,15 @@ export async function GET(
           },
         },
       },
-      orderBy: {
-        createdAt: "desc",
-      },
+      orderBy: [{ createdAt: "desc" }, { id: "desc" }],
+      ...(page.paged ? { take: page.limit + 1 } : {}),
     });
 
-    return NextResponse.json(notes);
+    if (!page.paged) {
+      return NextResponse.json(notes, { headers: version.headers });
+    }
+    const { items, nextCursor } = toPageBy(notes, page.limit, (note) => note.createdAt);
+    return NextResponse.json({ notes: items, nextCursor }, { headers: version.headers });
   } catch (error) {
     console.error("Error fetching notes:", error);
     return NextResponse.json(
@@ -159,4 +125,4 @@ export async function GET(
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
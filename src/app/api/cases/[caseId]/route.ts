@@ -1,22 +1,71 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
 import { prisma } from "@/lib/db";
-import { authOptions } from "@/lib/auth";
+import { invalidateAdminStats } from "@/lib/admin-stats";
+import { authoriseCase, invalidateCaseAccess } from "@/lib/request-context";
+import {
+  CaseBusyError,
+  CaseVersionConflictError,
+  PartyEditInput,
+  applyPartyDiff,
+  diffParties,
+  lockCaseVersion,
+} from "@/lib/case-edit";
+import { caseVersionHeaders, checkCaseVersion, ifMatchVersion, nextCaseVersion } from "@/lib/case-version";
+import { traced } from "@/lib/tracing";
 
 // GET /api/cases/[caseId] - Get a specific case by ID
-export async function GET(
+//
+// The case with its parties, owner and every hearing, latest first. With
+// summary=true the hearings are left out in favour of the latest one and
+// counts of the case's hearings, notes and uploads; page through those
+// with GET .../hearings, .../notes and .../upload.
+//
+// Carries the case's version as ETag / Last-Modified; a matching
+// If-None-Match / If-Modified-Since gets a 304 without loading the case.
+export const GET = traced("/api/cases/[caseId]", async function GET(
   request: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
+    const { caseId } = params;
 
-    // Check if user is authenticated
-    if (!session || !session.user) {
-      return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+    // Check the user is the owner or an admin
+    const auth = await authoriseCase(request, caseId, { action: "view" });
+    if (auth.response) {
+      return auth.response;
     }
 
-    const { caseId } = params;
+    const version = await checkCaseVersion(request, caseId);
+    if (!version) {
+      return NextResponse.json({ error: "Case not found" }, { status: 404 });
+    }
+    if (version.notModified) {
+      return version.notModified;
+    }
+
+    const summary = new URL(request.url).searchParams.get("summary") === "true";
+    const user = { select: { id: true, name: true, email: true } };
+
+    if (summary) {
+      const found = await prisma.case.findUnique({
+        where: { id: caseId },
+        include: {
+          petitioners: true,
+          respondents: true,
+          hearings: { orderBy: [{ date: "desc" }, { id: "desc" }], take: 1 },
+          user,
+          _count: { select: { hearings: true, notes: true, uploads: true } },
+        },
+      });
+      if (!found) {
+        return NextResponse.json({ error: "Case not found" }, { status: 404 });
+      }
+      const { hearings, _count, ...caseSummary } = found;
+      return NextResponse.json(
+        { ...caseSummary, version: version.updatedAt, latestHearing: hearings[0] ?? null, counts: _count },
+        { headers: version.headers }
+      );
+    }
 
     // Get the case with details
     const caseDetail = await prisma.case.findUnique({
@@ -27,33 +76,19 @@ export async function GET(
         hearings: {
           orderBy: { date: "desc" },
         },
-        user: {
-          select: {
-            id: true,
-            name: true,
-            email: true,
-          },
-        },
+        user,
       },
     });
 
-    // Check if case exists
+    // Check if case exists (it may have been deleted since the check)
     if (!caseDetail) {
       return NextResponse.json({ error: "Case not found" }, { status: 404 });
     }
 
-    // Check if user is the owner or an admin
-    const isAdmin = session.user.role === "ADMIN";
-    const isOwner = caseDetail.userId === session.user.id;
-
-    if (!isAdmin && !isOwner) {
-      return NextResponse.json(
-        { error: "You do not have permission to view this case" },
-        { status: 403 }
-      );
-    }
-
-    return NextResponse.json(caseDetail);
+    return NextResponse.json(
+      { ...caseDetail, version: version.updatedAt },
+      { headers: version.headers }
+    );
   } catch (error) {
     console.error("Error getting case:", error);
     return NextResponse.json(
@@ -61,47 +96,34 @@ export async function GET(
       { status: 500 }
     );
   }
-}
+});
 
 // PUT /api/cases/[caseId] - Update a case
-export async function PUT(
+//
+// Send the case's ETag (its version) as If-Match to make the edit
+// conditional: if the case changed since, it answers 409. A 409 with
+// Retry-After means another save of the case was in progress; the edit can
+// be sent again as is. See src/lib/case-edit.ts for how parties are diffed
+// and written.
+export const PUT = traced("/api/cases/[caseId]", async function PUT(
   request: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-
-    // Check if user is authenticated
-    if (!session || !session.user) {
-      return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
-    }
-
     const { caseId } = params;
-    const data = await request.json();
 
-    // Get the case to verify ownership
-    const caseDetail = await prisma.case.findUnique({
-      where: { id: caseId },
-      select: {
-        userId: true,
-      },
-    });
-
-    // Check if case exists
-    if (!caseDetail) {
-      return NextResponse.json({ error: "Case not found" }, { status: 404 });
+    // Check the user is the owner or an admin
+    const auth = await authoriseCase(request, caseId, { action: "update" });
+    if (auth.response) {
+      return auth.response;
     }
+    const { isAdmin } = auth;
 
-    // Check if user is the owner or an admin
-    const isAdmin = session.user.role === "ADMIN";
-    const isOwner = caseDetail.userId === session.user.id;
-
-    if (!isAdmin && !isOwner) {
-      return NextResponse.json(
-        { error: "You do not have permission to update this case" },
-        { status: 403 }
-      );
+    const expected = ifMatchVersion(request);
+    if (expected === null) {
+      return NextResponse.json({ error: "If-Match must be a case ETag" }, { status: 400 });
     }
+    const data = await request.json();
 
     // Extract and validate the input
     const {
@@ -110,16 +132,53 @@ export async function PUT(
       registrationNum,
       title,
       courtName,
-      petitioners,
-      respondents,
-      petitionersToDelete,
-      respondentsToDelete,
+      petitioners = [],
+      respondents = [],
+      petitionersToDelete = [],
+      respondentsToDelete = [],
       isCompleted,
     } = data;
 
-    // Start a transaction
+    if (
+      ![petitioners, respondents, petitionersToDelete, respondentsToDelete].every(Array.isArray)
+    ) {
+      return NextResponse.json({ error: "Parties must be arrays" }, { status: 400 });
+    }
+    if ([...petitioners, ...respondents].some((party: PartyEditInput) => !party?.name)) {
+      return NextResponse.json(
+        { error: "Every petitioner and respondent needs a name" },
+        { status: 400 }
+      );
+    }
+
+    // The stored parties to diff against, the case row they belong to and
+    // the case's version
+    const partySelect = { select: { id: true, name: true, advocate: true } };
+    const current = await prisma.case.findUnique({
+      where: { id: caseId },
+      select: {
+        updatedAt: true,
+        version: { select: { updatedAt: true } },
+        petitioners: partySelect,
+        respondents: partySelect,
+      },
+    });
+    if (!current) {
+      return NextResponse.json({ error: "Case not found" }, { status: 404 });
+    }
+    if (expected && expected.getTime() !== current.version?.updatedAt.getTime()) {
+      throw new CaseVersionConflictError();
+    }
+
+    const petitionerDiff = diffParties(current.petitioners, petitioners, petitionersToDelete);
+    const respondentDiff = diffParties(current.respondents, respondents, respondentsToDelete);
+
+    // A fixed number of statements, and none of them waits on another edit
     const updatedCase = await prisma.$transaction(async (tx) => {
-      // Update the case
+      await lockCaseVersion(tx, caseId, current.updatedAt, expected);
+      await applyPartyDiff(tx, "Petitioner", caseId, petitionerDiff);
+      await applyPartyDiff(tx, "Respondent", caseId, respondentDiff);
+
       const updated = await tx.case.update({
         where: { id: caseId },
         data: {
@@ -129,138 +188,57 @@ export async function PUT(
           title,
           courtName,
           ...(isAdmin && isCompleted !== undefined ? { isCompleted } : {}),
+          updatedAt: nextCaseVersion(current.updatedAt),
         },
       });
-
-      // Delete petitioners marked for deletion
-      if (petitionersToDelete && petitionersToDelete.length > 0) {
-        await tx.petitioner.deleteMany({
-          where: {
-            id: {
-              in: petitionersToDelete,
-            },
-            caseId,
-          },
-        });
-      }
-
-      // Delete respondents marked for deletion
-      if (respondentsToDelete && respondentsToDelete.length > 0) {
-        await tx.respondent.deleteMany({
-          where: {
-            id: {
-              in: respondentsToDelete,
-            },
-            caseId,
-          },
-        });
-      }
-
-      // Update existing and create new petitioners
-      for (const petitioner of petitioners) {
-        if (petitioner.isNew) {
-          // Create new petitioner
-          await tx.petitioner.create({
-            data: {
-              name: petitioner.name,
-              // Use optional chaining to handle potentially null advocate field
-              ...(petitioner.advocate ? { advocate: petitioner.advocate } : {}),
-              case: {
-                connect: { id: caseId },
-              },
-            },
-          });
-        } else if (petitioner.id) {
-          // Update existing petitioner
-          await tx.petitioner.update({
-            where: { id: petitioner.id },
-            data: {
-              name: petitioner.name,
-              // Use optional chaining to handle potentially null advocate field
-              ...(petitioner.advocate ? { advocate: petitioner.advocate } : {}),
-            },
-          });
-        }
-      }
-
-      // Update existing and create new respondents
-      for (const respondent of respondents) {
-        if (respondent.isNew) {
-          // Create new respondent
-          await tx.respondent.create({
-            data: {
-              name: respondent.name,
-              // Use optional chaining to handle potentially null advocate field
-              ...(respondent.advocate ? { advocate: respondent.advocate } : {}),
-              case: {
-                connect: { id: caseId },
-              },
-            },
-          });
-        } else if (respondent.id) {
-          // Update existing respondent
-          await tx.respondent.update({
-            where: { id: respondent.id },
-            data: {
-              name: respondent.name,
-              // Use optional chaining to handle potentially null advocate field
-              ...(respondent.advocate ? { advocate: respondent.advocate } : {}),
-            },
-          });
-        }
-      }
-
-      return updated;
+      // Moved on by the case's update trigger
+      const version = await tx.caseVersion.findUniqueOrThrow({
+        where: { caseId },
+        select: { updatedAt: true },
+      });
+      return { ...updated, version: version.updatedAt };
     });
+    invalidateAdminStats();
 
-    return NextResponse.json(updatedCase);
+    return NextResponse.json(updatedCase, {
+      headers: caseVersionHeaders(updatedCase.version),
+    });
   } catch (error) {
+    if (error instanceof CaseVersionConflictError) {
+      return NextResponse.json({ error: error.message }, { status: 409 });
+    }
+    if (error instanceof CaseBusyError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: 409, headers: { "Retry-After": "1" } }
+      );
+    }
     console.error("Error updating case:", error);
     return NextResponse.json(
       { error: "An error occurred while updating the case" },
       { status: 500 }
     );
   }
-}
+});
 
 // PATCH /api/cases/[caseId] - Update specific fields of a case (currently only isCompleted)
-export async function PATCH(
+export const PATCH = traced("/api/cases/[caseId]", async function PATCH(
   request: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-
-    // Check if user is authenticated
-    if (!session || !session.user) {
-      return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
-    }
-
-    // Only admins can update completion status
-    const isAdmin = session.user.role === "ADMIN";
-    if (!isAdmin) {
-      return NextResponse.json(
-        { error: "Only admins can update case completion status" },
-        { status: 403 }
-      );
-    }
-
     const { caseId } = await params;
-    const data = await request.json();
 
-    // Get the case to verify it exists
-    const caseDetail = await prisma.case.findUnique({
-      where: { id: caseId },
-      select: {
-        id: true,
-        isCompleted: true,
-      },
+    // Only admins can update completion status
+    const auth = await authoriseCase(request, caseId, {
+      action: "update",
+      adminOnly: true,
+      forbidden: "Only admins can update case completion status",
     });
-
-    // Check if case exists
-    if (!caseDetail) {
-      return NextResponse.json({ error: "Case not found" }, { status: 404 });
+    if (auth.response) {
+      return auth.response;
     }
+    const data = await request.json();
 
     // Extract the isCompleted field from the request body
     const { isCompleted } = data;
@@ -282,6 +260,7 @@ export async function PATCH(
         isCompleted: true,
       },
     });
+    invalidateAdminStats();
 
     return NextResponse.json(updatedCase);
   } catch (error) {
@@ -291,51 +270,28 @@ export async function PATCH(
       { status: 500 }
     );
   }
-}
+});
 
 // DELETE /api/cases/[caseId] - Delete a case
-export async function DELETE(
+export const DELETE = traced("/api/cases/[caseId]", async function DELETE(
   request: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-
-    // Check if user is authenticated
-    if (!session || !session.user) {
-      return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
-    }
-
     const { caseId } = params;
 
-    // Get the case to verify ownership
-    const caseDetail = await prisma.case.findUnique({
-      where: { id: caseId },
-      select: {
-        userId: true,
-      },
-    });
-
-    // Check if case exists
-    if (!caseDetail) {
-      return NextResponse.json({ error: "Case not found" }, { status: 404 });
-    }
-
-    // Check if user is the owner or an admin
-    const isAdmin = session.user.role === "ADMIN";
-    const isOwner = caseDetail.userId === session.user.id;
-
-    if (!isAdmin && !isOwner) {
-      return NextResponse.json(
-        { error: "You do not have permission to delete this case" },
-        { status: 403 }
-      );
+    // Check the user is the owner or an admin
+    const auth = await authoriseCase(request, caseId, { action: "delete" });
+    if (auth.response) {
+      return auth.response;
     }
 
     // Delete the case (cascade will handle related records)
     await prisma.case.delete({
       where: { id: caseId },
     });
+    invalidateCaseAccess(caseId);
+    invalidateAdminStats();
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -345,4 +301,4 @@ export async function DELETE(
       { status: 500 }
     );
   }
-}
+});
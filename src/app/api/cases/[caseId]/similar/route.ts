@@ -0,0 +1,49 @@
+import { NextRequest, NextResponse } from "next/server";
+import { authoriseCase } from "@/lib/request-context";
+import { DEFAULT_SIMILAR_CASES, MAX_SIMILAR_CASES, findSimilarCases } from "@/lib/case-similarity";
+import { traced } from "@/lib/tracing";
+
+// GET /api/cases/[caseId]/similar?limit= - Cases most like this one
+//
+// Ranks the cases the caller can see by TF-IDF similarity of titles, party
+// names and advocates, hearing notes and purposes and notes (see
+// src/lib/case-similarity.ts). Responds with { results }, best match first,
+// each carrying its score and latest hearing. limit defaults to 5, max 20.
+export const GET = traced("/api/cases/[caseId]/similar", async function GET(
+  request: NextRequest,
+  { params }: { params: { caseId: string } }
+) {
+  try {
+    const { caseId } = await params;
+    const auth = await authoriseCase(request, caseId, { action: "view" });
+    if (auth.response) {
+      return auth.response;
+    }
+    const { user, isAdmin } = auth;
+
+    const searchParams = new URL(request.url).searchParams;
+    const limitParam = searchParams.get("limit");
+    const limit = limitParam ? Number(limitParam) : DEFAULT_SIMILAR_CASES;
+    if (!Number.isInteger(limit) || limit < 1) {
+      return NextResponse.json({ error: "limit must be a positive integer" }, { status: 400 });
+    }
+
+    const results = await findSimilarCases(
+      caseId,
+      {
+        userId: user.id,
+        isAdmin,
+        includePERSONAL: searchParams.get("includePERSONAL") === "true",
+      },
+      Math.min(limit, MAX_SIMILAR_CASES)
+    );
+
+    return NextResponse.json({ results });
+  } catch (error) {
+    console.error("Error finding similar cases:", error);
+    return NextResponse.json(
+      { error: "An error occurred while finding similar cases" },
+      { status: 500 }
+    );
+  }
+});
@@ -1,215 +1,152 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
 import { prisma } from "@/lib/db";
-import { supabaseAdmin, initializeStorage } from "@/lib/supabase";
-
-// Helper to get current Unix timestamp to ensure unique filenames
-const getUniqueFileName = (originalName: string) => {
-  const timestamp = Date.now();
-  
-  // Handle files with no extension
-  if (!originalName.includes('.')) {
-    return `file_${timestamp}`;
-  }
-  
-  const extension = originalName.split(".").pop()?.toLowerCase() || "";
-  const baseName = originalName
-    .split(".")
-    .slice(0, -1)
-    .join(".")
-    .replace(/[^a-zA-Z0-9]/g, "_")
-    .substring(0, 50); // Limit length of base name
-  
-  return `${baseName}_${timestamp}.${extension}`;
-};
-
-export async function POST(
+import { authoriseCase } from "@/lib/request-context";
+import { checkCaseVersion } from "@/lib/case-version";
+import { parseCaseListPage, toPageBy } from "@/lib/pagination";
+import { ensureStorage } from "@/lib/supabase";
+import {
+  ALLOWED_UPLOAD_TYPES,
+  CASE_FILES_BUCKET,
+  MAX_FILES_PER_REQUEST,
+  MAX_UPLOAD_SIZE,
+  UPLOAD_CONCURRENCY,
+  getUniqueFileName,
+  mapWithConcurrency,
+  publicUrl,
+  putObject,
+  removeObjects,
+} from "@/lib/case-uploads";
+import { traced } from "@/lib/tracing";
+
+// POST /api/cases/[caseId]/upload - Upload one or more files to a case
+//
+// Multipart form with one or more "file" fields. Files are transferred to
+// storage in parallel and their Upload rows are written in one insert; if
+// the insert fails, the stored files are removed again.
+// Responds with { uploads, failed, upload } where upload is the first
+// created row (kept for single-file callers). Large files are better sent
+// through resumable upload sessions, see upload/sessions.
+export const POST = traced("/api/cases/[caseId]/upload", async function POST(
   req: NextRequest,
   { params }: { params: { caseId: string } }
 ) {
   try {
-    console.log(`Starting file upload for case: ${params.caseId}`);
-    
     // Extract caseId from params
     const { caseId } = await params;
-    
-    // Get the authenticated user
-    const session = await getServerSession(authOptions);
-    if (!session || !session.user) {
-      console.log("Unauthorized - No valid session");
-      return NextResponse.json(
-        { message: "Unauthorized" },
-        { status: 401 }
-      );
-    }
 
-    console.log(`Authenticated user: ${session.user.id} (${session.user.name})`);
-    
-    // Get the case and verify ownership (unless admin)
-    const caseData = await prisma.case.findUnique({
-      where: { id: caseId },
+    // Check the user may add files to this case
+    const auth = await authoriseCase(req, caseId, {
+      action: "upload to",
+      key: "message",
+      forbidden: "Forbidden",
     });
-
-    if (!caseData) {
-      console.log(`Case not found: ${caseId}`);
-      return NextResponse.json(
-        { message: "Case not found" },
-        { status: 404 }
-      );
-    }
-
-    console.log(`Case found: ${caseData.id}, userId: ${caseData.userId}`);
-
-    // Check if user has permission to add to this case
-    const isAdmin = session.user.role === "ADMIN";
-    if (!isAdmin && caseData.userId !== session.user.id) {
-      console.log(`Forbidden - User ${session.user.id} doesn't own case ${caseId}`);
-      return NextResponse.json(
-        { message: "Forbidden" },
-        { status: 403 }
-      );
+    if (auth.response) {
+      return auth.response;
     }
+    const { user } = auth;
 
-    // Initialize storage bucket
-    console.log("Initializing storage buckets");
-    try {
-      await initializeStorage();
-      console.log("Storage buckets initialized successfully");
-    } catch (storageError) {
-      console.error("Failed to initialize storage buckets:", storageError);
-      return NextResponse.json(
-        { 
-          message: "Failed to initialize storage", 
-          details: storageError instanceof Error ? storageError.message : "Unknown storage initialization error"
-        },
-        { status: 500 }
-      );
-    }
-
-    // Parse form data (file)
+    // Parse form data (files)
     const formData = await req.formData();
-    const file = formData.get("file") as File;
-    
-    if (!file) {
-      console.log("No file provided in form data");
+    const files = formData.getAll("file").filter((entry): entry is File => entry instanceof File);
+
+    if (files.length === 0) {
       return NextResponse.json(
         { message: "No file provided" },
         { status: 400 }
       );
     }
 
-    console.log(`Received file: ${file.name}, type: ${file.type}, size: ${file.size} bytes`);
-    
-    // Validate file type
-    const allowedTypes = ["image/jpeg", "image/png", "application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"];
-    if (!allowedTypes.includes(file.type)) {
-      console.log(`Invalid file type: ${file.type}`);
+    if (files.length > MAX_FILES_PER_REQUEST) {
       return NextResponse.json(
-        { message: `Invalid file type: ${file.type}. Only JPG, PNG, PDF, DOC, and DOCX files are allowed.` },
+        { message: `At most ${MAX_FILES_PER_REQUEST} files can be uploaded per request` },
         { status: 400 }
       );
     }
 
-    // Create a unique file name
-    const fileName = getUniqueFileName(file.name);
-    console.log(`Generated unique filename: ${fileName}`);
-    
-    // Get file buffer
-    let buffer;
-    try {
-      buffer = await file.arrayBuffer();
-      console.log(`File buffer created, size: ${buffer.byteLength} bytes`);
-    } catch (bufferError) {
-      console.error("Failed to create file buffer:", bufferError);
-      return NextResponse.json(
-        { message: "Failed to process file", details: bufferError instanceof Error ? bufferError.message : "Unknown buffer error" },
-        { status: 500 }
-      );
+    // Validate every file before transferring any of them
+    for (const file of files) {
+      if (!ALLOWED_UPLOAD_TYPES.includes(file.type)) {
+        return NextResponse.json(
+          { message: `Invalid file type: ${file.type}. Only JPG, PNG, PDF, DOC, and DOCX files are allowed.` },
+          { status: 400 }
+        );
+      }
+      if (file.size > MAX_UPLOAD_SIZE) {
+        return NextResponse.json(
+          { message: `${file.name} exceeds the maximum upload size` },
+          { status: 400 }
+        );
+      }
     }
 
-    // Upload to Supabase Storage
-    console.log(`Uploading to Supabase Storage bucket 'case-files/${caseId}/${fileName}'`);
-    let data, error;
+    // Buckets are checked once per server process, not per request
     try {
-      const uploadResult = await supabaseAdmin.storage
-        .from("case-files")
-        .upload(`${caseId}/${fileName}`, buffer, {
-          contentType: file.type,
-        });
-      
-      data = uploadResult.data;
-      error = uploadResult.error;
-    } catch (uploadError) {
-      console.error("Unexpected error during Supabase upload:", uploadError);
+      await ensureStorage();
+    } catch (storageError) {
+      console.error("Failed to initialize storage buckets:", storageError);
       return NextResponse.json(
-        { 
-          message: "Unexpected error during file upload", 
-          details: uploadError instanceof Error ? uploadError.message : "Unknown upload error" 
+        {
+          message: "Failed to initialize storage",
+          details: storageError instanceof Error ? storageError.message : "Unknown storage initialization error"
         },
         { status: 500 }
       );
     }
 
-    if (error) {
-      console.error("Supabase storage error:", error);
-      return NextResponse.json(
-        { message: "Error uploading file to storage", details: error.message },
-        { status: 500 }
-      );
-    }
-
-    // Get public URL
-    let publicURLData;
-    try {
-      const urlResult = supabaseAdmin.storage
-        .from("case-files")
-        .getPublicUrl(`${caseId}/${fileName}`);
-      
-      publicURLData = urlResult.data;
-      
-      if (!publicURLData || !publicURLData.publicUrl) {
-        console.error("Failed to get public URL for uploaded file");
-        return NextResponse.json(
-          { message: "Failed to get public URL for uploaded file" },
-          { status: 500 }
-        );
+    const transfers = await mapWithConcurrency(files, UPLOAD_CONCURRENCY, async (file) => {
+      const path = `${caseId}/${getUniqueFileName(file.name)}`;
+      try {
+        await putObject(CASE_FILES_BUCKET, path, file);
+        return { file, path, url: publicUrl(CASE_FILES_BUCKET, path) };
+      } catch (uploadError) {
+        console.error(`Storage upload failed for ${file.name}:`, uploadError);
+        return {
+          file,
+          error: uploadError instanceof Error ? uploadError.message : "Unknown upload error",
+        };
       }
-    } catch (urlError) {
-      console.error("Error getting public URL:", urlError);
+    });
+
+    const stored = transfers.filter((t) => t.url);
+    const failed = transfers
+      .filter((t) => t.error)
+      .map((t) => ({ fileName: t.file.name, error: t.error }));
+
+    if (stored.length === 0) {
       return NextResponse.json(
-        { message: "Failed to get file URL", details: urlError instanceof Error ? urlError.message : "Unknown URL error" },
+        { message: "Error uploading file to storage", failed },
         { status: 500 }
       );
     }
 
-    console.log(`Public URL generated: ${publicURLData.publicUrl}`);
-
-    // Save file info to database
-    console.log("Creating upload record in database");
-    let upload;
+    // Save file info to database in one insert
+    let uploads;
     try {
-      upload = await prisma.upload.create({
-        data: {
-          fileName: file.name,
-          fileUrl: publicURLData.publicUrl,
-          fileType: file.type,
+      uploads = await prisma.upload.createManyAndReturn({
+        data: stored.map((t) => ({
+          fileName: t.file.name,
+          fileUrl: t.url!,
+          fileType: t.file.type,
           caseId,
-          userId: session.user.id
-        },
+          userId: user.id,
+        })),
       });
     } catch (dbError) {
-      console.error("Database error while creating upload record:", dbError);
+      console.error("Database error while creating upload records:", dbError);
+      await removeObjects(CASE_FILES_BUCKET, stored.map((t) => t.path!));
       return NextResponse.json(
         { message: "Database error while creating upload record", details: dbError instanceof Error ? dbError.message : "Unknown database error" },
         { status: 500 }
       );
     }
 
-    console.log(`Upload record created with ID: ${upload.id}`);
-    return NextResponse.json({ 
-      message: "File uploaded successfully",
-      upload 
+    return NextResponse.json({
+      message: failed.length
+        ? `${uploads.length} of ${files.length} files uploaded`
+        : uploads.length === 1 ? "File uploaded successfully" : `${uploads.length} files uploaded successfully`,
+      upload: uploads[0],
+      uploads,
+      failed,
     });
   } catch (error) {
     console.error("Upload error:", error);
@@ -218,4 +155,60 @@ export async function POST(
       { status: 500 }
     );
   }
-}
+});
+
+// GET /api/cases/[caseId]/upload - Get all files of a case, newest first
+//
+// With limit and/or cursor, responds with one page as { uploads, nextCursor }
+// instead. Carries the case's version as ETag / Last-Modified and answers
+// a matching If-None-Match / If-Modified-Since with 304.
+export const GET = traced("/api/cases/[caseId]/upload", async function GET(
+  req: NextRequest,
+  { params }: { params: { caseId: string } }
+) {
+  try {
+    const { caseId } = await params;
+
+    const auth = await authoriseCase(req, caseId, { action: "view", key: "message", forbidden: "Forbidden" });
+    if (auth.response) {
+      return auth.response;
+    }
+
+    const page = parseCaseListPage(new URL(req.url).searchParams);
+    if ("error" in page) {
+      return NextResponse.json({ message: page.error }, { status: 400 });
+    }
+
+    const version = await checkCaseVersion(req, caseId);
+    if (!version) {
+      return NextResponse.json({ message: "Case not found" }, { status: 404 });
+    }
+    if (version.notModified) {
+      return version.notModified;
+    }
+
+    const { cursor } = page;
+    const uploads = await prisma.upload.findMany({
+      where: {
+        caseId,
+        ...(cursor
+          ? { OR: [{ createdAt: { lt: cursor.updatedAt } }, { createdAt: cursor.updatedAt, id: { lt: cursor.id } }] }
+          : {}),
+      },
+      orderBy: [{ createdAt: "desc" }, { id: "desc" }],
+      ...(page.paged ? { take: page.limit + 1 } : {}),
+    });
+
+    if (!page.paged) {
+      return NextResponse.json(uploads, { headers: version.headers });
+    }
+    const { items, nextCursor } = toPageBy(uploads, page.limit, (upload) => upload.createdAt);
+    return NextResponse.json({ uploads: items, nextCursor }, { headers: version.headers });
+  } catch (error) {
+    console.error("Error fetching uploads:", error);
+    return NextResponse.json(
+      { message: "Internal server error" },
+      { status: 500 }
+    );
+  }
+});
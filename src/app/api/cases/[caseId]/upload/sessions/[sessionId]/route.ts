@@ -0,0 +1,152 @@
+import { NextRequest, NextResponse } from "next/server";
+import { prisma } from "@/lib/db";
+import { isUniqueViolation } from "@/lib/case-input";
+import { authoriseCase } from "@/lib/request-context";
+import {
+  CASE_FILES_BUCKET,
+  RESUMABLE_CHUNK_SIZE,
+  UploadSession,
+  decodeUploadSession,
+  getResumableOffset,
+  isExpiredUploadSession,
+  publicUrl,
+  sendResumableChunk,
+} from "@/lib/case-uploads";
+import { traced } from "@/lib/tracing";
+
+type RouteParams = { params: { caseId: string; sessionId: string } };
+
+// Resolves the session in the URL, or an error response when the caller
+// did not start it, may no longer upload to the case, or it has expired
+async function loadSession(req: NextRequest, { params }: RouteParams) {
+  const { caseId, sessionId } = await params;
+
+  const auth = await authoriseCase(req, caseId, {
+    action: "upload to",
+    key: "message",
+    forbidden: "Forbidden",
+  });
+  if (auth.response) {
+    return { error: auth.response };
+  }
+
+  const upload = decodeUploadSession(sessionId);
+  if (!upload || upload.caseId !== caseId || upload.userId !== auth.user.id) {
+    return { error: NextResponse.json({ message: "Upload session not found" }, { status: 404 }) };
+  }
+  if (isExpiredUploadSession(upload)) {
+    return { error: NextResponse.json({ message: "Upload session expired; start a new one" }, { status: 410 }) };
+  }
+  return { upload };
+}
+
+// Writes the Upload row once storage holds the whole file; safe to repeat,
+// also concurrently (fileUrl is unique)
+async function recordUpload(upload: UploadSession) {
+  const fileUrl = publicUrl(CASE_FILES_BUCKET, upload.path);
+  try {
+    return await prisma.upload.upsert({
+      where: { fileUrl },
+      update: {},
+      create: {
+        fileName: upload.fileName,
+        fileUrl,
+        fileType: upload.fileType,
+        caseId: upload.caseId,
+        userId: upload.userId,
+      },
+    });
+  } catch (error) {
+    // A concurrent request created it between the upsert's lookup and insert
+    if (isUniqueViolation(error)) {
+      return prisma.upload.findUniqueOrThrow({ where: { fileUrl } });
+    }
+    throw error;
+  }
+}
+
+// GET /api/cases/[caseId]/upload/sessions/[sessionId] - Offset to resume from
+export const GET = traced("/api/cases/[caseId]/upload/sessions/[sessionId]", async function GET(req: NextRequest, context: RouteParams) {
+  try {
+    const loaded = await loadSession(req, context);
+    if ("error" in loaded) {
+      return loaded.error;
+    }
+    const { upload } = loaded;
+
+    const offset = await getResumableOffset(upload.uploadId);
+    return NextResponse.json({
+      offset,
+      size: upload.size,
+      ...(offset === upload.size ? { upload: await recordUpload(upload) } : {}),
+    });
+  } catch (error) {
+    console.error("Error reading upload session:", error);
+    return NextResponse.json(
+      { message: "Failed to read upload status" },
+      { status: 500 }
+    );
+  }
+});
+
+// PATCH /api/cases/[caseId]/upload/sessions/[sessionId] - Append one chunk
+//
+// Headers: Upload-Offset (bytes already sent). The raw body is piped to
+// storage without being buffered. Responds with the new { offset, size },
+// plus the created upload once the last chunk lands. A 409 carries the
+// offset storage actually holds, to resume from; an expired session gets
+// 410 and the file has to be sent again in a new one.
+export const PATCH = traced("/api/cases/[caseId]/upload/sessions/[sessionId]", async function PATCH(req: NextRequest, context: RouteParams) {
+  try {
+    const loaded = await loadSession(req, context);
+    if ("error" in loaded) {
+      return loaded.error;
+    }
+    const { upload } = loaded;
+
+    const offset = Number(req.headers.get("Upload-Offset"));
+    const length = Number(req.headers.get("Content-Length"));
+    const isLast = offset + length === upload.size;
+    if (
+      !Number.isInteger(offset) ||
+      offset % RESUMABLE_CHUNK_SIZE !== 0 ||
+      !Number.isInteger(length) ||
+      length < 1 ||
+      (length !== RESUMABLE_CHUNK_SIZE && !isLast) ||
+      offset + length > upload.size
+    ) {
+      return NextResponse.json(
+        { message: `Chunks must be ${RESUMABLE_CHUNK_SIZE} bytes at a chunk boundary, except the last` },
+        { status: 400 }
+      );
+    }
+
+    if (!req.body) {
+      return NextResponse.json({ message: "Chunk body is required" }, { status: 400 });
+    }
+
+    let newOffset;
+    try {
+      newOffset = await sendResumableChunk(upload.uploadId, offset, req.body);
+    } catch (chunkError) {
+      console.error("Chunk upload failed:", chunkError);
+      const current = await getResumableOffset(upload.uploadId);
+      return NextResponse.json(
+        { message: "Chunk was not stored; resume from offset", offset: current, size: upload.size },
+        { status: 409 }
+      );
+    }
+
+    return NextResponse.json({
+      offset: newOffset,
+      size: upload.size,
+      ...(newOffset === upload.size ? { upload: await recordUpload(upload) } : {}),
+    });
+  } catch (error) {
+    console.error("Error uploading chunk:", error);
+    return NextResponse.json(
+      { message: "Failed to upload chunk" },
+      { status: 500 }
+    );
+  }
+});
@@ -0,0 +1,90 @@
+import { NextRequest, NextResponse } from "next/server";
+import { authoriseCase } from "@/lib/request-context";
+import { ensureStorage } from "@/lib/supabase";
+import {
+  ALLOWED_UPLOAD_TYPES,
+  CASE_FILES_BUCKET,
+  MAX_UPLOAD_SIZE,
+  RESUMABLE_CHUNK_SIZE,
+  createResumableUpload,
+  encodeUploadSession,
+  getUniqueFileName,
+} from "@/lib/case-uploads";
+import { traced } from "@/lib/tracing";
+
+// POST /api/cases/[caseId]/upload/sessions - Start a resumable upload
+//
+// Body: { fileName, fileType, size }. Responds 201 with
+// { sessionId, offset, size, chunkSize }; the file is then sent as raw
+// chunks of chunkSize bytes (the last may be shorter) with
+// PATCH .../sessions/[sessionId]. After a dropped connection,
+// GET .../sessions/[sessionId] reports the offset to continue from.
+export const POST = traced("/api/cases/[caseId]/upload/sessions", async function POST(
+  req: NextRequest,
+  { params }: { params: { caseId: string } }
+) {
+  try {
+    const { caseId } = await params;
+
+    const auth = await authoriseCase(req, caseId, {
+      action: "upload to",
+      key: "message",
+      forbidden: "Forbidden",
+    });
+    if (auth.response) {
+      return auth.response;
+    }
+
+    const { fileName, fileType, size } = await req.json();
+
+    if (!fileName || typeof fileName !== "string") {
+      return NextResponse.json(
+        { message: "fileName is required" },
+        { status: 400 }
+      );
+    }
+
+    if (!ALLOWED_UPLOAD_TYPES.includes(fileType)) {
+      return NextResponse.json(
+        { message: `Invalid file type: ${fileType}. Only JPG, PNG, PDF, DOC, and DOCX files are allowed.` },
+        { status: 400 }
+      );
+    }
+
+    if (!Number.isInteger(size) || size < 1 || size > MAX_UPLOAD_SIZE) {
+      return NextResponse.json(
+        { message: "size must be a positive number of bytes within the upload limit" },
+        { status: 400 }
+      );
+    }
+
+    await ensureStorage();
+
+    const path = `${caseId}/${getUniqueFileName(fileName)}`;
+    const uploadId = await createResumableUpload(CASE_FILES_BUCKET, path, fileType, size);
+
+    return NextResponse.json(
+      {
+        sessionId: encodeUploadSession({
+          uploadId,
+          caseId,
+          userId: auth.user.id,
+          fileName,
+          fileType,
+          size,
+          path,
+        }),
+        offset: 0,
+        size,
+        chunkSize: RESUMABLE_CHUNK_SIZE,
+      },
+      { status: 201 }
+    );
+  } catch (error) {
+    console.error("Error starting upload session:", error);
+    return NextResponse.json(
+      { message: "Failed to start upload", details: error instanceof Error ? error.message : "Unknown error" },
+      { status: 500 }
+    );
+  }
+});
@@ -0,0 +1,181 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getRequestUser } from "@/lib/request-context";
+import { prisma } from "@/lib/db";
+import { invalidateAdminStats } from "@/lib/admin-stats";
+import {
+  CreateCaseInput,
+  caseCreateData,
+  caseKey,
+  isUniqueViolation,
+  validateCaseInput,
+} from "@/lib/case-input";
+import { traced } from "@/lib/tracing";
+
+// Largest batch accepted in one request
+const MAX_BATCH_SIZE = 500;
+// Cases written per transaction
+const CHUNK_SIZE = 100;
+
+type BatchStatus = "created" | "conflict" | "invalid" | "error";
+
+interface BatchResult {
+  index: number;
+  status: BatchStatus;
+  id?: string;
+  error?: string;
+}
+
+interface PendingCase {
+  index: number;
+  data: CreateCaseInput;
+  userId: string;
+}
+
+// POST /api/cases/batch - Create many cases in one request
+//
+// Body: { cases: CreateCaseInput[] } (each may carry a hearings array).
+// Every record is validated before anything is written; valid records are
+// then created in chunked transactions. The response lists one result per
+// input record, in order, with status created | conflict | invalid | error.
+export const POST = traced("/api/cases/batch", async function POST(request: NextRequest) {
+  try {
+    const user = await getRequestUser(request);
+
+    // Check if user is authenticated
+    if (!user) {
+      return NextResponse.json(
+        { error: "Unauthorized" },
+        { status: 401 }
+      );
+    }
+
+    const body = await request.json();
+    const records = body?.cases as CreateCaseInput[] | undefined;
+
+    if (!Array.isArray(records) || records.length === 0) {
+      return NextResponse.json(
+        { error: "A non-empty cases array is required" },
+        { status: 400 }
+      );
+    }
+
+    if (records.length > MAX_BATCH_SIZE) {
+      return NextResponse.json(
+        { error: `At most ${MAX_BATCH_SIZE} cases can be created per request` },
+        { status: 400 }
+      );
+    }
+
+    const isAdmin = user.role === "ADMIN";
+    const results: BatchResult[] = new Array(records.length);
+    const pending: PendingCase[] = [];
+    const batchKeys = new Set<string>();
+
+    // Validate every record up front
+    records.forEach((data, index) => {
+      const validationError = validateCaseInput(data);
+      if (validationError) {
+        results[index] = { index, status: "invalid", error: validationError };
+        return;
+      }
+
+      const key = caseKey(data);
+      if (batchKeys.has(key)) {
+        results[index] = { index, status: "conflict", error: "Duplicate case in batch" };
+        return;
+      }
+      batchKeys.add(key);
+
+      // Ensure user can only create cases for themselves unless admin
+      const userId = isAdmin && data.userId ? data.userId : user.id;
+      pending.push({ index, data, userId });
+    });
+
+    // Reject assignments to users that do not exist
+    const targetUserIds = Array.from(new Set(pending.map((p) => p.userId)));
+    const knownUsers = await prisma.user.findMany({
+      where: { id: { in: targetUserIds } },
+      select: { id: true },
+    });
+    const knownUserIds = new Set(knownUsers.map((u) => u.id));
+
+    // Look up existing keys with a single query
+    const existing = pending.length
+      ? await prisma.case.findMany({
+          where: {
+            OR: pending.map((p) => ({
+              caseType: p.data.caseType,
+              registrationYear: Number(p.data.registrationYear),
+              registrationNum: Number(p.data.registrationNum),
+            })),
+          },
+          select: { caseType: true, registrationYear: true, registrationNum: true },
+        })
+      : [];
+    const existingKeys = new Set(existing.map(caseKey));
+
+    const toCreate = pending.filter((p) => {
+      if (!knownUserIds.has(p.userId)) {
+        results[p.index] = { index: p.index, status: "invalid", error: "User not found" };
+        return false;
+      }
+      if (existingKeys.has(caseKey(p.data))) {
+        results[p.index] = { index: p.index, status: "conflict", error: "Case already exists" };
+        return false;
+      }
+      return true;
+    });
+
+    // Write in chunked transactions
+    for (let start = 0; start < toCreate.length; start += CHUNK_SIZE) {
+      const chunk = toCreate.slice(start, start + CHUNK_SIZE);
+
+      try {
+        const created = await prisma.$transaction(
+          chunk.map((p) =>
+            prisma.case.create({
+              data: caseCreateData(p.data, p.userId),
+              select: { id: true },
+            })
+          )
+        );
+        created.forEach((c, i) => {
+          results[chunk[i].index] = { index: chunk[i].index, status: "created", id: c.id };
+        });
+      } catch (error) {
+        // A concurrent writer took one of the keys; retry this chunk one
+        // case at a time so every record still gets its own result
+        console.error("Batch chunk failed, retrying individually:", error);
+        for (const p of chunk) {
+          try {
+            const c = await prisma.case.create({
+              data: caseCreateData(p.data, p.userId),
+              select: { id: true },
+            });
+            results[p.index] = { index: p.index, status: "created", id: c.id };
+          } catch (itemError) {
+            results[p.index] = isUniqueViolation(itemError)
+              ? { index: p.index, status: "conflict", error: "Case already exists" }
+              : { index: p.index, status: "error", error: "An error occurred while creating the case" };
+          }
+        }
+      }
+    }
+
+    const summary = { created: 0, conflict: 0, invalid: 0, error: 0 };
+    results.forEach((r) => {
+      summary[r.status] += 1;
+    });
+    if (summary.created > 0) {
+      invalidateAdminStats();
+    }
+
+    return NextResponse.json({ results, summary }, { status: 200 });
+  } catch (error) {
+    console.error("Error creating cases in batch:", error);
+    return NextResponse.json(
+      { error: "An error occurred while creating the cases" },
+      { status: 500 }
+    );
+  }
+});
@@ -0,0 +1,76 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getRequestUser } from "@/lib/request-context";
+import {
+  CONTENT_TYPES,
+  MAX_SYNC_EXPORT_ROWS,
+  countExportRows,
+  parseExportFilters,
+  parseExportFormat,
+  renderList,
+  toReadableStream,
+} from "@/lib/case-export";
+import { traced } from "@/lib/tracing";
+
+// GET /api/cases/export - Download a docket or cause list as PDF or CSV
+//
+// Query parameters:
+//   kind                   docket (default, cases by case number) or causelist
+//                          (hearings listed in the window, earliest first)
+//   format                 pdf (default) or csv
+//   from, to               cause lists only: half-open window (default: today + 30 days)
+//   userId                 one advocate's cases (admin only)
+//   caseType, isCompleted  filter the cases
+//   includePERSONAL        admins only see PERSONAL cases when this is true
+//
+// The file is streamed while it is rendered. Lists longer than
+// MAX_SYNC_EXPORT_ROWS are refused with 400; start an export job with
+// POST /api/exports instead.
+export const GET = traced("/api/cases/export", async function GET(request: NextRequest) {
+  try {
+    const user = await getRequestUser(request);
+
+    // Check if user is authenticated
+    if (!user) {
+      return NextResponse.json(
+        { error: "Unauthorized" },
+        { status: 401 }
+      );
+    }
+
+    const params = new URL(request.url).searchParams;
+    const format = parseExportFormat(params.get("format"));
+    if (!format) {
+      return NextResponse.json({ error: "format must be pdf or csv" }, { status: 400 });
+    }
+    const filters = parseExportFilters(params, user);
+    if ("error" in filters) {
+      return NextResponse.json({ error: filters.error }, { status: 400 });
+    }
+
+    const rows = await countExportRows(filters);
+    if (rows > MAX_SYNC_EXPORT_ROWS) {
+      return NextResponse.json(
+        {
+          error: `This export has ${rows} rows; lists over ${MAX_SYNC_EXPORT_ROWS} rows must be exported with POST /api/exports`,
+          rows,
+        },
+        { status: 400 }
+      );
+    }
+
+    return new NextResponse(toReadableStream(renderList(filters, format)), {
+      headers: {
+        "Content-Type": CONTENT_TYPES[format],
+        "Content-Disposition": `attachment; filename="${filters.kind}.${format}"`,
+        "Cache-Control": "private, no-store",
+        "X-Export-Rows": String(rows),
+      },
+    });
+  } catch (error) {
+    console.error("Error exporting cases:", error);
+    return NextResponse.json(
+      { error: "An error occurred while exporting cases" },
+      { status: 500 }
+    );
+  }
+});
@@ -1,38 +1,19 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
+import { getRequestUser } from "@/lib/request-context";
 import { prisma } from "@/lib/db";
+import { invalidateAdminStats } from "@/lib/admin-stats";
 import { Prisma } from "@prisma/client";
-
-// Define types for the request data
-interface PetitionerInput {
-  name: string;
-  advocate?: string | null;
-}
-
-interface RespondentInput {
-  name: string;
-  advocate?: string | null;
-}
-
-interface CreateCaseInput {
-  caseType: string;
-  registrationNum: number;
-  registrationYear: number;
-  title?: string;
-  courtName: string;
-  userId?: string;
-  petitioners: PetitionerInput[];
-  respondents: RespondentInput[];
-}
+import { CreateCaseInput, caseCreateData, validateCaseInput } from "@/lib/case-input";
+import { CursorKey, afterCursor, decodeCursor, parseLimit, toPage } from "@/lib/pagination";
+import { traced } from "@/lib/tracing";
 
 // POST /api/cases - Create a new case
-export async function POST(request: NextRequest) {
+export const POST = traced("/api/cases", async function POST(request: NextRequest) {
   try {
-    const session = await getServerSession(authOptions);
+    const user = await getRequestUser(request);
 
     // Check if user is authenticated
-    if (!session || !session.user) {
+    if (!user) {
       return NextResponse.json(
         { error: "Unauthorized" },
         { status: 401 }
@@ -42,61 +23,27 @@ export async function POST(request: NextRequest) {
     const data = await request.json() as CreateCaseInput;
     
     // Validate input
-    if (!data.caseType || !data.registrationNum || !data.registrationYear) {
-      return NextResponse.json(
-        { error: "Case type, registration number, and year are required" },
-        { status: 400 }
-      );
-    }
-
-    // Validate at least one petitioner and respondent
-    if (!data.petitioners?.length || !data.respondents?.length) {
+    const validationError = validateCaseInput(data);
+    if (validationError) {
       return NextResponse.json(
-        { error: "At least one petitioner and one respondent are required" },
+        { error: validationError },
         { status: 400 }
       );
     }
 
     // Ensure user can only create cases for themselves unless admin
-    const isAdmin = session.user.role === "ADMIN";
-    const userId = isAdmin && data.userId ? data.userId : session.user.id;
-
-    // Generate title if not provided
-    if (!data.title && data.petitioners.length > 0 && data.respondents.length > 0) {
-      data.title = `${data.petitioners[0].name} vs ${data.respondents[0].name}`;
-    }
+    const isAdmin = user.role === "ADMIN";
+    const userId = isAdmin && data.userId ? data.userId : user.id;
 
     // Create case with petitioners and respondents
     const newCase = await prisma.case.create({
-      data: {
-        caseType: data.caseType,
-        registrationNum: data.registrationNum,
-        registrationYear: data.registrationYear,
-        title: data.title || "",
-        courtName: data.courtName,
-        userId: userId,
-        
-        // Create petitioners
-        petitioners: {
-          create: data.petitioners.map((p) => ({
-            name: p.name,
-            advocate: p.advocate,
-          })),
-        },
-        
-        // Create respondents
-        respondents: {
-          create: data.respondents.map((r) => ({
-            name: r.name,
-            advocate: r.advocate,
-          })),
-        },
-      },
+      data: caseCreateData(data, userId),
       include: {
         petitioners: true,
         respondents: true,
       },
     });
+    invalidateAdminStats();
 
     return NextResponse.json(newCase, { status: 201 });
   } catch (error) {
@@ -106,49 +53,165 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
+});
+
+// Scalar columns a caller may pick with ?fields=
+const CASE_FIELDS = [
+  "id",
+  "caseType",
+  "registrationYear",
+  "registrationNum",
+  "title",
+  "courtName",
+  "createdAt",
+  "updatedAt",
+  "userId",
+  "isCompleted",
+] as const;
+
+// Relations a caller may pick with ?include= (hearings is the latest one only)
+const CASE_INCLUDES = ["petitioners", "respondents", "hearings", "user"] as const;
+const DEFAULT_INCLUDES = ["petitioners", "respondents", "hearings"];
+
+function parseList(value: string | null, allowed: readonly string[], fallback: readonly string[]) {
+  if (value === null) {
+    return { values: [...fallback] };
+  }
+  const values = value.split(",").map((v) => v.trim()).filter(Boolean);
+  const unknown = values.filter((v) => !allowed.includes(v));
+  return unknown.length ? { error: unknown.join(", ") } : { values };
+}
+
+function parseDateParam(value: string | null): Date | null | undefined {
+  if (!value) {
+    return undefined;
+  }
+  const date = new Date(value);
+  return isNaN(date.getTime()) ? null : date;
 }
 
-// GET /api/cases - Get all cases (for admin) or user's cases
-export async function GET(request: NextRequest) {
+// GET /api/cases - Get a page of cases (all for admin, own cases for users)
+//
+// Query parameters:
+//   limit, cursor          page size (default 50, max 200) and nextCursor from the previous page
+//   fields                 comma-separated scalar columns (default: all)
+//   include                comma-separated relations: petitioners,respondents,hearings,user
+//                          (default: petitioners,respondents,hearings; empty for none)
+//   court, caseType, isCompleted, userId (admin only)
+//   nextHearingFrom, nextHearingTo   cases with a hearing whose nextDate is in range
+//   includePERSONAL        admins only see PERSONAL cases when this is true
+//
+// Responds with { cases, nextCursor }, ordered by updatedAt then id, newest first.
+export const GET = traced("/api/cases", async function GET(request: NextRequest) {
   try {
-    const session = await getServerSession(authOptions);
+    const user = await getRequestUser(request);
 
     // Check if user is authenticated
-    if (!session || !session.user) {
+    if (!user) {
       return NextResponse.json(
         { error: "Unauthorized" },
         { status: 401 }
       );
     }
 
-    const isAdmin = session.user.role === "ADMIN";
+    const isAdmin = user.role === "ADMIN";
     // Parse URL to get query parameters
-    const url = new URL(request.url);
-    const includePERSONAL = url.searchParams.get('includePERSONAL') === 'true';
-    
-    // Get cases based on user role, filtering out PERSONAL cases for admin unless explicitly requested
-    const cases = await prisma.case.findMany({
-      where: isAdmin 
-        ? includePERSONAL 
-          ? {} // Include all cases if explicitly requested
-          : { caseType: { not: 'PERSONAL' } } // Filter out PERSONAL cases for admin by default
-        : { userId: session.user.id }, // Users always see all their own cases including PERSONAL
-      include: {
-        petitioners: true,
-        respondents: true,
+    const params = new URL(request.url).searchParams;
+    const includePERSONAL = params.get("includePERSONAL") === "true";
+
+    const limit = parseLimit(params.get("limit"));
+    if (limit === null) {
+      return NextResponse.json({ error: "limit must be a positive integer" }, { status: 400 });
+    }
+
+    const cursorToken = params.get("cursor");
+    const cursor = cursorToken ? decodeCursor(cursorToken) : null;
+    if (cursorToken && !cursor) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const fields = parseList(params.get("fields"), CASE_FIELDS, CASE_FIELDS);
+    const includes = parseList(params.get("include"), CASE_INCLUDES, DEFAULT_INCLUDES);
+    if (fields.error || includes.error) {
+      return NextResponse.json(
+        { error: `Unknown field: ${fields.error || includes.error}` },
+        { status: 400 }
+      );
+    }
+
+    const nextHearingFrom = parseDateParam(params.get("nextHearingFrom"));
+    const nextHearingTo = parseDateParam(params.get("nextHearingTo"));
+    if (nextHearingFrom === null || nextHearingTo === null) {
+      return NextResponse.json({ error: "Invalid next hearing date" }, { status: 400 });
+    }
+
+    const isCompleted = params.get("isCompleted");
+    if (isCompleted !== null && isCompleted !== "true" && isCompleted !== "false") {
+      return NextResponse.json({ error: "isCompleted must be true or false" }, { status: 400 });
+    }
+
+    const caseType = params.get("caseType");
+    const court = params.get("court");
+    const userId = params.get("userId");
+
+    // Users always see all their own cases including PERSONAL; admins see
+    // PERSONAL cases only when explicitly requested
+    const filters: Prisma.CaseWhereInput[] = [];
+    if (!isAdmin) {
+      filters.push({ userId: user.id });
+    } else {
+      if (!includePERSONAL && caseType !== "PERSONAL") {
+        filters.push({ caseType: { not: "PERSONAL" } });
+      }
+      if (userId) {
+        filters.push({ userId });
+      }
+    }
+    if (caseType) {
+      filters.push({ caseType });
+    }
+    if (court) {
+      filters.push({ courtName: { contains: court, mode: "insensitive" } });
+    }
+    if (isCompleted !== null) {
+      filters.push({ isCompleted: isCompleted === "true" });
+    }
+    if (nextHearingFrom || nextHearingTo) {
+      filters.push({
         hearings: {
-          orderBy: {
-            date: 'desc',
-          },
-          take: 1,
+          some: { nextDate: { gte: nextHearingFrom, lte: nextHearingTo } },
         },
-      },
-      orderBy: {
-        updatedAt: 'desc',
-      },
+      });
+    }
+    if (cursor) {
+      filters.push(afterCursor(cursor));
+    }
+
+    // id and updatedAt are always selected because they form the cursor
+    const select: Prisma.CaseSelect = { id: true, updatedAt: true };
+    for (const field of fields.values!) {
+      select[field as keyof Prisma.CaseSelect] = true;
+    }
+    for (const relation of includes.values!) {
+      if (relation === "hearings") {
+        select.hearings = { orderBy: { date: "desc" }, take: 1 };
+      } else if (relation === "user") {
+        select.user = { select: { id: true, name: true, email: true } };
+      } else {
+        select[relation as "petitioners" | "respondents"] = true;
+      }
+    }
+
+    const rows = await prisma.case.findMany({
+      where: { AND: filters },
+      select,
+      orderBy: [{ updatedAt: "desc" }, { id: "desc" }],
+      take: limit + 1,
     });
 
-    return NextResponse.json(cases);
+    const page = toPage(rows as unknown as CursorKey[], limit);
+
+    return NextResponse.json({ cases: page.items, nextCursor: page.nextCursor });
   } catch (error) {
     console.error("Error fetching cases:", error);
     return NextResponse.json(
@@ -156,4 +219,4 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-}
+});
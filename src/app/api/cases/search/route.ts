@@ -0,0 +1,69 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getRequestUser } from "@/lib/request-context";
+import { searchCases, searchTerms } from "@/lib/case-search";
+import { MAX_OFFSET, decodeOffsetCursor, encodeOffsetCursor, parseLimit } from "@/lib/pagination";
+import { traced } from "@/lib/tracing";
+
+// GET /api/cases/search?q=...&limit=&cursor= - Ranked full-text case search
+//
+// Matches titles, petitioner/respondent names and advocates, court, case
+// number and note content, with prefix matching on every term. Responds
+// with { results, nextCursor, fuzzy }; each result carries its rank, and
+// fuzzy is true when nothing matched exactly and the results are trigram
+// near-misses instead.
+export const GET = traced("/api/cases/search", async function GET(request: NextRequest) {
+  try {
+    const user = await getRequestUser(request);
+
+    // Check if user is authenticated
+    if (!user) {
+      return NextResponse.json(
+        { error: "Unauthorized" },
+        { status: 401 }
+      );
+    }
+
+    const params = new URL(request.url).searchParams;
+    const query = params.get("q") ?? "";
+    if (searchTerms(query).length === 0) {
+      return NextResponse.json(
+        { error: "Search query is required" },
+        { status: 400 }
+      );
+    }
+
+    const limit = parseLimit(params.get("limit"));
+    if (limit === null) {
+      return NextResponse.json({ error: "limit must be a positive integer" }, { status: 400 });
+    }
+
+    const cursorToken = params.get("cursor");
+    const offset = cursorToken ? decodeOffsetCursor(cursorToken) : 0;
+    if (offset === null) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const { results, hasMore, fuzzy } = await searchCases({
+      query,
+      userId: user.id,
+      isAdmin: user.role === "ADMIN",
+      includePERSONAL: params.get("includePERSONAL") === "true",
+      limit,
+      offset,
+    });
+
+    // Ranked results deeper than MAX_OFFSET are not served; refine the query instead
+    const nextOffset = offset + limit;
+    return NextResponse.json({
+      results,
+      nextCursor: hasMore && nextOffset <= MAX_OFFSET ? encodeOffsetCursor(nextOffset) : null,
+      fuzzy,
+    });
+  } catch (error) {
+    console.error("Error searching cases:", error);
+    return NextResponse.json(
+      { error: "An error occurred while searching cases" },
+      { status: 500 }
+    );
+  }
+});
@@ -0,0 +1,65 @@
+import { NextRequest, NextResponse } from "next/server";
+import { authenticate } from "@/lib/request-context";
+import {
+  currentChangeCursor,
+  decodeChangeCursor,
+  isExpiredChangeCursor,
+  parseChangeLimit,
+  readChanges,
+} from "@/lib/change-feed";
+import { traced } from "@/lib/tracing";
+
+// GET /api/changes - What changed in the caller's cases since a cursor
+//
+// Query parameters:
+//   cursor   nextCursor of the previous call; without one, responds with
+//            just { nextCursor } to follow from now (take it before a full
+//            load of the cases, so nothing changed meanwhile is missed)
+//   limit    changes to read (default 500, max 1000)
+//
+// Responds with { cases, hearings, notes, uploads, deleted, nextCursor,
+// hasMore }: the current rows of the cases, hearings, notes and uploads
+// that changed (cases as in GET /api/cases, with user), and in deleted a
+// { type, id, caseId, reason } tombstone for each row that was deleted or,
+// for users, case that was reassigned to someone else ("reassigned"); a
+// case's tombstone stands for its hearings, notes and uploads too. Call
+// again with nextCursor while hasMore. A cursor older than the feed's
+// retention gets 410; reload the cases and start over.
+export const GET = traced("/api/changes", async function GET(request: NextRequest) {
+  try {
+    const auth = await authenticate(request);
+    if (auth.response) {
+      return auth.response;
+    }
+
+    const params = new URL(request.url).searchParams;
+    const limit = parseChangeLimit(params.get("limit"));
+    if (limit === null) {
+      return NextResponse.json({ error: "limit must be a positive integer" }, { status: 400 });
+    }
+
+    const token = params.get("cursor");
+    if (!token) {
+      return NextResponse.json({ nextCursor: await currentChangeCursor() });
+    }
+    const cursor = decodeChangeCursor(token);
+    if (!cursor) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+    if (isExpiredChangeCursor(cursor)) {
+      return NextResponse.json(
+        { error: "Cursor expired; reload the cases and start over" },
+        { status: 410 }
+      );
+    }
+
+    const page = await readChanges(auth.user, cursor, limit);
+    return NextResponse.json(page, { headers: { "Cache-Control": "private, no-store" } });
+  } catch (error) {
+    console.error("Error reading changes:", error);
+    return NextResponse.json(
+      { error: "An error occurred while reading changes" },
+      { status: 500 }
+    );
+  }
+});
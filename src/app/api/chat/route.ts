@@ -1,62 +1,103 @@
-import { google } from "@ai-sdk/google";
-import { defaultSettingsMiddleware, generateText, wrapLanguageModel } from "ai";
-
-// Initialize the Google Generative AI model
-const model = wrapLanguageModel({
-  model: google("gemini-2.0-flash"),
-  middleware: defaultSettingsMiddleware({
-    settings: { providerMetadata: {} }, // customize as needed
-  }),
-});
+import { generateText, streamText } from "ai";
+import { getRequestUser } from "@/lib/request-context";
+import {
+  buildPrompt,
+  cacheKey,
+  findRelatedCases,
+  getAnswerCache,
+  getChatModel,
+  parseMessages,
+} from "@/lib/chat";
+import { traced } from "@/lib/tracing";
+
+const providerOptions = {
+  google: {
+    temperature: 0.7,
+    maxOutputTokens: 1000,
+  },
+};
+
+function jsonResponse(body: unknown, status = 200, headers: Record<string, string> = {}) {
+  return new Response(JSON.stringify(body), {
+    status,
+    headers: { "Content-Type": "application/json", ...headers },
+  });
+}
 
-export async function POST(req: Request) {
+// POST /api/chat - Ask the legal assistant
+//
+// Body: { messages: [{ role, content }], stream?: boolean }. Without stream
+// the answer comes back as { text } once complete; with stream: true the
+// answer text is streamed as plain text while it is generated.
+//
+// Only the most recent turns are sent to the model (see buildPrompt). For
+// a signed-in user the cases in their diary most similar to the question
+// are added as context; X-Chat-Cases lists their ids. Answers to standalone
+// questions are cached by normalised question text and context cases; the
+// X-Chat-Cache header says whether the answer was a cache hit.
+export const POST = traced("/api/chat", async function POST(req: Request) {
   try {
     // Parse the request body
-    const { messages } = await req.json();
-    // console.log('Full messages being sent to model:', messages);
-
-    // Format messages for the AI SDK
-    const formattedMessages = [
-      {
-        role: "system",
-        content:
-          "You are a legal assistant your answers should be based primarily on the origin country (INDIA), and you solve queries related to the country's laws, regulations, and procedures.",
-      },
-      ...messages.map((message: any) => ({
-        role: message.role === "user" ? "user" : "assistant",
-        content: message.content,
-      })),
-    ];
-    // console.log('Formatted messages:', formattedMessages);
+    const body = await req.json();
+    const messages = parseMessages(body?.messages);
+    if ("error" in messages) {
+      return jsonResponse({ error: messages.error }, 400);
+    }
 
-    // Generate the response
-    const result = await generateText({
-      model,
-      messages: formattedMessages,
-      providerOptions: {
-        google: {
-          temperature: 0.7,
-          maxOutputTokens: 1000,
+    const user = await getRequestUser(req);
+    const related = user
+      ? await findRelatedCases(messages[messages.length - 1].content, {
+          userId: user.id,
+          isAdmin: user.role === "ADMIN",
+        })
+      : [];
+    const casesHeader = { "X-Chat-Cases": related.map((c) => c.id).join(",") };
+
+    const cache = getAnswerCache();
+    const key = cacheKey(messages, related);
+    const cached = key ? cache.get(key) : undefined;
+
+    if (cached !== undefined) {
+      const headers = { "X-Chat-Cache": "hit", ...casesHeader };
+      return body.stream
+        ? new Response(cached, {
+            headers: { "Content-Type": "text/plain; charset=utf-8", ...headers },
+          })
+        : jsonResponse({ text: cached }, 200, headers);
+    }
+
+    const prompt = {
+      model: getChatModel(),
+      messages: buildPrompt(messages, related),
+      providerOptions,
+    };
+
+    if (body.stream) {
+      const result = streamText({
+        ...prompt,
+        onFinish: ({ text, finishReason }) => {
+          if (key && text && finishReason === "stop") {
+            cache.set(key, text);
+          }
+        },
+        onError: ({ error }) => {
+          console.error("Error streaming from Gemini API:", error);
         },
-      },
-    });
+      });
+      return result.toTextStreamResponse({
+        headers: { "X-Chat-Cache": "miss", ...casesHeader },
+      });
+    }
 
-    // Extract the text from the result
-    const { text } = result;
+    // Generate the response
+    const { text, finishReason } = await generateText(prompt);
+    if (key && text && finishReason === "stop") {
+      cache.set(key, text);
+    }
 
-    // Return the text as a JSON response
-    return new Response(JSON.stringify({ text }), {
-      status: 200,
-      headers: { "Content-Type": "application/json" },
-    });
+    return jsonResponse({ text }, 200, { "X-Chat-Cache": "miss", ...casesHeader });
   } catch (error) {
     console.error("Error calling Gemini API:", error);
-    return new Response(
-      JSON.stringify({ error: "Failed to process your request" }),
-      {
-        status: 500,
-        headers: { "Content-Type": "application/json" },
-      }
-    );
+    return jsonResponse({ error: "Failed to process your request" }, 500);
   }
-}
+});
@@ -0,0 +1,44 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getRequestUser } from "@/lib/request-context";
+import { prisma } from "@/lib/db";
+import { describeExportJob } from "@/lib/export-jobs";
+import { traced } from "@/lib/tracing";
+
+// GET /api/exports/[jobId] - Status of an export job
+//
+// Responds with { job }: its status (queued, running, completed or failed),
+// rows written so far and, once completed, a downloadUrl valid for an hour.
+// Jobs are only visible to the user who started them.
+export const GET = traced("/api/exports/[jobId]", async function GET(
+  request: NextRequest,
+  { params }: { params: { jobId: string } }
+) {
+  try {
+    const user = await getRequestUser(request);
+
+    // Check if user is authenticated
+    if (!user) {
+      return NextResponse.json(
+        { error: "Unauthorized" },
+        { status: 401 }
+      );
+    }
+
+    const { jobId } = await params;
+    const job = await prisma.exportJob.findUnique({ where: { id: jobId } });
+    if (!job || job.userId !== user.id) {
+      return NextResponse.json(
+        { error: "Export not found" },
+        { status: 404 }
+      );
+    }
+
+    return NextResponse.json({ job: await describeExportJob(job) });
+  } catch (error) {
+    console.error("Error fetching export:", error);
+    return NextResponse.json(
+      { error: "An error occurred while fetching the export" },
+      { status: 500 }
+    );
+  }
+});
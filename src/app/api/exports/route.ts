@@ -0,0 +1,59 @@
+import { NextRequest, NextResponse, after } from "next/server";
+import { getRequestUser } from "@/lib/request-context";
+import { parseExportFilters, parseExportFormat } from "@/lib/case-export";
+import { createExportJob, describeExportJob, runExportJob } from "@/lib/export-jobs";
+import { traced } from "@/lib/tracing";
+
+// POST /api/exports - Start a background export of a docket or cause list
+//
+// Takes the query parameters of GET /api/cases/export as a JSON body
+// ({ kind, format, from, to, userId, caseType, isCompleted,
+// includePERSONAL }) and responds 202 with { job }. The job renders after
+// the response is sent; poll GET /api/exports/[jobId] until its status is
+// completed (it then carries a downloadUrl) or failed.
+export const POST = traced("/api/exports", async function POST(request: NextRequest) {
+  try {
+    const user = await getRequestUser(request);
+
+    // Check if user is authenticated
+    if (!user) {
+      return NextResponse.json(
+        { error: "Unauthorized" },
+        { status: 401 }
+      );
+    }
+
+    let body: Record<string, unknown>;
+    try {
+      body = await request.json();
+    } catch {
+      return NextResponse.json({ error: "Body must be JSON" }, { status: 400 });
+    }
+    if (!body || typeof body !== "object" || Array.isArray(body)) {
+      return NextResponse.json({ error: "Body must be a JSON object" }, { status: 400 });
+    }
+    const params = {
+      get: (name: string) => (body[name] === undefined || body[name] === null ? null : String(body[name])),
+    };
+
+    const format = parseExportFormat(params.get("format"));
+    if (!format) {
+      return NextResponse.json({ error: "format must be pdf or csv" }, { status: 400 });
+    }
+    const filters = parseExportFilters(params, user);
+    if ("error" in filters) {
+      return NextResponse.json({ error: filters.error }, { status: 400 });
+    }
+
+    const job = await createExportJob(filters, format);
+    after(() => runExportJob(job.id));
+
+    return NextResponse.json({ job: await describeExportJob(job) }, { status: 202 });
+  } catch (error) {
+    console.error("Error starting export:", error);
+    return NextResponse.json(
+      { error: "An error occurred while starting the export" },
+      { status: 500 }
+    );
+  }
+});
@@ -0,0 +1,95 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getRequestUser } from "@/lib/request-context";
+import {
+  CALENDAR_FIELDS,
+  CalendarField,
+  getCalendarEntries,
+  parseCalendarWindow,
+  toICalendar,
+} from "@/lib/hearing-calendar";
+import { traced } from "@/lib/tracing";
+
+// GET /api/hearings/calendar - Hearings across all visible cases in a date window
+//
+// Query parameters:
+//   from, to               half-open window (default: today + 30 days, max 92 days)
+//   on                     nextDate (default, upcoming listings) or date (hearings held)
+//   userId                 one advocate's hearings (admin only)
+//   isCompleted            true | false, filter by case completion
+//   includePERSONAL        admins only see PERSONAL cases when this is true
+//   format                 json (default) or ics for an iCalendar download
+//
+// Responds with { hearings, from, to, on, truncated }, earliest first; each
+// hearing carries its case. truncated means the window held more hearings
+// than one response returns and should be narrowed; the ics download says
+// so in its X-Calendar-Truncated header.
+export const GET = traced("/api/hearings/calendar", async function GET(request: NextRequest) {
+  try {
+    const user = await getRequestUser(request);
+
+    // Check if user is authenticated
+    if (!user) {
+      return NextResponse.json(
+        { error: "Unauthorized" },
+        { status: 401 }
+      );
+    }
+
+    const params = new URL(request.url).searchParams;
+
+    const range = parseCalendarWindow(params.get("from"), params.get("to"));
+    if ("error" in range) {
+      return NextResponse.json({ error: range.error }, { status: 400 });
+    }
+
+    const on = (params.get("on") || "nextDate") as CalendarField;
+    if (!CALENDAR_FIELDS.includes(on)) {
+      return NextResponse.json({ error: "on must be nextDate or date" }, { status: 400 });
+    }
+
+    const isCompleted = params.get("isCompleted");
+    if (isCompleted !== null && isCompleted !== "true" && isCompleted !== "false") {
+      return NextResponse.json({ error: "isCompleted must be true or false" }, { status: 400 });
+    }
+
+    const format = params.get("format") || "json";
+    if (format !== "json" && format !== "ics") {
+      return NextResponse.json({ error: "format must be json or ics" }, { status: 400 });
+    }
+
+    const { hearings, truncated } = await getCalendarEntries({
+      ...range,
+      on,
+      userId: user.id,
+      isAdmin: user.role === "ADMIN",
+      ownerId: params.get("userId"),
+      includePERSONAL: params.get("includePERSONAL") === "true",
+      isCompleted: isCompleted === null ? null : isCompleted === "true",
+    });
+
+    if (format === "ics") {
+      return new NextResponse(toICalendar(hearings, on), {
+        headers: {
+          "Content-Type": "text/calendar; charset=utf-8",
+          "Content-Disposition": 'attachment; filename="hearings.ics"',
+          "Cache-Control": "private, no-store",
+          "X-Calendar-Truncated": String(truncated),
+        },
+      });
+    }
+
+    return NextResponse.json({
+      hearings,
+      from: range.from,
+      to: range.to,
+      on,
+      truncated,
+    });
+  } catch (error) {
+    console.error("Error fetching hearing calendar:", error);
+    return NextResponse.json(
+      { error: "An error occurred while fetching hearings" },
+      { status: 500 }
+    );
+  }
+});
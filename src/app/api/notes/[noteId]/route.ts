@@ -1,16 +1,15 @@
 import { NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
+import { getRequestUser } from "@/lib/request-context";
 import { prisma } from "@/lib/db";
+import { traced } from "@/lib/tracing";
 
-export async function DELETE(
+export const DELETE = traced("/api/notes/[noteId]", async function DELETE(
   request: Request,
   { params }: { params: { noteId: string } }
 ) {
   try {
-    console.log(`Starting deletion for note ID: ${params.noteId}`);
-    const session = await getServerSession(authOptions);
-    if (!session?.user) {
+    const user = await getRequestUser(request);
+    if (!user) {
       return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
     }
 
@@ -34,11 +33,9 @@ export async function DELETE(
       return NextResponse.json({ error: "Note not found" }, { status: 404 });
     }
 
-    console.log(`Note found: ${note.id}, caseId: ${note.caseId}, userId: ${note.userId}`);
-
     // Check if user owns this note directly (created it) or owns the case
-    const userId = session.user.id as string;
-    const isAdmin = session.user.role === "ADMIN";
+    const userId = user.id as string;
+    const isAdmin = user.role === "ADMIN";
     const isOwner = note.userId === userId;
     const isCaseOwner = note.case && note.case.userId === userId;
 
@@ -53,7 +50,6 @@ export async function DELETE(
     await prisma.note.delete({
       where: { id: noteId },
     });
-    console.log(`Note deleted successfully: ${noteId}`);
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -63,4 +59,4 @@ export async function DELETE(
       { status: 500 }
     );
   }
-}
+});
@@ -1,15 +1,15 @@
 import { NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
+import { getRequestUser } from "@/lib/request-context";
 import { prisma } from "@/lib/db";
+import { traced } from "@/lib/tracing";
 
-export async function PATCH(
+export const PATCH = traced("/api/tasks/[taskId]", async function PATCH(
   request: Request,
   { params }: { params: { taskId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-    if (!session?.user) {
+    const user = await getRequestUser(request);
+    if (!user) {
       return NextResponse.json(
         { error: "You must be logged in to update a task" },
         { status: 401 }
@@ -39,8 +39,8 @@ export async function PATCH(
     }
 
     // Check if user has permission to update this task
-    const userId = session.user.id as string;
-    const isAdmin = session.user.role === "ADMIN";
+    const userId = user.id as string;
+    const isAdmin = user.role === "ADMIN";
     const isCaseOwner = task.case.userId === userId;
 
     if (!isAdmin && !isCaseOwner) {
@@ -64,15 +64,15 @@ export async function PATCH(
       { status: 500 }
     );
   }
-}
+});
 
-export async function DELETE(
+export const DELETE = traced("/api/tasks/[taskId]", async function DELETE(
   request: Request,
   { params }: { params: { taskId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-    if (!session?.user) {
+    const user = await getRequestUser(request);
+    if (!user) {
       return NextResponse.json(
         { error: "You must be logged in to delete a task" },
         { status: 401 }
@@ -94,8 +94,8 @@ export async function DELETE(
     }
 
     // Check if user has permission to delete this task
-    const userId = session.user.id as string;
-    const isAdmin = session.user.role === "ADMIN";
+    const userId = user.id as string;
+    const isAdmin = user.role === "ADMIN";
     const isCaseOwner = task.case.userId === userId;
 
     if (!isAdmin && !isCaseOwner) {
@@ -118,4 +118,4 @@ export async function DELETE(
       { status: 500 }
     );
   }
-}
+});
@@ -1,15 +1,15 @@
 import { NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
+import { getRequestUser } from "@/lib/request-context";
 import { prisma } from "@/lib/db";
+import { traced } from "@/lib/tracing";
 
-export async function PATCH(
+export const PATCH = traced("/api/uploads/[uploadId]/rename", async function PATCH(
   request: Request,
   { params }: { params: { uploadId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-    if (!session?.user) {
+    const user = await getRequestUser(request);
+    if (!user) {
       return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
     }
 
@@ -45,8 +45,8 @@ export async function PATCH(
     }
 
     // Check permission to rename the file
-    const userId = session.user.id as string;
-    const isAdmin = session.user.role === "ADMIN";
+    const userId = user.id as string;
+    const isAdmin = user.role === "ADMIN";
 
     // Different permission logic based on whether it's a personal file or case file
     if (upload.caseId && upload.case) {
@@ -68,7 +68,8 @@ export async function PATCH(
       }
     }
 
-    // Update the file name in the database
+    // Update the file name in the database (a database trigger moves the
+    // case's version on, see src/lib/case-version.ts)
     const updatedUpload = await prisma.upload.update({
       where: { id: uploadId },
       data: { fileName: fileName.trim() },
@@ -85,4 +86,4 @@ export async function PATCH(
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}); 
\ No newline at end of file
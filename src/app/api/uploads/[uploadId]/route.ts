@@ -1,16 +1,16 @@
 import { NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
-import { authOptions } from "@/lib/auth";
+import { getRequestUser } from "@/lib/request-context";
 import { prisma } from "@/lib/db";
 import { supabaseAdmin } from "@/lib/supabase";
+import { traced } from "@/lib/tracing";
 
-export async function DELETE(
+export const DELETE = traced("/api/uploads/[uploadId]", async function DELETE(
   request: Request,
   { params }: { params: { uploadId: string } }
 ) {
   try {
-    const session = await getServerSession(authOptions);
-    if (!session?.user) {
+    const user = await getRequestUser(request);
+    if (!user) {
       return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
     }
 
@@ -35,8 +35,8 @@ export async function DELETE(
     }
 
     // Check permission to delete the file
-    const userId = session.user.id as string;
-    const isAdmin = session.user.role === "ADMIN";
+    const userId = user.id as string;
+    const isAdmin = user.role === "ADMIN";
 
     // Different permission logic based on whether it's a personal file or case file
     if (upload.caseId && upload.case) {
@@ -58,8 +58,6 @@ export async function DELETE(
       }
     }
 
-    console.log("Starting to delete file:", upload.fileUrl);
-
     // Determine which bucket the file is in
     let bucketName = "case-files";
     let pathMatch;
@@ -81,7 +79,6 @@ export async function DELETE(
     }
 
     const filePath = pathMatch[1];
-    console.log(`Deleting file path: ${filePath} from bucket: ${bucketName}`);
 
     // Delete the file from Supabase Storage
     const { error: deleteError } = await supabaseAdmin.storage
@@ -106,4 +103,4 @@ export async function DELETE(
       { status: 500 }
     );
   }
-}
+});
@@ -1,15 +1,15 @@
 import { NextRequest, NextResponse } from "next/server";
-import { getServerSession } from "next-auth";
 import { prisma } from "@/lib/db";
-import { authOptions } from "@/lib/auth";
-import bcrypt from "bcrypt";
+import { hashPassword, verifyPassword } from "@/lib/auth-utils";
+import { getRequestUser } from "@/lib/request-context";
+import { traced } from "@/lib/tracing";
 
-export async function POST(request: NextRequest) {
+export const POST = traced("/api/users/change-password", async function POST(request: NextRequest) {
   try {
     // Get the authenticated user
-    const session = await getServerSession(authOptions);
+    const currentUser = await getRequestUser(request);
 
-    if (!session || !session.user) {
+    if (!currentUser) {
       return NextResponse.json(
         { error: "Authentication required" },
         { status: 401 }
@@ -34,9 +34,9 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Find the user by email
+    // Find the signed-in user
     const user = await prisma.user.findUnique({
-      where: { email: session.user.email as string },
+      where: { id: currentUser.id },
     });
 
     if (!user) {
@@ -44,7 +44,7 @@ export async function POST(request: NextRequest) {
     }
 
     // Verify current password
-    const isPasswordValid = await bcrypt.compare(
+    const isPasswordValid = await verifyPassword(
       currentPassword,
       user.password
     );
@@ -57,7 +57,7 @@ export async function POST(request: NextRequest) {
     }
 
     // Hash the new password
-    const hashedPassword = await bcrypt.hash(newPassword, 10);
+    const hashedPassword = await hashPassword(newPassword);
 
     // Update the user's password
     await prisma.user.update({
@@ -76,4 +76,4 @@ export async function POST(request: NextRequest) {
       { status: 500 }
     );
   }
-}
+});
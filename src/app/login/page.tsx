@@ -39,7 +39,14 @@ export default function LoginPage() {
         password,
       });
 
-      if (result?.error) {
+      // Codes thrown by authorize(), see src/lib/login-throttle.ts
+      if (result?.error === "TooManyAttempts") {
+        setError("Too many failed attempts. Please try again in a few minutes.");
+        setLoading(false);
+      } else if (result?.error === "LoginBusy") {
+        setError("The server is busy. Please try again in a moment.");
+        setLoading(false);
+      } else if (result?.error) {
         setError("Invalid email or password");
         setLoading(false);
       } else {
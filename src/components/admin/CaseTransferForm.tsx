@@ -15,7 +15,7 @@ import {
   AlertDialogHeader,
   AlertDialogTitle,
 } from "@/components/ui/alert-dialog";
-import { reassignCases } from "@/lib/api-service";
+import { reassignCases, waitForReassignJob } from "@/lib/api-service";
 
 type User = {
   id: string;
@@ -37,6 +37,7 @@ export function CaseTransferForm({ users, onSuccess }: CaseTransferFormProps) {
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [error, setError] = useState("");
   const [successMessage, setSuccessMessage] = useState("");
+  const [progress, setProgress] = useState("");
   const [showConfirmDialog, setShowConfirmDialog] = useState(false);
   const [transferDetails, setTransferDetails] = useState({
     sourceUser: "",
@@ -67,6 +68,7 @@ export function CaseTransferForm({ users, onSuccess }: CaseTransferFormProps) {
   const handleTransfer = async () => {
     setIsSubmitting(true);
     setError("");
+    setSuccessMessage("");
 
     try {
       // Use your service function
@@ -78,7 +80,24 @@ export function CaseTransferForm({ users, onSuccess }: CaseTransferFormProps) {
       if (result.error) {
         setError(result.error);
       } else if (result.data) {
-        setSuccessMessage(result.data.message);
+        // The cases move in the background; follow the job to the end
+        const job = result.data.job;
+        if (job) {
+          setShowConfirmDialog(false);
+          const done = await waitForReassignJob(job.id, (current) =>
+            setProgress(`${result.data!.message}: ${current.moved} of ${current.total} moved`)
+          );
+          setProgress("");
+          if (done.error || done.data?.status === "failed") {
+            setError(done.error || done.data?.error || "The transfer failed");
+            return;
+          }
+          setSuccessMessage(
+            `${done.data!.moved} case(s) have been transferred from ${transferDetails.sourceUser} to ${transferDetails.targetUser}`
+          );
+        } else {
+          setSuccessMessage(result.data.message);
+        }
 
         // Reset form
         setSourceUserId("");
@@ -125,6 +144,12 @@ export function CaseTransferForm({ users, onSuccess }: CaseTransferFormProps) {
         </Alert>
       )}
 
+      {progress && (
+        <Alert variant="info" className="mb-6">
+          {progress}
+        </Alert>
+      )}
+
       {error && (
         <Alert
           variant="error"
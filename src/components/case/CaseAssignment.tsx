@@ -73,7 +73,7 @@ export default function CaseAssignment({
       if (!refreshAssignment) return;
 
       try {
-        const response = await fetch(`/api/cases/${caseId}`);
+        const response = await fetch(`/api/cases/${caseId}?summary=true`);
         if (!response.ok) {
           throw new Error("Failed to fetch updated case details");
         }
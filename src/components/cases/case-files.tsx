@@ -11,6 +11,7 @@ import {
   formatRelativeTime,
 } from "@/lib/date-utils";
 import { SearchBar } from "@/components/search-bar";
+import { uploadCaseFiles } from "@/lib/api-service";
 import {
   AlertDialog,
   AlertDialogContent,
@@ -61,6 +62,7 @@ export function CaseFiles({
   const router = useRouter();
   const fileInputRef = useRef<HTMLInputElement>(null);
   const [loading, setLoading] = useState(false);
+  const [progress, setProgress] = useState<number | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [groupByDateEnabled, setGroupByDateEnabled] = useState(true);
   const [searchQuery, setSearchQuery] = useState("");
@@ -75,45 +77,42 @@ export function CaseFiles({
   const [renameLoading, setRenameLoading] = useState(false);
 
   const handleFileUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
-    const file = e.target.files?.[0];
-    if (!file || !canUpload) return;
+    const selected = Array.from(e.target.files ?? []);
+    if (selected.length === 0 || !canUpload) return;
 
     setLoading(true);
     setError(null);
-
-    const formData = new FormData();
-    formData.append("file", file);
+    setProgress(null);
 
     toast.promise(
-      uploadFile(),
+      uploadFiles(),
       {
-        loading: 'Uploading file...',
-        success: 'File uploaded successfully',
+        loading: selected.length === 1 ? 'Uploading file...' : `Uploading ${selected.length} files...`,
+        success: selected.length === 1 ? 'File uploaded successfully' : 'Files uploaded successfully',
         error: (err) => `Upload failed: ${err.message || 'Please try again'}`,
       }
     );
 
-    async function uploadFile() {
+    async function uploadFiles() {
       try {
-        const response = await fetch(`/api/cases/${caseId}/upload`, {
-          method: "POST",
-          body: formData,
-        });
-
-        if (!response.ok) {
-          const error = await response.json();
-          throw new Error(error.message || "Error uploading file");
-        }
+        const { uploads, failed } = await uploadCaseFiles(caseId, selected, (sent, total) =>
+          setProgress(Math.round((sent / total) * 100))
+        );
 
         // Reset file input
         if (fileInputRef.current) {
           fileInputRef.current.value = "";
         }
 
-        // Refresh the page to show the new file
-        router.refresh();
+        // Refresh the page to show the new files
+        if (uploads.length > 0) {
+          router.refresh();
+        }
         setLoading(false);
-        
+
+        if (failed.length > 0) {
+          throw new Error(failed.map((f) => `${f.fileName}: ${f.error}`).join("; "));
+        }
         return true; // Resolve the promise successfully
       } catch (error) {
         console.error("Error uploading file:", error);
@@ -411,7 +410,7 @@ export function CaseFiles({
               htmlFor="file-upload"
               className="block text-sm font-medium text-gray-800 dark:text-gray-300 mb-2"
             >
-              Upload File (PDF, Images)
+              Upload Files (PDF, Images)
             </label>
             <input
               id="file-upload"
@@ -419,6 +418,7 @@ export function CaseFiles({
               ref={fileInputRef}
               onChange={handleFileUpload}
               disabled={loading}
+              multiple
               className="block w-full text-sm border border-gray-400 bg-gray-100 text-gray-800 rounded-md cursor-pointer file:mr-4 file:py-2 file:px-3 sm:file:px-4 file:rounded-md file:border-0 file:text-sm file:font-medium file:bg-blue-800 file:text-white hover:file:bg-blue-900 dark:border-gray-700 dark:bg-gray-800 dark:text-gray-300"
               accept=".pdf,.jpg,.jpeg,.png"
             />
@@ -426,7 +426,7 @@ export function CaseFiles({
 
           {loading && (
             <div className="text-sm text-blue-800 dark:text-blue-400 animate-pulse">
-              Uploading file...
+              Uploading{progress !== null ? ` (${progress}%)` : ""}...
             </div>
           )}
 
@@ -1,6 +1,7 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
+import { useRouter } from "next/navigation";
 import { Case } from "@/types/case";
 import CaseSearch, { SearchParams } from "./case-search";
 import {
@@ -15,30 +16,147 @@ import {
 import Link from "next/link";
 import DeleteCaseButton from "@/components/cases/delete-case-button";
 import CaseAssignButton from "@/components/case/CaseAssignButton";
+import { ChangePage, getChanges, searchCases } from "@/lib/api-service";
 
 type StatusFilter = "all" | "pending" | "completed";
 
+// How often an open (visible) list asks the change feed for updates
+const CHANGE_POLL_MS = 60_000;
+// Results fetched per "all" fields search request
+const SEARCH_PAGE_SIZE = 50;
+
 interface FilteredCasesProps {
   initialCases: Case[];
+  // Change feed cursor taken before initialCases were read
+  changeCursor: string;
   isAdmin: boolean;
   userId: string;
 }
 
+/**
+ * The list with a page of the change feed applied: changed cases replace
+ * their old rows (or are added), removed ones are dropped, newest first
+ */
+function applyCaseChanges(current: Case[], page: ChangePage): Case[] {
+  const removed = new Set(
+    page.deleted.filter((tombstone) => tombstone.type === "case").map((tombstone) => tombstone.id)
+  );
+  const changed = new Map<string, Case>(page.cases.map((caseItem: Case) => [caseItem.id, caseItem]));
+  return current
+    .filter((caseItem) => !removed.has(caseItem.id) && !changed.has(caseItem.id))
+    .concat([...changed.values()])
+    .sort((a, b) => new Date(b.updatedAt ?? 0).getTime() - new Date(a.updatedAt ?? 0).getTime());
+}
+
 export default function FilteredCases({
   initialCases,
+  changeCursor,
   isAdmin,
   userId,
 }: FilteredCasesProps) {
+  const router = useRouter();
+  // initialCases kept up to date from the change feed
+  const [allCases, setAllCases] = useState<Case[]>(initialCases);
+  const cursorRef = useRef(changeCursor);
   const [cases, setCases] = useState<Case[]>(initialCases);
   const [searchParams, setSearchParams] = useState<SearchParams>({
     query: "",
     field: "all",
   });
   const [statusFilter, setStatusFilter] = useState<StatusFilter>("all");
+  // Pages of the server-side search ("all" fields) fetched so far, best
+  // match first, and the cursor of the next page
+  const [searchResults, setSearchResults] = useState<Case[] | null>(null);
+  const [searchCursor, setSearchCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const searchQueryRef = useRef("");
+
+  // A server refresh brings a new list and the cursor that goes with it
+  useEffect(() => {
+    setAllCases(initialCases);
+    cursorRef.current = changeCursor;
+  }, [initialCases, changeCursor]);
+
+  // Rather than reloading the list, ask the feed what changed since the
+  // last look, while the tab is visible and when it becomes visible again
+  useEffect(() => {
+    let cancelled = false;
+    let syncing = false;
+
+    const sync = async () => {
+      if (syncing || document.visibilityState !== "visible") return;
+      syncing = true;
+      try {
+        for (;;) {
+          const { data, expired } = await getChanges(cursorRef.current);
+          if (cancelled) return;
+          if (expired) {
+            // Too far behind to catch up: reload the list with a new cursor
+            router.refresh();
+            return;
+          }
+          if (!data) return;
+          cursorRef.current = data.nextCursor;
+          if (data.cases.length > 0 || data.deleted.length > 0) {
+            setAllCases((current) => applyCaseChanges(current, data));
+          }
+          if (!data.hasMore) return;
+        }
+      } finally {
+        syncing = false;
+      }
+    };
+
+    const timer = window.setInterval(sync, CHANGE_POLL_MS);
+    document.addEventListener("visibilitychange", sync);
+    return () => {
+      cancelled = true;
+      window.clearInterval(timer);
+      document.removeEventListener("visibilitychange", sync);
+    };
+  }, [router]);
 
   useEffect(() => {
-    // First filter out PERSONAL cases for all users
-    let filteredCases = initialCases.filter(
+    const query = searchParams.query.trim();
+    searchQueryRef.current = searchParams.field === "all" ? query : "";
+    setSearchResults(null);
+    setSearchCursor(null);
+    if (!query || searchParams.field !== "all") {
+      return;
+    }
+
+    let cancelled = false;
+    searchCases(query, null, SEARCH_PAGE_SIZE).then(({ data }) => {
+      if (cancelled || !data) return;
+      // Without data the list is filtered client-side instead
+      setSearchResults(data.results);
+      setSearchCursor(data.nextCursor);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [searchParams]);
+
+  // Appends the next page of search results
+  const loadMoreResults = async () => {
+    const query = searchQueryRef.current;
+    if (!query || !searchCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const { data } = await searchCases(query, searchCursor, SEARCH_PAGE_SIZE);
+      // Dropped if the search changed meanwhile
+      if (!data || searchQueryRef.current !== query) return;
+      setSearchResults((current) => [...(current ?? []), ...data.results]);
+      setSearchCursor(data.nextCursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  useEffect(() => {
+    // "All" fields searches show the server's ranked results; everything
+    // else filters the list. Either way PERSONAL cases are left out.
+    let filteredCases = (searchResults ?? allCases).filter(
       (caseItem) => caseItem.caseType !== "PERSONAL"
     );
 
@@ -51,8 +169,9 @@ export default function FilteredCases({
       );
     }
 
-    // Then apply search filter if there's a search query
-    if (searchParams.query.trim()) {
+    // Then apply search filter if there's a search query the server did
+    // not answer
+    if (searchParams.query.trim() && !searchResults) {
       const query = searchParams.query.toLowerCase();
       filteredCases = filteredCases.filter((caseItem) => {
         // Search logic based on selected field
@@ -110,7 +229,7 @@ export default function FilteredCases({
     }
 
     setCases(filteredCases);
-  }, [searchParams, initialCases, statusFilter]);
+  }, [searchParams, allCases, statusFilter, searchResults]);
 
   // Format the next hearing date if available
   const getNextHearingDate = (caseItem: Case) => {
@@ -130,7 +249,7 @@ export default function FilteredCases({
   };
 
   // Get counts for status filters
-  const nonPersonalCases = initialCases.filter(
+  const nonPersonalCases = allCases.filter(
     (c) => c.caseType !== "PERSONAL"
   );
   const pendingCount = nonPersonalCases.filter((c) => !c.isCompleted).length;
@@ -519,6 +638,19 @@ export default function FilteredCases({
             </div>
           </>
         )}
+
+        {searchResults && searchCursor && (
+          <div className="mt-4 text-center">
+            <button
+              type="button"
+              onClick={loadMoreResults}
+              disabled={loadingMore}
+              className="rounded-md border border-slate-700 bg-slate-800 px-4 py-2 text-sm text-slate-300 hover:bg-slate-700 disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more results"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,171 @@
+import { prisma } from "@/lib/db";
+
+// Firm-wide statistics for the admin dashboard, computed with grouped
+// aggregate queries and served from a short-TTL in-process cache.
+//
+// Routes that change what the numbers count (case create, assign,
+// reassign, complete, delete, hearing create, user create/delete) call
+// invalidateAdminStats(). On multi-instance deployments another instance's
+// cache can lag by at most the TTL.
+
+const STATS_TTL_MS = Number(process.env.ADMIN_STATS_TTL_MS ?? 30_000);
+const HEARING_WINDOW_DAYS = 7;
+
+export interface UserCaseStats {
+  id: string;
+  name: string;
+  email: string;
+  role: string;
+  caseCount: number;
+  activeCount: number;
+  completedCount: number;
+}
+
+export interface AdminStats {
+  generatedAt: string;
+  totals: {
+    users: number;
+    cases: number;
+    activeCases: number;
+    completedCases: number;
+    closedCases: number;
+    hearingsDueThisWeek: number;
+  };
+  casesByUser: UserCaseStats[];
+  casesByCourt: { courtName: string; count: number }[];
+  casesByType: { caseType: string; count: number }[];
+}
+
+const globalForStats = globalThis as unknown as {
+  adminStats: { value: AdminStats; expiresAt: number } | undefined;
+  adminStatsPending: Promise<AdminStats> | undefined;
+  adminStatsGeneration: number | undefined;
+};
+
+// PERSONAL cases are private file stores, not firm work: the per-user,
+// per-court and per-type counts, the active total and the hearing count
+// leave them out. closedCases (the dashboard's "Closed Cases") counts every
+// completed case, PERSONAL ones included, as the dashboard always has.
+const FIRM_CASES = { caseType: { not: "PERSONAL" } };
+
+async function computeAdminStats(): Promise<AdminStats> {
+  const now = new Date();
+  const startOfToday = new Date(now.getFullYear(), now.getMonth(), now.getDate());
+  const windowEnd = new Date(startOfToday);
+  windowEnd.setDate(windowEnd.getDate() + HEARING_WINDOW_DAYS);
+
+  const [users, byUser, byCourt, byType, hearingsDueThisWeek] = await Promise.all([
+    prisma.user.findMany({
+      select: { id: true, name: true, email: true, role: true },
+      orderBy: { name: "asc" },
+    }),
+    prisma.case.groupBy({
+      by: ["userId", "isCompleted", "caseType"],
+      _count: { _all: true },
+    }),
+    prisma.case.groupBy({
+      by: ["courtName"],
+      where: FIRM_CASES,
+      _count: { _all: true },
+    }),
+    prisma.case.groupBy({
+      by: ["caseType"],
+      where: FIRM_CASES,
+      _count: { _all: true },
+    }),
+    prisma.hearing.count({
+      where: {
+        nextDate: { gte: startOfToday, lt: windowEnd },
+        case: { ...FIRM_CASES, isCompleted: false },
+      },
+    }),
+  ]);
+
+  const counts = new Map<string, { active: number; completed: number }>();
+  let activeCases = 0;
+  let completedCases = 0;
+  let closedCases = 0;
+  for (const row of byUser) {
+    if (row.isCompleted) {
+      closedCases += row._count._all;
+    }
+    if (row.caseType === "PERSONAL") {
+      continue;
+    }
+    const entry = counts.get(row.userId) ?? { active: 0, completed: 0 };
+    if (row.isCompleted) {
+      entry.completed += row._count._all;
+      completedCases += row._count._all;
+    } else {
+      entry.active += row._count._all;
+      activeCases += row._count._all;
+    }
+    counts.set(row.userId, entry);
+  }
+
+  return {
+    generatedAt: now.toISOString(),
+    totals: {
+      users: users.length,
+      cases: activeCases + completedCases,
+      activeCases,
+      completedCases,
+      closedCases,
+      hearingsDueThisWeek,
+    },
+    casesByUser: users.map((user) => {
+      const entry = counts.get(user.id) ?? { active: 0, completed: 0 };
+      return {
+        ...user,
+        caseCount: entry.active + entry.completed,
+        activeCount: entry.active,
+        completedCount: entry.completed,
+      };
+    }),
+    casesByCourt: byCourt
+      .map((row) => ({ courtName: row.courtName, count: row._count._all }))
+      .sort((a, b) => b.count - a.count),
+    casesByType: byType
+      .map((row) => ({ caseType: row.caseType, count: row._count._all }))
+      .sort((a, b) => b.count - a.count),
+  };
+}
+
+/**
+ * Cached admin statistics; concurrent callers on a cold cache share one computation
+ */
+export async function getAdminStats(): Promise<AdminStats> {
+  const cached = globalForStats.adminStats;
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.value;
+  }
+
+  if (!globalForStats.adminStatsPending) {
+    const generation = globalForStats.adminStatsGeneration ?? 0;
+    const pending: Promise<AdminStats> = computeAdminStats()
+      .then((value) => {
+        // Drop results computed before an invalidation landed
+        if ((globalForStats.adminStatsGeneration ?? 0) === generation) {
+          globalForStats.adminStats = { value, expiresAt: Date.now() + STATS_TTL_MS };
+        }
+        return value;
+      })
+      .finally(() => {
+        if (globalForStats.adminStatsPending === pending) {
+          globalForStats.adminStatsPending = undefined;
+        }
+      });
+    globalForStats.adminStatsPending = pending;
+  }
+
+  return globalForStats.adminStatsPending;
+}
+
+/**
+ * Forget cached statistics after a write that changes them
+ */
+export function invalidateAdminStats() {
+  globalForStats.adminStats = undefined;
+  globalForStats.adminStatsPending = undefined;
+  globalForStats.adminStatsGeneration = (globalForStats.adminStatsGeneration ?? 0) + 1;
+}
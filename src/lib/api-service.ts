@@ -12,21 +12,34 @@ type ReassignCasesParams = {
   targetUserId: string;
 };
 
+export interface ReassignJob {
+  id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  sourceUserId: string | null;
+  targetUserId: string;
+  excludePersonal: boolean;
+  total: number;
+  moved: number;
+  error: string | null;
+  createdAt: string;
+  completedAt: string | null;
+}
+
 type ReassignCasesResponse = {
-  count: number;
   message: string;
+  // Absent when there was nothing to move
+  job?: ReassignJob;
 };
 
 /**
- * Transfer cases from one user to another
+ * Start transferring cases from one user (or the unassigned cases, with a
+ * null sourceUserId) to another; the cases move in a background job, see
+ * waitForReassignJob
  */
-export async function reassignCases({ 
-  sourceUserId, 
-  targetUserId 
-}: { 
-  sourceUserId: string; 
-  targetUserId: string 
-}): Promise<ApiResponse<{ message: string }>> {
+export async function reassignCases({
+  sourceUserId,
+  targetUserId
+}: ReassignCasesParams): Promise<ApiResponse<ReassignCasesResponse>> {
   try {
     const response = await fetch('/api/admin/cases/reassign', {
       method: 'POST',
@@ -45,12 +58,54 @@ export async function reassignCases({
       return { error: data.message || 'Failed to reassign cases' };
     }
 
-    return { data: { message: data.message || 'Cases reassigned successfully' } };
+    return { data: { message: data.message || 'Cases reassigned successfully', job: data.job } };
   } catch (error) {
     return { error: 'An unexpected error occurred' };
   }
 }
 
+/**
+ * Get a bulk reassignment's progress
+ * @param jobId - Reassign job ID
+ */
+export async function getReassignJob(jobId: string): Promise<ApiResponse<ReassignJob>> {
+  try {
+    const response = await fetch(`/api/admin/cases/reassign/${jobId}`);
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { error: data.message || 'Failed to fetch reassignment' };
+    }
+
+    return { data: data.job };
+  } catch (error) {
+    return { error: 'An unexpected error occurred' };
+  }
+}
+
+/**
+ * Poll a bulk reassignment until it completes or fails
+ * @param jobId - Reassign job ID
+ * @param onProgress - Called with the job after every poll
+ */
+export async function waitForReassignJob(
+  jobId: string,
+  onProgress?: (job: ReassignJob) => void,
+  intervalMs = 1000
+): Promise<ApiResponse<ReassignJob>> {
+  for (;;) {
+    const result = await getReassignJob(jobId);
+    if (result.error || !result.data) {
+      return result;
+    }
+    onProgress?.(result.data);
+    if (result.data.status === 'completed' || result.data.status === 'failed') {
+      return result;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 type AssignCaseParams = {
   caseId: string;
   userId: string;
@@ -87,18 +142,121 @@ export async function assignCase(params: AssignCaseParams): Promise<ApiResponse<
   }
 }
 
+export interface CaseListOptions {
+  includePERSONAL?: boolean;
+  limit?: number;
+  cursor?: string | null;
+  fields?: string[];
+  include?: string[];
+  court?: string;
+  caseType?: string;
+  isCompleted?: boolean;
+  userId?: string;
+  nextHearingFrom?: string;
+  nextHearingTo?: string;
+}
+
+export interface CasePage {
+  cases: any[];
+  nextCursor: string | null;
+}
+
+/**
+ * Get one page of cases
+ * @param options - Filters, field selection and the cursor from the previous page
+ */
+export async function getCases(options: CaseListOptions = {}): Promise<ApiResponse<CasePage>> {
+  try {
+    const params = new URLSearchParams();
+    if (options.includePERSONAL) params.set('includePERSONAL', 'true');
+    if (options.limit) params.set('limit', String(options.limit));
+    if (options.cursor) params.set('cursor', options.cursor);
+    if (options.fields) params.set('fields', options.fields.join(','));
+    if (options.include) params.set('include', options.include.join(','));
+    if (options.court) params.set('court', options.court);
+    if (options.caseType) params.set('caseType', options.caseType);
+    if (options.isCompleted !== undefined) params.set('isCompleted', String(options.isCompleted));
+    if (options.userId) params.set('userId', options.userId);
+    if (options.nextHearingFrom) params.set('nextHearingFrom', options.nextHearingFrom);
+    if (options.nextHearingTo) params.set('nextHearingTo', options.nextHearingTo);
+
+    const query = params.toString();
+    const response = await fetch(query ? `/api/cases?${query}` : '/api/cases');
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { error: data.error || 'Failed to fetch cases' };
+    }
+
+    return { data: data };
+  } catch (error) {
+    return { error: 'An unexpected error occurred' };
+  }
+}
+
+export interface ChangeTombstone {
+  type: 'case' | 'hearing' | 'note' | 'upload';
+  id: string;
+  caseId: string;
+  reason: 'deleted' | 'reassigned';
+}
+
+export interface ChangePage {
+  cases: any[];
+  hearings: any[];
+  notes: any[];
+  uploads: any[];
+  deleted: ChangeTombstone[];
+  nextCursor: string;
+  hasMore: boolean;
+}
+
+/**
+ * Get what changed in the user's cases since a cursor; without one, just a
+ * nextCursor to follow from now. Responds with expired: true when the
+ * cursor is too old to follow and the cases must be reloaded.
+ * @param cursor - nextCursor from the previous call
+ */
+export async function getChanges(cursor?: string | null, limit?: number): Promise<ApiResponse<ChangePage> & { expired?: boolean }> {
+  try {
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    if (limit) params.set('limit', String(limit));
+
+    const query = params.toString();
+    const response = await fetch(query ? `/api/changes?${query}` : '/api/changes', { cache: 'no-store' });
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { error: data.error || 'Failed to fetch changes', expired: response.status === 410 };
+    }
+
+    return { data: data };
+  } catch (error) {
+    return { error: 'An unexpected error occurred' };
+  }
+}
+
+export interface CaseSearchPage {
+  results: any[];
+  nextCursor: string | null;
+}
+
 /**
- * Get all cases
- * @param includePERSONAL - Whether to include PERSONAL cases (only relevant for admins)
+ * Ranked full-text search over cases, parties, advocates and notes
+ * @param query - Search text; every word is prefix-matched
+ * @param cursor - nextCursor from the previous page
  */
-export async function getCases(includePERSONAL = false): Promise<ApiResponse<any[]>> {
+export async function searchCases(query: string, cursor?: string | null, limit = 50): Promise<ApiResponse<CaseSearchPage>> {
   try {
-    const url = includePERSONAL ? '/api/cases?includePERSONAL=true' : '/api/cases';
-    const response = await fetch(url);
+    const params = new URLSearchParams({ q: query, limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+
+    const response = await fetch(`/api/cases/search?${params.toString()}`);
     const data = await response.json();
 
     if (!response.ok) {
-      return { error: data.message || 'Failed to fetch cases' };
+      return { error: data.error || 'Failed to search cases' };
     }
 
     return { data: data };
@@ -107,6 +265,266 @@ export async function getCases(includePERSONAL = false): Promise<ApiResponse<any
   }
 }
 
+/**
+ * Get the cases most similar to a case, best match first
+ * @param caseId - The ID of the case
+ * @param limit - How many cases to return (default 5, max 20)
+ */
+export async function getSimilarCases(caseId: string, limit?: number): Promise<ApiResponse<any[]>> {
+  try {
+    const query = limit ? `?limit=${limit}` : '';
+    const response = await fetch(`/api/cases/${caseId}/similar${query}`);
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { error: data.error || 'Failed to fetch similar cases' };
+    }
+
+    return { data: data.results };
+  } catch (error) {
+    return { error: 'An unexpected error occurred' };
+  }
+}
+
+export interface HearingCalendarOptions {
+  from?: string;
+  to?: string;
+  on?: 'nextDate' | 'date';
+  userId?: string;
+  isCompleted?: boolean;
+}
+
+export interface HearingCalendar {
+  hearings: any[];
+  from: string;
+  to: string;
+  on: 'nextDate' | 'date';
+  truncated: boolean;
+}
+
+/**
+ * Get hearings across every visible case in a date window, e.g. a day's cause list
+ * @param options - Window (default: the next 30 days) and filters
+ */
+export async function getHearingCalendar(options: HearingCalendarOptions = {}): Promise<ApiResponse<HearingCalendar>> {
+  try {
+    const params = new URLSearchParams();
+    if (options.from) params.set('from', options.from);
+    if (options.to) params.set('to', options.to);
+    if (options.on) params.set('on', options.on);
+    if (options.userId) params.set('userId', options.userId);
+    if (options.isCompleted !== undefined) params.set('isCompleted', String(options.isCompleted));
+
+    const query = params.toString();
+    const response = await fetch(query ? `/api/hearings/calendar?${query}` : '/api/hearings/calendar');
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { error: data.error || 'Failed to fetch hearings' };
+    }
+
+    return { data: data };
+  } catch (error) {
+    return { error: 'An unexpected error occurred' };
+  }
+}
+
+export interface ExportOptions {
+  kind?: 'docket' | 'causelist';
+  format?: 'pdf' | 'csv';
+  from?: string;
+  to?: string;
+  userId?: string;
+  caseType?: string;
+  isCompleted?: boolean;
+}
+
+export interface ExportJob {
+  id: string;
+  kind: string;
+  format: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  rows: number;
+  error: string | null;
+  createdAt: string;
+  completedAt: string | null;
+  downloadUrl: string | null;
+}
+
+/**
+ * Start a background export of a docket or cause list, for lists too long to download directly
+ * @param options - What to export (default: the whole docket as PDF)
+ */
+export async function startExport(options: ExportOptions = {}): Promise<ApiResponse<ExportJob>> {
+  try {
+    const response = await fetch('/api/exports', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(options),
+    });
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { error: data.error || 'Failed to start export' };
+    }
+
+    return { data: data.job };
+  } catch (error) {
+    return { error: 'An unexpected error occurred' };
+  }
+}
+
+/**
+ * Get an export job's status; completed jobs carry a downloadUrl
+ * @param jobId - Export job ID
+ */
+export async function getExportJob(jobId: string): Promise<ApiResponse<ExportJob>> {
+  try {
+    const response = await fetch(`/api/exports/${jobId}`);
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { error: data.error || 'Failed to fetch export' };
+    }
+
+    return { data: data.job };
+  } catch (error) {
+    return { error: 'An unexpected error occurred' };
+  }
+}
+
+// Files above this size go through resumable upload sessions
+const RESUMABLE_UPLOAD_THRESHOLD = 6 * 1024 * 1024;
+const PARALLEL_LARGE_UPLOADS = 3;
+const CHUNK_ATTEMPTS = 3;
+
+export interface UploadResult {
+  uploads: any[];
+  failed: { fileName: string; error: string }[];
+}
+
+async function uploadSmallFiles(caseId: string, files: File[]): Promise<UploadResult> {
+  const formData = new FormData();
+  files.forEach((file) => formData.append('file', file));
+
+  const response = await fetch(`/api/cases/${caseId}/upload`, {
+    method: 'POST',
+    body: formData,
+  });
+  const data = await response.json();
+  if (!response.ok) {
+    return {
+      uploads: [],
+      failed: files.map((file) => ({ fileName: file.name, error: data.message || 'Error uploading file' })),
+    };
+  }
+  return { uploads: data.uploads ?? [data.upload], failed: data.failed ?? [] };
+}
+
+// Sends one large file in chunks, resuming from the server's offset after a failure
+async function uploadLargeFile(caseId: string, file: File, onProgress?: (sent: number) => void) {
+  const start = await fetch(`/api/cases/${caseId}/upload/sessions`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ fileName: file.name, fileType: file.type, size: file.size }),
+  });
+  const session = await start.json();
+  if (!start.ok) {
+    throw new Error(session.message || 'Failed to start upload');
+  }
+
+  const url = `/api/cases/${caseId}/upload/sessions/${session.sessionId}`;
+  let offset = 0;
+  let failures = 0;
+  while (offset < file.size) {
+    try {
+      const response = await fetch(url, {
+        method: 'PATCH',
+        headers: { 'Upload-Offset': String(offset) },
+        body: file.slice(offset, offset + session.chunkSize),
+      });
+      const data = await response.json();
+      if (response.ok) {
+        offset = data.offset;
+        failures = 0;
+        onProgress?.(offset);
+        if (data.upload) {
+          return data.upload;
+        }
+        continue;
+      }
+      if (response.status !== 409) {
+        throw new Error(data.message || 'Error uploading file');
+      }
+      offset = data.offset;
+    } catch (error) {
+      if (++failures >= CHUNK_ATTEMPTS) {
+        throw error;
+      }
+      // The connection may have dropped after storage took the chunk
+      const status = await fetch(url).then((r) => r.json()).catch(() => null);
+      if (status?.upload) {
+        return status.upload;
+      }
+      if (typeof status?.offset === 'number') {
+        offset = status.offset;
+      }
+    }
+  }
+
+  // Every byte was already stored; the status call records the upload
+  const status = await fetch(url).then((r) => r.json());
+  return status.upload;
+}
+
+/**
+ * Upload several files to a case. Small files share one multipart request;
+ * large ones are sent in resumable chunks, a few at a time.
+ * @param onProgress - Called with the total bytes sent so far
+ */
+export async function uploadCaseFiles(
+  caseId: string,
+  files: File[],
+  onProgress?: (sent: number, total: number) => void
+): Promise<UploadResult> {
+  const small = files.filter((file) => file.size <= RESUMABLE_UPLOAD_THRESHOLD);
+  const large = files.filter((file) => file.size > RESUMABLE_UPLOAD_THRESHOLD);
+  const total = files.reduce((sum, file) => sum + file.size, 0);
+  const sent = new Map<File, number>();
+  const report = (file: File, bytes: number) => {
+    sent.set(file, bytes);
+    onProgress?.(Array.from(sent.values()).reduce((sum, n) => sum + n, 0), total);
+  };
+
+  const result: UploadResult = { uploads: [], failed: [] };
+  const smallUpload = small.length
+    ? uploadSmallFiles(caseId, small).then((r) => {
+        small.forEach((file) => report(file, file.size));
+        return r;
+      })
+    : Promise.resolve<UploadResult>({ uploads: [], failed: [] });
+
+  const queue = [...large];
+  const workers = Array.from({ length: Math.min(PARALLEL_LARGE_UPLOADS, queue.length) }, async () => {
+    for (let file = queue.shift(); file; file = queue.shift()) {
+      const current = file;
+      try {
+        result.uploads.push(await uploadLargeFile(caseId, current, (bytes) => report(current, bytes)));
+      } catch (error) {
+        result.failed.push({
+          fileName: current.name,
+          error: error instanceof Error ? error.message : 'Error uploading file',
+        });
+      }
+    }
+  });
+
+  const [smallResult] = await Promise.all([smallUpload, Promise.all(workers)]);
+  result.uploads.unshift(...smallResult.uploads);
+  result.failed.unshift(...smallResult.failed);
+  return result;
+}
+
 /**
  * Get all users with case counts
  */
@@ -0,0 +1,9 @@
+// Request headers on which middleware.ts forwards the user it decoded from
+// the session token to the API routes (read by src/lib/request-context.ts).
+// Kept apart so the Edge middleware does not pull in Prisma.
+
+export const USER_ID_HEADER = "x-auth-user-id";
+export const USER_ROLE_HEADER = "x-auth-user-role";
+export const USER_NAME_HEADER = "x-auth-user-name";
+export const USER_EMAIL_HEADER = "x-auth-user-email";
+export const AUTH_HEADERS = [USER_ID_HEADER, USER_ROLE_HEADER, USER_NAME_HEADER, USER_EMAIL_HEADER];
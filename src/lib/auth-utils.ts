@@ -1,7 +1,8 @@
 'use server';
 
 // This file is server-only and will not be included in client bundles
-import * as bcrypt from 'bcrypt';
+// bcrypt itself runs on the worker threads of src/lib/password-pool.ts
+import { comparePassword, hashPasswordInPool } from '@/lib/password-pool';
 
 /**
  * Verifies a password against a hash
@@ -10,7 +11,7 @@ import * as bcrypt from 'bcrypt';
  * @returns True if the password matches, false otherwise
  */
 export async function verifyPassword(plainPassword: string, hashedPassword: string): Promise<boolean> {
-  return bcrypt.compare(plainPassword, hashedPassword);
+  return comparePassword(plainPassword, hashedPassword);
 }
 
 /**
@@ -19,5 +20,5 @@ export async function verifyPassword(plainPassword: string, hashedPassword: stri
  * @returns The hashed password
  */
 export async function hashPassword(password: string): Promise<string> {
-  return bcrypt.hash(password, 10);
-} 
\ No newline at end of file
+  return hashPasswordInPool(password, 10);
+}
@@ -2,6 +2,15 @@ import { type NextAuthOptions } from "next-auth";
 import CredentialsProvider from "next-auth/providers/credentials";
 import { prisma } from "@/lib/db";
 import { verifyPassword } from "@/lib/auth-utils";
+import { PasswordPoolBusyError } from "@/lib/password-pool";
+import {
+  LOGIN_BUSY,
+  LOGIN_THROTTLED,
+  clientIp,
+  loginRetryAfter,
+  recordLoginFailure,
+  recordLoginSuccess,
+} from "@/lib/login-throttle";
 
 export const authOptions: NextAuthOptions = {
   session: {
@@ -20,6 +29,13 @@ export const authOptions: NextAuthOptions = {
           return null;
         }
 
+        // Refuse throttled emails and addresses before any database or
+        // bcrypt work (see src/lib/login-throttle.ts)
+        const ip = clientIp(req?.headers);
+        if ((await loginRetryAfter(credentials.email, ip)) > 0) {
+          throw new Error(LOGIN_THROTTLED);
+        }
+
         const user = await prisma.user.findUnique({
           where: {
             email: credentials.email,
@@ -27,17 +43,25 @@ export const authOptions: NextAuthOptions = {
         });
 
         if (!user) {
+          await recordLoginFailure(credentials.email, ip);
           return null;
         }
 
-        const isPasswordValid = await verifyPassword(
-          credentials.password,
-          user.password
-        );
+        let isPasswordValid: boolean;
+        try {
+          isPasswordValid = await verifyPassword(credentials.password, user.password);
+        } catch (error) {
+          if (error instanceof PasswordPoolBusyError) {
+            throw new Error(LOGIN_BUSY);
+          }
+          throw error;
+        }
 
         if (!isPasswordValid) {
+          await recordLoginFailure(credentials.email, ip);
           return null;
         }
+        await recordLoginSuccess(credentials.email, ip);
 
         return {
           id: user.id,
@@ -0,0 +1,163 @@
+import { Prisma } from "@prisma/client";
+import type { TransactionClient } from "@/lib/db";
+
+// Case edits (PUT /api/cases/[caseId]).
+//
+// The submitted parties are diffed against the stored ones and the diff is
+// written with at most three set-based statements per kind of party, so an
+// edit costs the same handful of round trips however many parties the case
+// has, and parties that did not change are not written at all.
+//
+// An edit may send the case's version (src/lib/case-version.ts) as
+// If-Match; an edit made against an older copy of the case fails with 409
+// rather than overwriting the newer one. One that finds another write of
+// the case row in progress fails at once with a retryable 409 rather than
+// waiting on it. Hearing, note and upload writes never hold the case row.
+
+export interface PartyEditInput {
+  id?: string;
+  name: string;
+  advocate?: string | null;
+  isNew?: boolean;
+}
+
+export interface PartyRow {
+  id: string;
+  name: string;
+  advocate: string | null;
+}
+
+export interface PartyDiff {
+  added: { name: string; advocate: string | null }[];
+  changed: PartyRow[];
+  removed: string[];
+}
+
+export class CaseVersionConflictError extends Error {
+  constructor() {
+    super("The case was changed by someone else. Reload it and try again.");
+    this.name = "CaseVersionConflictError";
+  }
+}
+
+export class CaseBusyError extends Error {
+  constructor() {
+    super("The case is being saved by someone else. Try again in a moment.");
+    this.name = "CaseBusyError";
+  }
+}
+
+/**
+ * What an edit changes about one kind of party. New parties are the ones
+ * flagged isNew; listed parties are compared with the stored ones and kept
+ * only if their name or advocate differs (an empty advocate leaves the
+ * stored one in place); ids in toDelete are removed. Ids that are not
+ * parties of this case are ignored.
+ */
+export function diffParties(
+  existing: PartyRow[],
+  submitted: PartyEditInput[] = [],
+  toDelete: string[] = []
+): PartyDiff {
+  const current = new Map(existing.map((party) => [party.id, party]));
+  const removed = toDelete.filter((id) => current.has(id));
+  const doomed = new Set(removed);
+  const diff: PartyDiff = { added: [], changed: [], removed };
+
+  for (const party of submitted) {
+    if (party.isNew) {
+      diff.added.push({ name: party.name, advocate: party.advocate || null });
+      continue;
+    }
+    const row = party.id ? current.get(party.id) : undefined;
+    if (!row || doomed.has(row.id)) {
+      continue;
+    }
+    const advocate = party.advocate || row.advocate;
+    if (party.name !== row.name || advocate !== row.advocate) {
+      diff.changed.push({ id: row.id, name: party.name, advocate });
+    }
+  }
+  return diff;
+}
+
+/**
+ * Takes the case row for an edit diffed against the case row at
+ * `updatedAt`. Fails with CaseVersionConflictError if the row has changed
+ * since, or the case's version is no longer `expected` (the If-Match), and
+ * with CaseBusyError if another transaction is writing the row (NOWAIT).
+ *
+ * FOR NO KEY UPDATE does not conflict with the key-share locks that
+ * inserting a hearing, note or upload takes on its case.
+ */
+export async function lockCaseVersion(
+  tx: TransactionClient,
+  caseId: string,
+  updatedAt: Date,
+  expected?: Date
+) {
+  let rows: { id: string }[];
+  try {
+    rows = await tx.$queryRaw<{ id: string }[]>`
+      SELECT c.id FROM "Case" c JOIN "CaseVersion" v ON v."caseId" = c.id
+      WHERE c.id = ${caseId} AND c."updatedAt" = ${updatedAt}
+      ${expected ? Prisma.sql`AND v."updatedAt" = ${expected}` : Prisma.empty}
+      FOR NO KEY UPDATE OF c NOWAIT
+    `;
+  } catch (error) {
+    // 55P03 lock_not_available
+    if (
+      error instanceof Prisma.PrismaClientKnownRequestError &&
+      error.code === "P2010" &&
+      (error.meta as { code?: string } | undefined)?.code === "55P03"
+    ) {
+      throw new CaseBusyError();
+    }
+    throw error;
+  }
+  if (rows.length === 0) {
+    throw new CaseVersionConflictError();
+  }
+}
+
+/**
+ * Writes one kind of party's diff: a deleteMany, a createMany, and one
+ * UPDATE ... FROM (VALUES ...) for the changed rows (updateMany can only
+ * set the same values on every row it matches)
+ */
+export async function applyPartyDiff(
+  tx: TransactionClient,
+  table: "Petitioner" | "Respondent",
+  caseId: string,
+  diff: PartyDiff
+) {
+  if (diff.removed.length > 0) {
+    const where = { caseId, id: { in: diff.removed } };
+    if (table === "Petitioner") {
+      await tx.petitioner.deleteMany({ where });
+    } else {
+      await tx.respondent.deleteMany({ where });
+    }
+  }
+
+  if (diff.added.length > 0) {
+    const data = diff.added.map((party) => ({ ...party, caseId }));
+    if (table === "Petitioner") {
+      await tx.petitioner.createMany({ data });
+    } else {
+      await tx.respondent.createMany({ data });
+    }
+  }
+
+  if (diff.changed.length > 0) {
+    const values = Prisma.join(
+      diff.changed.map((party) => Prisma.sql`(${party.id}, ${party.name}, ${party.advocate}::text)`)
+    );
+    await tx.$executeRaw`
+      UPDATE ${Prisma.raw(`"${table}"`)} AS party
+      SET name = v.name, advocate = v.advocate
+      FROM (VALUES ${values}) AS v(id, name, advocate)
+      WHERE party.id = v.id AND party."caseId" = ${caseId}
+    `;
+  }
+}
@@ -0,0 +1,602 @@
+import { Prisma } from "@prisma/client";
+import { prisma } from "@/lib/db";
+import { CalendarWindow, parseCalendarWindow } from "@/lib/hearing-calendar";
+import { CONTENT_WIDTH, Column, PdfWriter } from "@/lib/pdf-writer";
+
+// Server-side exports, as PDF or CSV:
+//   - a case file: one case with its parties, hearings, notes and documents
+//   - a docket: a filtered list of cases, e.g. one advocate's matters
+//   - a cause list: hearings listed in a date window
+//
+// Lists are read in keyset batches and rendered row by row into a stream,
+// so memory use does not grow with the number of cases. Case files are
+// small and cached, keyed on the case's version (see caseFileVersion).
+// Lists too long to stream within a request run as background export jobs
+// (see src/lib/export-jobs.ts).
+
+export const EXPORT_FORMATS = ["pdf", "csv"] as const;
+export type ExportFormat = (typeof EXPORT_FORMATS)[number];
+
+export const EXPORT_KINDS = ["docket", "causelist"] as const;
+export type ExportKind = (typeof EXPORT_KINDS)[number];
+
+export const CONTENT_TYPES: Record<ExportFormat, string> = {
+  pdf: "application/pdf",
+  csv: "text/csv; charset=utf-8",
+};
+
+// Rows read per query while streaming a list
+const EXPORT_BATCH_SIZE = 200;
+// Longer lists are refused by GET /api/cases/export; start an export job instead
+export const MAX_SYNC_EXPORT_ROWS = 2000;
+
+const CACHE_MAX_BYTES = Number(process.env.EXPORT_CACHE_MAX_BYTES ?? 64 * 1024 * 1024);
+
+const LETTERHEAD = [
+  "Just Chambers Legal Services",
+  "123 Law Street, Legal District, City - 100001",
+  "Tel: (555) 123-4567 | Email: contact@supremelegal.com",
+];
+
+const MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
+
+export interface ExportFilters {
+  kind: ExportKind;
+  userId: string;
+  isAdmin: boolean;
+  // Admins only: one advocate's cases
+  ownerId?: string | null;
+  caseType?: string | null;
+  isCompleted?: boolean | null;
+  includePERSONAL?: boolean;
+  // Cause lists only
+  window?: CalendarWindow;
+}
+
+/**
+ * 03 Jun 2025, in UTC so the output does not depend on the server's zone
+ */
+export function formatDate(value: Date | null | undefined) {
+  if (!value) {
+    return "";
+  }
+  const day = String(value.getUTCDate()).padStart(2, "0");
+  return `${day} ${MONTHS[value.getUTCMonth()]} ${value.getUTCFullYear()}`;
+}
+
+function caseNumber(c: { caseType: string; registrationNum: number; registrationYear: number }) {
+  return `${c.caseType} ${c.registrationNum}/${c.registrationYear}`;
+}
+
+function partyList(parties: { name: string; advocate: string | null }[]) {
+  return parties.map((p) => (p.advocate ? `${p.name} (Adv. ${p.advocate})` : p.name)).join("; ");
+}
+
+/**
+ * One CSV line. Cells that a spreadsheet would read as a formula are
+ * prefixed with an apostrophe.
+ */
+export function csvLine(cells: (string | number | null | undefined)[]) {
+  return (
+    cells
+      .map((cell) => {
+        let text = cell === null || cell === undefined ? "" : String(cell);
+        if (/^[=+\-@]/.test(text)) {
+          text = `'${text}`;
+        }
+        return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+      })
+      .join(",") + "\r\n"
+  );
+}
+
+/**
+ * Parses the export query parameters shared by GET /api/cases/export and
+ * POST /api/exports, returning an error message for invalid ones
+ */
+export function parseExportFilters(
+  params: { get(name: string): string | null },
+  user: { id: string; role: string }
+): ExportFilters | { error: string } {
+  const kind = params.get("kind") ?? "docket";
+  if (!EXPORT_KINDS.includes(kind as ExportKind)) {
+    return { error: `kind must be one of ${EXPORT_KINDS.join(", ")}` };
+  }
+  const isCompleted = params.get("isCompleted");
+  if (isCompleted !== null && isCompleted !== "true" && isCompleted !== "false") {
+    return { error: "isCompleted must be true or false" };
+  }
+
+  const isAdmin = user.role === "ADMIN";
+  const filters: ExportFilters = {
+    kind: kind as ExportKind,
+    userId: user.id,
+    isAdmin,
+    ownerId: isAdmin ? params.get("userId") : null,
+    caseType: params.get("caseType"),
+    isCompleted: isCompleted === null ? null : isCompleted === "true",
+    includePERSONAL: params.get("includePERSONAL") === "true",
+  };
+
+  if (filters.kind === "causelist") {
+    const window = parseCalendarWindow(params.get("from"), params.get("to"));
+    if ("error" in window) {
+      return window;
+    }
+    filters.window = window;
+  }
+  return filters;
+}
+
+export function parseExportFormat(value: string | null): ExportFormat | null {
+  const format = value ?? "pdf";
+  return EXPORT_FORMATS.includes(format as ExportFormat) ? (format as ExportFormat) : null;
+}
+
+function caseFilter(filters: ExportFilters): Prisma.CaseWhereInput {
+  const conditions: Prisma.CaseWhereInput[] = [];
+  if (!filters.isAdmin) {
+    conditions.push({ userId: filters.userId });
+  } else {
+    if (!filters.includePERSONAL && filters.caseType !== "PERSONAL") {
+      conditions.push({ caseType: { not: "PERSONAL" } });
+    }
+    if (filters.ownerId) {
+      conditions.push({ userId: filters.ownerId });
+    }
+  }
+  if (filters.caseType) {
+    conditions.push({ caseType: filters.caseType });
+  }
+  if (filters.isCompleted !== null && filters.isCompleted !== undefined) {
+    conditions.push({ isCompleted: filters.isCompleted });
+  }
+  return { AND: conditions };
+}
+
+function hearingFilter(filters: ExportFilters): Prisma.HearingWhereInput {
+  return {
+    nextDate: { gte: filters.window!.from, lt: filters.window!.to },
+    case: caseFilter(filters),
+  };
+}
+
+/**
+ * Number of rows a list export would contain
+ */
+export function countExportRows(filters: ExportFilters) {
+  return filters.kind === "causelist"
+    ? prisma.hearing.count({ where: hearingFilter(filters) })
+    : prisma.case.count({ where: caseFilter(filters) });
+}
+
+const docketSelect = {
+  id: true,
+  caseType: true,
+  registrationNum: true,
+  registrationYear: true,
+  title: true,
+  courtName: true,
+  isCompleted: true,
+  user: { select: { name: true } },
+  petitioners: { select: { name: true, advocate: true } },
+  respondents: { select: { name: true, advocate: true } },
+  hearings: {
+    orderBy: { date: "desc" as const },
+    take: 1,
+    select: { date: true, nextDate: true, nextPurpose: true },
+  },
+} satisfies Prisma.CaseSelect;
+
+type DocketCase = Prisma.CaseGetPayload<{ select: typeof docketSelect }>;
+
+/**
+ * Cases in case-number order, read in batches along the
+ * (caseType, registrationYear, registrationNum) unique index
+ */
+async function* docketCases(filters: ExportFilters): AsyncGenerator<DocketCase> {
+  const where = caseFilter(filters);
+  let after: DocketCase | undefined;
+  for (;;) {
+    const batch: DocketCase[] = await prisma.case.findMany({
+      where: after
+        ? {
+            AND: [
+              where,
+              {
+                OR: [
+                  { caseType: { gt: after.caseType } },
+                  { caseType: after.caseType, registrationYear: { gt: after.registrationYear } },
+                  {
+                    caseType: after.caseType,
+                    registrationYear: after.registrationYear,
+                    registrationNum: { gt: after.registrationNum },
+                  },
+                ],
+              },
+            ],
+          }
+        : where,
+      orderBy: [{ caseType: "asc" }, { registrationYear: "asc" }, { registrationNum: "asc" }],
+      take: EXPORT_BATCH_SIZE,
+      select: docketSelect,
+    });
+    yield* batch;
+    if (batch.length < EXPORT_BATCH_SIZE) {
+      return;
+    }
+    after = batch[batch.length - 1];
+  }
+}
+
+const causeListSelect = {
+  id: true,
+  nextDate: true,
+  nextPurpose: true,
+  case: {
+    select: {
+      caseType: true,
+      registrationNum: true,
+      registrationYear: true,
+      title: true,
+      courtName: true,
+      user: { select: { name: true } },
+    },
+  },
+} satisfies Prisma.HearingSelect;
+
+type CauseListEntry = Prisma.HearingGetPayload<{ select: typeof causeListSelect }>;
+
+/**
+ * Hearings listed in the window, earliest first, read in batches along
+ * the Hearing(nextDate) index
+ */
+async function* causeListEntries(filters: ExportFilters): AsyncGenerator<CauseListEntry> {
+  const where = hearingFilter(filters);
+  let after: CauseListEntry | undefined;
+  for (;;) {
+    const batch: CauseListEntry[] = await prisma.hearing.findMany({
+      where: after
+        ? {
+            AND: [
+              where,
+              {
+                OR: [
+                  { nextDate: { gt: after.nextDate! } },
+                  { nextDate: after.nextDate, id: { gt: after.id } },
+                ],
+              },
+            ],
+          }
+        : where,
+      orderBy: [{ nextDate: "asc" }, { id: "asc" }],
+      take: EXPORT_BATCH_SIZE,
+      select: causeListSelect,
+    });
+    yield* batch;
+    if (batch.length < EXPORT_BATCH_SIZE) {
+      return;
+    }
+    after = batch[batch.length - 1];
+  }
+}
+
+const DOCKET_HEADINGS = [
+  "Case No", "Title", "Court", "Advocate", "Petitioners", "Respondents",
+  "Status", "Last Hearing", "Next Hearing", "Purpose",
+];
+const DOCKET_COLUMNS: Column[] = [
+  { x: 0, width: 80 },
+  { x: 80, width: 150 },
+  { x: 230, width: 95 },
+  { x: 325, width: 55 },
+  { x: 380, width: 65 },
+  { x: 445, width: 50 },
+];
+const CAUSE_LIST_HEADINGS = ["Date", "Court", "Case No", "Title", "Purpose", "Advocate"];
+const CAUSE_LIST_COLUMNS: Column[] = [
+  { x: 0, width: 55 },
+  { x: 55, width: 95 },
+  { x: 150, width: 80 },
+  { x: 230, width: 145 },
+  { x: 375, width: 75 },
+  { x: 450, width: 45 },
+];
+
+function docketCells(c: DocketCase) {
+  const hearing = c.hearings[0];
+  return {
+    csv: [
+      caseNumber(c), c.title, c.courtName, c.user?.name, partyList(c.petitioners), partyList(c.respondents),
+      c.isCompleted ? "Completed" : "Pending",
+      formatDate(hearing?.date), formatDate(hearing?.nextDate), hearing?.nextPurpose,
+    ],
+    pdf: [
+      caseNumber(c), c.title, c.courtName, formatDate(hearing?.nextDate), hearing?.nextPurpose ?? "",
+      c.isCompleted ? "Completed" : "Pending",
+    ],
+  };
+}
+
+function causeListCells(h: CauseListEntry) {
+  const cells = [
+    formatDate(h.nextDate), h.case.courtName, caseNumber(h.case), h.case.title, h.nextPurpose ?? "", h.case.user?.name ?? "",
+  ];
+  return { csv: cells, pdf: cells };
+}
+
+function listTitle(filters: ExportFilters) {
+  if (filters.kind === "causelist") {
+    const last = new Date(filters.window!.to.getTime() - 1);
+    return `Cause List: ${formatDate(filters.window!.from)} to ${formatDate(last)}`;
+  }
+  return "Docket";
+}
+
+/**
+ * Renders a docket or cause list row by row. `onRow` is called with the
+ * running row count, e.g. to report a job's progress.
+ */
+export async function* renderList(
+  filters: ExportFilters,
+  format: ExportFormat,
+  onRow?: (rows: number) => void | Promise<void>
+): AsyncGenerator<Buffer> {
+  const isCauseList = filters.kind === "causelist";
+  const rows = isCauseList
+    ? mapRows(causeListEntries(filters), causeListCells)
+    : mapRows(docketCases(filters), docketCells);
+  let count = 0;
+
+  if (format === "csv") {
+    // A byte order mark so spreadsheet programs read the file as UTF-8
+    yield Buffer.from("\uFEFF" + csvLine(isCauseList ? CAUSE_LIST_HEADINGS : DOCKET_HEADINGS));
+    for await (const row of rows) {
+      yield Buffer.from(csvLine(row.csv));
+      await onRow?.(++count);
+    }
+    return;
+  }
+
+  const columns = isCauseList ? CAUSE_LIST_COLUMNS : DOCKET_COLUMNS;
+  const headings = isCauseList
+    ? CAUSE_LIST_HEADINGS
+    : ["Case No", "Title", "Court", "Next Hearing", "Purpose", "Status"];
+  const pdf = new PdfWriter(listTitle(filters));
+  pdf.text(LETTERHEAD[0], { bold: true, size: 14 });
+  pdf.text(listTitle(filters), { bold: true, size: 12 });
+  pdf.text(`Generated on ${formatDate(new Date())}`, { size: 9 });
+  pdf.gap(6);
+  const header = (page: PdfWriter) => {
+    page.row(headings, columns, { bold: true });
+    page.rule();
+  };
+  header(pdf);
+  pdf.setPageHeader(header);
+
+  for await (const row of rows) {
+    pdf.row(row.pdf, columns);
+    await onRow?.(++count);
+    yield* pdf.take();
+  }
+  if (count === 0) {
+    pdf.text("Nothing to list.", { size: 9 });
+  }
+  pdf.setPageHeader(undefined);
+  pdf.finish();
+  yield* pdf.take();
+}
+
+async function* mapRows<T, R>(source: AsyncGenerator<T>, map: (item: T) => R): AsyncGenerator<R> {
+  for await (const item of source) {
+    yield map(item);
+  }
+}
+
+/**
+ * Wraps rendered chunks in a web stream for a Response body
+ */
+export function toReadableStream(chunks: AsyncGenerator<Buffer>): ReadableStream<Uint8Array> {
+  return new ReadableStream({
+    async pull(controller) {
+      try {
+        const { done, value } = await chunks.next();
+        if (done) {
+          controller.close();
+        } else {
+          controller.enqueue(new Uint8Array(value));
+        }
+      } catch (error) {
+        controller.error(error);
+      }
+    },
+    async cancel() {
+      await chunks.return(undefined);
+    },
+  });
+}
+
+// Case files
+
+const caseFileSelect = {
+  id: true,
+  caseType: true,
+  registrationNum: true,
+  registrationYear: true,
+  title: true,
+  courtName: true,
+  isCompleted: true,
+  userId: true,
+  user: { select: { name: true } },
+  petitioners: { select: { name: true, advocate: true } },
+  respondents: { select: { name: true, advocate: true } },
+  hearings: {
+    orderBy: { date: "desc" as const },
+    select: { date: true, notes: true, nextDate: true, nextPurpose: true },
+  },
+  notes: {
+    orderBy: { createdAt: "desc" as const },
+    select: { content: true, createdAt: true, user: { select: { name: true } } },
+  },
+  uploads: {
+    orderBy: { createdAt: "desc" as const },
+    select: { fileName: true, createdAt: true },
+  },
+} satisfies Prisma.CaseSelect;
+
+type CaseFile = Prisma.CaseGetPayload<{ select: typeof caseFileSelect }>;
+
+/**
+ * Version of everything a case file shows: the case's version (see
+ * src/lib/case-version.ts), which every write to the case or its hearings,
+ * notes and documents moves on. One primary key lookup.
+ */
+export async function caseFileVersion(caseId: string) {
+  const found = await prisma.caseVersion.findUnique({
+    where: { caseId },
+    select: { updatedAt: true },
+  });
+  if (!found) {
+    return null;
+  }
+  return { version: String(found.updatedAt.getTime()) };
+}
+
+export function renderCaseFile(c: CaseFile, format: ExportFormat): Buffer {
+  if (format === "csv") {
+    const lines = [
+      "\uFEFF" + csvLine(["Case No", "Title", "Court", "Status", "Hearing Date", "Notes", "Next Date", "Purpose"]),
+    ];
+    const status = c.isCompleted ? "Completed" : "Pending";
+    for (const h of c.hearings) {
+      lines.push(csvLine([
+        caseNumber(c), c.title, c.courtName, status,
+        formatDate(h.date), h.notes, formatDate(h.nextDate), h.nextPurpose,
+      ]));
+    }
+    if (c.hearings.length === 0) {
+      lines.push(csvLine([caseNumber(c), c.title, c.courtName, status]));
+    }
+    return Buffer.from(lines.join(""));
+  }
+
+  const pdf = new PdfWriter(`Case: ${c.title}`);
+  for (const [i, line] of LETTERHEAD.entries()) {
+    pdf.text(line, i === 0 ? { bold: true, size: 14 } : { size: 9 });
+  }
+  pdf.rule();
+  pdf.gap(6);
+  pdf.text(`${c.caseType} Case Details`, { bold: true, size: 13 });
+  pdf.text(`${c.registrationNum}/${c.registrationYear}`, { bold: true });
+  pdf.gap(4);
+  pdf.text(`Title: ${c.title}`);
+  pdf.text(`Court: ${c.courtName || "N/A"}`);
+  pdf.text(`Filed By: ${c.user?.name || "Not assigned"}`);
+  pdf.text(`Status: ${c.isCompleted ? "Completed" : "Pending"}`);
+
+  const section = (heading: string) => {
+    pdf.gap(8);
+    pdf.text(heading.toUpperCase(), { bold: true, size: 11 });
+    pdf.rule();
+  };
+
+  section("Petitioners");
+  c.petitioners.forEach((p, i) => pdf.text(`${i + 1}. ${p.name}${p.advocate ? ` (Advocate: ${p.advocate})` : ""}`));
+  section("Respondents");
+  c.respondents.forEach((r, i) => pdf.text(`${i + 1}. ${r.name}${r.advocate ? ` (Advocate: ${r.advocate})` : ""}`));
+
+  section("Hearing History");
+  if (c.hearings.length) {
+    const columns: Column[] = [
+      { x: 0, width: 70 },
+      { x: 70, width: CONTENT_WIDTH - 230 },
+      { x: CONTENT_WIDTH - 160, width: 70 },
+      { x: CONTENT_WIDTH - 90, width: 90 },
+    ];
+    pdf.row(["Date", "Notes", "Next Date", "Purpose"], columns, { bold: true, size: 9 });
+    for (const h of c.hearings) {
+      pdf.row([formatDate(h.date), h.notes || "-", formatDate(h.nextDate) || "-", h.nextPurpose || "-"], columns, { size: 9 });
+    }
+  } else {
+    pdf.text("No hearings recorded for this case.");
+  }
+
+  if (c.notes.length) {
+    section("Case Notes");
+    for (const note of c.notes) {
+      pdf.text(`By: ${note.user?.name || "Unknown"}, ${formatDate(note.createdAt)}`, { bold: true, size: 9 });
+      pdf.text(note.content, { indent: 10 });
+      pdf.gap(4);
+    }
+  }
+
+  if (c.uploads.length) {
+    section("Attached Documents");
+    for (const file of c.uploads) {
+      pdf.text(`${file.fileName} (added ${formatDate(file.createdAt)})`);
+    }
+  }
+
+  pdf.gap(12);
+  pdf.text(`Generated on ${formatDate(new Date())}`, { size: 9 });
+  pdf.finish();
+  return Buffer.concat(pdf.take());
+}
+
+export function loadCaseFile(caseId: string) {
+  return prisma.case.findUnique({ where: { id: caseId }, select: caseFileSelect });
+}
+
+// Rendered case files, keyed on case and format and valid for one version.
+// Least recently used entries are evicted past CACHE_MAX_BYTES.
+
+interface CachedExport {
+  version: string;
+  body: Buffer;
+}
+
+const globalForExports = globalThis as unknown as {
+  caseFileCache: Map<string, CachedExport> | undefined;
+  caseFileCacheBytes: number | undefined;
+};
+
+function exportCache() {
+  globalForExports.caseFileCache ??= new Map();
+  return globalForExports.caseFileCache;
+}
+
+export function getCachedCaseFile(caseId: string, format: ExportFormat, version: string) {
+  const cache = exportCache();
+  const key = `${caseId}:${format}`;
+  const entry = cache.get(key);
+  if (!entry || entry.version !== version) {
+    return undefined;
+  }
+  // Re-insert so Map order tracks recency
+  cache.delete(key);
+  cache.set(key, entry);
+  return entry.body;
+}
+
+export function setCachedCaseFile(caseId: string, format: ExportFormat, version: string, body: Buffer) {
+  const cache = exportCache();
+  const key = `${caseId}:${format}`;
+  let bytes = globalForExports.caseFileCacheBytes ?? 0;
+  const previous = cache.get(key);
+  if (previous) {
+    bytes -= previous.body.length;
+    cache.delete(key);
+  }
+  if (body.length <= CACHE_MAX_BYTES) {
+    cache.set(key, { version, body });
+    bytes += body.length;
+  }
+  for (const [oldest, entry] of cache) {
+    if (bytes <= CACHE_MAX_BYTES) {
+      break;
+    }
+    cache.delete(oldest);
+    bytes -= entry.body.length;
+  }
+  globalForExports.caseFileCacheBytes = bytes;
+}
@@ -0,0 +1,137 @@
+import { Prisma } from "@prisma/client";
+
+// Shared request shapes and validation for the case creation routes
+// (POST /api/cases and POST /api/cases/batch)
+
+export interface PetitionerInput {
+  name: string;
+  advocate?: string | null;
+}
+
+export interface RespondentInput {
+  name: string;
+  advocate?: string | null;
+}
+
+export interface HearingInput {
+  date: string;
+  notes?: string | null;
+  nextDate?: string | null;
+  nextPurpose?: string | null;
+}
+
+export interface CreateCaseInput {
+  caseType: string;
+  registrationNum: number;
+  registrationYear: number;
+  title?: string;
+  courtName: string;
+  userId?: string;
+  petitioners: PetitionerInput[];
+  respondents: RespondentInput[];
+  hearings?: HearingInput[];
+}
+
+function isValidDate(value: unknown): boolean {
+  return typeof value === "string" && !isNaN(new Date(value).getTime());
+}
+
+/**
+ * Returns the validation error for a case creation payload, or null if valid
+ */
+export function validateCaseInput(data: CreateCaseInput): string | null {
+  if (!data || typeof data !== "object") {
+    return "Case data must be an object";
+  }
+
+  if (!data.caseType || !data.registrationNum || !data.registrationYear) {
+    return "Case type, registration number, and year are required";
+  }
+
+  if (!Number.isInteger(Number(data.registrationNum)) || !Number.isInteger(Number(data.registrationYear))) {
+    return "Registration number and year must be integers";
+  }
+
+  if (!data.petitioners?.length || !data.respondents?.length) {
+    return "At least one petitioner and one respondent are required";
+  }
+
+  if ([...data.petitioners, ...data.respondents].some((party) => !party?.name)) {
+    return "Every petitioner and respondent needs a name";
+  }
+
+  if (data.hearings !== undefined) {
+    if (!Array.isArray(data.hearings)) {
+      return "Hearings must be an array";
+    }
+    for (const hearing of data.hearings) {
+      if (!isValidDate(hearing?.date)) {
+        return "Hearing date is required";
+      }
+      if (hearing.nextDate && !isValidDate(hearing.nextDate)) {
+        return "Hearing next date is invalid";
+      }
+    }
+  }
+
+  return null;
+}
+
+/**
+ * Key of the @@unique([caseType, registrationYear, registrationNum]) constraint
+ */
+export function caseKey(data: { caseType: string; registrationYear: number; registrationNum: number }): string {
+  return `${data.caseType}|${Number(data.registrationYear)}|${Number(data.registrationNum)}`;
+}
+
+/**
+ * Nested create data for a validated case, owned by userId
+ */
+export function caseCreateData(data: CreateCaseInput, userId: string): Prisma.CaseUncheckedCreateInput {
+  return {
+    caseType: data.caseType,
+    registrationNum: Number(data.registrationNum),
+    registrationYear: Number(data.registrationYear),
+    // Generate title if not provided
+    title: data.title || `${data.petitioners[0].name} vs ${data.respondents[0].name}`,
+    courtName: data.courtName,
+    userId: userId,
+
+    // Create petitioners
+    petitioners: {
+      create: data.petitioners.map((p) => ({
+        name: p.name,
+        advocate: p.advocate,
+      })),
+    },
+
+    // Create respondents
+    respondents: {
+      create: data.respondents.map((r) => ({
+        name: r.name,
+        advocate: r.advocate,
+      })),
+    },
+
+    // Create hearings when the caller supplies history (e.g. bulk imports)
+    ...(data.hearings?.length
+      ? {
+          hearings: {
+            create: data.hearings.map((h) => ({
+              date: new Date(h.date),
+              notes: h.notes,
+              nextDate: h.nextDate ? new Date(h.nextDate) : null,
+              nextPurpose: h.nextPurpose,
+            })),
+          },
+        }
+      : {}),
+  };
+}
+
+/**
+ * True when a Prisma error is a unique constraint violation
+ */
+export function isUniqueViolation(error: unknown): boolean {
+  return error instanceof Prisma.PrismaClientKnownRequestError && error.code === "P2002";
+}
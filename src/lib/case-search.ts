@@ -0,0 +1,111 @@
+import { Prisma } from "@prisma/client";
+import { prisma } from "@/lib/db";
+
+// Ranked full-text search over the CaseSearchDocument index (titles, party
+// names and advocates, court, case number and notes). The index is kept in
+// sync by database triggers, see migrations/20250602090000_add_case_search.
+
+const MAX_QUERY_TERMS = 10;
+// Runs of letters or digits in any script (built at runtime: the TS target predates \p{...})
+const WORD = new RegExp("[\\p{L}\\p{N}]+", "gu");
+
+export interface CaseSearchOptions {
+  query: string;
+  userId: string;
+  isAdmin: boolean;
+  includePERSONAL?: boolean;
+  limit: number;
+  offset: number;
+}
+
+/**
+ * Splits a search string into lowercase word terms, dropping punctuation so
+ * nothing the user types can change the tsquery syntax
+ */
+export function searchTerms(query: string): string[] {
+  return (query.toLowerCase().match(WORD) ?? []).slice(0, MAX_QUERY_TERMS);
+}
+
+/**
+ * Prefix-matching tsquery requiring every term, e.g. "deep kumar" -> "deep:* & kumar:*"
+ */
+export function toPrefixQuery(terms: string[]): string {
+  return terms.map((term) => `${term}:*`).join(" & ");
+}
+
+/**
+ * Returns one page of matching cases, best match first, and whether more follow.
+ *
+ * Rows match when every term prefix-matches the weighted tsvector and are
+ * ranked with ts_rank_cd. When nothing matches at all, the first page falls
+ * back to trigram word similarity so misspelt names still find something;
+ * such results are flagged as fuzzy.
+ */
+export async function searchCases(options: CaseSearchOptions) {
+  const terms = searchTerms(options.query);
+  const text = terms.join(" ");
+  const tsquery = toPrefixQuery(terms);
+
+  // Users search their own cases; admins skip PERSONAL cases unless asked
+  const access = !options.isAdmin
+    ? Prisma.sql`AND c."userId" = ${options.userId}`
+    : options.includePERSONAL
+      ? Prisma.empty
+      : Prisma.sql`AND c."caseType" <> 'PERSONAL'`;
+
+  let fuzzy = false;
+  let ranked = await prisma.$queryRaw<{ id: string; rank: number }[]>`
+    SELECT c."id", ts_rank_cd(d."document", q.query) AS rank
+    FROM "CaseSearchDocument" d
+    JOIN "Case" c ON c."id" = d."caseId"
+    CROSS JOIN to_tsquery('simple', ${tsquery}) AS q(query)
+    WHERE d."document" @@ q.query
+    ${access}
+    ORDER BY rank DESC, c."id" DESC
+    LIMIT ${options.limit + 1} OFFSET ${options.offset}
+  `;
+
+  if (ranked.length === 0 && options.offset === 0) {
+    fuzzy = true;
+    ranked = await prisma.$queryRaw<{ id: string; rank: number }[]>`
+      SELECT c."id", word_similarity(${text}, d."content") AS rank
+      FROM "CaseSearchDocument" d
+      JOIN "Case" c ON c."id" = d."caseId"
+      WHERE ${text} <% d."content"
+      ${access}
+      ORDER BY rank DESC, c."id" DESC
+      LIMIT ${options.limit}
+    `;
+  }
+
+  const hasMore = ranked.length > options.limit;
+  const page = ranked.slice(0, options.limit);
+
+  const cases = await prisma.case.findMany({
+    where: { id: { in: page.map((r) => r.id) } },
+    select: {
+      id: true,
+      caseType: true,
+      registrationYear: true,
+      registrationNum: true,
+      title: true,
+      courtName: true,
+      userId: true,
+      updatedAt: true,
+      isCompleted: true,
+      petitioners: { select: { name: true, advocate: true } },
+      respondents: { select: { name: true, advocate: true } },
+      // The latest hearing, as in the case list
+      hearings: { orderBy: { date: "desc" }, take: 1 },
+    },
+  });
+  const byId = new Map(cases.map((c) => [c.id, c]));
+
+  return {
+    results: page
+      .filter((r) => byId.has(r.id))
+      .map((r) => ({ ...byId.get(r.id)!, rank: Number(r.rank) })),
+    hasMore,
+    fuzzy,
+  };
+}
@@ -0,0 +1,175 @@
+import { Prisma } from "@prisma/client";
+import { prisma } from "@/lib/db";
+
+// Similar-case retrieval over the TF-IDF index in CaseSimilarityTerm (titles,
+// party names and advocates, hearing notes and purposes, note content). The
+// index is kept in sync by database triggers, see
+// migrations/20250605090000_add_case_similarity and
+// migrations/20250612090000_case_similarity_df_at_query_time.
+//
+// A query, free text or another case, is scored against the cases that
+// share at least one of its terms:
+//   score(case) = sum over shared terms of q(t) * w(t) * idf(t)^2 / |case|
+// with idf(t) = ln(1 + N / df(t)). Only the posting lists of the query's
+// terms are read, so the cost follows the query, not the number of cases.
+// df(t) is counted from those posting lists here rather than kept by the
+// triggers, so writes never contend on shared per-term rows; counting
+// stops past the cap below, so a common term costs no more than a rare one.
+
+export const DEFAULT_SIMILAR_CASES = 5;
+export const MAX_SIMILAR_CASES = 20;
+
+// Terms found in more than this share of cases (once there are enough
+// cases for the share to mean something) are skipped: they say little
+// about similarity and would make nearly every case a candidate
+const MAX_TERM_DF_RATIO = 0.1;
+const MIN_TERM_DF_CAP = 50;
+
+export interface SimilarityAccess {
+  userId: string;
+  isAdmin: boolean;
+  includePERSONAL?: boolean;
+}
+
+export interface SimilarCase {
+  id: string;
+  caseType: string;
+  registrationNum: number;
+  registrationYear: number;
+  title: string;
+  courtName: string;
+  isCompleted: boolean;
+  score: number;
+  lastHearing: { date: Date; nextDate: Date | null; nextPurpose: string | null } | null;
+}
+
+function accessFilter(access: SimilarityAccess) {
+  // Users only see their own cases; admins skip PERSONAL cases unless asked
+  return !access.isAdmin
+    ? Prisma.sql`AND c."userId" = ${access.userId}`
+    : access.includePERSONAL
+      ? Prisma.empty
+      : Prisma.sql`AND c."caseType" <> 'PERSONAL'`;
+}
+
+async function rankCases(
+  query: Prisma.Sql,
+  access: SimilarityAccess,
+  limit: number,
+  excludeId?: string
+): Promise<SimilarCase[]> {
+  const exclude = excludeId ? Prisma.sql`AND c."id" <> ${excludeId}` : Prisma.empty;
+  const ranked = await prisma.$queryRaw<{ id: string; score: number }[]>`
+    WITH q AS (${query}),
+    corpus AS (
+      SELECT n, floor(greatest(${MIN_TERM_DF_CAP}::float8, n * ${MAX_TERM_DF_RATIO}::float8))::bigint AS "dfCap"
+      FROM (SELECT greatest(count(*), 1)::float8 AS n FROM "CaseSimilarityDocument") d
+    ),
+    weighted AS (
+      SELECT q."term", q."weight" * power(ln(1 + corpus.n / s."df"), 2) AS weight
+      FROM q
+      CROSS JOIN corpus
+      CROSS JOIN LATERAL (
+        SELECT count(*)::float8 AS "df"
+        FROM (
+          SELECT 1 FROM "CaseSimilarityTerm" p WHERE p."term" = q."term" LIMIT corpus."dfCap" + 1
+        ) postings
+      ) s
+      WHERE s."df" > 0 AND s."df" <= corpus."dfCap"
+    )
+    SELECT t."caseId" AS id, sum(w."weight" * t."weight") / d."norm" AS score
+    FROM weighted w
+    JOIN "CaseSimilarityTerm" t ON t."term" = w."term"
+    JOIN "CaseSimilarityDocument" d ON d."caseId" = t."caseId"
+    JOIN "Case" c ON c."id" = t."caseId"
+    WHERE true
+    ${exclude}
+    ${accessFilter(access)}
+    GROUP BY t."caseId", d."norm"
+    ORDER BY score DESC, t."caseId"
+    LIMIT ${limit}
+  `;
+  if (ranked.length === 0) {
+    return [];
+  }
+
+  const cases = await prisma.case.findMany({
+    where: { id: { in: ranked.map((row) => row.id) } },
+    select: {
+      id: true,
+      caseType: true,
+      registrationNum: true,
+      registrationYear: true,
+      title: true,
+      courtName: true,
+      isCompleted: true,
+      hearings: {
+        orderBy: { date: "desc" },
+        take: 1,
+        select: { date: true, nextDate: true, nextPurpose: true },
+      },
+    },
+  });
+  const byId = new Map(cases.map((c) => [c.id, c]));
+
+  // Keep rank order; a case deleted since ranking is simply dropped
+  return ranked.flatMap((row) => {
+    const found = byId.get(row.id);
+    if (!found) {
+      return [];
+    }
+    const { hearings, ...rest } = found;
+    return [{ ...rest, score: Number(row.score), lastHearing: hearings[0] ?? null }];
+  });
+}
+
+/**
+ * Cases most similar to a piece of text, such as a question put to the
+ * legal assistant. The text is split into terms the way the index is.
+ */
+export function findSimilarCasesForText(text: string, access: SimilarityAccess, limit = DEFAULT_SIMILAR_CASES) {
+  return rankCases(
+    Prisma.sql`
+      SELECT v.lexeme AS term, 1 + ln(coalesce(array_length(v.positions, 1), 1)) AS weight
+      FROM unnest(to_tsvector('simple', ${text})) AS v
+      WHERE length(v.lexeme) > 1
+    `,
+    access,
+    limit
+  );
+}
+
+/**
+ * Cases most similar to an indexed case, excluding the case itself
+ */
+export function findSimilarCases(caseId: string, access: SimilarityAccess, limit = DEFAULT_SIMILAR_CASES) {
+  return rankCases(
+    Prisma.sql`SELECT "term", "weight" FROM "CaseSimilarityTerm" WHERE "caseId" = ${caseId}`,
+    access,
+    limit,
+    caseId
+  );
+}
+
+function formatDate(date: Date) {
+  return date.toISOString().slice(0, 10);
+}
+
+/**
+ * One line per case, for handing retrieved cases to the assistant as context
+ */
+export function describeCases(cases: SimilarCase[]): string {
+  return cases
+    .map((c) => {
+      const parts = [`${c.title} (${c.caseType} ${c.registrationNum}/${c.registrationYear})`, c.courtName];
+      if (c.lastHearing?.nextDate) {
+        const purpose = c.lastHearing.nextPurpose ? ` for ${c.lastHearing.nextPurpose}` : "";
+        parts.push(`next hearing ${formatDate(c.lastHearing.nextDate)}${purpose}`);
+      }
+      if (c.isCompleted) {
+        parts.push("completed");
+      }
+      return `- ${parts.join("; ")}`;
+    })
+    .join("\n");
+}
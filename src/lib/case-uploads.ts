@@ -0,0 +1,327 @@
+import { createHmac, randomBytes, timingSafeEqual } from "crypto";
+import { supabaseAdmin } from "@/lib/supabase";
+import { tracedFetch } from "@/lib/tracing";
+
+// Case document uploads to Supabase Storage.
+//
+// Files up to one chunk go through the storage upload API as a Blob, with
+// no extra in-memory copy. Larger files use Supabase's resumable (TUS)
+// endpoint in RESUMABLE_CHUNK_SIZE pieces, so a transfer holds at most one
+// chunk in memory and a failed chunk is resent from the offset storage
+// reports. Browsers upload large files through resumable upload sessions
+// (see upload/sessions), whose chunks are streamed straight through.
+
+export const CASE_FILES_BUCKET = "case-files";
+
+// Supabase's resumable endpoint requires exactly 6MB for every chunk but the last
+export const RESUMABLE_CHUNK_SIZE = 6 * 1024 * 1024;
+export const MAX_FILES_PER_REQUEST = 20;
+// Parallel storage transfers per request
+export const UPLOAD_CONCURRENCY = 4;
+export const MAX_UPLOAD_SIZE = 1024 * 1024 * 1024;
+
+const CHUNK_ATTEMPTS = 3;
+// Supabase keeps an unfinished resumable upload for a day
+const UPLOAD_SESSION_TTL_MS = 24 * 60 * 60 * 1000;
+const TUS_VERSION = "1.0.0";
+
+export const ALLOWED_UPLOAD_TYPES = [
+  "image/jpeg",
+  "image/png",
+  "application/pdf",
+  "application/msword",
+  "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+];
+
+const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL as string;
+const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY as string;
+const resumableEndpoint = `${supabaseUrl}/storage/v1/upload/resumable`;
+const storageFetch = tracedFetch("storage");
+
+/**
+ * Storage object name for an uploaded file; a random suffix keeps parallel
+ * uploads of the same name in the same millisecond apart
+ */
+export function getUniqueFileName(originalName: string) {
+  const suffix = `${Date.now()}_${randomBytes(4).toString("hex")}`;
+
+  // Handle files with no extension
+  if (!originalName.includes(".")) {
+    return `file_${suffix}`;
+  }
+
+  const extension = originalName.split(".").pop()?.toLowerCase() || "";
+  const baseName = originalName
+    .split(".")
+    .slice(0, -1)
+    .join(".")
+    .replace(/[^a-zA-Z0-9]/g, "_")
+    .substring(0, 50); // Limit length of base name
+
+  return `${baseName}_${suffix}.${extension}`;
+}
+
+export function publicUrl(bucket: string, path: string) {
+  return supabaseAdmin.storage.from(bucket).getPublicUrl(path).data.publicUrl;
+}
+
+// Resumable (TUS) protocol
+
+function tusHeaders(extra: Record<string, string> = {}) {
+  return {
+    authorization: `Bearer ${supabaseServiceKey}`,
+    "Tus-Resumable": TUS_VERSION,
+    ...extra,
+  };
+}
+
+function uploadLocation(uploadId: string) {
+  return `${resumableEndpoint}/${uploadId}`;
+}
+
+/**
+ * Starts a resumable upload of `size` bytes and returns its upload id
+ */
+export async function createResumableUpload(
+  bucket: string,
+  path: string,
+  contentType: string,
+  size: number
+): Promise<string> {
+  const metadata = [
+    ["bucketName", bucket],
+    ["objectName", path],
+    ["contentType", contentType],
+  ]
+    .map(([key, value]) => `${key} ${Buffer.from(value).toString("base64")}`)
+    .join(",");
+
+  const response = await storageFetch(resumableEndpoint, {
+    method: "POST",
+    headers: tusHeaders({
+      "Upload-Length": String(size),
+      "Upload-Metadata": metadata,
+    }),
+  });
+  const location = response.headers.get("Location");
+  if (response.status !== 201 || !location) {
+    throw new Error(`Could not start resumable upload (status ${response.status})`);
+  }
+  return location.slice(location.lastIndexOf("/") + 1);
+}
+
+/**
+ * Bytes storage has received so far for a resumable upload
+ */
+export async function getResumableOffset(uploadId: string): Promise<number> {
+  const response = await storageFetch(uploadLocation(uploadId), {
+    method: "HEAD",
+    headers: tusHeaders(),
+  });
+  const offset = response.headers.get("Upload-Offset");
+  if (!response.ok || offset === null) {
+    throw new Error(`Could not read upload offset (status ${response.status})`);
+  }
+  return Number(offset);
+}
+
+/**
+ * Sends one chunk at `offset` and returns the new offset. A stream body is
+ * piped through to storage without being buffered here.
+ */
+export async function sendResumableChunk(
+  uploadId: string,
+  offset: number,
+  body: Uint8Array | ReadableStream<Uint8Array>
+): Promise<number> {
+  const response = await storageFetch(uploadLocation(uploadId), {
+    method: "PATCH",
+    headers: tusHeaders({
+      "Upload-Offset": String(offset),
+      "Content-Type": "application/offset+octet-stream",
+    }),
+    body,
+    // Required by Node's fetch for streamed request bodies
+    duplex: "half",
+  } as RequestInit);
+  const newOffset = response.headers.get("Upload-Offset");
+  if (response.status !== 204 || newOffset === null) {
+    throw new Error(`Chunk upload failed (status ${response.status})`);
+  }
+  return Number(newOffset);
+}
+
+// Retries a buffered chunk from wherever storage says it got to
+async function sendChunkWithRetry(uploadId: string, offset: number, chunk: Uint8Array) {
+  let sent = offset;
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await sendResumableChunk(uploadId, sent, chunk.subarray(sent - offset));
+    } catch (error) {
+      if (attempt >= CHUNK_ATTEMPTS) {
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 250 * 2 ** attempt));
+      sent = await getResumableOffset(uploadId);
+      if (sent >= offset + chunk.length) {
+        return sent;
+      }
+    }
+  }
+}
+
+/**
+ * Streams `size` bytes to storage through a resumable upload, holding at
+ * most one chunk in memory
+ */
+export async function streamToStorage(
+  bucket: string,
+  path: string,
+  contentType: string,
+  size: number,
+  stream: ReadableStream<Uint8Array>
+) {
+  const uploadId = await createResumableUpload(bucket, path, contentType, size);
+  const reader = stream.getReader();
+  const chunk = new Uint8Array(RESUMABLE_CHUNK_SIZE);
+  let filled = 0;
+  let offset = 0;
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    let read = 0;
+    while (value && read < value.length) {
+      const take = Math.min(value.length - read, chunk.length - filled);
+      chunk.set(value.subarray(read, read + take), filled);
+      filled += take;
+      read += take;
+      if (filled === chunk.length) {
+        offset = await sendChunkWithRetry(uploadId, offset, chunk);
+        filled = 0;
+      }
+    }
+    if (done) {
+      break;
+    }
+  }
+  if (filled > 0) {
+    offset = await sendChunkWithRetry(uploadId, offset, chunk.subarray(0, filled));
+  }
+  if (offset !== size) {
+    throw new Error(`Upload incomplete: storage has ${offset} of ${size} bytes`);
+  }
+}
+
+/**
+ * Uploads one file (or any Blob with a type), choosing a single request or
+ * a chunked resumable transfer by size
+ */
+export async function putObject(bucket: string, path: string, file: Blob) {
+  if (file.size <= RESUMABLE_CHUNK_SIZE) {
+    const { error } = await supabaseAdmin.storage
+      .from(bucket)
+      .upload(path, file, { contentType: file.type });
+    if (error) {
+      throw error;
+    }
+    return;
+  }
+  await streamToStorage(bucket, path, file.type, file.size, file.stream());
+}
+
+/**
+ * Deletes objects whose upload was not recorded, so a failed request leaves
+ * no orphaned files behind. Failures are logged, not thrown, as the caller
+ * is already reporting an error.
+ */
+export async function removeObjects(bucket: string, paths: string[]) {
+  if (paths.length === 0) {
+    return;
+  }
+  try {
+    const { error } = await supabaseAdmin.storage.from(bucket).remove(paths);
+    if (error) {
+      throw error;
+    }
+  } catch (removeError) {
+    console.error(`Could not remove ${paths.length} orphaned objects from ${bucket}:`, removeError);
+  }
+}
+
+/**
+ * Runs `task` over `items` with at most `limit` in flight, keeping result order
+ */
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  task: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let next = 0;
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await task(items[index], index);
+    }
+  });
+  await Promise.all(workers);
+  return results;
+}
+
+// Resumable upload sessions. The session id handed to the browser is a
+// signed token carrying everything needed to finish the upload, so no
+// session table is needed and one user cannot continue another's upload.
+// Tokens expire with the storage upload they point at.
+
+export interface UploadSession {
+  uploadId: string;
+  caseId: string;
+  userId: string;
+  fileName: string;
+  fileType: string;
+  size: number;
+  path: string;
+  expiresAt: number;
+}
+
+function sign(payload: string) {
+  const secret = process.env.NEXTAUTH_SECRET;
+  if (!secret) {
+    throw new Error("NEXTAUTH_SECRET must be set to sign upload sessions");
+  }
+  return createHmac("sha256", secret).update(payload).digest("base64url");
+}
+
+export function encodeUploadSession(session: Omit<UploadSession, "expiresAt">): string {
+  const signed: UploadSession = { ...session, expiresAt: Date.now() + UPLOAD_SESSION_TTL_MS };
+  const payload = Buffer.from(JSON.stringify(signed)).toString("base64url");
+  return `${payload}.${sign(payload)}`;
+}
+
+/**
+ * Whether a session's storage upload may already have been discarded
+ */
+export function isExpiredUploadSession(session: UploadSession) {
+  return !(session.expiresAt > Date.now());
+}
+
+/**
+ * Verifies and decodes a session id, returning null when it is malformed
+ * or was not issued by this server
+ */
+export function decodeUploadSession(token: string): UploadSession | null {
+  const [payload, signature] = token.split(".");
+  if (!payload || !signature) {
+    return null;
+  }
+  const expected = Buffer.from(sign(payload));
+  const actual = Buffer.from(signature);
+  if (expected.length !== actual.length || !timingSafeEqual(expected, actual)) {
+    return null;
+  }
+  try {
+    return JSON.parse(Buffer.from(payload, "base64url").toString("utf8")) as UploadSession;
+  } catch {
+    return null;
+  }
+}
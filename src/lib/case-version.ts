@@ -0,0 +1,91 @@
+import { NextRequest, NextResponse } from "next/server";
+import { prisma } from "@/lib/db";
+
+// A case's version is its CaseVersion row's updatedAt. Triggers (see the
+// 20250613090000_case_version_table migration) move it on whenever the case
+// or one of its hearings, notes or uploads is written, without touching the
+// case row itself: the case's own updatedAt, which orders the case lists,
+// only changes when the case is.
+//
+// Reads of the case and of its hearings, notes and uploads send the version
+// as ETag and Last-Modified; a client that sends it back (If-None-Match /
+// If-Modified-Since) gets a bodiless 304 while nothing has changed. Edits
+// send it as If-Match to fail with 409 instead of overwriting a newer copy
+// (see src/lib/case-edit.ts).
+
+/**
+ * The ETag of a case version
+ */
+export function caseETag(updatedAt: Date) {
+  return `"${updatedAt.toISOString()}"`;
+}
+
+/**
+ * The updatedAt an edit of a case at `current` writes. Always later than
+ * `current`, so two edits within one millisecond still differ.
+ */
+export function nextCaseVersion(current: Date) {
+  return new Date(Math.max(Date.now(), current.getTime() + 1));
+}
+
+/**
+ * The version an edit's If-Match asks for: undefined when it names none
+ * (no header, or "*"), null when the header is not a case version
+ */
+export function ifMatchVersion(request: NextRequest): Date | null | undefined {
+  const header = request.headers.get("if-match")?.trim();
+  if (!header || header === "*") {
+    return undefined;
+  }
+  const version = new Date(header.replace(/^W\//, "").replace(/^"(.*)"$/, "$1"));
+  return isNaN(version.getTime()) ? null : version;
+}
+
+/**
+ * Validator headers for a response showing the case at version `updatedAt`
+ */
+export function caseVersionHeaders(updatedAt: Date): Record<string, string> {
+  return {
+    ETag: caseETag(updatedAt),
+    "Last-Modified": updatedAt.toUTCString(),
+    "Cache-Control": "private, no-cache",
+  };
+}
+
+function isNotModified(request: NextRequest, updatedAt: Date) {
+  // If-None-Match wins over If-Modified-Since when both are sent
+  const ifNoneMatch = request.headers.get("if-none-match");
+  if (ifNoneMatch) {
+    const etag = caseETag(updatedAt);
+    return ifNoneMatch
+      .split(",")
+      .some((tag) => tag.trim() === "*" || tag.trim().replace(/^W\//, "") === etag);
+  }
+  const since = Date.parse(request.headers.get("if-modified-since") ?? "");
+  // Last-Modified only has whole seconds
+  return !isNaN(since) && Math.floor(updatedAt.getTime() / 1000) * 1000 <= since;
+}
+
+/**
+ * Looks up the case's version for a read. `notModified` is the 304 to send
+ * when the request's validators still match it; otherwise send `headers`
+ * with the body. The version is read before the body, so a write landing
+ * in between leaves an ETag older than the body, never newer.
+ */
+export async function checkCaseVersion(request: NextRequest, caseId: string) {
+  const found = await prisma.caseVersion.findUnique({
+    where: { caseId },
+    select: { updatedAt: true },
+  });
+  if (!found) {
+    return null;
+  }
+  const headers = caseVersionHeaders(found.updatedAt);
+  return {
+    updatedAt: found.updatedAt,
+    headers,
+    notModified: isNotModified(request, found.updatedAt)
+      ? new NextResponse(null, { status: 304, headers })
+      : null,
+  };
+}
@@ -0,0 +1,272 @@
+import { Prisma } from "@prisma/client";
+import { prisma } from "@/lib/db";
+import type { RequestUser } from "@/lib/request-context";
+
+// Incremental change feed (GET /api/changes).
+//
+// Triggers (the 20250610090000_change_feed migration) append a Change row
+// for every write to a case, hearing, note or upload, carrying the case's
+// owner, so a client holding a cursor can ask for what changed since
+// instead of reloading every case. The feed returns the current rows of
+// whatever changed and a tombstone for whatever the caller can no longer
+// see: deleted rows, and for users, cases that were reassigned away.
+//
+// Changes are read in (transaction id, seq) order, and only those of
+// transactions older than every transaction still running (the snapshot's
+// xmin): a transaction that has not committed yet cannot end up behind a
+// cursor that was already handed out.
+//
+// A cursor for a full load is taken with currentChangeCursor() before the
+// load reads anything, so the feed repeats rather than misses what changed
+// meanwhile. Changes are kept for CHANGE_RETENTION_DAYS; an older cursor
+// is refused (410) and its client reloads in full.
+
+const RETENTION_DAYS = Number(process.env.CHANGE_RETENTION_DAYS ?? 30);
+const RETENTION_MS = RETENTION_DAYS * 24 * 60 * 60 * 1000;
+// Rows outlive the cursors that may still need them by a day, for
+// transactions that ran long before their changes became readable
+const PRUNE_AFTER_MS = RETENTION_MS + 24 * 60 * 60 * 1000;
+const PRUNE_INTERVAL_MS = 60 * 60 * 1000;
+
+export const DEFAULT_CHANGE_LIMIT = 500;
+export const MAX_CHANGE_LIMIT = 1000;
+
+export type ChangeEntity = "case" | "hearing" | "note" | "upload";
+
+export interface ChangeCursor {
+  // Transaction id and seq of the last change read (xid8 and bigint, as text)
+  xid: string;
+  seq: string;
+  issuedAt: number;
+}
+
+export interface Tombstone {
+  type: ChangeEntity;
+  id: string;
+  caseId: string;
+  reason: "deleted" | "reassigned";
+}
+
+export interface ChangePage {
+  cases: unknown[];
+  hearings: unknown[];
+  notes: unknown[];
+  uploads: unknown[];
+  deleted: Tombstone[];
+  nextCursor: string;
+  hasMore: boolean;
+}
+
+interface ChangeRow {
+  horizon: string;
+  seq: string | null;
+  xid: string | null;
+  entity: ChangeEntity;
+  entityId: string;
+  caseId: string;
+  op: "upsert" | "delete";
+  userId: string | null;
+  previousUserId: string | null;
+}
+
+// The row shape of GET /api/cases with its default includes plus the owner
+export const CHANGE_CASE_SELECT = {
+  id: true,
+  caseType: true,
+  registrationYear: true,
+  registrationNum: true,
+  title: true,
+  courtName: true,
+  createdAt: true,
+  updatedAt: true,
+  userId: true,
+  isCompleted: true,
+  petitioners: true,
+  respondents: true,
+  hearings: { orderBy: { date: "desc" }, take: 1 },
+  user: { select: { id: true, name: true, email: true } },
+} satisfies Prisma.CaseSelect;
+
+const globalForChangeFeed = globalThis as unknown as {
+  changeFeedPrunedAt: number | undefined;
+};
+
+export function encodeChangeCursor(cursor: ChangeCursor): string {
+  return Buffer.from(`${cursor.xid}|${cursor.seq}|${cursor.issuedAt}`).toString("base64url");
+}
+
+/**
+ * Decodes a change cursor, returning null when it is malformed
+ */
+export function decodeChangeCursor(token: string): ChangeCursor | null {
+  const [xid, seq, issuedAt] = Buffer.from(token, "base64url").toString("utf8").split("|");
+  if (!/^\d+$/.test(xid ?? "") || !/^\d+$/.test(seq ?? "") || !/^\d+$/.test(issuedAt ?? "")) {
+    return null;
+  }
+  return { xid, seq, issuedAt: Number(issuedAt) };
+}
+
+/**
+ * Whether the changes after a cursor may already have been pruned
+ */
+export function isExpiredChangeCursor(cursor: ChangeCursor) {
+  return Date.now() - cursor.issuedAt > RETENTION_MS;
+}
+
+/**
+ * Parses the limit query parameter, clamped to [1, MAX_CHANGE_LIMIT]
+ */
+export function parseChangeLimit(value: string | null): number | null {
+  if (value === null || value === "") {
+    return DEFAULT_CHANGE_LIMIT;
+  }
+  const limit = Number(value);
+  if (!Number.isInteger(limit) || limit < 1) {
+    return null;
+  }
+  return Math.min(limit, MAX_CHANGE_LIMIT);
+}
+
+/**
+ * A cursor from which the feed returns every change not yet visible now.
+ * Take it before reading the rows it is meant to follow.
+ */
+export async function currentChangeCursor(): Promise<string> {
+  const [{ horizon }] = await prisma.$queryRaw<{ horizon: string }[]>`
+    SELECT pg_snapshot_xmin(pg_current_snapshot())::text AS horizon
+  `;
+  return encodeChangeCursor({ xid: horizon, seq: "0", issuedAt: Date.now() });
+}
+
+/**
+ * Drops changes past the retention period, at most once an hour per instance
+ */
+async function pruneChanges() {
+  const now = Date.now();
+  if (now - (globalForChangeFeed.changeFeedPrunedAt ?? 0) < PRUNE_INTERVAL_MS) {
+    return;
+  }
+  globalForChangeFeed.changeFeedPrunedAt = now;
+  await prisma.change.deleteMany({ where: { changedAt: { lt: new Date(now - PRUNE_AFTER_MS) } } });
+}
+
+type ChangePosition = Pick<ChangeCursor, "xid" | "seq">;
+
+function later(a: ChangePosition, b: ChangePosition): ChangePosition {
+  const [ax, bx] = [BigInt(a.xid), BigInt(b.xid)];
+  if (ax !== bx) {
+    return ax > bx ? a : b;
+  }
+  return BigInt(a.seq) >= BigInt(b.seq) ? a : b;
+}
+
+/**
+ * Up to `limit` changes after `cursor` that the user may see, as the
+ * current rows of what changed and tombstones for what went away
+ */
+export async function readChanges(user: RequestUser, cursor: ChangeCursor, limit: number): Promise<ChangePage> {
+  const isAdmin = user.role === "ADMIN";
+  const owner = isAdmin
+    ? Prisma.empty
+    : Prisma.sql`AND ("userId" = ${user.id} OR "previousUserId" = ${user.id})`;
+
+  // One statement, so the changes are read under the horizon they are checked against
+  const rows = await prisma.$queryRaw<ChangeRow[]>`
+    SELECT h.horizon::text AS horizon, c.seq::text AS seq, c.xid::text AS xid,
+      c.entity, c."entityId", c."caseId", c.op, c."userId", c."previousUserId"
+    FROM (SELECT pg_snapshot_xmin(pg_current_snapshot()) AS horizon) h
+    LEFT JOIN LATERAL (
+      SELECT * FROM "Change"
+      WHERE ("xid", "seq") > (${cursor.xid}::text::xid8, ${cursor.seq}::text::bigint)
+        AND "xid" < h.horizon
+        ${owner}
+      ORDER BY "xid", "seq"
+      LIMIT ${limit + 1}
+    ) c ON true
+  `;
+  void pruneChanges().catch((error) => console.error("Error pruning changes:", error));
+
+  const changes = rows.filter((row) => row.seq !== null);
+  const hasMore = changes.length > limit;
+  const read = hasMore ? changes.slice(0, limit) : changes;
+  const last = read[read.length - 1];
+  const next = {
+    ...(hasMore && last ? { xid: last.xid!, seq: last.seq! } : later(cursor, { xid: rows[0].horizon, seq: "0" })),
+    issuedAt: Date.now(),
+  };
+
+  // The latest change of each row decides what is sent for it
+  const latest = new Map<string, ChangeRow>();
+  for (const change of read) {
+    latest.delete(`${change.entity}:${change.entityId}`);
+    latest.set(`${change.entity}:${change.entityId}`, change);
+  }
+
+  // Cases that became the user's: their hearings, notes and uploads are new to them
+  const arrived = new Set(
+    read
+      .filter((change) => !isAdmin && change.entity === "case" && change.userId === user.id && change.previousUserId)
+      .map((change) => change.entityId)
+  );
+
+  const deleted: Tombstone[] = [];
+  const ids: Record<ChangeEntity, string[]> = { case: [], hearing: [], note: [], upload: [] };
+  const movedIn: string[] = [];
+  for (const change of latest.values()) {
+    const tombstone = { type: change.entity, id: change.entityId, caseId: change.caseId };
+    if (change.op === "delete") {
+      deleted.push({ ...tombstone, reason: "deleted" });
+    } else if (!isAdmin && change.entity === "case" && change.userId !== user.id) {
+      deleted.push({ ...tombstone, reason: "reassigned" });
+    } else {
+      ids[change.entity].push(change.entityId);
+      if (change.entity === "case" && arrived.has(change.entityId)) {
+        movedIn.push(change.entityId);
+      }
+    }
+  }
+
+  // Writing a hearing does not write its case, but the case's row in the
+  // list shows its latest hearing, so the case is sent again too
+  const caseIds = new Set(ids.case);
+  for (const change of latest.values()) {
+    if (change.entity === "hearing") {
+      caseIds.add(change.caseId);
+    }
+  }
+
+  // Rows are read as they are now; ones deleted or moved away since turn
+  // up as tombstones further on in the feed, so they are just left out
+  const owned = isAdmin ? {} : { case: { userId: user.id } };
+  const childWhere = (childIds: string[]) => ({
+    ...owned,
+    OR: [{ id: { in: childIds } }, ...(movedIn.length ? [{ caseId: { in: movedIn } }] : [])],
+  });
+  const wanted = (childIds: string[]) => childIds.length > 0 || movedIn.length > 0;
+  const [cases, hearings, notes, uploads] = await Promise.all([
+    caseIds.size
+      ? prisma.case.findMany({
+          where: { id: { in: [...caseIds] }, ...(isAdmin ? {} : { userId: user.id }) },
+          select: CHANGE_CASE_SELECT,
+        })
+      : [],
+    wanted(ids.hearing) ? prisma.hearing.findMany({ where: childWhere(ids.hearing) }) : [],
+    wanted(ids.note)
+      ? prisma.note.findMany({
+          where: childWhere(ids.note),
+          include: { user: { select: { id: true, name: true, email: true } } },
+        })
+      : [],
+    wanted(ids.upload) ? prisma.upload.findMany({ where: childWhere(ids.upload) }) : [],
+  ]);
+
+  return {
+    cases,
+    hearings,
+    notes,
+    uploads,
+    deleted,
+    nextCursor: encodeChangeCursor(next),
+    hasMore,
+  };
+}
@@ -0,0 +1,256 @@
+import { createGoogleGenerativeAI } from "@ai-sdk/google";
+import {
+  LanguageModelV1,
+  LanguageModelV1StreamPart,
+  defaultSettingsMiddleware,
+  wrapLanguageModel,
+} from "ai";
+import {
+  SimilarCase,
+  SimilarityAccess,
+  describeCases,
+  findSimilarCasesForText,
+} from "@/lib/case-similarity";
+import { tracedFetch } from "@/lib/tracing";
+
+// Model, history window and answer cache for the legal assistant (/api/chat)
+
+export const SYSTEM_PROMPT =
+  "You are a legal assistant your answers should be based primarily on the origin country (INDIA), and you solve queries related to the country's laws, regulations, and procedures.";
+
+// Messages sent to the model verbatim; older turns are folded into a note
+const HISTORY_MAX_MESSAGES = 12;
+const HISTORY_MAX_CHARS = 12_000;
+export const MAX_MESSAGE_CHARS = 8_000;
+// How many of the dropped questions the note lists (the most recent ones)
+const SUMMARY_MAX_QUESTIONS = 5;
+const SUMMARY_QUESTION_CHARS = 200;
+// Similar cases from the user's diary handed to the model with each question
+export const CONTEXT_CASES = 3;
+
+// Anything but letters, digits and whitespace (built at runtime: the TS target predates \p{...})
+const NON_WORD = new RegExp("[^\\p{L}\\p{N}\\s]", "gu");
+
+const CACHE_TTL_MS = Number(process.env.CHAT_CACHE_TTL_MS ?? 6 * 60 * 60 * 1000);
+const CACHE_MAX_ENTRIES = Number(process.env.CHAT_CACHE_MAX_ENTRIES ?? 500);
+
+export interface ChatMessage {
+  role: "user" | "assistant";
+  content: string;
+}
+
+/**
+ * Validates the posted messages, returning an error message when they are
+ * unusable. The last message must be the user's question.
+ */
+export function parseMessages(messages: unknown): ChatMessage[] | { error: string } {
+  if (!Array.isArray(messages) || messages.length === 0) {
+    return { error: "messages must be a non-empty array" };
+  }
+  const parsed: ChatMessage[] = [];
+  for (const message of messages) {
+    if (!message || typeof message.content !== "string") {
+      return { error: "Every message needs string content" };
+    }
+    if (message.content.length > MAX_MESSAGE_CHARS) {
+      return { error: `Messages are limited to ${MAX_MESSAGE_CHARS} characters` };
+    }
+    parsed.push({
+      role: message.role === "user" ? "user" : "assistant",
+      content: message.content,
+    });
+  }
+  if (parsed[parsed.length - 1].role !== "user") {
+    return { error: "The last message must be from the user" };
+  }
+  return parsed;
+}
+
+/**
+ * The caller's cases most similar to the question. A retrieval failure
+ * only costs the answer its case context.
+ */
+export async function findRelatedCases(question: string, access: SimilarityAccess): Promise<SimilarCase[]> {
+  try {
+    return await findSimilarCasesForText(question, access, CONTEXT_CASES);
+  } catch (error) {
+    console.error("Error retrieving similar cases for chat:", error);
+    return [];
+  }
+}
+
+/**
+ * The most recent messages that fit the history budget, preceded by the
+ * system prompt and any related cases. Dropped turns are replaced by a
+ * short note listing the user's earlier questions, so request size stays
+ * bounded however long the conversation runs.
+ */
+export function buildPrompt(messages: ChatMessage[], related: SimilarCase[] = []) {
+  const kept: ChatMessage[] = [];
+  let chars = 0;
+  for (let i = messages.length - 1; i >= 0; i--) {
+    const message = messages[i];
+    if (
+      kept.length > 0 &&
+      (kept.length >= HISTORY_MAX_MESSAGES || chars + message.content.length > HISTORY_MAX_CHARS)
+    ) {
+      break;
+    }
+    kept.unshift(message);
+    chars += message.content.length;
+  }
+  // The window should not open on an answer whose question was dropped
+  while (kept.length > 1 && kept[0].role === "assistant") {
+    kept.shift();
+  }
+
+  const system: { role: "system"; content: string }[] = [{ role: "system", content: SYSTEM_PROMPT }];
+  if (related.length) {
+    system.push({
+      role: "system",
+      content: `Cases in the user's diary that may relate to the question (refer to them only where relevant):\n${describeCases(related)}`,
+    });
+  }
+  const earlier = messages
+    .slice(0, messages.length - kept.length)
+    .filter((m) => m.role === "user")
+    .slice(-SUMMARY_MAX_QUESTIONS)
+    .map((m) => m.content.slice(0, SUMMARY_QUESTION_CHARS).replace(/\s+/g, " ").trim());
+  if (earlier.length) {
+    system.push({
+      role: "system",
+      content: `Earlier in this conversation the user asked:\n${earlier.map((q) => `- ${q}`).join("\n")}`,
+    });
+  }
+
+  return [...system, ...kept];
+}
+
+/**
+ * Cache key for a conversation, or null when the answer depends on earlier
+ * turns. Only standalone questions are cached; the key is the question
+ * lowercased with punctuation and extra whitespace removed, plus the ids
+ * of the cases given as context.
+ */
+export function cacheKey(messages: ChatMessage[], related: SimilarCase[] = []): string | null {
+  const questions = messages.filter((m) => m.role === "user");
+  if (questions.length !== 1) {
+    return null;
+  }
+  const key = questions[0].content
+    .toLowerCase()
+    .replace(NON_WORD, " ")
+    .replace(/\s+/g, " ")
+    .trim();
+  if (!key) {
+    return null;
+  }
+  return related.length ? `${key}|${related.map((c) => c.id).join(",")}` : key;
+}
+
+/**
+ * Answers keyed by normalised question, expiring after a TTL and evicting
+ * the least recently used entry beyond the size limit
+ */
+export class AnswerCache {
+  private entries = new Map<string, { text: string; expiresAt: number }>();
+
+  constructor(
+    private maxEntries = CACHE_MAX_ENTRIES,
+    private ttlMs = CACHE_TTL_MS
+  ) {}
+
+  get(key: string): string | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) {
+      return undefined;
+    }
+    // Re-insert so Map order tracks recency
+    this.entries.set(key, entry);
+    return entry.text;
+  }
+
+  set(key: string, text: string) {
+    this.entries.delete(key);
+    this.entries.set(key, { text, expiresAt: Date.now() + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as string);
+    }
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+}
+
+const globalForChat = globalThis as unknown as {
+  chatAnswerCache: AnswerCache | undefined;
+  chatModel: LanguageModelV1 | undefined;
+};
+
+export function getAnswerCache(): AnswerCache {
+  globalForChat.chatAnswerCache ??= new AnswerCache();
+  return globalForChat.chatAnswerCache;
+}
+
+/**
+ * Offline stand-in for Gemini: streams back a canned answer quoting the
+ * question and the prompt size, word by word. Selected with CHAT_MODEL=fake for local runs and
+ * tests, so no API key or network is needed.
+ */
+export function createFakeModel(): LanguageModelV1 {
+  const answer = (prompt: Parameters<LanguageModelV1["doGenerate"]>[0]["prompt"]) => {
+    const last = prompt[prompt.length - 1];
+    const question =
+      last && last.role === "user"
+        ? last.content.map((part) => (part.type === "text" ? part.text : "")).join("")
+        : "";
+    return `This is a test answer to: ${question} (${prompt.length} messages in context)`;
+  };
+  const usage = { promptTokens: 0, completionTokens: 0 };
+  const rawCall = { rawPrompt: null, rawSettings: {} };
+
+  return {
+    specificationVersion: "v1",
+    provider: "fake",
+    modelId: "fake-legal-assistant",
+    defaultObjectGenerationMode: undefined,
+    async doGenerate(options) {
+      return { text: answer(options.prompt), finishReason: "stop", usage, rawCall };
+    },
+    async doStream(options) {
+      const words = answer(options.prompt).match(/\S+\s*/g) ?? [];
+      const stream = new ReadableStream<LanguageModelV1StreamPart>({
+        start(controller) {
+          for (const word of words) {
+            controller.enqueue({ type: "text-delta", textDelta: word });
+          }
+          controller.enqueue({ type: "finish", finishReason: "stop", usage });
+          controller.close();
+        },
+      });
+      return { stream, rawCall };
+    },
+  };
+}
+
+/**
+ * The assistant model: Gemini, or the fake model when CHAT_MODEL=fake
+ */
+export function getChatModel(): LanguageModelV1 {
+  globalForChat.chatModel ??=
+    process.env.CHAT_MODEL === "fake"
+      ? createFakeModel()
+      : wrapLanguageModel({
+          // Timed up to the start of the streamed answer
+          model: createGoogleGenerativeAI({ fetch: tracedFetch("ai") })("gemini-2.0-flash"),
+          middleware: defaultSettingsMiddleware({
+            settings: { providerMetadata: {} }, // customize as needed
+          }),
+        });
+  return globalForChat.chatModel;
+}
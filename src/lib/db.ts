@@ -1,14 +1,32 @@
-import { PrismaClient } from '@prisma/client';
+import { Prisma, PrismaClient } from '@prisma/client';
+import type { ITXClientDenyList } from '@prisma/client/runtime/library';
+import { NameCursorKey, encodeNameCursor } from '@/lib/pagination';
+import { tracePhase } from '@/lib/tracing';
+
+// Every query, raw ones included, is timed as a db span of the request's
+// trace (src/lib/tracing.ts)
+function createPrismaClient() {
+  return new PrismaClient({
+    log: process.env.NODE_ENV === 'development' ? ['query', 'error', 'warn'] : ['error'],
+  }).$extends({
+    query: {
+      $allOperations({ model, operation, args, query }) {
+        return tracePhase('db', model ? `${model}.${operation}` : operation, () => query(args));
+      },
+    },
+  });
+}
+
+type TracedPrismaClient = ReturnType<typeof createPrismaClient>;
+
+// The client handed to interactive $transaction callbacks
+export type TransactionClient = Omit<TracedPrismaClient, ITXClientDenyList>;
 
 const globalForPrisma = globalThis as unknown as {
-  prisma: PrismaClient | undefined;
+  prisma: TracedPrismaClient | undefined;
 };
 
-export const prisma =
-  globalForPrisma.prisma ??
-  new PrismaClient({
-    log: process.env.NODE_ENV === 'development' ? ['query', 'error', 'warn'] : ['error'],
-  });
+export const prisma = globalForPrisma.prisma ?? createPrismaClient();
 
 if (process.env.NODE_ENV !== 'production') globalForPrisma.prisma = prisma;
 
@@ -19,8 +37,6 @@ export async function createPersonalFileUpload(data: {
   userId: string;
 }) {
   try {
-    console.log(`Creating personal file upload for user ${data.userId}`);
-    
     // First, make sure the user has a PERSONAL case
     // Check if the user already has a PERSONAL case
     let personalCase = await prisma.case.findFirst({
@@ -32,8 +48,6 @@ export async function createPersonalFileUpload(data: {
     
     // If no personal case exists, create one
     if (!personalCase) {
-      console.log(`No personal case found for user ${data.userId}, creating one`);
-      
       // Generate a unique registration number based on timestamp
       const currentYear = new Date().getFullYear();
       const uniqueNum = Math.floor(Date.now() / 1000) % 1000000; // Use timestamp for uniqueness
@@ -49,13 +63,9 @@ export async function createPersonalFileUpload(data: {
           isCompleted: false
         }
       });
-      console.log(`Created personal case with ID: ${personalCase.id}`);
-    } else {
-      console.log(`Found existing personal case with ID: ${personalCase.id}`);
     }
     
     // Now create the upload with the personal case ID
-    console.log(`Creating upload record with caseId: ${personalCase.id}`);
     const upload = await prisma.upload.create({
       data: {
         fileName: data.fileName,
@@ -66,7 +76,6 @@ export async function createPersonalFileUpload(data: {
       }
     });
     
-    console.log(`Personal file upload created with ID: ${upload.id}`);
     return upload;
   } catch (error) {
     console.error("Error creating personal file upload:", error);
@@ -74,87 +83,133 @@ export async function createPersonalFileUpload(data: {
   }
 }
 
-export async function getUsersWithInfo() {
-  try {
-    // Fetch all users with their basic info
-    const users = await prisma.$queryRaw`
-      SELECT u.id, u.name, u.email, u.role, 
-            p.id as "personalInfoId", 
-            p.address, p.city, p.state, p."zipCode", 
-            p."phoneNumber", p."dateOfBirth", p."idNumber", p.notes
-      FROM "User" u
-      LEFT JOIN "PersonalInfo" p ON u.id = p."userId"
-      ORDER BY u.name ASC
-    `;
-    
-    // Process users to have the expected structure
-    const processedUsers = Array.isArray(users) ? users.map(user => {
-      // Extract personalInfo fields
-      const personalInfo = user.personalInfoId ? {
-        id: user.personalInfoId,
-        address: user.address,
-        city: user.city, 
-        state: user.state,
-        zipCode: user.zipCode,
-        phoneNumber: user.phoneNumber,
-        dateOfBirth: user.dateOfBirth,
-        idNumber: user.idNumber,
-        notes: user.notes
-      } : null;
-      
-      // Remove personalInfo fields from user object
-      const { 
-        personalInfoId, address, city, state, zipCode, 
-        phoneNumber, dateOfBirth, idNumber, notes, 
-        ...userFields 
-      } = user;
-      
-      return {
-        ...userFields,
-        personalInfo,
-        uploads: [] // Will be filled in next step
-      };
-    }) : [];
-    
-    // Fetch and add uploads for each user
-    for (const user of processedUsers) {
-      try {
-        // Use Prisma client instead of raw query to get case information
-        const uploads = await prisma.upload.findMany({
-          where: {
-            userId: user.id
-          },
-          include: {
-            case: {
-              select: {
-                id: true,
-                caseType: true,
-                title: true
-              }
-            }
-          },
-          orderBy: {
-            createdAt: 'desc'
-          }
-        });
-        
-        user.uploads = uploads;
-        console.log(`Found ${uploads.length} uploads for user ${user.id}`);
-        
-        // Log personal files count for debugging
-        const personalFiles = uploads.filter(upload => 
-          upload.case?.caseType === "PERSONAL" || upload.caseId === null
-        );
-        console.log(`User ${user.id} has ${personalFiles.length} personal files`);
-      } catch (error) {
-        console.error(`Error fetching uploads for user ${user.id}:`, error);
-        user.uploads = [];
-      }
-    }
-    
-    return processedUsers;
-  } catch (error) {
-    console.error("Error in getUsersWithInfo:", error);
-    throw error;
+export const DEFAULT_UPLOADS_PER_USER = 20;
+export const MAX_UPLOADS_PER_USER = 100;
+
+export interface UsersWithInfoOptions {
+  limit: number;
+  after?: NameCursorKey | null;
+  // Most recent uploads returned per user; counts always cover every upload
+  uploadsPerUser?: number;
+  // Skip the upload rows entirely and return only the counts
+  countsOnly?: boolean;
+}
+
+type UploadRow = {
+  id: string;
+  fileName: string;
+  fileUrl: string;
+  fileType: string;
+  createdAt: Date;
+  caseId: string | null;
+  userId: string;
+  caseType: string | null;
+  title: string | null;
+};
+
+// Personal files are uploads on a PERSONAL case, or older ones with no case
+const PERSONAL_UPLOADS: Prisma.UploadWhereInput = {
+  OR: [{ caseId: null }, { case: { caseType: "PERSONAL" } }],
+};
+
+/**
+ * One page of users (name order) with their personal info, upload counts
+ * and their most recent uploads. Uploads for the whole page are loaded in
+ * a single windowed query, and counts come from grouped aggregates, so the
+ * query count does not grow with the number of users.
+ */
+export async function getUsersWithInfo(options: UsersWithInfoOptions) {
+  const uploadsPerUser = Math.min(
+    options.uploadsPerUser ?? DEFAULT_UPLOADS_PER_USER,
+    MAX_UPLOADS_PER_USER
+  );
+
+  const rows = await prisma.user.findMany({
+    where: options.after
+      ? {
+          OR: [
+            { name: { gt: options.after.name } },
+            { name: options.after.name, id: { gt: options.after.id } },
+          ],
+        }
+      : undefined,
+    orderBy: [{ name: "asc" }, { id: "asc" }],
+    take: options.limit + 1,
+    select: {
+      id: true,
+      name: true,
+      email: true,
+      role: true,
+      personalInfo: {
+        select: {
+          id: true,
+          address: true,
+          city: true,
+          state: true,
+          zipCode: true,
+          phoneNumber: true,
+          dateOfBirth: true,
+          idNumber: true,
+          notes: true,
+        },
+      },
+    },
+  });
+
+  const users = rows.slice(0, options.limit);
+  const last = users[users.length - 1];
+  const nextCursor = rows.length > options.limit && last ? encodeNameCursor(last) : null;
+  const userIds = users.map((user) => user.id);
+  if (userIds.length === 0) {
+    return { users: [], nextCursor };
+  }
+
+  const [uploadCounts, personalCounts, uploadRows] = await Promise.all([
+    prisma.upload.groupBy({
+      by: ["userId"],
+      where: { userId: { in: userIds } },
+      _count: { _all: true },
+    }),
+    prisma.upload.groupBy({
+      by: ["userId"],
+      where: { userId: { in: userIds }, ...PERSONAL_UPLOADS },
+      _count: { _all: true },
+    }),
+    options.countsOnly || uploadsPerUser < 1
+      ? Promise.resolve([] as UploadRow[])
+      : prisma.$queryRaw<UploadRow[]>`
+          SELECT up."id", up."fileName", up."fileUrl", up."fileType", up."createdAt",
+                 up."caseId", up."userId", c."caseType", c."title"
+          FROM (
+            SELECT u.*, ROW_NUMBER() OVER (PARTITION BY u."userId" ORDER BY u."createdAt" DESC) AS rn
+            FROM "Upload" u
+            WHERE u."userId" IN (${Prisma.join(userIds)})
+          ) up
+          LEFT JOIN "Case" c ON c."id" = up."caseId"
+          WHERE up.rn <= ${uploadsPerUser}
+          ORDER BY up."userId", up."createdAt" DESC
+        `,
+  ]);
+
+  const totals = new Map(uploadCounts.map((row) => [row.userId, row._count._all]));
+  const personal = new Map(personalCounts.map((row) => [row.userId, row._count._all]));
+  const uploadsByUser = new Map<string, object[]>();
+  for (const { caseType, title, ...upload } of uploadRows) {
+    const list = uploadsByUser.get(upload.userId) ?? [];
+    list.push({
+      ...upload,
+      case: upload.caseId ? { id: upload.caseId, caseType, title } : null,
+    });
+    uploadsByUser.set(upload.userId, list);
   }
-} 
\ No newline at end of file
+
+  return {
+    users: users.map((user) => ({
+      ...user,
+      uploadCount: totals.get(user.id) ?? 0,
+      personalFileCount: personal.get(user.id) ?? 0,
+      uploads: uploadsByUser.get(user.id) ?? [],
+    })),
+    nextCursor,
+  };
+}
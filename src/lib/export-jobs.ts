@@ -0,0 +1,149 @@
+import { once } from "events";
+import { createWriteStream, openAsBlob } from "fs";
+import { unlink } from "fs/promises";
+import { tmpdir } from "os";
+import path from "path";
+import { ExportJob } from "@prisma/client";
+import { prisma } from "@/lib/db";
+import { ensureStorage, supabaseAdmin } from "@/lib/supabase";
+import { putObject } from "@/lib/case-uploads";
+import { CONTENT_TYPES, ExportFilters, ExportFormat, renderList } from "@/lib/case-export";
+
+// Background exports of dockets and cause lists too long to stream within
+// one request. A job renders to a temporary file (so memory stays flat),
+// uploads it to the private case-exports bucket and records its progress on
+// the ExportJob row; the owner polls GET /api/exports/[jobId] and downloads
+// through a short-lived signed URL.
+
+export const EXPORTS_BUCKET = "case-exports";
+
+// How often a running job writes its row count
+const PROGRESS_EVERY_ROWS = 100;
+// A queued or running job that has not moved for this long was cut off,
+// e.g. its instance was recycled, and is reported as failed
+const STALE_JOB_MS = 5 * 60 * 1000;
+const DOWNLOAD_URL_TTL_SECONDS = 60 * 60;
+
+interface StoredFilters extends Omit<ExportFilters, "window"> {
+  window?: { from: string; to: string };
+}
+
+function storeFilters(filters: ExportFilters): StoredFilters {
+  return {
+    ...filters,
+    window: filters.window && {
+      from: filters.window.from.toISOString(),
+      to: filters.window.to.toISOString(),
+    },
+  };
+}
+
+function loadFilters(stored: StoredFilters): ExportFilters {
+  return {
+    ...stored,
+    window: stored.window && { from: new Date(stored.window.from), to: new Date(stored.window.to) },
+  };
+}
+
+export function createExportJob(filters: ExportFilters, format: ExportFormat) {
+  return prisma.exportJob.create({
+    data: {
+      userId: filters.userId,
+      kind: filters.kind,
+      format,
+      filters: storeFilters(filters) as object,
+    },
+  });
+}
+
+/**
+ * Renders and uploads one job. Safe to call more than once: only the call
+ * that moves the job from queued to running does the work.
+ */
+export async function runExportJob(jobId: string) {
+  const claimed = await prisma.exportJob.updateMany({
+    where: { id: jobId, status: "queued" },
+    data: { status: "running" },
+  });
+  if (claimed.count === 0) {
+    return;
+  }
+  const job = await prisma.exportJob.findUniqueOrThrow({ where: { id: jobId } });
+  const format = job.format as ExportFormat;
+  const file = path.join(tmpdir(), `export-${job.id}.${format}`);
+  let rows = 0;
+
+  try {
+    const out = createWriteStream(file);
+    const chunks = renderList(loadFilters(job.filters as unknown as StoredFilters), format, async (count) => {
+      rows = count;
+      if (count % PROGRESS_EVERY_ROWS === 0) {
+        await prisma.exportJob.update({ where: { id: job.id }, data: { rows: count } });
+      }
+    });
+    for await (const chunk of chunks) {
+      if (!out.write(chunk)) {
+        await once(out, "drain");
+      }
+    }
+    out.end();
+    await once(out, "finish");
+
+    await ensureStorage();
+    const objectPath = `${job.userId}/${job.id}.${format}`;
+    await putObject(EXPORTS_BUCKET, objectPath, await openAsBlob(file, { type: CONTENT_TYPES[format] }));
+
+    await prisma.exportJob.update({
+      where: { id: job.id },
+      data: { status: "completed", rows, path: objectPath, completedAt: new Date() },
+    });
+  } catch (error) {
+    console.error(`Export job ${job.id} failed:`, error);
+    await prisma.exportJob.update({
+      where: { id: job.id },
+      data: {
+        status: "failed",
+        rows,
+        error: error instanceof Error ? error.message : "Unknown export error",
+        completedAt: new Date(),
+      },
+    });
+  } finally {
+    await unlink(file).catch(() => undefined);
+  }
+}
+
+/**
+ * The job as the API shows it, with a download URL once it has completed
+ */
+export async function describeExportJob(job: ExportJob) {
+  if ((job.status === "queued" || job.status === "running") && Date.now() - job.updatedAt.getTime() > STALE_JOB_MS) {
+    job = await prisma.exportJob.update({
+      where: { id: job.id },
+      data: { status: "failed", error: "The export was interrupted; please start it again", completedAt: new Date() },
+    });
+  }
+
+  let downloadUrl: string | null = null;
+  if (job.status === "completed" && job.path) {
+    const { data, error } = await supabaseAdmin.storage
+      .from(EXPORTS_BUCKET)
+      .createSignedUrl(job.path, DOWNLOAD_URL_TTL_SECONDS, { download: `${job.kind}-${job.id}.${job.format}` });
+    if (error) {
+      throw error;
+    }
+    downloadUrl = data.signedUrl;
+  }
+
+  return {
+    id: job.id,
+    kind: job.kind,
+    format: job.format,
+    status: job.status,
+    rows: job.rows,
+    error: job.error,
+    createdAt: job.createdAt,
+    completedAt: job.completedAt,
+    downloadUrl,
+  };
+}
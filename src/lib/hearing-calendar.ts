@@ -0,0 +1,268 @@
+import { Prisma } from "@prisma/client";
+import { prisma } from "@/lib/db";
+
+// Hearings across many cases in a date window, for cause lists and the
+// calendar feed. One query walks the Hearing(date) or Hearing(nextDate)
+// index for the window and joins the owning case, instead of one
+// /api/cases/[caseId]/hearings request per case.
+
+export const DEFAULT_WINDOW_DAYS = 30;
+export const MAX_WINDOW_DAYS = 92;
+// Entries returned for one window; narrow the window when truncated
+export const MAX_CALENDAR_ENTRIES = 1000;
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Hearing dates are stored as instants; the all-day events of the iCalendar
+// feed fall on the day the instant is in the firm's timezone, and the
+// default window starts at midnight there
+export const FIRM_TIMEZONE = process.env.FIRM_TIMEZONE || "Asia/Kolkata";
+
+const firmClockFormat = new Intl.DateTimeFormat("en-CA", {
+  timeZone: FIRM_TIMEZONE,
+  year: "numeric",
+  month: "2-digit",
+  day: "2-digit",
+  hour: "2-digit",
+  minute: "2-digit",
+  second: "2-digit",
+  hourCycle: "h23",
+});
+
+// The firm's wall clock at an instant, read as if it were UTC
+function firmClock(date: Date): number {
+  const parts = Object.fromEntries(firmClockFormat.formatToParts(date).map((part) => [part.type, part.value]));
+  return Date.UTC(
+    Number(parts.year),
+    Number(parts.month) - 1,
+    Number(parts.day),
+    Number(parts.hour),
+    Number(parts.minute),
+    Number(parts.second)
+  );
+}
+
+// Midnight (as a UTC date) of the firm's calendar day at an instant
+function firmDay(date: Date): Date {
+  const clock = firmClock(date);
+  return new Date(clock - (((clock % DAY_MS) + DAY_MS) % DAY_MS));
+}
+
+/** The instant the firm's calendar day containing `date` begins */
+export function startOfFirmDay(date: Date): Date {
+  const midnight = firmDay(date).getTime();
+  // Offset of the firm's clock from UTC, taken again at the guessed start
+  // in case it changes during the day
+  const guess = midnight - (firmClock(new Date(midnight)) - midnight);
+  return new Date(midnight - (firmClock(new Date(guess)) - guess));
+}
+
+// date is when a hearing took place, nextDate is the listing it set
+export const CALENDAR_FIELDS = ["nextDate", "date"] as const;
+export type CalendarField = (typeof CALENDAR_FIELDS)[number];
+
+export interface CalendarWindow {
+  from: Date;
+  to: Date;
+}
+
+export interface CalendarOptions extends CalendarWindow {
+  on: CalendarField;
+  userId: string;
+  isAdmin: boolean;
+  ownerId?: string | null;
+  includePERSONAL?: boolean;
+  isCompleted?: boolean | null;
+}
+
+export interface CalendarEntry {
+  id: string;
+  date: Date;
+  notes: string | null;
+  nextDate: Date | null;
+  nextPurpose: string | null;
+  caseId: string;
+  case: {
+    id: string;
+    title: string;
+    caseType: string;
+    registrationNum: number;
+    registrationYear: number;
+    courtName: string;
+    isCompleted: boolean;
+    userId: string;
+    user: { id: string; name: string };
+  };
+}
+
+/**
+ * Parses from/to query parameters into a half-open [from, to) window.
+ * Defaults to DEFAULT_WINDOW_DAYS from the start of today in FIRM_TIMEZONE;
+ * returns an error message for unparseable, reversed or over-long windows.
+ */
+export function parseCalendarWindow(
+  fromParam: string | null,
+  toParam: string | null
+): CalendarWindow | { error: string } {
+  const today = startOfFirmDay(new Date());
+
+  const from = fromParam ? new Date(fromParam) : today;
+  if (isNaN(from.getTime())) {
+    return { error: "from must be a valid date" };
+  }
+  const to = toParam ? new Date(toParam) : new Date(from.getTime() + DEFAULT_WINDOW_DAYS * DAY_MS);
+  if (isNaN(to.getTime())) {
+    return { error: "to must be a valid date" };
+  }
+  if (to <= from) {
+    return { error: "to must be after from" };
+  }
+  if (to.getTime() - from.getTime() > MAX_WINDOW_DAYS * DAY_MS) {
+    return { error: `The window can span at most ${MAX_WINDOW_DAYS} days` };
+  }
+  return { from, to };
+}
+
+/**
+ * Hearings whose date (or nextDate) falls in the window, earliest first,
+ * with their case. Users get hearings on their own cases; admins get the
+ * whole firm, or one advocate's when ownerId is set.
+ */
+export async function getCalendarEntries(options: CalendarOptions) {
+  const caseFilters: Prisma.CaseWhereInput[] = [];
+  if (!options.isAdmin) {
+    caseFilters.push({ userId: options.userId });
+  } else {
+    if (!options.includePERSONAL) {
+      caseFilters.push({ caseType: { not: "PERSONAL" } });
+    }
+    if (options.ownerId) {
+      caseFilters.push({ userId: options.ownerId });
+    }
+  }
+  if (options.isCompleted !== null && options.isCompleted !== undefined) {
+    caseFilters.push({ isCompleted: options.isCompleted });
+  }
+
+  const range = { gte: options.from, lt: options.to };
+  const where: Prisma.HearingWhereInput =
+    options.on === "date" ? { date: range } : { nextDate: range };
+  if (caseFilters.length) {
+    where.case = { AND: caseFilters };
+  }
+
+  const rows = await prisma.hearing.findMany({
+    where,
+    orderBy: [options.on === "date" ? { date: "asc" } : { nextDate: "asc" }, { id: "asc" }],
+    take: MAX_CALENDAR_ENTRIES + 1,
+    select: {
+      id: true,
+      date: true,
+      notes: true,
+      nextDate: true,
+      nextPurpose: true,
+      caseId: true,
+      case: {
+        select: {
+          id: true,
+          title: true,
+          caseType: true,
+          registrationNum: true,
+          registrationYear: true,
+          courtName: true,
+          isCompleted: true,
+          userId: true,
+          user: { select: { id: true, name: true } },
+        },
+      },
+    },
+  });
+
+  return {
+    hearings: rows.slice(0, MAX_CALENDAR_ENTRIES) as CalendarEntry[],
+    truncated: rows.length > MAX_CALENDAR_ENTRIES,
+  };
+}
+
+// iCalendar (RFC 5545) export
+
+function escapeText(value: string): string {
+  return value
+    .replace(/\\/g, "\\\\")
+    .replace(/;/g, "\\;")
+    .replace(/,/g, "\\,")
+    .replace(/\r?\n/g, "\\n");
+}
+
+// Content lines longer than 75 octets continue on lines starting with a space
+function foldLine(line: string): string {
+  const parts: string[] = [];
+  let current = "";
+  let octets = 0;
+  for (const char of Array.from(line)) {
+    const size = Buffer.byteLength(char);
+    if (octets + size > (parts.length ? 74 : 75)) {
+      parts.push(current);
+      current = "";
+      octets = 0;
+    }
+    current += char;
+    octets += size;
+  }
+  parts.push(current);
+  return parts.join("\r\n ");
+}
+
+// The calendar day of an instant in the firm's timezone, and the day after
+function firmDays(date: Date): [string, string] {
+  const day = firmDay(date);
+  const nextDay = new Date(day.getTime() + DAY_MS);
+  return [formatDate(day), formatDate(nextDay)];
+}
+
+function formatDate(day: Date): string {
+  return day.toISOString().slice(0, 10).replace(/-/g, "");
+}
+
+function formatTimestamp(date: Date): string {
+  return date.toISOString().replace(/[-:]/g, "").replace(/\.\d{3}/, "");
+}
+
+/**
+ * Renders calendar entries as an iCalendar feed of all-day events, one per
+ * hearing on the day (in FIRM_TIMEZONE) given by the `on` field
+ */
+export function toICalendar(entries: CalendarEntry[], on: CalendarField): string {
+  const stamp = formatTimestamp(new Date());
+  const lines = [
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//Advocate Diary//Hearings//EN",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+    "X-WR-CALNAME:Hearings",
+  ];
+
+  for (const entry of entries) {
+    const [day, nextDay] = firmDays(on === "date" ? entry.date : entry.nextDate!);
+    const c = entry.case;
+    const purpose = on === "nextDate" ? entry.nextPurpose : entry.notes;
+
+    lines.push(
+      "BEGIN:VEVENT",
+      `UID:${entry.id}-${on}@advocate-diary`,
+      `DTSTAMP:${stamp}`,
+      `DTSTART;VALUE=DATE:${day}`,
+      `DTEND;VALUE=DATE:${nextDay}`,
+      `SUMMARY:${escapeText(`${c.title} (${c.caseType} ${c.registrationNum}/${c.registrationYear})`)}`,
+      `LOCATION:${escapeText(c.courtName)}`
+    );
+    if (purpose) {
+      lines.push(`DESCRIPTION:${escapeText(purpose)}`);
+    }
+    lines.push("END:VEVENT");
+  }
+
+  lines.push("END:VCALENDAR");
+  return lines.map(foldLine).join("\r\n") + "\r\n";
+}
@@ -0,0 +1,154 @@
+// Brute-force throttling for the credentials login.
+//
+// Failed logins are counted in fixed windows per email and client IP pair,
+// per email across all addresses (a higher limit, against guessing spread
+// over many addresses) and per client IP. Once any count reaches its limit,
+// further attempts are refused until the window runs out, before the user
+// is looked up or a password hashed, so a credential-stuffing burst costs
+// one map lookup per attempt. Keying the low limit on the pair means a
+// stranger's failures lock an account out only from the stranger's own
+// address. A successful login clears its pair's count.
+//
+// Counts live in an in-process AttemptStore by default. With several app
+// instances each keeps its own counts; setAttemptStore() swaps in a shared
+// store (e.g. one backed by Redis) without changing the callers.
+
+const WINDOW_MS = Number(process.env.LOGIN_THROTTLE_WINDOW_MS ?? 15 * 60 * 1000);
+const MAX_EMAIL_FAILURES = Number(process.env.LOGIN_MAX_EMAIL_FAILURES ?? 5);
+const MAX_ACCOUNT_FAILURES = Number(process.env.LOGIN_MAX_ACCOUNT_FAILURES ?? 50);
+const MAX_IP_FAILURES = Number(process.env.LOGIN_MAX_IP_FAILURES ?? 100);
+// Proxies in front of the app that append to X-Forwarded-For; the client
+// address is the entry the outermost of them added
+const TRUSTED_PROXY_HOPS = Number(process.env.TRUSTED_PROXY_HOPS ?? 1);
+const MAX_TRACKED_KEYS = 50_000;
+
+// Error codes authorize() throws; NextAuth passes them to the login page
+// as ?error=, see src/app/login/page.tsx
+export const LOGIN_THROTTLED = "TooManyAttempts";
+export const LOGIN_BUSY = "LoginBusy";
+
+export interface AttemptCount {
+  count: number;
+  resetAt: number;
+}
+
+export interface AttemptStore {
+  // Current count for key, or null if it has none or its window is over
+  get(key: string): Promise<AttemptCount | null>;
+  // Adds one to key, opening a window of windowMs if none is running
+  increment(key: string, windowMs: number): Promise<AttemptCount>;
+  reset(key: string): Promise<void>;
+}
+
+export class MemoryAttemptStore implements AttemptStore {
+  private counts = new Map<string, AttemptCount>();
+
+  async get(key: string) {
+    const entry = this.counts.get(key);
+    if (!entry || entry.resetAt <= Date.now()) {
+      return null;
+    }
+    return entry;
+  }
+
+  async increment(key: string, windowMs: number) {
+    const now = Date.now();
+    let entry = this.counts.get(key);
+    if (!entry || entry.resetAt <= now) {
+      if (this.counts.size >= MAX_TRACKED_KEYS) {
+        this.sweep(now);
+      }
+      entry = { count: 0, resetAt: now + windowMs };
+      this.counts.set(key, entry);
+    }
+    entry.count++;
+    return entry;
+  }
+
+  async reset(key: string) {
+    this.counts.delete(key);
+  }
+
+  private sweep(now: number) {
+    for (const [key, entry] of this.counts) {
+      if (entry.resetAt <= now) {
+        this.counts.delete(key);
+      }
+    }
+    // Still full of live windows: drop the oldest keys
+    for (const key of this.counts.keys()) {
+      if (this.counts.size < MAX_TRACKED_KEYS) {
+        break;
+      }
+      this.counts.delete(key);
+    }
+  }
+}
+
+const globalForLoginThrottle = globalThis as unknown as {
+  attemptStore: AttemptStore | undefined;
+};
+
+function store() {
+  globalForLoginThrottle.attemptStore ??= new MemoryAttemptStore();
+  return globalForLoginThrottle.attemptStore;
+}
+
+export function setAttemptStore(attemptStore: AttemptStore) {
+  globalForLoginThrottle.attemptStore = attemptStore;
+}
+
+const accountKey = (email: string) => `email:${email.trim().toLowerCase()}`;
+const emailKey = (email: string, ip: string) => `${accountKey(email)}|ip:${ip}`;
+const ipKey = (ip: string) => `ip:${ip}`;
+
+// Each counted key with the failures that lock it
+function limits(email: string, ip: string): [string, number][] {
+  return [
+    [emailKey(email, ip), MAX_EMAIL_FAILURES],
+    [accountKey(email), MAX_ACCOUNT_FAILURES],
+    [ipKey(ip), MAX_IP_FAILURES],
+  ];
+}
+
+/**
+ * The client address of a login request, from the proxy headers.
+ *
+ * Clients can send X-Forwarded-For themselves and each proxy appends the
+ * address it saw, so only the last TRUSTED_PROXY_HOPS entries are
+ * trustworthy; earlier ones are ignored. Without the header, the
+ * X-Real-IP the platform sets is used.
+ */
+export function clientIp(headers: Record<string, string | string[] | undefined> | undefined) {
+  const header = (name: string) => {
+    const value = headers?.[name];
+    return Array.isArray(value) ? value.join(",") : value;
+  };
+  const hops = (header("x-forwarded-for") ?? "")
+    .split(",")
+    .map((hop) => hop.trim())
+    .filter(Boolean);
+  const forwarded = TRUSTED_PROXY_HOPS > 0 ? hops[Math.max(0, hops.length - TRUSTED_PROXY_HOPS)] : undefined;
+  return forwarded || header("x-real-ip")?.trim() || "unknown";
+}
+
+/**
+ * Milliseconds until the email may try again from the IP, or 0 if it may now
+ */
+export async function loginRetryAfter(email: string, ip: string): Promise<number> {
+  const checks = limits(email, ip);
+  const counts = await Promise.all(checks.map(([key]) => store().get(key)));
+  const blockedUntil = Math.max(
+    0,
+    ...counts.map((entry, i) => (entry && entry.count >= checks[i][1] ? entry.resetAt : 0))
+  );
+  return Math.max(0, blockedUntil - Date.now());
+}
+
+export async function recordLoginFailure(email: string, ip: string) {
+  await Promise.all(limits(email, ip).map(([key]) => store().increment(key, WINDOW_MS)));
+}
+
+export async function recordLoginSuccess(email: string, ip: string) {
+  await store().reset(emailKey(email, ip));
+}
@@ -0,0 +1,158 @@
+// Keyset (cursor) pagination helpers for list endpoints ordered by
+// (updatedAt desc, id desc). The cursor is an opaque base64url token of
+// the last row's sort key, so pages stay stable while rows are inserted.
+
+export const DEFAULT_PAGE_SIZE = 50;
+export const MAX_PAGE_SIZE = 200;
+
+export interface CursorKey {
+  updatedAt: Date;
+  id: string;
+}
+
+export function encodeCursor(key: CursorKey): string {
+  return Buffer.from(`${key.updatedAt.toISOString()}|${key.id}`).toString("base64url");
+}
+
+/**
+ * Decodes a cursor token, returning null when it is malformed
+ */
+export function decodeCursor(token: string): CursorKey | null {
+  try {
+    const [timestamp, id] = Buffer.from(token, "base64url").toString("utf8").split("|");
+    const updatedAt = new Date(timestamp);
+    if (!id || isNaN(updatedAt.getTime())) {
+      return null;
+    }
+    return { updatedAt, id };
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Prisma where clause selecting rows that sort after the cursor
+ */
+export function afterCursor(key: CursorKey) {
+  return {
+    OR: [
+      { updatedAt: { lt: key.updatedAt } },
+      { updatedAt: key.updatedAt, id: { lt: key.id } },
+    ],
+  };
+}
+
+/**
+ * Parses the limit query parameter, clamped to [1, MAX_PAGE_SIZE]
+ */
+export function parseLimit(value: string | null): number | null {
+  if (value === null || value === "") {
+    return DEFAULT_PAGE_SIZE;
+  }
+  const limit = Number(value);
+  if (!Number.isInteger(limit) || limit < 1) {
+    return null;
+  }
+  return Math.min(limit, MAX_PAGE_SIZE);
+}
+
+/**
+ * Splits a page fetched with take: limit + 1 into items and the next cursor
+ */
+export function toPage<T extends CursorKey>(rows: T[], limit: number) {
+  const hasMore = rows.length > limit;
+  const items = hasMore ? rows.slice(0, limit) : rows;
+  const last = items[items.length - 1];
+  return {
+    items,
+    nextCursor: hasMore && last ? encodeCursor(last) : null,
+  };
+}
+
+// Lists under a case (hearings by date, notes and uploads by createdAt)
+// page by a (date desc, id desc) keyset on their own date column, behind
+// the same cursor tokens. They only page when asked to (limit or cursor);
+// otherwise they still return the whole list, as before pagination.
+
+export interface CaseListPage {
+  paged: boolean;
+  limit: number;
+  cursor: CursorKey | null;
+}
+
+/**
+ * Parses limit and cursor for a list under a case, or returns the 400 message
+ */
+export function parseCaseListPage(params: URLSearchParams): CaseListPage | { error: string } {
+  const limitParam = params.get("limit");
+  const cursorToken = params.get("cursor");
+  const limit = parseLimit(limitParam);
+  if (limit === null) {
+    return { error: "limit must be a positive integer" };
+  }
+  const cursor = cursorToken ? decodeCursor(cursorToken) : null;
+  if (cursorToken && !cursor) {
+    return { error: "Invalid cursor" };
+  }
+  return { paged: limitParam !== null || cursorToken !== null, limit, cursor };
+}
+
+/**
+ * toPage for rows keyed on another date column than updatedAt
+ */
+export function toPageBy<T extends { id: string }>(rows: T[], limit: number, date: (row: T) => Date) {
+  const hasMore = rows.length > limit;
+  const items = hasMore ? rows.slice(0, limit) : rows;
+  const last = items[items.length - 1];
+  return {
+    items,
+    nextCursor: hasMore && last ? encodeCursor({ updatedAt: date(last), id: last.id }) : null,
+  };
+}
+
+// Ranked results (e.g. search) cannot use a keyset on updatedAt, so they
+// page by offset behind the same kind of opaque token
+
+export const MAX_OFFSET = 1000;
+
+export function encodeOffsetCursor(offset: number): string {
+  return Buffer.from(`offset|${offset}`).toString("base64url");
+}
+
+/**
+ * Decodes an offset cursor, returning null when it is malformed or too deep
+ */
+export function decodeOffsetCursor(token: string): number | null {
+  const [kind, value] = Buffer.from(token, "base64url").toString("utf8").split("|");
+  const offset = Number(value);
+  if (kind !== "offset" || !Number.isInteger(offset) || offset < 0 || offset > MAX_OFFSET) {
+    return null;
+  }
+  return offset;
+}
+
+// Alphabetical lists (e.g. users) page by a (name asc, id asc) keyset
+
+export interface NameCursorKey {
+  name: string;
+  id: string;
+}
+
+export function encodeNameCursor(key: NameCursorKey): string {
+  return Buffer.from(JSON.stringify([key.name, key.id])).toString("base64url");
+}
+
+/**
+ * Decodes a name cursor, returning null when it is malformed
+ */
+export function decodeNameCursor(token: string): NameCursorKey | null {
+  try {
+    const [name, id] = JSON.parse(Buffer.from(token, "base64url").toString("utf8"));
+    if (typeof name !== "string" || typeof id !== "string" || !id) {
+      return null;
+    }
+    return { name, id };
+  } catch {
+    return null;
+  }
+}
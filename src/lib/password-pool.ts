@@ -0,0 +1,135 @@
+import os from "node:os";
+import { Worker } from "node:worker_threads";
+import * as bcrypt from "bcrypt";
+
+// Bounded pool of worker threads for bcrypt.
+//
+// bcrypt's own async API runs on libuv's shared thread pool (4 threads by
+// default), the same one file system and zlib work queues on, so a burst of
+// logins stalls uploads and exports behind password hashes. Hashes run here
+// on a fixed number of dedicated threads instead, one job per thread, and
+// the queue in front of them is bounded: past PASSWORD_QUEUE_LIMIT waiting
+// jobs, new ones fail fast with PasswordPoolBusyError rather than pile up.
+// PASSWORD_WORKERS=0 turns the pool off and calls bcrypt's async API.
+
+const POOL_SIZE = Number(
+  process.env.PASSWORD_WORKERS ?? Math.max(1, Math.min(4, Math.floor(os.cpus().length / 2)))
+);
+const QUEUE_LIMIT = Number(process.env.PASSWORD_QUEUE_LIMIT ?? 100);
+
+// Evaluated rather than loaded from a file, so the bundler has nothing to
+// resolve; require() inside resolves from the app's node_modules
+const WORKER_SOURCE = `
+const { parentPort } = require("node:worker_threads");
+const bcrypt = require("bcrypt");
+parentPort.on("message", ({ op, args }) => {
+  try {
+    const result = op === "compare" ? bcrypt.compareSync(args[0], args[1]) : bcrypt.hashSync(args[0], args[1]);
+    parentPort.postMessage({ result });
+  } catch (error) {
+    parentPort.postMessage({ error: error instanceof Error ? error.message : String(error) });
+  }
+});
+`;
+
+type Job = {
+  op: "compare" | "hash";
+  args: [string, string | number];
+  resolve: (value: any) => void;
+  reject: (error: Error) => void;
+};
+
+export class PasswordPoolBusyError extends Error {
+  constructor() {
+    super("Too many password checks are queued");
+    this.name = "PasswordPoolBusyError";
+  }
+}
+
+class PasswordPool {
+  private idle: Worker[] = [];
+  private busy = new Map<Worker, Job>();
+  private queue: Job[] = [];
+  private started = 0;
+
+  run<T>(op: Job["op"], args: Job["args"]): Promise<T> {
+    if (this.queue.length >= QUEUE_LIMIT) {
+      return Promise.reject(new PasswordPoolBusyError());
+    }
+    return new Promise<T>((resolve, reject) => {
+      this.queue.push({ op, args, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  private dispatch() {
+    while (this.queue.length > 0) {
+      const worker = this.idle.pop() ?? this.spawn();
+      if (!worker) {
+        return;
+      }
+      const job = this.queue.shift()!;
+      this.busy.set(worker, job);
+      worker.postMessage({ op: job.op, args: job.args });
+    }
+  }
+
+  private spawn(): Worker | undefined {
+    if (this.started >= POOL_SIZE) {
+      return undefined;
+    }
+    this.started++;
+    const worker = new Worker(WORKER_SOURCE, { eval: true });
+    // Idle workers must not keep the process alive
+    worker.unref();
+
+    worker.on("message", (message: { result?: unknown; error?: string }) => {
+      const job = this.busy.get(worker);
+      this.busy.delete(worker);
+      this.idle.push(worker);
+      if (job) {
+        if (message.error !== undefined) {
+          job.reject(new Error(message.error));
+        } else {
+          job.resolve(message.result);
+        }
+      }
+      this.dispatch();
+    });
+
+    // A crashed worker fails its job and is replaced on the next dispatch
+    worker.on("error", (error) => {
+      this.busy.get(worker)?.reject(error);
+    });
+    worker.on("exit", () => {
+      this.busy.delete(worker);
+      this.idle = this.idle.filter((w) => w !== worker);
+      this.started--;
+      this.dispatch();
+    });
+    return worker;
+  }
+}
+
+const globalForPasswordPool = globalThis as unknown as {
+  passwordPool: PasswordPool | undefined;
+};
+
+function pool() {
+  globalForPasswordPool.passwordPool ??= new PasswordPool();
+  return globalForPasswordPool.passwordPool;
+}
+
+export function comparePassword(plain: string, hashed: string): Promise<boolean> {
+  if (POOL_SIZE < 1) {
+    return bcrypt.compare(plain, hashed);
+  }
+  return pool().run<boolean>("compare", [plain, hashed]);
+}
+
+export function hashPasswordInPool(password: string, rounds: number): Promise<string> {
+  if (POOL_SIZE < 1) {
+    return bcrypt.hash(password, rounds);
+  }
+  return pool().run<string>("hash", [password, rounds]);
+}
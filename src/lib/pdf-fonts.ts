@@ -0,0 +1,291 @@
+import { readFileSync } from "fs";
+import path from "path";
+
+// TrueType fonts for the text of server-side PDFs that the standard
+// Helvetica fonts cannot show, such as party names in Devanagari.
+//
+// Characters WinAnsiEncoding has stay in Helvetica; any other character is
+// drawn in the first fallback font with a glyph for it. A fallback font is
+// embedded whole (as a Type0 font over a CIDFontType2 with Identity
+// glyph ids and a ToUnicode map) only in files that use it, so exports of
+// Latin-only text are unchanged. Text is not shaped: conjuncts show with
+// an explicit virama, and only the pre-base vowel sign I is moved in front
+// of its consonant cluster.
+//
+// The fonts live in assets/fonts (or PDF_FONTS_DIR). A script is added by
+// dropping its regular and bold TrueType files there and listing them in
+// FALLBACK_FONTS. As nothing is shaped, the committed files are subsets
+// cut down to the script's blocks with no layout tables (see the README),
+// which keeps each embedded copy around 25 KB.
+
+const FONTS_DIR = process.env.PDF_FONTS_DIR || path.join(process.cwd(), "assets", "fonts");
+
+const FALLBACK_FONTS = [
+  { regular: "NotoSansDevanagariUI-Regular.ttf", bold: "NotoSansDevanagariUI-Bold.ttf" },
+];
+
+export interface TrueTypeFont {
+  // PostScript name, used as the PDF BaseFont
+  name: string;
+  data: Buffer;
+  // Code point to glyph id
+  glyphs: Map<number, number>;
+  // Advance widths by glyph id, per 1000 units of font size
+  advances: number[];
+  bbox: [number, number, number, number];
+  ascent: number;
+  descent: number;
+  capHeight: number;
+}
+
+export interface FallbackFont {
+  regular: TrueTypeFont;
+  bold: TrueTypeFont;
+}
+
+const globalForFonts = globalThis as unknown as {
+  pdfFallbackFonts: FallbackFont[] | undefined;
+};
+
+function tableOffsets(data: Buffer) {
+  const tables = new Map<string, number>();
+  const count = data.readUInt16BE(4);
+  for (let i = 0; i < count; i++) {
+    const record = 12 + i * 16;
+    tables.set(data.toString("latin1", record, record + 4), data.readUInt32BE(record + 8));
+  }
+  return tables;
+}
+
+// Reads a format 4 (BMP) or format 12 (full range) Unicode cmap subtable
+function readCmap(data: Buffer, cmap: number): Map<number, number> {
+  const glyphs = new Map<number, number>();
+  const subtables: { platform: number; encoding: number; offset: number }[] = [];
+  for (let i = 0; i < data.readUInt16BE(cmap + 2); i++) {
+    const record = cmap + 4 + i * 8;
+    subtables.push({
+      platform: data.readUInt16BE(record),
+      encoding: data.readUInt16BE(record + 2),
+      offset: cmap + data.readUInt32BE(record + 4),
+    });
+  }
+  const pick = (format: number) =>
+    subtables.find(
+      (s) => (s.platform === 3 || s.platform === 0) && s.encoding !== 0 && data.readUInt16BE(s.offset) === format
+    );
+
+  const full = pick(12);
+  if (full) {
+    const groups = data.readUInt32BE(full.offset + 12);
+    for (let i = 0; i < groups; i++) {
+      const group = full.offset + 16 + i * 12;
+      const start = data.readUInt32BE(group);
+      const end = data.readUInt32BE(group + 4);
+      const glyph = data.readUInt32BE(group + 8);
+      for (let code = start; code <= end; code++) {
+        glyphs.set(code, glyph + code - start);
+      }
+    }
+    return glyphs;
+  }
+
+  const bmp = pick(4);
+  if (!bmp) {
+    throw new Error("Font has no Unicode cmap");
+  }
+  const segments = data.readUInt16BE(bmp.offset + 6) / 2;
+  const ends = bmp.offset + 14;
+  const starts = ends + segments * 2 + 2;
+  const deltas = starts + segments * 2;
+  const rangeOffsets = deltas + segments * 2;
+  for (let i = 0; i < segments; i++) {
+    const start = data.readUInt16BE(starts + i * 2);
+    const end = data.readUInt16BE(ends + i * 2);
+    const delta = data.readInt16BE(deltas + i * 2);
+    const rangeOffset = data.readUInt16BE(rangeOffsets + i * 2);
+    for (let code = start; code <= end && code !== 0xffff; code++) {
+      let glyph;
+      if (rangeOffset === 0) {
+        glyph = (code + delta) & 0xffff;
+      } else {
+        const at = rangeOffsets + i * 2 + rangeOffset + (code - start) * 2;
+        glyph = data.readUInt16BE(at);
+        glyph = glyph === 0 ? 0 : (glyph + delta) & 0xffff;
+      }
+      if (glyph !== 0) {
+        glyphs.set(code, glyph);
+      }
+    }
+  }
+  return glyphs;
+}
+
+/**
+ * Reads what embedding needs from a TrueType font file: its character
+ * map, glyph widths and the metrics of the font descriptor
+ */
+export function parseTrueType(data: Buffer, name: string): TrueTypeFont {
+  const tables = tableOffsets(data);
+  const [head, hhea, hmtx, maxp, cmap] = ["head", "hhea", "hmtx", "maxp", "cmap"].map((tag) => {
+    const offset = tables.get(tag);
+    if (offset === undefined) {
+      throw new Error(`Font ${name} has no ${tag} table`);
+    }
+    return offset;
+  });
+  const os2 = tables.get("OS/2");
+
+  const unitsPerEm = data.readUInt16BE(head + 18);
+  const scale = (value: number) => Math.round((value * 1000) / unitsPerEm);
+
+  const glyphCount = data.readUInt16BE(maxp + 4);
+  const metrics = data.readUInt16BE(hhea + 34);
+  const advances: number[] = [];
+  for (let glyph = 0; glyph < glyphCount; glyph++) {
+    advances.push(scale(data.readUInt16BE(hmtx + Math.min(glyph, metrics - 1) * 4)));
+  }
+
+  const ascent = scale(data.readInt16BE(hhea + 4));
+  return {
+    name,
+    data,
+    glyphs: readCmap(data, cmap),
+    advances,
+    bbox: [
+      scale(data.readInt16BE(head + 36)),
+      scale(data.readInt16BE(head + 38)),
+      scale(data.readInt16BE(head + 40)),
+      scale(data.readInt16BE(head + 42)),
+    ],
+    ascent,
+    descent: scale(data.readInt16BE(hhea + 6)),
+    capHeight: os2 !== undefined && data.readUInt16BE(os2) >= 2 ? scale(data.readInt16BE(os2 + 88)) : ascent,
+  };
+}
+
+function loadFont(file: string) {
+  return parseTrueType(readFileSync(path.join(FONTS_DIR, file)), path.parse(file).name);
+}
+
+/**
+ * The fallback fonts, read once per process. A missing or broken font is
+ * logged and skipped; its characters then print as "?".
+ */
+export function fallbackFonts(): FallbackFont[] {
+  if (!globalForFonts.pdfFallbackFonts) {
+    globalForFonts.pdfFallbackFonts = FALLBACK_FONTS.flatMap((files) => {
+      try {
+        return [{ regular: loadFont(files.regular), bold: loadFont(files.bold) }];
+      } catch (error) {
+        console.error(`Error loading PDF font ${files.regular}:`, error);
+        return [];
+      }
+    });
+  }
+  return globalForFonts.pdfFallbackFonts;
+}
+
+const VIRAMA = "्";
+const NUKTA = "़";
+const SIGN_I = "ि";
+
+function isConsonant(char: string | undefined) {
+  return char !== undefined && /[क-हक़-य़ॸ-ॿ]/.test(char);
+}
+
+// Index of the first character of the consonant cluster ending at `end`
+// (consonants joined by viramas, each with an optional nukta), or -1
+function clusterStart(chars: string[], end: number) {
+  let at = chars[end] === NUKTA ? end - 1 : end;
+  if (!isConsonant(chars[at])) {
+    return -1;
+  }
+  while (chars[at - 1] === VIRAMA) {
+    const previous = chars[at - 2] === NUKTA ? at - 3 : at - 2;
+    if (!isConsonant(chars[previous])) {
+      break;
+    }
+    at = previous;
+  }
+  return at;
+}
+
+/**
+ * Text in the order its glyphs are drawn: the Devanagari vowel sign I goes
+ * before the consonant cluster it follows in the text
+ */
+export function visualOrder(text: string): string {
+  const chars = Array.from(text);
+  for (let i = 1; i < chars.length; i++) {
+    if (chars[i] !== SIGN_I) {
+      continue;
+    }
+    const start = clusterStart(chars, i - 1);
+    if (start >= 0) {
+      chars.splice(i, 1);
+      chars.splice(start, 0, SIGN_I);
+    }
+  }
+  return chars.join("");
+}
+
+/**
+ * A string as a PDF hex string of UTF-16BE code units with a byte order mark
+ */
+export function utf16Hex(text: string) {
+  let hex = "FEFF";
+  for (let i = 0; i < text.length; i++) {
+    hex += text.charCodeAt(i).toString(16).toUpperCase().padStart(4, "0");
+  }
+  return `<${hex}>`;
+}
+
+function hex4(value: number) {
+  return value.toString(16).toUpperCase().padStart(4, "0");
+}
+
+/**
+ * ToUnicode CMap mapping each used glyph id back to its character
+ */
+export function toUnicodeCMap(used: Map<number, string>) {
+  const entries = [...used.entries()].sort((a, b) => a[0] - b[0]);
+  const blocks: string[] = [];
+  for (let i = 0; i < entries.length; i += 100) {
+    const block = entries.slice(i, i + 100);
+    blocks.push(
+      `${block.length} beginbfchar\n` +
+        block.map(([glyph, char]) => `<${hex4(glyph)}> ${utf16Hex(char).replace("<FEFF", "<")}`).join("\n") +
+        "\nendbfchar"
+    );
+  }
+  return [
+    "/CIDInit /ProcSet findresource begin",
+    "12 dict begin",
+    "begincmap",
+    "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+    "/CMapName /Adobe-Identity-UCS def",
+    "/CMapType 2 def",
+    "1 begincodespacerange",
+    "<0000> <FFFF>",
+    "endcodespacerange",
+    ...blocks,
+    "endcmap",
+    "CMapName currentdict /CMap defineresource pop",
+    "end",
+    "end",
+  ].join("\n");
+}
+
+/**
+ * Glyph ids of `text` in `font` as a PDF hex string, noting each glyph's
+ * character in `used` for the ToUnicode map
+ */
+export function encodeGlyphs(font: TrueTypeFont, text: string, used: Map<number, string>) {
+  let hex = "";
+  for (const char of text) {
+    const glyph = font.glyphs.get(char.codePointAt(0)!) ?? 0;
+    used.set(glyph, char);
+    hex += hex4(glyph);
+  }
+  return `<${hex}>`;
+}
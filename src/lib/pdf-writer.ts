@@ -0,0 +1,458 @@
+import { deflateSync } from "zlib";
+import {
+  TrueTypeFont,
+  encodeGlyphs,
+  fallbackFonts,
+  toUnicodeCMap,
+  utf16Hex,
+  visualOrder,
+} from "@/lib/pdf-fonts";
+
+// Minimal streaming PDF writer for server-side exports: A4 pages of text
+// and simple tables in the standard Helvetica fonts, so no headless browser
+// is needed. Characters those fonts lack are drawn in embedded TrueType
+// fallback fonts (see pdf-fonts.ts).
+//
+// Each page is written out (deflated) as soon as it is full, and take()
+// hands over the bytes written since the last call, so a long export is
+// sent while it is being rendered and only one page is held in memory. The
+// page tree, catalog and cross-reference table follow the last page.
+
+const PAGE_WIDTH = 595.28;
+const PAGE_HEIGHT = 841.89;
+const MARGIN = 50;
+export const CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN;
+
+// Object ids fixed up front; pages and their content streams follow
+const CATALOG_ID = 1;
+const PAGES_ID = 2;
+const REGULAR_FONT_ID = 3;
+const BOLD_FONT_ID = 4;
+
+// Advance widths (per 1000 units of font size) of characters 32-126
+const REGULAR_WIDTHS = [
+  278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+  556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+  1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+  667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+  333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+  556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+];
+const BOLD_WIDTHS = [
+  278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+  556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+  975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+  667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+  333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+  611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+];
+const DEFAULT_WIDTH = 556;
+
+// Font of a run drawn in Helvetica rather than a fallback font
+const STANDARD = -1;
+
+// Typographic characters outside Latin-1 that WinAnsiEncoding has
+const WIN_ANSI: Record<string, number> = {
+  "…": 0x85,
+  "‘": 0x91,
+  "’": 0x92,
+  "“": 0x93,
+  "”": 0x94,
+  "•": 0x95,
+  "–": 0x96,
+  "—": 0x97,
+  "€": 0x80,
+};
+
+export interface TextStyle {
+  bold?: boolean;
+  size?: number;
+  indent?: number;
+}
+
+export interface Column {
+  // Offset from the left margin
+  x: number;
+  width: number;
+}
+
+// Part of a line drawn in one font
+interface Run {
+  font: number;
+  text: string;
+}
+
+// A fallback font used in this file, written out by finish()
+interface EmbeddedFont {
+  resource: string;
+  id: number;
+  font: TrueTypeFont;
+  // Glyph ids drawn, with their characters
+  used: Map<number, string>;
+}
+
+// Fonts are deflated once per process, not once per export
+const compressedFonts = new WeakMap<TrueTypeFont, Buffer>();
+
+function isWinAnsi(char: string) {
+  const code = char.codePointAt(0) ?? 0;
+  return (code >= 32 && code <= 126) || (code >= 160 && code <= 255) || WIN_ANSI[char] !== undefined;
+}
+
+/**
+ * Maps text onto WinAnsi character codes; characters the standard fonts
+ * cannot show become "?"
+ */
+function toWinAnsi(text: string): string {
+  let out = "";
+  for (const char of text) {
+    const code = char.codePointAt(0) ?? 63;
+    if (code === 9 || code === 10 || code === 13) {
+      out += " ";
+    } else if (code >= 32 && code <= 126) {
+      out += char;
+    } else if (code >= 160 && code <= 255) {
+      out += char;
+    } else if (WIN_ANSI[char] !== undefined) {
+      out += String.fromCharCode(WIN_ANSI[char]);
+    } else {
+      out += "?";
+    }
+  }
+  return out;
+}
+
+// Tabs and line breaks inside a value print as spaces
+function normalise(text: string) {
+  return text.replace(/[\t\r\n]/g, " ");
+}
+
+// Index of the fallback font that draws `char`, or STANDARD
+function fontFor(char: string) {
+  if (isWinAnsi(char)) {
+    return STANDARD;
+  }
+  const code = char.codePointAt(0) ?? 0;
+  return fallbackFonts().findIndex((font) => font.regular.glyphs.has(code));
+}
+
+/**
+ * Splits text into runs of characters drawn in the same font
+ */
+function runs(text: string): Run[] {
+  const result: Run[] = [];
+  for (const char of text) {
+    const font = fontFor(char);
+    const last = result[result.length - 1];
+    if (last && last.font === font) {
+      last.text += char;
+    } else {
+      result.push({ font, text: char });
+    }
+  }
+  return result.length ? result : [{ font: STANDARD, text: "" }];
+}
+
+function textWidth(text: string, size: number, bold = false) {
+  const widths = bold ? BOLD_WIDTHS : REGULAR_WIDTHS;
+  let units = 0;
+  for (const char of text) {
+    const code = char.codePointAt(0) ?? 0;
+    const font = fontFor(char);
+    if (font === STANDARD) {
+      units += code >= 32 && code <= 126 ? widths[code - 32] : DEFAULT_WIDTH;
+    } else {
+      const fallback = fallbackFonts()[font][bold ? "bold" : "regular"];
+      units += fallback.advances[fallback.glyphs.get(code) ?? 0];
+    }
+  }
+  return (units * size) / 1000;
+}
+
+function escapeString(text: string) {
+  return text.replace(/[\\()]/g, (char) => `\\${char}`);
+}
+
+/**
+ * Breaks text into lines no wider than `width`, splitting words that do
+ * not fit on a line of their own
+ */
+function wrap(text: string, width: number, size: number, bold: boolean): string[] {
+  const lines: string[] = [];
+  for (const paragraph of text.split("\n")) {
+    let line = "";
+    for (const word of paragraph.split(" ").filter(Boolean)) {
+      const candidate = line ? `${line} ${word}` : word;
+      if (textWidth(candidate, size, bold) <= width) {
+        line = candidate;
+        continue;
+      }
+      if (line) {
+        lines.push(line);
+      }
+      line = word;
+      while (textWidth(line, size, bold) > width && line.length > 1) {
+        let cut = line.length - 1;
+        while (cut > 1 && textWidth(line.slice(0, cut), size, bold) > width) {
+          cut--;
+        }
+        lines.push(line.slice(0, cut));
+        line = line.slice(cut);
+      }
+    }
+    lines.push(line);
+  }
+  return lines;
+}
+
+function truncate(text: string, width: number, size: number, bold: boolean) {
+  if (textWidth(text, size, bold) <= width) {
+    return text;
+  }
+  let cut = text.length;
+  while (cut > 0 && textWidth(`${text.slice(0, cut)}...`, size, bold) > width) {
+    cut--;
+  }
+  return `${text.slice(0, cut)}...`;
+}
+
+export class PdfWriter {
+  private chunks: Buffer[] = [];
+  private position = 0;
+  private offsets: number[] = [];
+  private pageIds: number[] = [];
+  private nextId = BOLD_FONT_ID + 1;
+  private operations: string[] = [];
+  private pageOpen = false;
+  private y = 0;
+  private pageHeader?: (pdf: PdfWriter) => void;
+  private embedded = new Map<string, EmbeddedFont>();
+
+  constructor(private title: string) {
+    this.write("%PDF-1.4\n%\xe2\xe3\xcf\xd3\n");
+    this.object(REGULAR_FONT_ID, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>");
+    this.object(BOLD_FONT_ID, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>");
+  }
+
+  get pageCount() {
+    return this.pageIds.length + (this.pageOpen ? 1 : 0);
+  }
+
+  /**
+   * Bytes written since the last call
+   */
+  take(): Buffer[] {
+    const chunks = this.chunks;
+    this.chunks = [];
+    return chunks;
+  }
+
+  /**
+   * Draws `header` at the top of every page started from now on, e.g. the
+   * column headings of a table
+   */
+  setPageHeader(header: ((pdf: PdfWriter) => void) | undefined) {
+    this.pageHeader = header;
+  }
+
+  newPage() {
+    this.flushPage();
+    this.pageOpen = true;
+    this.y = PAGE_HEIGHT - MARGIN;
+    this.pageHeader?.(this);
+  }
+
+  /**
+   * Writes wrapped text, starting new pages as needed
+   */
+  text(text: string, style: TextStyle = {}) {
+    const size = style.size ?? 10;
+    const bold = style.bold ?? false;
+    const indent = style.indent ?? 0;
+    for (const line of wrap(normalise(text), CONTENT_WIDTH - indent, size, bold)) {
+      this.advance(size * 1.35);
+      this.show(line, MARGIN + indent, size, bold);
+    }
+  }
+
+  /**
+   * Writes one table row, each cell cut to its column's width
+   */
+  row(cells: string[], columns: Column[], style: TextStyle = {}) {
+    const size = style.size ?? 8;
+    const bold = style.bold ?? false;
+    this.advance(size * 1.5);
+    cells.forEach((cell, i) => {
+      const column = columns[i];
+      const text = truncate(normalise(cell), column.width - 4, size, bold);
+      if (text) {
+        this.show(text, MARGIN + column.x, size, bold);
+      }
+    });
+  }
+
+  gap(points: number) {
+    if (this.pageOpen) {
+      this.y -= points;
+    }
+  }
+
+  /**
+   * Horizontal line across the page
+   */
+  rule() {
+    this.advance(6);
+    const y = (this.y + 3).toFixed(2);
+    this.operations.push(`0.5 w ${MARGIN} ${y} m ${(PAGE_WIDTH - MARGIN).toFixed(2)} ${y} l S`);
+  }
+
+  /**
+   * Writes the page tree, catalog and cross-reference table; take() then
+   * returns the rest of the file
+   */
+  finish() {
+    if (this.pageCount === 0) {
+      this.newPage();
+    }
+    this.flushPage();
+    for (const font of this.embedded.values()) {
+      this.writeFont(font);
+    }
+
+    this.object(
+      PAGES_ID,
+      `<< /Type /Pages /Kids [${this.pageIds.map((id) => `${id} 0 R`).join(" ")}] /Count ${this.pageIds.length} >>`
+    );
+    this.object(CATALOG_ID, `<< /Type /Catalog /Pages ${PAGES_ID} 0 R >>`);
+    const infoId = this.nextId++;
+    const title = [...this.title].every(isWinAnsi) ? `(${escapeString(toWinAnsi(this.title))})` : utf16Hex(this.title);
+    this.object(infoId, `<< /Title ${title} /Producer (Advocate Diary) >>`);
+
+    const xref = this.position;
+    const entries = ["0000000000 65535 f \n"];
+    for (let id = 1; id < this.nextId; id++) {
+      entries.push(`${String(this.offsets[id]).padStart(10, "0")} 00000 n \n`);
+    }
+    this.write(`xref\n0 ${this.nextId}\n${entries.join("")}`);
+    this.write(`trailer\n<< /Size ${this.nextId} /Root ${CATALOG_ID} 0 R /Info ${infoId} 0 R >>\nstartxref\n${xref}\n%%EOF\n`);
+  }
+
+  private write(data: string | Buffer) {
+    const buffer = typeof data === "string" ? Buffer.from(data, "latin1") : data;
+    this.chunks.push(buffer);
+    this.position += buffer.length;
+  }
+
+  private object(id: number, body: string) {
+    this.offsets[id] = this.position;
+    this.write(`${id} 0 obj\n${body}\nendobj\n`);
+  }
+
+  private stream(id: number, compressed: Buffer, entries = "") {
+    this.offsets[id] = this.position;
+    this.write(`${id} 0 obj\n<< /Length ${compressed.length}${entries} /Filter /FlateDecode >>\nstream\n`);
+    this.write(compressed);
+    this.write("\nendstream\nendobj\n");
+  }
+
+  // Moves down by `height`, starting a new page when it does not fit
+  private advance(height: number) {
+    if (!this.pageOpen || this.y - height < MARGIN) {
+      this.newPage();
+    }
+    this.y -= height;
+  }
+
+  // Fallback runs carry their text as ActualText, as their glyphs may be
+  // drawn in a different order
+  private show(text: string, x: number, size: number, bold: boolean) {
+    const baseline = (this.y + size * 0.3).toFixed(2);
+    const parts = runs(text).map((run, i) => {
+      const position = i === 0 ? ` ${x.toFixed(2)} ${baseline} Td` : "";
+      if (run.font === STANDARD) {
+        return `/${bold ? "F2" : "F1"} ${size} Tf${position} (${escapeString(toWinAnsi(run.text))}) Tj`;
+      }
+      const font = this.embed(run.font, bold);
+      const glyphs = encodeGlyphs(font.font, visualOrder(run.text), font.used);
+      return `/Span << /ActualText ${utf16Hex(run.text)} >> BDC /${font.resource} ${size} Tf${position} ${glyphs} Tj EMC`;
+    });
+    this.operations.push(`BT ${parts.join(" ")} ET`);
+  }
+
+  // The font object of a fallback font, allocated on its first use
+  private embed(index: number, bold: boolean) {
+    const resource = `F${3 + index * 2 + (bold ? 1 : 0)}`;
+    let font = this.embedded.get(resource);
+    if (!font) {
+      font = {
+        resource,
+        id: this.nextId++,
+        font: fallbackFonts()[index][bold ? "bold" : "regular"],
+        used: new Map(),
+      };
+      this.embedded.set(resource, font);
+    }
+    return font;
+  }
+
+  // Type0 font over the whole TrueType file, addressed by glyph id
+  private writeFont({ id, font, used }: EmbeddedFont) {
+    const descendantId = this.nextId++;
+    const descriptorId = this.nextId++;
+    const fileId = this.nextId++;
+    const toUnicodeId = this.nextId++;
+    const widths = [...used.keys()]
+      .sort((a, b) => a - b)
+      .map((glyph) => `${glyph} [${font.advances[glyph]}]`)
+      .join(" ");
+
+    this.object(
+      id,
+      `<< /Type /Font /Subtype /Type0 /BaseFont /${font.name} /Encoding /Identity-H ` +
+        `/DescendantFonts [${descendantId} 0 R] /ToUnicode ${toUnicodeId} 0 R >>`
+    );
+    this.object(
+      descendantId,
+      `<< /Type /Font /Subtype /CIDFontType2 /BaseFont /${font.name} ` +
+        `/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> ` +
+        `/FontDescriptor ${descriptorId} 0 R /CIDToGIDMap /Identity /DW 1000 /W [${widths}] >>`
+    );
+    this.object(
+      descriptorId,
+      `<< /Type /FontDescriptor /FontName /${font.name} /Flags 32 /FontBBox [${font.bbox.join(" ")}] ` +
+        `/ItalicAngle 0 /Ascent ${font.ascent} /Descent ${font.descent} /CapHeight ${font.capHeight} ` +
+        `/StemV 80 /FontFile2 ${fileId} 0 R >>`
+    );
+
+    let compressed = compressedFonts.get(font);
+    if (!compressed) {
+      compressed = deflateSync(font.data);
+      compressedFonts.set(font, compressed);
+    }
+    this.stream(fileId, compressed, ` /Length1 ${font.data.length}`);
+    this.stream(toUnicodeId, deflateSync(Buffer.from(toUnicodeCMap(used), "latin1")));
+  }
+
+  private flushPage() {
+    if (!this.pageOpen) {
+      return;
+    }
+    const content = deflateSync(Buffer.from(this.operations.join("\n"), "latin1"));
+    const contentId = this.nextId++;
+    const pageId = this.nextId++;
+    const fonts = [`/F1 ${REGULAR_FONT_ID} 0 R /F2 ${BOLD_FONT_ID} 0 R`]
+      .concat([...this.embedded.values()].map((font) => `/${font.resource} ${font.id} 0 R`))
+      .join(" ");
+
+    this.stream(contentId, content);
+    this.object(
+      pageId,
+      `<< /Type /Page /Parent ${PAGES_ID} 0 R /MediaBox [0 0 ${PAGE_WIDTH} ${PAGE_HEIGHT}] ` +
+        `/Resources << /Font << ${fonts} >> >> /Contents ${contentId} 0 R >>`
+    );
+
+    this.pageIds.push(pageId);
+    this.operations = [];
+    this.pageOpen = false;
+  }
+}
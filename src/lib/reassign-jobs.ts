@@ -0,0 +1,131 @@
+import { Prisma, ReassignJob } from "@prisma/client";
+import { prisma } from "@/lib/db";
+import { invalidateAdminStats } from "@/lib/admin-stats";
+import { invalidateCaseAccess } from "@/lib/request-context";
+
+// Bulk reassignment of cases as a background job. Rather than one
+// updateMany over every case of the source user (a single long transaction
+// holding row locks on all of them), the job moves REASSIGN_CHUNK_SIZE
+// cases per statement and records its progress on the ReassignJob row
+// after each chunk; admins poll GET /api/admin/cases/reassign/[jobId].
+//
+// Each chunk picks cases the source still owns, so a job that was cut off
+// (e.g. its instance was recycled) simply carries on where it stopped when
+// it is run again; the status route does that for jobs that went stale.
+
+const CHUNK_SIZE = Number(process.env.REASSIGN_CHUNK_SIZE ?? 500);
+// A queued or running job that has not moved for this long was cut off
+const STALE_JOB_MS = 2 * 60 * 1000;
+
+type JobSource = Pick<ReassignJob, "sourceUserId" | "excludePersonal">;
+
+function sourceCondition(job: JobSource) {
+  const owner =
+    job.sourceUserId === null ? Prisma.sql`"userId" IS NULL` : Prisma.sql`"userId" = ${job.sourceUserId}`;
+  return job.excludePersonal ? Prisma.sql`${owner} AND "caseType" != 'PERSONAL'` : owner;
+}
+
+/**
+ * Number of cases a reassignment from this source would move
+ */
+export async function countCasesToMove(job: JobSource) {
+  const [{ count }] = await prisma.$queryRaw<{ count: bigint }[]>`
+    SELECT COUNT(*) AS count FROM "Case" WHERE ${sourceCondition(job)}
+  `;
+  return Number(count);
+}
+
+export function createReassignJob(data: {
+  userId: string;
+  sourceUserId: string | null;
+  targetUserId: string;
+  excludePersonal: boolean;
+  total: number;
+}) {
+  return prisma.reassignJob.create({ data });
+}
+
+export function isStaleJob(job: ReassignJob) {
+  return (
+    (job.status === "queued" || job.status === "running") &&
+    Date.now() - job.updatedAt.getTime() > STALE_JOB_MS
+  );
+}
+
+/**
+ * Moves a job's cases chunk by chunk. Safe to call more than once: only
+ * the call that claims a queued (or stale) job does the work.
+ */
+export async function runReassignJob(jobId: string) {
+  const claimed = await prisma.reassignJob.updateMany({
+    where: {
+      id: jobId,
+      OR: [
+        { status: "queued" },
+        { status: "running", updatedAt: { lt: new Date(Date.now() - STALE_JOB_MS) } },
+      ],
+    },
+    data: { status: "running" },
+  });
+  if (claimed.count === 0) {
+    return;
+  }
+  const job = await prisma.reassignJob.findUniqueOrThrow({ where: { id: jobId } });
+  let moved = job.moved;
+
+  try {
+    for (;;) {
+      // One short statement per chunk, so row locks are held briefly
+      const rows = await prisma.$queryRaw<{ id: string }[]>`
+        UPDATE "Case" SET "userId" = ${job.targetUserId}, "updatedAt" = now()
+        WHERE id IN (
+          SELECT id FROM "Case" WHERE ${sourceCondition(job)}
+          LIMIT ${CHUNK_SIZE} FOR UPDATE
+        )
+        RETURNING id
+      `;
+      if (rows.length === 0) {
+        break;
+      }
+
+      moved += rows.length;
+      invalidateCaseAccess(rows.map((row) => row.id));
+      invalidateAdminStats();
+      await prisma.reassignJob.update({ where: { id: job.id }, data: { moved } });
+    }
+
+    await prisma.reassignJob.update({
+      where: { id: job.id },
+      data: { status: "completed", moved, completedAt: new Date() },
+    });
+  } catch (error) {
+    console.error(`Reassign job ${job.id} failed:`, error);
+    await prisma.reassignJob.update({
+      where: { id: job.id },
+      data: {
+        status: "failed",
+        moved,
+        error: error instanceof Error ? error.message : "Unknown reassignment error",
+        completedAt: new Date(),
+      },
+    });
+  }
+}
+
+/**
+ * The job as the API shows it
+ */
+export function describeReassignJob(job: ReassignJob) {
+  return {
+    id: job.id,
+    status: job.status,
+    sourceUserId: job.sourceUserId,
+    targetUserId: job.targetUserId,
+    excludePersonal: job.excludePersonal,
+    total: job.total,
+    moved: job.moved,
+    error: job.error,
+    createdAt: job.createdAt,
+    completedAt: job.completedAt,
+  };
+}
@@ -0,0 +1,224 @@
+import { NextResponse } from "next/server";
+import { getServerSession } from "next-auth";
+import { authOptions } from "@/lib/auth";
+import { prisma } from "@/lib/db";
+import { tracePhase } from "@/lib/tracing";
+import { USER_EMAIL_HEADER, USER_ID_HEADER, USER_NAME_HEADER, USER_ROLE_HEADER } from "@/lib/auth-headers";
+
+// Per-request authentication and case authorisation for the API routes.
+//
+// middleware.ts decodes the NextAuth JWT for every API request and forwards
+// the user on the x-auth-user-* request headers (src/lib/auth-headers.ts),
+// after stripping any the client sent, so routes read the user from there
+// instead of decoding the token again. getRequestUser memoises per request
+// and only falls back to getServerSession when the middleware did not run.
+//
+// Case ownership is looked up once per request and kept in a short-TTL
+// in-process cache, so the parallel calls of the case page (detail,
+// hearings, notes, similar cases) share one query. Routes that change a
+// case's owner or delete it call invalidateCaseAccess(); on multi-instance
+// deployments another instance's cache can lag by at most the TTL.
+
+const CASE_ACCESS_TTL_MS = Number(process.env.CASE_ACCESS_TTL_MS ?? 10_000);
+const CASE_ACCESS_MAX_ENTRIES = 10_000;
+
+export interface RequestUser {
+  id: string;
+  role: string;
+  name?: string | null;
+  email?: string | null;
+}
+
+export interface CaseAccess {
+  id: string;
+  userId: string;
+  caseType: string;
+}
+
+type ErrorKey = "error" | "message";
+
+const requestUsers = new WeakMap<Request, Promise<RequestUser | null>>();
+const requestCases = new WeakMap<Request, Map<string, Promise<CaseAccess | null>>>();
+
+const globalForCaseAccess = globalThis as unknown as {
+  caseAccess: Map<string, { value: Promise<CaseAccess | null>; expiresAt: number }> | undefined;
+};
+
+async function decodeUser(request: Request): Promise<RequestUser | null> {
+  const id = request.headers.get(USER_ID_HEADER);
+  if (id) {
+    const name = request.headers.get(USER_NAME_HEADER);
+    return {
+      id,
+      role: request.headers.get(USER_ROLE_HEADER) ?? "USER",
+      name: name === null ? null : decodeURIComponent(name),
+      email: request.headers.get(USER_EMAIL_HEADER),
+    };
+  }
+
+  const session = await getServerSession(authOptions);
+  if (!session || !session.user || !session.user.id) {
+    return null;
+  }
+  return {
+    id: session.user.id,
+    role: session.user.role,
+    name: session.user.name,
+    email: session.user.email,
+  };
+}
+
+/**
+ * The signed-in user making this request, or null; decoded once per request
+ */
+export function getRequestUser(request: Request): Promise<RequestUser | null> {
+  let user = requestUsers.get(request);
+  if (!user) {
+    user = tracePhase("auth", "session", () => decodeUser(request));
+    requestUsers.set(request, user);
+  }
+  return user;
+}
+
+/**
+ * The signed-in user, or a 401 response to return as-is
+ */
+export async function authenticate(
+  request: Request,
+  key: ErrorKey = "error"
+): Promise<{ user: RequestUser; response?: undefined } | { response: NextResponse }> {
+  const user = await getRequestUser(request);
+  if (!user) {
+    return { response: NextResponse.json({ [key]: "Unauthorized" }, { status: 401 }) };
+  }
+  return { user };
+}
+
+function caseAccessCache() {
+  globalForCaseAccess.caseAccess ??= new Map();
+  return globalForCaseAccess.caseAccess;
+}
+
+function loadCaseAccess(caseId: string): Promise<CaseAccess | null> {
+  const cache = caseAccessCache();
+  const cached = cache.get(caseId);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.value;
+  }
+
+  // Concurrent requests on a cold entry share the pending query
+  const entry = {
+    value: prisma.case.findUnique({
+      where: { id: caseId },
+      select: { id: true, userId: true, caseType: true },
+    }),
+    expiresAt: Date.now() + CASE_ACCESS_TTL_MS,
+  };
+  cache.delete(caseId);
+  cache.set(caseId, entry);
+  entry.value.then(
+    (found) => {
+      // Unknown ids are not remembered
+      if (!found && cache.get(caseId) === entry) {
+        cache.delete(caseId);
+      }
+    },
+    () => {
+      if (cache.get(caseId) === entry) {
+        cache.delete(caseId);
+      }
+    }
+  );
+
+  // Map order is insertion order, so the first keys are the oldest
+  for (const oldest of cache.keys()) {
+    if (cache.size <= CASE_ACCESS_MAX_ENTRIES) {
+      break;
+    }
+    cache.delete(oldest);
+  }
+  return entry.value;
+}
+
+/**
+ * Owner and type of a case, or null if there is no such case; one lookup
+ * per case per request
+ */
+export function getCaseAccess(request: Request, caseId: string): Promise<CaseAccess | null> {
+  let cases = requestCases.get(request);
+  if (!cases) {
+    cases = new Map();
+    requestCases.set(request, cases);
+  }
+  let access = cases.get(caseId);
+  if (!access) {
+    access = tracePhase("auth", "case access", () => loadCaseAccess(caseId));
+    cases.set(caseId, access);
+  }
+  return access;
+}
+
+/**
+ * Forget cached owners after a case is reassigned or deleted; without ids,
+ * forgets every case (for bulk changes whose ids are not at hand)
+ */
+export function invalidateCaseAccess(caseIds?: string | string[]) {
+  const cache = caseAccessCache();
+  if (caseIds === undefined) {
+    cache.clear();
+    return;
+  }
+  for (const caseId of Array.isArray(caseIds) ? caseIds : [caseIds]) {
+    cache.delete(caseId);
+  }
+}
+
+export interface CaseAuthorisationOptions {
+  // Completes "You don't have permission to ... this case"
+  action: string;
+  // Body field the route reports errors in
+  key?: ErrorKey;
+  // Message of the 403, replacing the one built from action
+  forbidden?: string;
+  // Only admins may act, owners included
+  adminOnly?: boolean;
+}
+
+/**
+ * Checks the signed-in user may act on a case: admins on any case, users
+ * on their own. Returns the user and case, or the 401/403/404 response to
+ * return as-is.
+ */
+export async function authoriseCase(
+  request: Request,
+  caseId: string,
+  options: CaseAuthorisationOptions
+): Promise<
+  | { user: RequestUser; access: CaseAccess; isAdmin: boolean; response?: undefined }
+  | { response: NextResponse }
+> {
+  const key = options.key ?? "error";
+  const user = await getRequestUser(request);
+  if (!user) {
+    return { response: NextResponse.json({ [key]: "Unauthorized" }, { status: 401 }) };
+  }
+
+  const isAdmin = user.role === "ADMIN";
+  const forbidden = () =>
+    NextResponse.json(
+      { [key]: options.forbidden ?? `You don't have permission to ${options.action} this case` },
+      { status: 403 }
+    );
+  if (options.adminOnly && !isAdmin) {
+    return { response: forbidden() };
+  }
+
+  const access = await getCaseAccess(request, caseId);
+  if (!access) {
+    return { response: NextResponse.json({ [key]: "Case not found" }, { status: 404 }) };
+  }
+  if (!isAdmin && access.userId !== user.id) {
+    return { response: forbidden() };
+  }
+  return { user, access, isAdmin };
+}
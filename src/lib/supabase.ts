@@ -1,14 +1,10 @@
 import { createClient } from "@supabase/supabase-js";
+import { tracedFetch } from "@/lib/tracing";
 
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL as string;
 const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY as string;
 const supabaseAnonKey = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY as string;
 
-// Log Supabase configuration status (without exposing the actual keys)
-console.log(`Supabase URL available: ${!!supabaseUrl}`);
-console.log(`Supabase Service Role Key available: ${!!supabaseServiceKey}`);
-console.log(`Supabase Anon Key available: ${!!supabaseAnonKey}`);
-
 if (!supabaseUrl || !supabaseServiceKey || !supabaseAnonKey) {
   console.error(
     "Supabase environment variables are missing. Please check your .env file."
@@ -21,7 +17,10 @@ if (!supabaseUrl || !supabaseServiceKey || !supabaseAnonKey) {
 }
 
 // Create a Supabase client for server-side operations (with service role key)
-export const supabaseAdmin = createClient(supabaseUrl || "", supabaseServiceKey || "");
+// (its calls are timed as storage spans, see src/lib/tracing.ts)
+export const supabaseAdmin = createClient(supabaseUrl || "", supabaseServiceKey || "", {
+  global: { fetch: tracedFetch("storage") },
+});
 
 // Create a Supabase client for client-side operations (with anon key)
 export const supabase = createClient(supabaseUrl || "", supabaseAnonKey || "");
@@ -29,15 +28,12 @@ export const supabase = createClient(supabaseUrl || "", supabaseAnonKey || "");
 // Initialize Supabase storage buckets if they don't exist
 export async function initializeStorage() {
   try {
-    console.log("Starting initializeStorage function");
-    
     // Verify Supabase credentials
     if (!supabaseUrl || !supabaseServiceKey) {
       throw new Error("Supabase credentials missing. Cannot initialize storage.");
     }
     
     // Check if buckets already exist
-    console.log("Listing existing buckets...");
     const { data: buckets, error: bucketsError } = await supabaseAdmin.storage.listBuckets();
     
     if (bucketsError) {
@@ -50,12 +46,9 @@ export async function initializeStorage() {
       throw new Error("Failed to retrieve buckets from Supabase");
     }
     
-    console.log("Existing buckets:", buckets.map(b => b.name).join(", "));
-    
     // Create case-files bucket if it doesn't exist
     if (!buckets.find(bucket => bucket.name === "case-files")) {
-      console.log("Creating case-files bucket");
-      const { data: caseFilesData, error: caseFilesError } = await supabaseAdmin.storage.createBucket("case-files", {
+      const { error: caseFilesError } = await supabaseAdmin.storage.createBucket("case-files", {
         public: true,
       });
       
@@ -63,15 +56,11 @@ export async function initializeStorage() {
         console.error("Error creating case-files bucket:", caseFilesError);
         throw caseFilesError;
       }
-      console.log("case-files bucket created successfully", caseFilesData);
-    } else {
-      console.log("case-files bucket already exists");
     }
     
     // Create personal-files bucket if it doesn't exist
     if (!buckets.find(bucket => bucket.name === "personal-files")) {
-      console.log("Creating personal-files bucket");
-      const { data: personalFilesData, error: personalFilesError } = await supabaseAdmin.storage.createBucket("personal-files", {
+      const { error: personalFilesError } = await supabaseAdmin.storage.createBucket("personal-files", {
         public: true,
       });
       
@@ -79,15 +68,43 @@ export async function initializeStorage() {
         console.error("Error creating personal-files bucket:", personalFilesError);
         throw personalFilesError;
       }
-      console.log("personal-files bucket created successfully", personalFilesData);
-    } else {
-      console.log("personal-files bucket already exists");
     }
     
-    console.log("initializeStorage completed successfully");
+    // Exports hold whole dockets, so they are private and handed out as signed URLs
+    if (!buckets.find(bucket => bucket.name === "case-exports")) {
+      const { error: exportsError } = await supabaseAdmin.storage.createBucket("case-exports", {
+        public: false,
+      });
+
+      if (exportsError) {
+        console.error("Error creating case-exports bucket:", exportsError);
+        throw exportsError;
+      }
+    }
+
     return true;
   } catch (error) {
     console.error("initializeStorage failed with error:", error);
     throw error;
   }
 }
+
+const globalForStorage = globalThis as unknown as {
+  storageReady: Promise<boolean> | undefined;
+};
+
+/**
+ * Runs initializeStorage() once per server process. Upload routes call this
+ * instead of initializeStorage() so only the first request pays the
+ * listBuckets/createBucket round trips; a failed attempt is retried by the
+ * next caller.
+ */
+export function ensureStorage(): Promise<boolean> {
+  if (!globalForStorage.storageReady) {
+    globalForStorage.storageReady = initializeStorage().catch((error) => {
+      globalForStorage.storageReady = undefined;
+      throw error;
+    });
+  }
+  return globalForStorage.storageReady;
+}
@@ -0,0 +1,177 @@
+import { AsyncLocalStorage } from "node:async_hooks";
+
+// Per-request timing for the API routes.
+//
+// Route handlers are wrapped with traced(route, handler). While a handler
+// runs, tracePhase() times the work done on its behalf as spans in one of
+// four phases: auth (session decode and case authorisation), db (every
+// Prisma query, through the client extension in src/lib/db.ts), storage
+// (Supabase calls) and ai (model calls); tracedFetch() does the same for
+// clients that take a fetch implementation. Work nested inside another
+// phase (a case lookup during auth) is listed as a span but counted only
+// in the outer phase, so the phase totals do not overlap. Spans running
+// concurrently are all counted, so a phase can add up to more than the
+// request took.
+//
+// Every traced response carries the totals as a Server-Timing header
+// (auth;dur=3.1, db;dur=12.4;desc="5 queries", ..., total;dur=20.2), which
+// browsers show in the network panel. Requests slower than TRACE_SLOW_MS,
+// and a TRACE_SAMPLE_RATE share of the rest, are also logged as one JSON
+// line with every span; advocate_diary/timings.py aggregates those lines
+// (or Server-Timing headers) into per-route breakdowns.
+//
+// The time is measured until the handler returns its response, so for a
+// streamed body (the assistant) it stops at the first byte. The JWT decode
+// in middleware.ts runs before the route and is not part of the trace.
+
+const SLOW_REQUEST_MS = Number(process.env.TRACE_SLOW_MS ?? 1000);
+const SAMPLE_RATE = Number(process.env.TRACE_SAMPLE_RATE ?? 0.01);
+// Spans kept per request for the log line; the totals count every span
+const MAX_SPANS = 200;
+
+export type Phase = "auth" | "db" | "storage" | "ai";
+
+const PHASES: Phase[] = ["auth", "db", "storage", "ai"];
+// Server-Timing descriptions, e.g. db;desc="3 queries"
+const UNITS: Record<Phase, [string, string]> = {
+  auth: ["step", "steps"],
+  db: ["query", "queries"],
+  storage: ["call", "calls"],
+  ai: ["call", "calls"],
+};
+
+interface Span {
+  phase: Phase;
+  name: string;
+  at: number;
+  ms: number;
+  nested?: boolean;
+}
+
+class Trace {
+  readonly started = performance.now();
+  readonly spans: Span[] = [];
+  readonly totals = new Map<Phase, { ms: number; count: number }>();
+  dropped = 0;
+
+  record(span: Span) {
+    if (!span.nested) {
+      const total = this.totals.get(span.phase) ?? { ms: 0, count: 0 };
+      total.ms += span.ms;
+      total.count++;
+      this.totals.set(span.phase, total);
+    }
+    if (this.spans.length < MAX_SPANS) {
+      this.spans.push(span);
+    } else {
+      this.dropped++;
+    }
+  }
+}
+
+interface TraceContext {
+  trace: Trace;
+  phase?: Phase;
+}
+
+const storage = new AsyncLocalStorage<TraceContext>();
+
+const round = (ms: number) => Math.round(ms * 10) / 10;
+
+/**
+ * Times `fn` as a span of the current request's trace. Outside a traced
+ * request it just runs `fn`.
+ */
+export async function tracePhase<T>(phase: Phase, name: string, fn: () => Promise<T>): Promise<T> {
+  const context = storage.getStore();
+  if (!context) {
+    return fn();
+  }
+  const { trace } = context;
+  const start = performance.now();
+  try {
+    return await storage.run({ trace, phase: context.phase ?? phase }, fn);
+  } finally {
+    trace.record({
+      phase,
+      name,
+      at: round(start - trace.started),
+      ms: performance.now() - start,
+      ...(context.phase ? { nested: true } : {}),
+    });
+  }
+}
+
+/**
+ * A fetch that times each call as a span of `phase`, named by its method
+ * and path, for clients that accept a fetch implementation
+ */
+export function tracedFetch(phase: Phase, baseFetch: typeof fetch = fetch): typeof fetch {
+  return (input, init) => {
+    const url = typeof input === "string" ? input : input instanceof URL ? input.href : input.url;
+    const method = init?.method ?? (input instanceof Request ? input.method : "GET");
+    // Object paths carry file names; keep the first three segments only
+    const path = new URL(url).pathname.split("/").slice(0, 4).join("/");
+    return tracePhase(phase, `${method} ${path}`, () => baseFetch(input, init));
+  };
+}
+
+function serverTiming(trace: Trace, totalMs: number) {
+  const entries = PHASES.filter((phase) => trace.totals.has(phase)).map((phase) => {
+    const { ms, count } = trace.totals.get(phase)!;
+    const unit = UNITS[phase][count === 1 ? 0 : 1];
+    return `${phase};dur=${round(ms)};desc="${count} ${unit}"`;
+  });
+  return [...entries, `total;dur=${round(totalMs)}`].join(", ");
+}
+
+function logTrace(trace: Trace, request: Request, route: string, status: number, totalMs: number) {
+  const slow = totalMs >= SLOW_REQUEST_MS;
+  if (!slow && !(Math.random() < SAMPLE_RATE)) {
+    return;
+  }
+  const phases: Record<string, { ms: number; count: number }> = {};
+  for (const [phase, { ms, count }] of trace.totals) {
+    phases[phase] = { ms: round(ms), count };
+  }
+  console.log(
+    JSON.stringify({
+      type: "request-trace",
+      time: new Date().toISOString(),
+      method: request.method,
+      route,
+      status,
+      ms: round(totalMs),
+      slow,
+      phases,
+      spans: trace.spans.map((span) => ({ ...span, ms: round(span.ms) })),
+      ...(trace.dropped ? { droppedSpans: trace.dropped } : {}),
+    })
+  );
+}
+
+/**
+ * Wraps a route handler so that its request is traced. `route` is the
+ * app-router path, e.g. "/api/cases/[caseId]".
+ */
+export function traced<Q extends Request, C, R extends Response>(
+  route: string,
+  handler: (request: Q, context: C) => Promise<R>
+): (request: Q, context: C) => Promise<R> {
+  return async (request: Q, context: C) => {
+    const trace = new Trace();
+    let status = 500;
+    try {
+      const response = await storage.run({ trace }, () => handler(request, context));
+      status = response.status;
+      try {
+        response.headers.set("Server-Timing", serverTiming(trace, performance.now() - trace.started));
+      } catch {
+        // Responses with immutable headers (e.g. Response.redirect) go without
+      }
+      return response;
+    } finally {
+      logTrace(trace, request, route, status, performance.now() - trace.started);
+    }
+  };
+}
@@ -1,31 +1,65 @@
 import { NextResponse } from "next/server";
 import { withAuth, NextRequestWithAuth } from "next-auth/middleware";
+import {
+  AUTH_HEADERS,
+  USER_EMAIL_HEADER,
+  USER_ID_HEADER,
+  USER_NAME_HEADER,
+  USER_ROLE_HEADER,
+} from "@/lib/auth-headers";
+
+// Pages and API routes that need a session; other API routes (e.g. the
+// assistant) also serve signed-out users and decide for themselves
+const LOGIN_REQUIRED = ["/cases", "/admin", "/api/cases", "/api/admin"];
+
+function requiresLogin(path: string) {
+  return LOGIN_REQUIRED.some((prefix) => path === prefix || path.startsWith(`${prefix}/`));
+}
 
 export default withAuth(
   function middleware(request: NextRequestWithAuth) {
     const path = request.nextUrl.pathname;
     const token = request.nextauth.token;
-    
+
     // Protected admin routes
     if (path.startsWith("/admin") && token?.role !== "ADMIN") {
       return NextResponse.redirect(new URL("/unauthorized", request.url));
     }
 
+    // Hand the decoded user to API routes (see src/lib/request-context.ts).
+    // Headers a client sent under these names are always dropped first.
+    if (path.startsWith("/api/")) {
+      const headers = new Headers(request.headers);
+      AUTH_HEADERS.forEach((name) => headers.delete(name));
+      if (token?.id) {
+        headers.set(USER_ID_HEADER, token.id);
+        headers.set(USER_ROLE_HEADER, token.role ?? "USER");
+        if (token.name) {
+          headers.set(USER_NAME_HEADER, encodeURIComponent(token.name));
+        }
+        if (token.email) {
+          headers.set(USER_EMAIL_HEADER, token.email);
+        }
+      }
+      return NextResponse.next({ request: { headers } });
+    }
+
     // Protect case editing/deleting for non-owners (implement in API routes)
     return NextResponse.next();
   },
   {
     callbacks: {
-      authorized: ({ token }) => !!token,
+      authorized: ({ token, req }) => !!token || !requiresLogin(req.nextUrl.pathname),
     },
   }
 );
 
 export const config = {
   matcher: [
-    "/cases/:path*", 
+    "/cases/:path*",
     "/admin/:path*",
-    "/api/cases/:path*",
-    "/api/admin/:path*",
+    // Every API route except NextAuth's own, so forwarded user headers
+    // can never come from the client
+    "/api/((?!auth/).*)",
   ],
-}; 
\ No newline at end of file
+};
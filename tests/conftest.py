@@ -0,0 +1,141 @@
+import os
+import pytest
+
+from advocate_diary import BASE_URL_ENV, AdvocateDiaryClient, LoginCache
+from advocate_diary.isolation import Namespace, RegistrationAllocator, ResourceTracker
+from advocate_diary.query_plans import DATABASE_URL_ENV
+from advocate_diary.standin import StandInServer
+
+# Per-route latency table, baseline file and regression check
+pytest_plugins = ["advocate_diary.pytest_latency"]
+
+# Seeded accounts (see prisma/seed.ts)
+ADMIN_CREDENTIALS = ("admin@example.com", "password123", "ADMIN")
+USER_CREDENTIALS = ("user1@example.com", "password123", "USER")
+
+# --api-url value that starts the in-process stand-in server
+LOCAL = "local"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--api-url",
+        default=os.environ.get(BASE_URL_ENV, LOCAL),
+        help=(
+            "Base URL of the app under test, e.g. https://advocate-diary.vercel.app "
+            f"(default: ${BASE_URL_ENV}, or '{LOCAL}' for the in-process stand-in)"
+        ),
+    )
+    parser.addoption(
+        "--database-url",
+        default=os.environ.get(DATABASE_URL_ENV),
+        help=(
+            "Scratch PostgreSQL database for the query plan checks in test_query_plans.py "
+            f"(default: ${DATABASE_URL_ENV}; skipped when unset)"
+        ),
+    )
+
+
+@pytest.fixture(scope="session")
+def api_base_url(request):
+    """Base URL every API test talks to"""
+    url = request.config.getoption("--api-url")
+    if url != LOCAL:
+        yield url.rstrip("/")
+        return
+
+    with StandInServer() as server:
+        yield server.url
+
+
+@pytest.fixture
+def real_app(request):
+    """Skips checks of the app's own rendering, which the stand-in does not mirror"""
+    if request.config.getoption("--api-url") == LOCAL:
+        pytest.skip("needs a deployment (--api-url); the stand-in does not render like the app")
+
+
+@pytest.fixture
+def stand_in(request):
+    """Skips checks that need the stand-in, e.g. to pick the client address"""
+    if request.config.getoption("--api-url") != LOCAL:
+        pytest.skip("needs the stand-in; a deployment's proxy sets the client address")
+
+
+@pytest.fixture(scope="session")
+def login_cache():
+    """Logins shared by every client in the test session"""
+    return LoginCache()
+
+
+@pytest.fixture(scope="session")
+def admin_client(api_base_url, login_cache, latency_recorder):
+    """Client signed in as the seeded admin, reused across tests"""
+    with AdvocateDiaryClient(api_base_url, login_cache=login_cache, recorder=latency_recorder) as client:
+        client.login(*ADMIN_CREDENTIALS)
+        yield client
+
+
+@pytest.fixture(scope="session")
+def user_client(api_base_url, login_cache, latency_recorder):
+    """Client signed in as a seeded regular user, reused across tests"""
+    with AdvocateDiaryClient(api_base_url, login_cache=login_cache, recorder=latency_recorder) as client:
+        client.login(*USER_CREDENTIALS)
+        yield client
+
+
+@pytest.fixture
+def anonymous_client(api_base_url, latency_recorder):
+    """Fresh client with no session cookie"""
+    with AdvocateDiaryClient(api_base_url, recorder=latency_recorder) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def namespace():
+    """Prefix for data created by this xdist worker in this run"""
+    return Namespace()
+
+
+@pytest.fixture(scope="session")
+def registrations():
+    """Case registration numbers reserved for this xdist worker"""
+    return RegistrationAllocator()
+
+
+@pytest.fixture
+def created(admin_client, registrations):
+    """Tracks cases and users a test creates and deletes them afterwards"""
+    tracker = ResourceTracker(admin_client, registrations)
+    # pytest runs this teardown even when the test body fails
+    yield tracker
+    tracker.cleanup()
+
+
+# A valid case; tests pass new_case/new_cases the fields they check
+CASE_DEFAULTS = {
+    "caseType": "CIVIL",
+    "registrationYear": 2023,
+    "title": "Test Case",
+    "courtName": "Test Court",
+    "petitioners": [{"name": "Test Petitioner"}],
+    "respondents": [{"name": "Test Respondent"}],
+}
+
+
+@pytest.fixture
+def new_case(created):
+    """Creates a case from CASE_DEFAULTS and the given fields, as `client` (default admin)"""
+    def create(client=None, **fields):
+        return created.create_case({**CASE_DEFAULTS, **fields}, client=client)
+    return create
+
+
+@pytest.fixture
+def new_cases(created):
+    """Creates `count` cases like new_case in one batch request and returns their ids"""
+    def create(count, client=None, **fields):
+        case_ids = created.create_cases([{**CASE_DEFAULTS, **fields} for _ in range(count)], client=client)
+        assert len(case_ids) == count
+        return case_ids
+    return create
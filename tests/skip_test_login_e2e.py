@@ -2,6 +2,11 @@ import re
 import pytest
 from playwright.sync_api import Playwright, expect
 
+from advocate_diary import resolve_base_url
+
+# The browser flow needs the real app, so this ignores the in-process stand-in
+BASE_URL = resolve_base_url()
+
 @pytest.fixture(scope="function")
 def browser_context_args(browser_context_args):
     return {
@@ -14,7 +19,7 @@ def browser_context_args(browser_context_args):
 
 def test_admin_login(page):
     # Navigate to login page
-    page.goto("https://advocate-diary.vercel.app/login")
+    page.goto(f"{BASE_URL}/login")
     
     # Login process
     page.get_by_role("textbox", name="you@example.com").fill("admin@example.com")
@@ -28,7 +33,7 @@ def test_admin_login(page):
 
 def test_user1_login(page):
     # Navigate to login page
-    page.goto("https://advocate-diary.vercel.app/login")
+    page.goto(f"{BASE_URL}/login")
     
     # Login process
     page.get_by_role("textbox", name="you@example.com").fill("user1@example.com")
@@ -40,7 +45,7 @@ def test_user1_login(page):
 
 def test_user2_login(page):
     # Navigate to login page
-    page.goto("https://advocate-diary.vercel.app/login")
+    page.goto(f"{BASE_URL}/login")
     
     # Login process
     page.get_by_role("textbox", name="you@example.com").fill("user2@example.com")
@@ -0,0 +1,99 @@
+import json
+
+from advocate_diary.bench import render_html, run_benchmark, run_login_benchmark, write_reports
+from advocate_diary.metrics import LatencyRecorder, percentile, route_template
+from advocate_diary.pytest_latency import find_regressions, load_baseline, render_html_table, write_baseline
+
+# Tests for the latency bookkeeping and the benchmark harness
+
+def test_route_template_collapses_ids():
+    """Test that concrete ids map onto app-router route names"""
+    case_id = "0b9f3a9e-2a8e-4c9e-9a57-7f4f6f3d2c11"
+
+    assert route_template(f"/api/cases/{case_id}") == "/api/cases/[caseId]"
+    assert route_template(f"/api/cases/{case_id}/hearings?take=5") == "/api/cases/[caseId]/hearings"
+    assert route_template(f"/api/admin/users/{case_id}") == "/api/admin/users/[userId]"
+    assert route_template("/api/admin/users/with-case-counts") == "/api/admin/users/with-case-counts"
+    assert route_template(f"/api/cases/{case_id}/upload/sessions/5fSd-fC8HyU") == (
+        "/api/cases/[caseId]/upload/sessions/[sessionId]"
+    )
+
+def test_percentiles_and_summary():
+    """Test nearest-rank percentiles and per-route summaries"""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) is None
+
+    recorder = LatencyRecorder()
+    recorder.record("GET", "/api/cases", 200, 0.010, 512)
+    recorder.record("GET", "/api/cases", 500, 0.030, 64)
+    summary = recorder.summary(wall_seconds=2.0)["GET /api/cases"]
+
+    assert summary["count"] == 2
+    assert summary["error_rate"] == 0.5
+    assert summary["rps"] == 1.0
+    assert summary["p99_ms"] == 30.0
+
+def test_benchmark_reports_every_route(api_base_url, tmp_path):
+    """Test a short mixed run against the target and its JSON/HTML output"""
+    report = run_benchmark(api_base_url, stages=(1, 2), duration=0.3, pool_cases=3)
+
+    assert [stage["concurrency"] for stage in report["stages"]] == [1, 2]
+    routes = report["stages"][-1]["routes"]
+    assert "GET /api/cases" in routes
+    assert "GET /api/cases/[caseId]" in routes
+    for stats in routes.values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert stats["rps"] > 0
+
+    json_path, html_path = tmp_path / "bench.json", tmp_path / "bench.html"
+    write_reports(report, str(json_path), str(html_path))
+    assert json.loads(json_path.read_text())["scenario"] == "mixed"
+    assert "GET /api/cases/[caseId]" in html_path.read_text()
+    assert render_html(report).startswith("<!DOCTYPE html>")
+
+def test_login_benchmark(api_base_url):
+    """Test the login scenario reports login throughput beside the read routes"""
+    report = run_login_benchmark(api_base_url, stages=(0, 2), readers=2, duration=0.3, pool_cases=2)
+
+    baseline, loaded = report["stages"]
+    assert baseline["logins"]["count"] == 0
+    assert baseline["reads_p95_ratio"] == 1.0
+    assert loaded["logins"]["count"] > 0
+    assert loaded["logins"]["errors"] == 0
+    assert "POST /api/auth/callback/credentials" in loaded["routes"]
+    assert loaded["reads"]["count"] > 0 and loaded["reads_p95_ratio"] > 0
+    assert "Concurrent logins 2" in render_html(report)
+
+def test_latency_baseline_flags_regressed_routes(tmp_path, admin_client, latency_recorder):
+    """Test the run's route latencies against a baseline file"""
+    # Step 1: The session fixtures' clients feed the run's recorder
+    admin_client.list_cases()
+    assert "GET /api/cases" in latency_recorder.by_route()
+
+    recorder = LatencyRecorder()
+    for seconds in (0.010, 0.011, 0.012):
+        recorder.record("GET", "/api/cases", 200, seconds, 1000)
+        recorder.record("GET", "/api/cases/search", 200, seconds, 400)
+    path = str(tmp_path / "baseline.json")
+    write_baseline(path, recorder.summary())
+    baseline = load_baseline(path)["routes"]
+
+    # Step 2: The case list doubles; search moves by less than the threshold
+    recorder.clear()
+    for seconds in (0.020, 0.022, 0.024):
+        recorder.record("GET", "/api/cases", 200, seconds, 1000)
+        recorder.record("GET", "/api/cases/search", 200, seconds / 1.6, 400)
+    recorder.record("POST", "/api/cases", 200, 0.5, 100)
+    routes = recorder.summary()
+
+    regressions = find_regressions(routes, baseline, threshold=0.5)
+    assert list(regressions) == ["GET /api/cases"]
+    assert "11.0ms -> 22.0ms" in regressions["GET /api/cases"]
+    assert find_regressions(routes, baseline, threshold=0.5, min_ms=15) == {}
+
+    table = render_html_table(routes, baseline, regressions)
+    assert '<tr style="color:#b91c1c;font-weight:bold"><td>GET /api/cases</td>' in table
+    assert "<td>+100%</td>" in table
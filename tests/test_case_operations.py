@@ -1,50 +1,17 @@
 import pytest
-import requests
-import json
-import uuid
-import time
-
-# Utility functions for authentication
-def get_csrf_token(session):
-    """Get CSRF token for authentication"""
-    response = session.get("https://advocate-diary.vercel.app/api/auth/csrf")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "csrfToken" in data
-    return data["csrfToken"]
-
-def authenticate_user(session, email, password):
-    """Authenticate with NextAuth and return the session"""
-    csrf_token = get_csrf_token(session)
-    
-    login_data = {
-        "csrfToken": csrf_token,
-        "email": email,
-        "password": password,
-        "callbackUrl": "https://advocate-diary.vercel.app"
-    }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/auth/callback/credentials",
-        data=login_data
-    )
-    
-    assert response.status_code in [200, 302]
-    return session
+
+from advocate_diary import ApiError
 
 # Tests for case operations
-def test_add_and_delete_case():
+def test_add_and_delete_case(admin_client, created, namespace, registrations):
     """Test creating a new case and then deleting it"""
-    # Setup: Create a session and authenticate as admin
-    session = requests.Session()
-    authenticate_user(session, "admin@example.com", "password123")
-    
-    # Step 1: Create a new case with a unique identifier
-    unique_id = str(uuid.uuid4())[:8]
+    # Step 1: Create a new case with a unique identifier and a registration
+    # number reserved for this worker, so parallel runs never collide
+    unique_id = namespace.unique()
+    registration_num = registrations.next()
     case_data = {
         "caseType": "CIVIL",
-        "registrationNum": 12345,
+        "registrationNum": registration_num,
         "registrationYear": 2023,
         "title": f"Test Case {unique_id}",
         "courtName": "Test Court",
@@ -61,49 +28,40 @@ def test_add_and_delete_case():
             }
         ]
     }
-    
+
     # Send request to create case
-    create_response = session.post(
-        "https://advocate-diary.vercel.app/api/cases",
-        json=case_data
-    )
-    
+    create_response = admin_client.request("POST", "/api/cases", json=case_data)
+
     # Verify response
     assert create_response.status_code == 201
     created_case = create_response.json()
     assert "id" in created_case
-    case_id = created_case["id"]
-    
+    case_id = created.track_case(created_case["id"])
+
     # Verify the case was created with the correct data
     assert created_case["title"] == f"Test Case {unique_id}"
     assert created_case["caseType"] == "CIVIL"
-    assert created_case["registrationNum"] == 12345
+    assert created_case["registrationNum"] == registration_num
     assert created_case["registrationYear"] == 2023
     assert len(created_case["petitioners"]) == 1
     assert len(created_case["respondents"]) == 1
     assert created_case["petitioners"][0]["name"] == f"Petitioner {unique_id}"
     assert created_case["respondents"][0]["name"] == f"Respondent {unique_id}"
-    
+
     # Step 2: Verify the case exists by fetching it
-    get_response = session.get(f"https://advocate-diary.vercel.app/api/cases/{case_id}")
-    assert get_response.status_code == 200
-    fetched_case = get_response.json()
+    fetched_case = admin_client.get_case(case_id)
     assert fetched_case["id"] == case_id
-    
+
     # Step 3: Delete the case
-    delete_response = session.delete(f"https://advocate-diary.vercel.app/api/cases/{case_id}")
-    assert delete_response.status_code == 200
-    
+    admin_client.delete_case(case_id)
+
     # Step 4: Verify the case has been deleted
-    verify_response = session.get(f"https://advocate-diary.vercel.app/api/cases/{case_id}")
-    assert verify_response.status_code == 404
-    
-def test_create_case_validation():
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.get_case(case_id)
+    assert excinfo.value.status_code == 404
+
+def test_create_case_validation(admin_client):
     """Test validation when creating a case"""
-    # Setup: Create a session and authenticate
-    session = requests.Session()
-    authenticate_user(session, "admin@example.com", "password123")
-    
     # Test case with missing required fields
     invalid_case = {
         "caseType": "CIVIL",
@@ -111,15 +69,12 @@ def test_create_case_validation():
         "courtName": "Test Court",
         # Missing petitioners and respondents
     }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/cases",
-        json=invalid_case
-    )
-    
+
     # Should fail validation
-    assert response.status_code == 400
-    
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.create_case(invalid_case)
+    assert excinfo.value.status_code == 400
+
     # Test case with empty arrays for petitioners and respondents
     invalid_case = {
         "caseType": "CIVIL",
@@ -129,11 +84,184 @@ def test_create_case_validation():
         "petitioners": [],
         "respondents": []
     }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/cases",
-        json=invalid_case
-    )
-    
+
     # Should fail validation
-    assert response.status_code == 400 
\ No newline at end of file
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.create_case(invalid_case)
+    assert excinfo.value.status_code == 400
+
+def test_batch_create_cases(admin_client, created, namespace, registrations):
+    """Test batch creation reports a status for every record"""
+    def case(registration_num, **extra):
+        unique_id = namespace.unique()
+        data = {
+            "caseType": "CIVIL",
+            "registrationNum": registration_num,
+            "registrationYear": 2023,
+            "courtName": "Test Court",
+            "petitioners": [{"name": f"Petitioner {unique_id}"}],
+            "respondents": [{"name": f"Respondent {unique_id}"}],
+        }
+        data.update(extra)
+        return data
+
+    # Step 1: One existing case for the batch to conflict with
+    existing = created.create_case(case(registrations.next()))
+    first, second = registrations.next(), registrations.next()
+
+    batch = [
+        case(first, hearings=[{"date": "2024-06-05T00:00:00.000Z", "nextPurpose": "Evidence"}]),
+        case(second),
+        case(first),  # duplicate of record 0
+        case(existing["registrationNum"]),  # already in the database
+        case(registrations.next(), petitioners=[]),  # invalid
+    ]
+
+    # Step 2: Submit the batch in one request
+    result = admin_client.create_cases(batch)
+    statuses = [item["status"] for item in result["results"]]
+    assert statuses == ["created", "created", "conflict", "conflict", "invalid"]
+    assert [item["index"] for item in result["results"]] == list(range(5))
+    assert result["summary"] == {"created": 2, "conflict": 2, "invalid": 1, "error": 0}
+
+    case_ids = [created.track_case(item["id"]) for item in result["results"][:2]]
+
+    # Step 3: Hearings sent with a case are created alongside it
+    hearings = admin_client.list_hearings(case_ids[0])
+    assert [h["nextPurpose"] for h in hearings] == ["Evidence"]
+    assert admin_client.list_hearings(case_ids[1]) == []
+
+    # Step 4: An empty batch is rejected outright
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.create_cases([])
+    assert excinfo.value.status_code == 400
+
+def test_case_access_follows_assignment(admin_client, user_client, anonymous_client, created):
+    """Test forwarded identity headers are ignored and reassignment applies at once"""
+    case = created.create_case({
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "courtName": "Test Court",
+        "petitioners": [{"name": "Petitioner A"}],
+        "respondents": [{"name": "Respondent B"}],
+    })
+    path = f"/api/cases/{case['id']}"
+    admin = admin_client.get_session()["user"]
+    user = user_client.get_session()["user"]
+
+    # Step 1: Claiming to be the admin through the forwarded headers does not help
+    spoofed = {"x-auth-user-id": admin["id"], "x-auth-user-role": "ADMIN"}
+    assert user_client.request("GET", path, headers=spoofed).status_code == 403
+    assert anonymous_client.request("GET", path, headers=spoofed).status_code == 401
+
+    # Step 2: Once assigned, the new owner can open the case straight away
+    admin_client.assign_case(case["id"], user["id"])
+    assert user_client.get_case(case["id"])["userId"] == user["id"]
+
+    # Step 3: Assigning it back takes the user's access away just as quickly
+    admin_client.assign_case(case["id"], admin["id"])
+    with pytest.raises(ApiError) as excinfo:
+        user_client.get_case(case["id"])
+    assert excinfo.value.status_code == 403
+
+def test_case_edit_applies_party_diff_and_checks_version(admin_client, created):
+    """Test edits change only the listed parties and refuse a stale If-Match"""
+    case = created.create_case({
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "courtName": "Test Court",
+        "petitioners": [{"name": "Petitioner A", "advocate": "Advocate A"}, {"name": "Petitioner B"}],
+        "respondents": [{"name": "Respondent C"}],
+    })
+    loaded = admin_client.get_case(case["id"])
+    kept, renamed = sorted(loaded["petitioners"], key=lambda p: p["name"])
+
+    # Step 1: Rename one petitioner, drop the respondent and add another,
+    # sending the version the edit was made on
+    edit = {
+        "title": "Edited title",
+        "petitioners": [
+            {"id": kept["id"], "name": kept["name"]},
+            {"id": renamed["id"], "name": "Petitioner B2", "advocate": "Advocate B"},
+        ],
+        "respondents": [{"name": "Respondent D", "isNew": True}],
+        "respondentsToDelete": [loaded["respondents"][0]["id"]],
+    }
+    response = admin_client.request(
+        "PUT", f"/api/cases/{case['id']}", json=edit, headers={"If-Match": f'"{loaded["version"]}"'}
+    )
+    assert response.status_code == 200
+    updated = response.json()
+    assert response.headers["ETag"] == f'"{updated["version"]}"'
+    assert updated["version"] > loaded["version"]
+    assert updated["updatedAt"] > loaded["updatedAt"]
+
+    after = admin_client.get_case(case["id"])
+    assert after["title"] == "Edited title"
+    petitioners = {p["id"]: (p["name"], p["advocate"]) for p in after["petitioners"]}
+    assert petitioners == {
+        kept["id"]: ("Petitioner A", "Advocate A"),  # an empty advocate keeps the stored one
+        renamed["id"]: ("Petitioner B2", "Advocate B"),
+    }
+    assert [r["name"] for r in after["respondents"]] == ["Respondent D"]
+
+    # Step 2: A second edit made on the old copy is refused and changes nothing
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.update_case(case["id"], {"title": "Lost update"}, version=loaded["version"])
+    assert excinfo.value.status_code == 409
+    assert admin_client.get_case(case["id"])["title"] == "Edited title"
+
+    # Step 3: The current version is accepted, and no version means no check
+    admin_client.update_case(case["id"], {"title": "Second edit"}, version=updated["version"])
+    admin_client.update_case(case["id"], {"title": "Unconditional edit"})
+    assert admin_client.get_case(case["id"])["title"] == "Unconditional edit"
+
+    # Step 4: An If-Match that is not a version is a bad request
+    response = admin_client.request(
+        "PUT", f"/api/cases/{case['id']}", json={}, headers={"If-Match": '"not-a-version"'}
+    )
+    assert response.status_code == 400
+
+def test_case_detail_conditional_get_and_summary(admin_client, created):
+    """Test an unchanged case answers 304 and any child write changes its ETag"""
+    case = created.create_case({
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "courtName": "Test Court",
+        "petitioners": [{"name": "Petitioner A"}],
+        "respondents": [{"name": "Respondent B"}],
+    })
+
+    # Step 1: The first read returns the case and its ETag; repeating it with
+    # that ETag, or with its Last-Modified, gets an empty 304
+    loaded, etag = admin_client.get_case_if_changed(case["id"], None)
+    assert loaded["id"] == case["id"] and etag == f'"{loaded["version"]}"'
+    assert admin_client.get_case_if_changed(case["id"], etag) == (None, etag)
+    response = admin_client.request("GET", f"/api/cases/{case['id']}")
+    last_modified = response.headers["Last-Modified"]
+    response = admin_client.request(
+        "GET", f"/api/cases/{case['id']}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304 and not response.content
+
+    # Step 2: Adding a hearing or a note moves the version on, but not the
+    # case's updatedAt, so lists ordered by it keep their order
+    admin_client.add_hearing(case["id"], "2024-03-01T00:00:00.000Z", next_purpose="Evidence")
+    with_hearing, etag2 = admin_client.get_case_if_changed(case["id"], etag)
+    assert with_hearing is not None and etag2 != etag
+    assert with_hearing["updatedAt"] == loaded["updatedAt"]
+    assert [h["nextPurpose"] for h in with_hearing["hearings"]] == ["Evidence"]
+
+    note = admin_client.add_note(case["id"], "Client called")
+    _, etag3 = admin_client.get_case_if_changed(case["id"], etag2)
+    assert etag3 not in (None, etag2)
+    admin_client.delete_note(note["id"])
+    _, etag4 = admin_client.get_case_if_changed(case["id"], etag3)
+    assert etag4 != etag3
+
+    # Step 3: The summary leaves the hearings out, keeping the latest and counts
+    summary = admin_client.get_case_summary(case["id"])
+    assert "hearings" not in summary
+    assert summary["latestHearing"]["nextPurpose"] == "Evidence"
+    assert summary["counts"] == {"hearings": 1, "notes": 0, "uploads": 0}
+    assert [p["name"] for p in summary["petitioners"]] == ["Petitioner A"]
@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from advocate_diary import AdvocateDiaryClient, ApiError
+
+# Tests for the paginated, filterable GET /api/cases
+
+def sort_key(case):
+    return (case["updatedAt"], case["id"])
+
+def test_pages_cover_every_case_once(admin_client, new_cases, namespace):
+    """Test walking the cursor returns each case exactly once, newest first"""
+    court = f"Court {namespace.unique()}"
+    case_ids = new_cases(7, courtName=court)
+
+    # Step 1: Walk the pages three at a time
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page = admin_client.list_cases_page(cursor=cursor, limit=3, court=court)
+        assert len(page["cases"]) <= 3
+        seen.extend(page["cases"])
+        pages += 1
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+
+    # Step 2: Every case appears once, in (updatedAt, id) descending order
+    assert pages == 3
+    assert sorted(c["id"] for c in seen) == sorted(case_ids)
+    assert seen == sorted(seen, key=sort_key, reverse=True)
+
+    # Step 3: iter_cases does the same walk
+    assert [c["id"] for c in admin_client.iter_cases(limit=2, court=court)] == [c["id"] for c in seen]
+
+def test_field_and_include_selection(admin_client, new_cases, namespace):
+    """Test list views can skip party arrays and unneeded columns"""
+    court = f"Court {namespace.unique()}"
+    new_cases(1, courtName=court)
+
+    # Default: all columns plus parties and the latest hearing
+    full = admin_client.list_cases_page(court=court)["cases"][0]
+    assert {"petitioners", "respondents", "hearings", "courtName"} <= set(full)
+
+    # Only the requested columns (id and updatedAt always come back for the cursor)
+    slim = admin_client.list_cases_page(court=court, fields=["title"], include=[])["cases"][0]
+    assert set(slim) == {"id", "updatedAt", "title"}
+
+    with_user = admin_client.list_cases_page(court=court, fields=["title"], include=["user"])["cases"][0]
+    assert with_user["user"]["email"] == "admin@example.com"
+
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.list_cases_page(fields=["password"])
+    assert excinfo.value.status_code == 400
+
+def test_server_side_filters(admin_client, new_cases, namespace):
+    """Test the court, completion, type and next hearing filters"""
+    court = f"Court {namespace.unique()}"
+    open_id, done_id = new_cases(2, courtName=court)
+    admin_client.set_case_completed(done_id, True)
+    admin_client.add_hearing(open_id, "2024-06-05T00:00:00.000Z", next_date="2030-01-15T00:00:00.000Z")
+
+    def ids(**filters):
+        filters.setdefault("court", court)
+        return {c["id"] for c in admin_client.iter_cases(include=[], **filters)}
+
+    assert ids() == {open_id, done_id}
+    assert ids(court=court.upper()) == {open_id, done_id}
+    assert ids(isCompleted=True) == {done_id}
+    assert ids(isCompleted=False) == {open_id}
+    assert ids(caseType="CRIMINAL") == set()
+    assert ids(nextHearingFrom="2030-01-01T00:00:00.000Z", nextHearingTo="2030-01-31T00:00:00.000Z") == {open_id}
+    assert ids(nextHearingFrom="2030-02-01T00:00:00.000Z") == set()
+
+def test_pages_stable_under_concurrent_inserts(api_base_url, login_cache, latency_recorder, admin_client, new_cases, namespace):
+    """Test inserts while paging never duplicate or skip existing cases"""
+    court = f"Court {namespace.unique()}"
+    original = set(new_cases(30, courtName=court))
+    inserted = []
+    writing = threading.Event()
+    stop = threading.Event()
+
+    # Step 1: Keep inserting cases into the same court from another thread
+    def writer():
+        with AdvocateDiaryClient(api_base_url, login_cache=login_cache, recorder=latency_recorder) as client:
+            client.login("admin@example.com", "password123", role="ADMIN")
+            while not stop.is_set():
+                inserted.extend(new_cases(2, client, courtName=court))
+                writing.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        assert writing.wait(timeout=10)
+        seen = list(admin_client.iter_cases(limit=4, court=court, include=[]))
+    finally:
+        stop.set()
+        thread.join()
+
+    # Step 2: No duplicates, no gaps among the original cases, order preserved
+    seen_ids = [c["id"] for c in seen]
+    assert len(seen_ids) == len(set(seen_ids))
+    assert original <= set(seen_ids)
+    assert seen == sorted(seen, key=sort_key, reverse=True)
+
+def test_invalid_cursor_and_limit(admin_client):
+    """Test malformed paging parameters are rejected"""
+    for params in ({"cursor": "not-a-cursor"}, {"limit": "0"}, {"limit": "abc"}):
+        response = admin_client.request("GET", "/api/cases", params=params)
+        assert response.status_code == 400
+
+def test_case_hearings_and_notes_pages(admin_client, created):
+    """Test a case's hearings and notes can be walked page by page, latest first"""
+    case = created.create_case({
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "courtName": "Test Court",
+        "petitioners": [{"name": "Petitioner A"}],
+        "respondents": [{"name": "Respondent B"}],
+    })
+    for day in range(1, 6):
+        admin_client.add_hearing(case["id"], f"2024-01-0{day}T00:00:00.000Z")
+    for number in range(3):
+        admin_client.add_note(case["id"], f"Note {number}")
+
+    # Step 1: Walk the hearings two at a time
+    dates = []
+    cursor = None
+    while True:
+        page = admin_client.hearings_page(case["id"], cursor=cursor, limit=2)
+        assert len(page["hearings"]) <= 2
+        dates += [h["date"][:10] for h in page["hearings"]]
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+    assert dates == [f"2024-01-0{day}" for day in range(5, 0, -1)]
+
+    # Step 2: Without limit or cursor the whole list still comes back as before
+    assert [h["date"][:10] for h in admin_client.list_hearings(case["id"])] == dates
+
+    # Step 3: Notes page the same way (notes added in the same millisecond
+    # tie on createdAt, so only check each comes back once)
+    first = admin_client.notes_page(case["id"], limit=2)
+    second = admin_client.notes_page(case["id"], cursor=first["nextCursor"], limit=2)
+    contents = [n["content"] for n in first["notes"] + second["notes"]]
+    assert sorted(contents) == ["Note 0", "Note 1", "Note 2"]
+    assert second["nextCursor"] is None
+    assert admin_client.uploads_page(case["id"]) == {"uploads": [], "nextCursor": None}
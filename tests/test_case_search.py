@@ -0,0 +1,81 @@
+import pytest
+
+from advocate_diary import ApiError
+
+# Tests for the ranked full-text GET /api/cases/search
+
+@pytest.fixture
+def tag(namespace):
+    """Single search token unique to this test, so parallel workers never match"""
+    return namespace.unique().replace("-", "")
+
+def result_ids(page):
+    """Ids of exact matches; fuzzy near-miss pages count as no match"""
+    return [] if page["fuzzy"] else [r["id"] for r in page["results"]]
+
+def test_search_matches_parties_with_prefixes(admin_client, new_case, tag):
+    """Test advocate names are found by full words and by prefixes"""
+    case_id = new_case(title=f"Jain vs Shaha {tag}", petitioners=[{"name": "Jain", "advocate": "Deependra Kumar Dixit"}])["id"]
+
+    assert result_ids(admin_client.search_cases(f"Deependra Kumar Dixit {tag}")) == [case_id]
+    assert result_ids(admin_client.search_cases(f"deep dix {tag[:12]}")) == [case_id]
+    assert result_ids(admin_client.search_cases(f"Deependra Sharma {tag}")) == []
+
+    # A misspelt name finds the case through the trigram fallback
+    page = admin_client.search_cases(f"Deependr Dixt {tag}")
+    assert page["fuzzy"] is True
+    assert [r["id"] for r in page["results"]] == [case_id]
+
+def test_search_ranks_title_above_notes(admin_client, new_case, tag):
+    """Test a title hit outranks a hit that is only in the notes"""
+    in_notes = new_case(title=f"Unrelated {tag}")["id"]
+    admin_client.add_note(in_notes, "Client mentioned the Mehra arbitration")
+    in_title = new_case(title=f"Mehra vs State {tag}", petitioners=[{"name": "Test Petitioner", "advocate": "Advocate P"}])["id"]
+    admin_client.add_hearing(in_title, "2031-01-05", next_date="2031-02-10")
+
+    page = admin_client.search_cases(f"mehra {tag}")
+    assert result_ids(page) == [in_title, in_notes]
+    assert page["results"][0]["rank"] > page["results"][1]["rank"]
+    # Results carry what a case list row shows
+    assert page["results"][0]["petitioners"][0]["advocate"] == "Advocate P"
+    assert page["results"][0]["hearings"][0]["nextDate"].startswith("2031-02-10")
+    assert page["results"][1]["hearings"] == []
+
+def test_search_index_follows_writes(admin_client, new_case, tag):
+    """Test notes and case edits are searchable as soon as they are saved"""
+    case_id = new_case(title=f"Before {tag}")["id"]
+
+    # Step 1: A new note becomes searchable
+    note = admin_client.add_note(case_id, "Adjournment sought for evidence")
+    assert result_ids(admin_client.search_cases(f"adjourn {tag}")) == [case_id]
+
+    # Step 2: Deleting the note removes it from the index
+    admin_client.delete_note(note["id"])
+    assert result_ids(admin_client.search_cases(f"adjourn {tag}")) == []
+
+    # Step 3: A renamed case is found by its new title only
+    admin_client.update_case(case_id, {"title": f"After {tag}"})
+    assert result_ids(admin_client.search_cases(f"after {tag}")) == [case_id]
+    assert result_ids(admin_client.search_cases(f"before {tag}")) == []
+
+def test_search_is_paginated_and_scoped(admin_client, user_client, new_case, tag):
+    """Test paging through results and that users only find their own cases"""
+    case_ids = {new_case(title=f"Bulk {tag}")["id"] for _ in range(5)}
+
+    seen = []
+    cursor = None
+    while True:
+        page = admin_client.search_cases(tag, cursor=cursor, limit=2)
+        assert len(page["results"]) <= 2
+        seen.extend(result_ids(page))
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(case_ids)
+
+    # The admin owns these cases, so a regular user finds none of them
+    assert result_ids(user_client.search_cases(tag)) == []
+
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.search_cases("  ?! ")
+    assert excinfo.value.status_code == 400
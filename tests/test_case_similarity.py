@@ -0,0 +1,56 @@
+import pytest
+
+from advocate_diary import ApiError
+
+# Tests for GET /api/cases/[caseId]/similar; every case shares a word unique
+# to the test, so cases from other workers never outrank them
+
+@pytest.fixture
+def word(namespace):
+    return namespace.unique().rsplit("-", 1)[1]
+
+def parties(petitioner, respondent):
+    return {"petitioners": [{"name": petitioner}], "respondents": [{"name": respondent}]}
+
+def test_similar_cases_rank_by_shared_terms(admin_client, new_case, word):
+    """Test cases sharing more distinctive terms rank higher"""
+    base = new_case(title=f"Partition suit {word}", **parties(f"Raghunath {word}", "Kamala Devi"))["id"]
+    close = new_case(title=f"Partition appeal {word}", **parties(f"Raghunath {word}", "Kamala Devi"))["id"]
+    far = new_case(title=f"Cheque bounce {word}", **parties("Mohan Lal", "Suresh Gupta"))["id"]
+
+    results = admin_client.similar_cases(base)
+    ids = [r["id"] for r in results]
+    assert base not in ids
+    assert ids.index(close) < ids.index(far)
+    assert results[0]["title"] == f"Partition appeal {word}"
+    assert results[0]["score"] > 0
+
+def test_similar_cases_follow_notes_and_hearings(admin_client, new_case, word):
+    """Test notes and hearing purposes written after creation count towards similarity"""
+    base = new_case(title=f"Property dispute {word}", **parties("Anil Kapoor", "Sunita Rao"))["id"]
+    other = new_case(title=f"Motor accident {word}", **parties("Vijay Singh", "Insurance Co"))["id"]
+    hearing = f"injunction{word}"
+    admin_client.add_note(base, f"Seek interim {hearing} against construction")
+    admin_client.add_hearing(other, "2031-02-01", next_date="2031-02-15", next_purpose=f"Arguments on {hearing}")
+
+    results = admin_client.similar_cases(base, limit=1)
+    assert [r["id"] for r in results] == [other]
+    assert results[0]["lastHearing"]["nextPurpose"] == f"Arguments on {hearing}"
+
+def test_similar_cases_are_scoped_to_the_user(admin_client, user_client, new_case, word):
+    """Test users only get their own cases back and cannot query others' cases"""
+    mine = new_case(user_client, title=f"Maintenance claim {word}", **parties("Geeta", "Ramesh"))["id"]
+    my_other = new_case(user_client, title=f"Maintenance revision {word}", **parties("Geeta", "Ramesh"))["id"]
+    theirs = new_case(title=f"Maintenance claim {word}", **parties("Geeta", "Ramesh"))["id"]
+
+    ids = [r["id"] for r in user_client.similar_cases(mine)]
+    assert my_other in ids
+    assert theirs not in ids
+
+    with pytest.raises(ApiError) as excinfo:
+        user_client.similar_cases(theirs)
+    assert excinfo.value.status_code == 403
+
+    with pytest.raises(ApiError) as excinfo:
+        user_client._json("GET", f"/api/cases/{mine}/similar", params={"limit": "0"})
+    assert excinfo.value.status_code == 400
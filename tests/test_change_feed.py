@@ -0,0 +1,118 @@
+import pytest
+
+from advocate_diary import ApiError
+from advocate_diary.replica import CaseReplica
+
+# Tests for the change feed (GET /api/changes) and the replica built on it
+
+def _follow(client, cursor):
+    """Every page of the feed after cursor, merged, and the cursor after them"""
+    merged = {"cases": [], "hearings": [], "notes": [], "uploads": [], "deleted": []}
+    while True:
+        page = client.changes(cursor, limit=50)
+        for key in merged:
+            merged[key].extend(page[key])
+        cursor = page["nextCursor"]
+        if not page["hasMore"]:
+            return merged, cursor
+
+def _ids(rows):
+    return {row["id"] for row in rows}
+
+def test_change_feed_sends_upserts_and_tombstones(admin_client, user_client, created):
+    """Test the feed follows writes, reassignment and deletes of a user's case"""
+    admin = admin_client.get_session()["user"]
+    user = user_client.get_session()["user"]
+    cursor = user_client.changes()["nextCursor"]
+    admin_cursor = admin_client.changes()["nextCursor"]
+
+    # Step 1: A new case of the user's arrives with its hearing and note
+    case = created.create_case({
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "courtName": "Test Court",
+        "userId": user["id"],
+        "petitioners": [{"name": "Petitioner A"}],
+        "respondents": [{"name": "Respondent B"}],
+    })
+    hearing = admin_client.add_hearing(case["id"], "2025-07-01T00:00:00.000Z", notes="First")
+    note = admin_client.add_note(case["id"], "Feed note")
+    changes, cursor = _follow(user_client, cursor)
+    assert case["id"] in _ids(changes["cases"])
+    row = next(c for c in changes["cases"] if c["id"] == case["id"])
+    assert row["user"]["id"] == user["id"] and row["petitioners"][0]["name"] == "Petitioner A"
+    assert hearing["id"] in _ids(changes["hearings"])
+    assert note["id"] in _ids(changes["notes"])
+
+    # Step 2: Nothing new since the last cursor. A later note arrives on its
+    # own; a later hearing brings the case along, with it as the latest
+    changes, cursor = _follow(user_client, cursor)
+    assert case["id"] not in _ids(changes["cases"])
+    later = admin_client.add_note(case["id"], "Later note")
+    changes, cursor = _follow(user_client, cursor)
+    assert case["id"] not in _ids(changes["cases"])
+    assert later["id"] in _ids(changes["notes"])
+    latest = admin_client.add_hearing(case["id"], "2025-08-01T00:00:00.000Z", notes="Second")
+    changes, cursor = _follow(user_client, cursor)
+    row = next(c for c in changes["cases"] if c["id"] == case["id"])
+    assert [h["id"] for h in row["hearings"]] == [latest["id"]]
+
+    # Step 3: Reassigned away it is a tombstone for the user, an upsert for admins
+    admin_client.assign_case(case["id"], admin["id"])
+    changes, cursor = _follow(user_client, cursor)
+    assert {"type": "case", "id": case["id"], "caseId": case["id"], "reason": "reassigned"} in changes["deleted"]
+    assert case["id"] not in _ids(changes["cases"])
+    admin_changes, admin_cursor = _follow(admin_client, admin_cursor)
+    assert next(c for c in admin_changes["cases"] if c["id"] == case["id"])["userId"] == admin["id"]
+
+    # Step 4: Moved back, the case comes with everything under it
+    admin_client.assign_case(case["id"], user["id"])
+    changes, cursor = _follow(user_client, cursor)
+    assert case["id"] in _ids(changes["cases"])
+    assert hearing["id"] in _ids(changes["hearings"])
+    assert note["id"] in _ids(changes["notes"])
+
+    # Step 5: Deletes are tombstones
+    admin_client.delete_note(note["id"])
+    admin_client.delete_case(case["id"])
+    changes, cursor = _follow(user_client, cursor)
+    deleted = {(t["type"], t["id"], t["reason"]) for t in changes["deleted"]}
+    assert ("note", note["id"], "deleted") in deleted
+    assert ("case", case["id"], "deleted") in deleted
+
+    with pytest.raises(ApiError) as excinfo:
+        user_client.changes("not-a-cursor")
+    assert excinfo.value.status_code == 400
+
+def test_replica_sync_applies_deltas(user_client, created, tmp_path):
+    """Test a replica loads once, then follows changes and survives a save"""
+    user = user_client.get_session()["user"]
+    replica = CaseReplica()
+    assert replica.sync(user_client)["full"]
+
+    # Step 1: A case created after the load arrives as a delta
+    case = created.create_case({
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "courtName": "Test Court",
+        "userId": user["id"],
+        "petitioners": [{"name": "Petitioner A"}],
+        "respondents": [{"name": "Respondent B"}],
+    })
+    note = user_client.add_note(case["id"], "Replica note")
+    summary = replica.sync(user_client)
+    assert not summary["full"] and summary["changed"] >= 2
+    assert replica.cases[case["id"]]["courtName"] == "Test Court"
+    assert note["id"] in replica.notes
+
+    # Step 2: The saved state picks up where it left off
+    path = str(tmp_path / "replica.json")
+    replica.save(path)
+    reopened = CaseReplica.open(path)
+    assert reopened.cursor == replica.cursor and case["id"] in reopened.cases
+
+    # Step 3: Deleting the case drops it and its note from the replica
+    user_client.delete_case(case["id"])
+    reopened.sync(user_client)
+    assert case["id"] not in reopened.cases
+    assert note["id"] not in reopened.notes
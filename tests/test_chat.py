@@ -0,0 +1,106 @@
+import pytest
+
+from advocate_diary import ApiError
+
+# Tests for POST /api/chat against the offline model (CHAT_MODEL=fake), whose
+# answer quotes the question and the number of prompt messages it was given.
+# Signed-in users also get similar cases as context, so tests of the bare
+# prompt ask anonymously.
+
+ANSWER_PREFIX = "This is a test answer to: "
+
+def ask(client, messages, stream=False):
+    body = {"messages": messages}
+    if stream:
+        body["stream"] = True
+    response = client.request("POST", "/api/chat", json=body)
+    assert response.status_code == 200
+    return response
+
+def test_standalone_questions_are_cached(anonymous_client, namespace):
+    """Test a repeated question is answered from the cache, ignoring case and punctuation"""
+    question = f"What is the limitation period for a civil suit? {namespace.unique()}"
+
+    first = ask(anonymous_client, [{"role": "user", "content": question}])
+    assert first.headers["X-Chat-Cache"] == "miss"
+    text = first.json()["text"]
+    assert text == f"{ANSWER_PREFIX}{question} (2 messages in context)"
+
+    variant = "  " + question.upper().replace("?", " ?!") + "  "
+    second = ask(anonymous_client, [{"role": "user", "content": variant}])
+    assert second.headers["X-Chat-Cache"] == "hit"
+    assert second.json()["text"] == text
+
+def test_streamed_answer(anonymous_client, namespace):
+    """Test a streamed answer arrives in pieces and is cached for later requests"""
+    question = f"How do I file an appeal? {namespace.unique()}"
+    messages = [{"role": "user", "content": question}]
+
+    chunks = list(anonymous_client.chat_stream(messages))
+    assert len(chunks) > 1
+    answer = "".join(chunks)
+    assert answer.startswith(ANSWER_PREFIX + question)
+
+    # Cached answers come back whole, streamed or not
+    assert ask(anonymous_client, messages, stream=True).text == answer
+    assert anonymous_client.chat(messages) == answer
+
+def test_follow_ups_send_bounded_history(anonymous_client, namespace):
+    """Test long conversations are trimmed to the recent turns and follow-ups are not cached"""
+    messages = []
+    for turn in range(15):
+        messages.append({"role": "user", "content": f"Question {turn} {namespace.unique()}"})
+        messages.append({"role": "assistant", "content": f"Answer {turn}"})
+    messages.append({"role": "user", "content": "And what about costs?"})
+
+    # Step 1: System prompt, a note of earlier questions and the last 12
+    # messages less the answer that would open the window
+    first = ask(anonymous_client, messages)
+    assert first.json()["text"].endswith("(13 messages in context)")
+
+    # Step 2: The answer depends on the conversation, so it is never cached
+    second = ask(anonymous_client, messages)
+    assert first.headers["X-Chat-Cache"] == second.headers["X-Chat-Cache"] == "miss"
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"messages": []},
+    {"messages": [{"role": "user", "content": 42}]},
+    {"messages": [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]},
+    {"messages": [{"role": "user", "content": "x" * 8001}]},
+])
+def test_chat_rejects_bad_messages(anonymous_client, body):
+    """Test malformed conversations are rejected before reaching the model"""
+    response = anonymous_client.request("POST", "/api/chat", json=body)
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+def test_client_raises_on_bad_stream_request(anonymous_client):
+    """Test the streaming helper surfaces errors as ApiError"""
+    with pytest.raises(ApiError) as excinfo:
+        list(anonymous_client.chat_stream([{"role": "assistant", "content": "Hello"}]))
+    assert excinfo.value.status_code == 400
+
+def test_questions_get_similar_cases_as_context(user_client, admin_client, created, registrations, namespace):
+    """Test a signed-in user's question is answered with their own matching cases as context"""
+    word = namespace.unique().rsplit("-", 1)[1]
+    case_ids = {}
+    for name, client in (("mine", user_client), ("theirs", admin_client)):
+        num = registrations.next()
+        case = client.create_case({
+            "caseType": "CIVIL",
+            "registrationNum": num,
+            "registrationYear": 2023,
+            "title": f"Tenancy dispute {word}",
+            "courtName": "Rent Controller",
+            "petitioners": [{"name": f"Landlord {num}"}],
+            "respondents": [{"name": f"Tenant {num}"}],
+        })
+        case_ids[name] = created.track_case(case["id"])
+
+    response = ask(user_client, [{"role": "user", "content": f"What can I argue in the {word} eviction?"}])
+    # Other cases of the user may share common words, but rank lower
+    related = response.headers["X-Chat-Cases"].split(",")
+    assert related[0] == case_ids["mine"]
+    assert case_ids["theirs"] not in related
+    assert response.json()["text"].endswith("(3 messages in context)")
@@ -0,0 +1,63 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from requests.cookies import create_cookie
+
+from advocate_diary import AdvocateDiaryClient, AuthenticationError, CachedLogin, LoginCache
+
+# Unit tests for the API client's login cache; no server required
+
+def make_login(expires_in=3600, role="ADMIN"):
+    cookie = create_cookie("next-auth.session-token", "jwt-value", domain="example.com")
+    user = {"id": "1", "email": "admin@example.com", "role": role}
+    return CachedLogin(cookie, user, time.time() + expires_in)
+
+def test_login_cache_is_keyed_on_email_and_role():
+    """Test that cached logins are looked up by (email, role)"""
+    cache = LoginCache()
+    login = make_login()
+    cache.put("Admin@Example.com", "ADMIN", login)
+
+    assert cache.get("admin@example.com", "ADMIN") is login
+    assert cache.get("admin@example.com", "USER") is None
+    assert cache.get("admin@example.com") is None
+
+    cache.invalidate("admin@example.com", "ADMIN")
+    assert len(cache) == 0
+
+def test_login_cache_drops_expired_logins():
+    """Test that a login close to its expiry is not handed out"""
+    cache = LoginCache()
+    cache.put("admin@example.com", "ADMIN", make_login(expires_in=10))
+
+    assert cache.get("admin@example.com", "ADMIN") is None
+    assert len(cache) == 0
+
+def test_login_reuses_cached_cookie():
+    """Test that a second client skips the credentials round trips"""
+    cache = LoginCache()
+    login = make_login()
+
+    with patch.object(AdvocateDiaryClient, "_login_uncached", MagicMock(return_value=login)) as uncached:
+        first = AdvocateDiaryClient("https://example.com", login_cache=cache)
+        second = AdvocateDiaryClient("https://example.com", login_cache=cache)
+
+        first.login("admin@example.com", "password123", role="ADMIN")
+        user = second.login("admin@example.com", "password123", role="ADMIN")
+
+    assert uncached.call_count == 1
+    assert user["role"] == "ADMIN"
+    assert second.session.cookies.get("next-auth.session-token") == "jwt-value"
+
+def test_login_rejects_unexpected_role():
+    """Test that a login is not cached under the wrong role"""
+    cache = LoginCache()
+    login = make_login(role="USER")
+
+    with patch.object(AdvocateDiaryClient, "_login_uncached", MagicMock(return_value=login)):
+        client = AdvocateDiaryClient("https://example.com", login_cache=cache)
+        with pytest.raises(AuthenticationError):
+            client.login("admin@example.com", "password123", role="ADMIN")
+
+    assert len(cache) == 0
+    assert client.user is None
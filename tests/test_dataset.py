@@ -0,0 +1,100 @@
+from datetime import date, datetime
+
+from advocate_diary.dataset import COPY_COLUMNS, Dataset, DatasetSpec, Template, load_through_api, write_copy_files
+from advocate_diary.importer import case_key, map_record
+
+AS_OF = date(2025, 6, 1)
+
+# Tests for the synthetic dataset generator
+
+def _ecourts(value: str) -> date:
+    return datetime.strptime(value, "%d-%m-%Y").date()
+
+def test_dataset_is_reproducible():
+    """Test the same seed gives the same data, and a smaller dataset is a prefix of a larger one"""
+    small = list(Dataset(DatasetSpec(users=2, cases_per_user=5, seed=7, as_of=AS_OF)).records())
+    again = list(Dataset(DatasetSpec(users=2, cases_per_user=5, seed=7, as_of=AS_OF)).records())
+    large = list(Dataset(DatasetSpec(users=2, cases_per_user=50, seed=7, as_of=AS_OF)).records())
+    other = list(Dataset(DatasetSpec(users=2, cases_per_user=5, seed=8, as_of=AS_OF)).records())
+
+    assert small == again
+    # Owners differ with cases_per_user, everything else is shared
+    strip = lambda records: [{k: v for k, v in r.items() if k != "owner"} for r in records]
+    assert strip(large[:10]) == strip(small)
+    assert strip(other) != strip(small)
+
+def test_records_follow_the_template():
+    """Test case types, unique registrations and hearing chains of a generated firm"""
+    template = Template.load()
+    dataset = Dataset(DatasetSpec(users=4, cases_per_user=50, seed=1, as_of=AS_OF), template)
+    records = list(dataset.records())
+    assert len(records) == 200
+
+    keys = set()
+    for record in records:
+        # Step 1: Types come from db.json, bar the occasional PERSONAL case
+        assert record["case_type"] in set(template.case_types) | {"PERSONAL"}
+        case = map_record(record)
+        keys.add((case["caseType"], case["registrationYear"], case["registrationNum"]))
+
+        # Step 2: Every hearing is listed for the date of the next one
+        history = record["case_history"]
+        held = [_ecourts(entry["business_on_date"]) for entry in history]
+        assert held == sorted(held)
+        for entry, following in zip(history, history[1:]):
+            assert entry["hearing_date"] == following["business_on_date"]
+
+        # Step 3: Pending cases have a next date ahead, completed ones none
+        if record["is_completed"]:
+            assert history[-1]["hearing_date"] == ""
+        else:
+            assert _ecourts(history[-1]["hearing_date"]) > AS_OF
+    assert len(keys) == len(records)
+
+def test_copy_files(tmp_path):
+    """Test the COPY files hold one row per generated record with every column"""
+    dataset = Dataset(DatasetSpec(users=3, cases_per_user=10, seed=2, as_of=AS_OF))
+    counts = write_copy_files(dataset, str(tmp_path))
+    records = list(dataset.records())
+
+    assert counts["User"] == 3
+    assert counts["Case"] == 30
+    assert counts["Hearing"] == sum(len(r["case_history"]) for r in records)
+    assert counts["Note"] == sum(len(r["notes"]) for r in records)
+    for table, columns in COPY_COLUMNS.items():
+        lines = (tmp_path / f"{table}.tsv").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == counts[table]
+        assert all(len(line.split("\t")) == len(columns) for line in lines)
+        assert f"\\copy \"{table}\"" in (tmp_path / "load.sql").read_text(encoding="utf-8")
+
+def test_dataset_through_api(api_base_url, admin_client, created, registrations, namespace):
+    """Test a small dataset is created through the API with its owners, hearings and notes"""
+    seed = int(namespace.unique()[-8:], 16)
+    spec = DatasetSpec(users=2, cases_per_user=3, seed=seed, as_of=AS_OF, notes_per_case=1)
+    # Reserve as many registration numbers as there are cases
+    spec.registration_start = min(registrations.next() for _ in range(spec.cases))
+    dataset = Dataset(spec)
+
+    try:
+        result = load_through_api(dataset, api_base_url, concurrency=2, batch_size=2)
+    finally:
+        # Track whatever was created, so a failure still cleans up
+        users = {u["email"]: u["id"] for u in admin_client.list_users()}
+        user_ids = [users[u["email"]] for u in dataset.users() if u["email"] in users]
+        for user_id in user_ids:
+            created.track_user(user_id)
+            for case in admin_client.list_cases(include_personal=True, userId=user_id):
+                created.track_case(case["id"])
+
+    assert result["users"] == 2
+    assert result["created"] == 6
+    assert result["failed"] == 0
+    records = list(dataset.records())
+    assert result["notes"] == sum(len(r["notes"]) for r in records)
+
+    # Each case belongs to its generated owner and carries its hearings
+    owned = {user_id: admin_client.list_cases(include_personal=True, userId=user_id) for user_id in user_ids}
+    assert [len(cases) for cases in owned.values()] == [3, 3]
+    case = owned[user_ids[0]][0]
+    record = next(r for r in records if case_key(map_record(r)) == case_key(case))
+    assert len(admin_client.list_hearings(case["id"])) == len(record["case_history"])
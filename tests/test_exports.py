@@ -0,0 +1,195 @@
+import csv
+import io
+
+import pytest
+
+from advocate_diary import ApiError
+from advocate_diary.pdf import extract_text
+
+# Tests for GET /api/cases/[caseId]/export, GET /api/cases/export and the
+# /api/exports jobs; list exports are filtered on a case type unique to the
+# test, so cases from other workers never show up in them
+
+@pytest.fixture
+def case_type(namespace):
+    return "EXPORT-" + namespace.unique().rsplit("-", 1)[1].upper()
+
+def pdf_lines(data):
+    assert data.startswith(b"%PDF-1.4")
+    assert data.rstrip().endswith(b"%%EOF")
+    return [line for page in extract_text(data) for line in page]
+
+def csv_rows(data):
+    text = data.decode("utf-8")
+    assert text.startswith("\ufeff")
+    return list(csv.reader(io.StringIO(text[1:])))
+
+def test_case_file_pdf(admin_client, new_case):
+    """Test the case file carries the case, its parties, hearings and notes"""
+    case_id = new_case(
+        title="Shah (HUF) vs State", petitioners=[{"name": "Ramesh Shah", "advocate": "Advocate Rao"}],
+    )["id"]
+    admin_client.add_hearing(case_id, "2031-01-05", notes="Arguments heard", next_date="2031-02-10", next_purpose="Orders")
+    admin_client.add_note(case_id, "Client to bring the original sale deed")
+
+    lines = pdf_lines(admin_client.export_case(case_id))
+    assert "CIVIL Case Details" in lines
+    assert "Title: Shah (HUF) vs State" in lines
+    assert "1. Ramesh Shah (Advocate: Advocate Rao)" in lines
+    assert "05 Jan 2031 | Arguments heard | 10 Feb 2031 | Orders" in lines
+    assert "Client to bring the original sale deed" in lines
+
+def test_case_file_pdf_non_latin_names(real_app, admin_client, new_case):
+    """Test Devanagari names are drawn in an embedded font instead of as question marks"""
+    case_id = new_case(
+        title="राम प्रसाद शर्मा vs State",
+        petitioners=[{"name": "राम प्रसाद शर्मा", "advocate": "Advocate Rao"}],
+        respondents=[{"name": "किशोर कुमार"}],
+    )["id"]
+
+    data = admin_client.export_case(case_id)
+    lines = pdf_lines(data)
+    assert "Title: राम प्रसाद शर्मा vs State" in lines
+    assert "1. राम प्रसाद शर्मा (Advocate: Advocate Rao)" in lines
+    assert "1. किशोर कुमार" in lines
+    assert not any("?" in line for line in lines)
+    for marker in (b"/CIDFontType2", b"/FontFile2", b"/ToUnicode"):
+        assert marker in data
+
+def test_case_file_is_cached_until_the_case_changes(admin_client, new_case):
+    """Test repeat exports are served from the cache and revalidate with the ETag"""
+    case_id = new_case()["id"]
+    path = f"/api/cases/{case_id}/export"
+
+    # Step 1: The first export renders the file, the second reuses it
+    first = admin_client.request("GET", path)
+    assert first.status_code == 200
+    assert first.headers["Content-Type"] == "application/pdf"
+    assert first.headers["X-Export-Cache"] == "miss"
+    second = admin_client.request("GET", path)
+    assert second.headers["X-Export-Cache"] == "hit"
+    assert second.content == first.content
+
+    # Step 2: An unchanged case answers If-None-Match with 304
+    etag = first.headers["ETag"]
+    assert admin_client.request("GET", path, headers={"If-None-Match": etag}).status_code == 304
+
+    # Step 3: A new note is a new version
+    admin_client.add_note(case_id, "Adjournment sought by respondent")
+    third = admin_client.request("GET", path, headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["ETag"] != etag
+    assert third.headers["X-Export-Cache"] == "miss"
+    assert "Adjournment sought by respondent" in pdf_lines(third.content)
+
+def test_case_file_shows_renamed_documents(admin_client, new_case):
+    """Test renaming a document is a new version of the case file"""
+    case_id = new_case()["id"]
+    upload = admin_client.upload_file(case_id, "scan-0012.pdf", b"%PDF-1.4 order")
+    path = f"/api/cases/{case_id}/export"
+
+    # Step 1: The first export lists the document under its upload name
+    first = admin_client.request("GET", path)
+    assert any(line.startswith("scan-0012.pdf (added ") for line in pdf_lines(first.content))
+
+    # Step 2: After a rename the cached file and its ETag are stale
+    admin_client.rename_upload(upload["id"], "Interim order.pdf")
+    second = admin_client.request("GET", path, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["X-Export-Cache"] == "miss"
+    lines = pdf_lines(second.content)
+    assert any(line.startswith("Interim order.pdf (added ") for line in lines)
+    assert not any(line.startswith("scan-0012.pdf") for line in lines)
+
+def test_case_file_csv(admin_client, new_case):
+    """Test the CSV case file has one row per hearing and defuses formulas"""
+    case = new_case()
+    case_id = case["id"]
+    admin_client.add_hearing(case_id, "2031-01-05", notes="=HYPERLINK(\"x\")", next_date="2031-02-10")
+    admin_client.add_hearing(case_id, "2031-02-10", notes="Evidence, part heard")
+
+    rows = csv_rows(admin_client.export_case(case_id, fmt="csv"))
+    assert rows[0][:2] == ["Case No", "Title"]
+    assert [row[4:6] for row in rows[1:]] == [
+        ["10 Feb 2031", "Evidence, part heard"],
+        ["05 Jan 2031", "'=HYPERLINK(\"x\")"],
+    ]
+    assert rows[1][0] == f"CIVIL {case['registrationNum']}/2023"
+
+def test_case_file_permissions(admin_client, user_client, new_case):
+    """Test users cannot export others' cases and formats are validated"""
+    theirs = new_case()["id"]
+    with pytest.raises(ApiError) as excinfo:
+        user_client.export_case(theirs)
+    assert excinfo.value.status_code == 403
+
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.export_case(theirs, fmt="docx")
+    assert excinfo.value.status_code == 400
+
+def test_docket_export(admin_client, user_client, new_case, case_type):
+    """Test the docket lists the filtered cases in case-number order"""
+    new_case(caseType=case_type, title="First Matter")
+    second = new_case(
+        user_client, caseType=case_type, title="Second Matter",
+        petitioners=[{"name": "Sunil Verma", "advocate": "Advocate Rao"}],
+    )["id"]
+    admin_client.add_hearing(second, "2031-03-01", next_date="2031-03-20", next_purpose="Evidence")
+
+    rows = csv_rows(admin_client.export_cases(fmt="csv", caseType=case_type))
+    assert [row[1] for row in rows[1:]] == ["First Matter", "Second Matter"]
+    assert rows[2][8:10] == ["20 Mar 2031", "Evidence"]
+    assert rows[2][4] == "Sunil Verma (Adv. Advocate Rao)"
+
+    lines = pdf_lines(admin_client.export_cases(caseType=case_type))
+    assert "Docket" in lines
+    # The app cuts cells to their column, eliding the long test case type
+    assert any(line.endswith(" | First Matter | Test Court | Pending") for line in lines)
+
+    # Users only get their own cases
+    rows = csv_rows(user_client.export_cases(fmt="csv", caseType=case_type))
+    assert [row[1] for row in rows[1:]] == ["Second Matter"]
+
+def test_cause_list_export(admin_client, new_case, case_type):
+    """Test the cause list has the hearings listed in the window, earliest first"""
+    first = new_case(caseType=case_type, title="Later Listing")["id"]
+    second = new_case(caseType=case_type, title="Earlier Listing")["id"]
+    admin_client.add_hearing(first, "2031-04-01", next_date="2031-04-15", next_purpose="Arguments")
+    admin_client.add_hearing(second, "2031-04-02", next_date="2031-04-14", next_purpose="Framing of issues")
+    admin_client.add_hearing(second, "2031-04-14", next_date="2031-06-01")
+
+    rows = csv_rows(admin_client.export_cases("causelist", "csv", "2031-04-14", "2031-04-16", caseType=case_type))
+    assert [(row[0], row[3], row[4]) for row in rows[1:]] == [
+        ("14 Apr 2031", "Earlier Listing", "Framing of issues"),
+        ("15 Apr 2031", "Later Listing", "Arguments"),
+    ]
+
+    lines = pdf_lines(admin_client.export_cases("causelist", "pdf", "2031-04-14", "2031-04-16", caseType=case_type))
+    assert "Cause List: 14 Apr 2031 to 15 Apr 2031" in lines
+
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.export_cases("causelist", start="2031-01-01", end="2031-06-01")
+    assert excinfo.value.status_code == 400
+
+def test_export_job(admin_client, user_client, new_case, case_type):
+    """Test a background export produces the same file as the direct download"""
+    for title in ("Job Matter A", "Job Matter B", "Job Matter C"):
+        new_case(caseType=case_type, title=title)
+
+    job = admin_client.start_export(fmt="csv", caseType=case_type)
+    assert job["status"] in ("queued", "running", "completed")
+    assert job["kind"] == "docket"
+
+    done = admin_client.wait_for_export(job["id"], timeout=60)
+    assert done["status"] == "completed"
+    assert done["rows"] == 3
+    assert admin_client.download_export(done) == admin_client.export_cases(fmt="csv", caseType=case_type)
+
+    # Jobs are private to the user who started them
+    with pytest.raises(ApiError) as excinfo:
+        user_client.export_job(job["id"])
+    assert excinfo.value.status_code == 404
+
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.start_export(kind="ledger")
+    assert excinfo.value.status_code == 400
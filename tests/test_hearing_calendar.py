@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from advocate_diary import ApiError
+
+# Tests for GET /api/hearings/calendar; every window is filtered to the
+# cases a test created, since other workers add hearings to the same dates
+
+def own_hearings(calendar, case_ids):
+    return [h for h in calendar["hearings"] if h["caseId"] in case_ids]
+
+def test_calendar_joins_hearings_across_cases(admin_client, new_case):
+    """Test one request returns every case's hearings in the window, earliest first"""
+    first = new_case(title="First")["id"]
+    second = new_case(title="Second", courtName="Calendar Court")["id"]
+    admin_client.add_hearing(first, "2031-03-01", next_date="2031-03-12", next_purpose="Evidence")
+    admin_client.add_hearing(second, "2031-03-02", next_date="2031-03-10", next_purpose="Arguments")
+    admin_client.add_hearing(second, "2031-03-10", next_date="2031-05-20")
+
+    calendar = admin_client.hearing_calendar("2031-03-10", "2031-03-13")
+    hearings = own_hearings(calendar, {first, second})
+    assert [(h["caseId"], h["nextPurpose"]) for h in hearings] == [(second, "Arguments"), (first, "Evidence")]
+    assert hearings[0]["case"]["title"] == "Second"
+    assert hearings[0]["case"]["courtName"] == "Calendar Court"
+    assert calendar["truncated"] is False
+
+    # The window is half-open and on=date selects hearings held in it instead
+    held = admin_client.hearing_calendar("2031-03-01", "2031-03-10", on="date")
+    assert [h["caseId"] for h in own_hearings(held, {first, second})] == [first, second]
+
+def test_calendar_is_scoped_to_the_user(admin_client, user_client, new_case):
+    """Test regular users only see hearings on their own cases"""
+    mine = new_case(user_client)["id"]
+    theirs = new_case()["id"]
+    for case_id in (mine, theirs):
+        admin_client.add_hearing(case_id, "2031-04-01", next_date="2031-04-15")
+
+    calendar = user_client.hearing_calendar("2031-04-15", "2031-04-16")
+    assert [h["caseId"] for h in own_hearings(calendar, {mine, theirs})] == [mine]
+
+    # Completed cases can be filtered out
+    admin_client.set_case_completed(mine, True)
+    calendar = user_client.hearing_calendar("2031-04-15", "2031-04-16", isCompleted=False)
+    assert own_hearings(calendar, {mine, theirs}) == []
+
+def test_calendar_ics_feed(admin_client, new_case):
+    """Test the iCalendar export has one all-day event per hearing"""
+    case_id = new_case(title="Shah, Mehta; and others")["id"]
+    hearing = admin_client.add_hearing(case_id, "2031-06-01", next_date="2031-06-09", next_purpose="Final hearing")
+
+    feed = admin_client.hearing_calendar_ics("2031-06-09", "2031-06-10")
+    assert feed.startswith("BEGIN:VCALENDAR\r\n")
+    assert feed.endswith("END:VCALENDAR\r\n")
+    # Unfold continuation lines before looking for the event
+    lines = feed.replace("\r\n ", "").split("\r\n")
+    assert f"UID:{hearing['id']}-nextDate@advocate-diary" in lines
+    assert "DTSTART;VALUE=DATE:20310609" in lines
+    assert "DTEND;VALUE=DATE:20310610" in lines
+    assert "DESCRIPTION:Final hearing" in lines
+    assert any(line.startswith("SUMMARY:Shah\\, Mehta\\; and others (CIVIL ") for line in lines)
+    assert all(len(line.encode("utf-8")) <= 75 for line in feed.split("\r\n"))
+
+    # The download says whether the window was cut short, as the JSON does
+    response = admin_client.request(
+        "GET", "/api/hearings/calendar", params={"from": "2031-06-09", "to": "2031-06-10", "format": "ics"},
+    )
+    assert response.headers["X-Calendar-Truncated"] == "false"
+
+def test_calendar_default_window_starts_at_the_firm_midnight(admin_client):
+    """Test the default window starts at midnight in Asia/Kolkata, not UTC"""
+    calendar = admin_client.hearing_calendar()
+    today = datetime.now(ZoneInfo("Asia/Kolkata")).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = datetime.fromisoformat(calendar["from"].replace("Z", "+00:00"))
+    end = datetime.fromisoformat(calendar["to"].replace("Z", "+00:00"))
+    # Allow for the day turning over between the request and this check
+    assert start in (today.astimezone(timezone.utc), (today - timedelta(days=1)).astimezone(timezone.utc))
+    assert end - start == timedelta(days=30)
+
+def test_calendar_ics_uses_the_firm_day(admin_client, new_case):
+    """Test a hearing listed at midnight IST falls on its Indian date, not the UTC one"""
+    case_id = new_case()["id"]
+    # 2031-07-15 00:00 in Asia/Kolkata is still 2031-07-14 in UTC
+    hearing = admin_client.add_hearing(case_id, "2031-07-01", next_date="2031-07-15T00:00:00+05:30")
+
+    feed = admin_client.hearing_calendar_ics("2031-07-14", "2031-07-16")
+    lines = feed.replace("\r\n ", "").split("\r\n")
+    start = lines.index(f"UID:{hearing['id']}-nextDate@advocate-diary")
+    event = lines[start:lines.index("END:VEVENT", start)]
+    assert "DTSTART;VALUE=DATE:20310715" in event
+    assert "DTEND;VALUE=DATE:20310716" in event
+
+@pytest.mark.parametrize("params", [
+    {"start": "2031-03-10", "end": "2031-03-01"},
+    {"start": "2031-01-01", "end": "2031-06-01"},
+    {"start": "not-a-date"},
+    {"on": "createdAt"},
+])
+def test_calendar_rejects_bad_windows(admin_client, params):
+    """Test reversed, over-long and malformed windows are rejected"""
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.hearing_calendar(**params)
+    assert excinfo.value.status_code == 400
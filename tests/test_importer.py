@@ -0,0 +1,92 @@
+import io
+import json
+import os
+
+import pytest
+
+from advocate_diary.importer import CaseImporter, RecordError, iter_records, map_record, parse_date, parse_registration
+
+DB_JSON = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db.json")
+
+# Tests for the streaming db.json importer
+
+def test_registration_and_date_parsing():
+    """Test the same conversions prisma/seed.ts applies"""
+    assert parse_registration("138/2024") == (138, 2024)
+    assert parse_date("05-06-2024") == "2024-06-05T00:00:00.000Z"
+    assert parse_date("") is None
+    assert parse_date("2024-06-05") is None
+    with pytest.raises(RecordError):
+        parse_registration("138-2024")
+
+def test_streams_json_array_in_small_chunks():
+    """Test that records split across read chunks decode identically"""
+    with open(DB_JSON, encoding="utf-8") as handle:
+        expected = json.load(handle)
+
+    # Step 1: A chunk size far smaller than one record forces buffering
+    assert list(iter_records(DB_JSON, chunk_size=7)) == expected
+
+    # Step 2: JSON Lines input yields the same records
+    lines = "\n".join(json.dumps(record) for record in expected) + "\n"
+    assert list(iter_records(io.StringIO(lines))) == expected
+
+    # Step 3: A truncated file is reported rather than silently cut short
+    with pytest.raises(RecordError):
+        list(iter_records(io.StringIO(json.dumps(expected)[:-40]), chunk_size=16))
+
+def test_malformed_record_is_reported_where_it_is():
+    """Test a broken record fails at once with its byte offset, not at the end of the file"""
+    head = '[{"case_type": "सिविल"}, {"case_type": CIVIL}, '
+    source = io.StringIO(head + '{"case_type": "CIVIL"}, ' * 10_000 + "]")
+
+    records = iter_records(source, chunk_size=16)
+    assert next(records) == {"case_type": "सिविल"}
+    with pytest.raises(RecordError) as excinfo:
+        next(records)
+
+    # The offset counts UTF-8 bytes, so the Devanagari before it counts three times
+    offset = len(head[:head.index("CIVIL}")].encode("utf-8"))
+    assert str(excinfo.value) == f"Malformed case record at byte {offset}: Expecting value"
+    assert source.tell() < 100
+
+def test_map_record_matches_seed():
+    """Test that a db.json record maps onto a case with hearings"""
+    record = next(iter_records(DB_JSON))
+    case = map_record(record)
+
+    assert (case["caseType"], case["registrationNum"], case["registrationYear"]) == (record["case_type"], 138, 2024)
+    assert case["title"] == f"{record['petitioners'][0]['name']} vs {record['respondents'][0]['name']}"
+    assert case["courtName"] == "Court 53 - Presiding Off.-MACT"
+    assert len(case["petitioners"]) == len(record["petitioners"])
+    assert len(case["hearings"]) == len(record["case_history"])
+    assert case["hearings"][0]["nextPurpose"] == record["case_history"][0]["purpose"]
+
+def test_import_is_idempotent(api_base_url, login_cache, admin_client, registrations, created):
+    """Test that re-running an import skips cases that already exist"""
+    # Step 1: Give the db.json records registration numbers owned by this worker
+    records = list(iter_records(DB_JSON))
+    for record in records:
+        record["registration"]["number"] = f"{registrations.next()}/2024"
+    records.append({"case_type": "CIVIL", "registration": {"number": "bad"}})
+
+    # Step 2: First run creates every valid case with its hearings
+    importer = CaseImporter(api_base_url, login_cache=login_cache, batch_size=2, concurrency=3)
+    summary = importer.run(records)
+    for case_id in summary.created:
+        created.track_case(case_id)
+
+    assert summary.as_dict() == {
+        "created": 4,
+        "hearings": sum(len(r.get("case_history", [])) for r in records),
+        "skipped": 0,
+        "invalid": 1,
+        "failed": 0,
+    }
+    hearings = admin_client.list_hearings(summary.created[0])
+    assert len(hearings) > 0
+
+    # Step 3: A second run finds every key and creates nothing
+    again = CaseImporter(api_base_url, login_cache=login_cache).run(records)
+    assert again.as_dict()["created"] == 0
+    assert again.skipped == 4
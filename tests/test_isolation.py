@@ -0,0 +1,59 @@
+import pytest
+
+from advocate_diary import ApiError
+from advocate_diary.isolation import Namespace, RegistrationAllocator, ResourceTracker
+
+# Tests for the helpers that keep parallel workers from colliding
+
+def test_registration_blocks_are_disjoint_per_worker():
+    """Test that workers of one run draw from non-overlapping ranges"""
+    blocks = [RegistrationAllocator(run="run-a", worker=f"gw{i}") for i in range(16)]
+    ranges = sorted((b.start, b.stop) for b in blocks)
+
+    for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+        assert stop <= start
+    assert all(start > 0 and stop <= 2**31 - 1 for start, stop in ranges)
+
+def test_registration_numbers_are_unique_within_a_worker():
+    """Test that one allocator never repeats a number"""
+    allocator = RegistrationAllocator(run="run-a", worker="gw0", block=100)
+    numbers = [allocator.next() for _ in range(100)]
+
+    assert len(set(numbers)) == 100
+    with pytest.raises(RuntimeError):
+        allocator.next()
+
+def test_namespace_includes_run_and_worker():
+    """Test that generated identifiers carry the run and worker"""
+    namespace = Namespace(run="abcdef123456", worker="gw3")
+
+    assert namespace.unique().startswith("pytest-abcdef12-gw3-")
+    assert namespace.unique() != namespace.unique()
+    assert namespace.email().endswith("@example.com")
+
+def test_tracker_cleans_up_after_failure(admin_client, registrations, namespace):
+    """Test that tracked cases are deleted even when the test body fails"""
+    tracker = ResourceTracker(admin_client, registrations)
+    case = {
+        "caseType": "CIVIL",
+        "registrationYear": 2023,
+        "courtName": "Test Court",
+        "petitioners": [{"name": f"Petitioner {namespace.unique()}"}],
+        "respondents": [{"name": f"Respondent {namespace.unique()}"}],
+    }
+
+    with pytest.raises(AssertionError):
+        try:
+            created = tracker.create_case(case)
+            assert created["registrationNum"] >= registrations.start
+            assert False, "simulated test failure"
+        finally:
+            tracker.cleanup()
+
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.get_case(created["id"])
+    assert excinfo.value.status_code == 404
+
+    # A second cleanup, or one racing a test that already deleted, is harmless
+    tracker.track_case(created["id"])
+    tracker.cleanup()
@@ -0,0 +1,33 @@
+import pytest
+
+from advocate_diary.query_plans import HOT_QUERIES, PlanDatabase, check_query, connect, declared_indexes
+
+# Plan checks for the hot route queries; they need a PostgreSQL database
+# (--database-url or $QUERY_PLAN_DATABASE_URL) and are skipped without one
+
+
+@pytest.fixture(scope="module")
+def plan_db(request):
+    """A scratch schema with the migrations applied and the synthetic firm seeded"""
+    database_url = request.config.getoption("--database-url")
+    if not database_url:
+        pytest.skip("no --database-url for the query plan checks")
+    pytest.importorskip("psycopg")
+    with connect(database_url) as conn, PlanDatabase(conn) as db:
+        db.migrate()
+        db.seed()
+        yield db
+
+
+def test_hot_query_indexes_are_migrated():
+    """Test every index the plan checks expect is created by a migration"""
+    declared = set(declared_indexes())
+    missing = sorted({query.index for query in HOT_QUERIES} - declared)
+    assert not missing
+
+
+@pytest.mark.parametrize("query", HOT_QUERIES, ids=[query.name for query in HOT_QUERIES])
+def test_hot_query_plan(plan_db, query):
+    """Test a hot route query uses its index, scans no large table and stays in budget"""
+    check = check_query(plan_db, query)
+    assert not check.problems, f"{query.route}: {'; '.join(check.problems)}"
@@ -0,0 +1,56 @@
+import json
+
+from advocate_diary import AdvocateDiaryClient
+from advocate_diary.timings import TimingCollector, format_server_timing, parse_server_timing, render_table
+
+# Tests for the Server-Timing / request-trace collector
+
+def test_breakdown_from_headers_and_trace_logs():
+    """Test that headers and request-trace log lines add up to per-route phase shares"""
+    header = format_server_timing({"auth": (2.0, 2), "db": (6.0, 3)}, 10.0)
+    assert header == 'auth;dur=2.0;desc="2 steps", db;dur=6.0;desc="3 queries", total;dur=10.0'
+    assert parse_server_timing(header)["db"] == {"dur": 6.0, "desc": "3 queries"}
+
+    collector = TimingCollector()
+    case_id = "0b9f3a9e-2a8e-4c9e-9a57-7f4f6f3d2c11"
+    assert collector.add_server_timing("GET", f"/api/cases/{case_id}", 200, header)
+    assert not collector.add_server_timing("GET", "/api/cases", 200, "cache;desc=hit")
+
+    # Step 1: Server logs mix plain lines in with the trace lines
+    trace = {
+        "type": "request-trace",
+        "method": "GET",
+        "route": "/api/cases/[caseId]",
+        "status": 200,
+        "ms": 30.0,
+        "slow": False,
+        "phases": {"db": {"ms": 18.0, "count": 5}, "storage": {"ms": 6.0, "count": 1}},
+        "spans": [],
+    }
+    lines = ["Ready in 1.2s", json.dumps({"type": "other"}), json.dumps(trace), "{not json"]
+    assert collector.read_log(lines) == 1
+
+    # Step 2: Two requests of one route: 40ms in all, 24 of it in the db
+    summary = collector.breakdown()["GET /api/cases/[caseId]"]
+    assert summary["count"] == 2
+    assert summary["p95_ms"] == 30.0
+    assert summary["phases"]["db"] == {"mean_ms": 12.0, "share": 0.6, "mean_count": 4.0}
+    assert summary["phases"]["auth"]["mean_ms"] == 1.0
+    assert summary["other"]["mean_ms"] == 4.0
+
+    table = render_table(collector.breakdown())
+    assert table.splitlines()[1].startswith("GET /api/cases/[caseId]")
+    assert "12.0 (60%)" in table
+
+def test_client_collects_server_timing(api_base_url, login_cache):
+    """Test that a client with a collector gathers the Server-Timing of its calls"""
+    timings = TimingCollector()
+    with AdvocateDiaryClient(api_base_url, login_cache=login_cache, timings=timings) as client:
+        client.login("admin@example.com", "password123", role="ADMIN")
+        client.list_cases()
+        client.list_cases()
+
+    summary = timings.breakdown()["GET /api/cases"]
+    assert summary["count"] == 2
+    assert summary["phases"]["auth"]["mean_count"] >= 1
+    assert all(timing.phases["auth"][0] <= timing.total_ms for timing in timings.timings)
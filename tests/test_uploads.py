@@ -0,0 +1,109 @@
+import io
+
+import pytest
+
+from advocate_diary import ApiError
+
+# Tests for case document uploads: multi-file requests and resumable sessions
+
+@pytest.fixture
+def case_id(new_case):
+    return new_case(title="Upload Case")["id"]
+
+def test_upload_several_files_in_one_request(admin_client, case_id):
+    """Test a multi-file upload creates one Upload row per file"""
+    result = admin_client.upload_files(case_id, [
+        ("vakalatnama.pdf", b"%PDF-1.4 one", "application/pdf"),
+        ("exhibit.png", b"\x89PNG two", "image/png"),
+        ("vakalatnama.pdf", b"%PDF-1.4 three", "application/pdf"),
+    ])
+
+    assert result["failed"] == []
+    uploads = result["uploads"]
+    assert [u["fileName"] for u in uploads] == ["vakalatnama.pdf", "exhibit.png", "vakalatnama.pdf"]
+    assert all(u["caseId"] == case_id for u in uploads)
+    # Files with the same name are stored under different objects
+    assert len({u["fileUrl"] for u in uploads}) == 3
+
+    # A single file still answers with the upload it created
+    single = admin_client.upload_file(case_id, "order.pdf", b"%PDF-1.4 order")
+    assert single["fileName"] == "order.pdf"
+
+def test_upload_rejects_bad_files(admin_client, user_client, case_id):
+    """Test an invalid file type fails the whole request and others' cases are off limits"""
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.upload_files(case_id, [
+            ("brief.pdf", b"%PDF-1.4", "application/pdf"),
+            ("script.sh", b"#!/bin/sh", "text/x-sh"),
+        ])
+    assert excinfo.value.status_code == 400
+
+    with pytest.raises(ApiError) as excinfo:
+        user_client.upload_file(case_id, "brief.pdf", b"%PDF-1.4")
+    assert excinfo.value.status_code == 403
+
+def test_resumable_upload_continues_after_a_dropped_chunk(admin_client, user_client, case_id):
+    """Test a large file is sent in chunks and resumes from the stored offset"""
+    chunk_size = 6 * 1024 * 1024
+    content = bytes(range(256)) * ((chunk_size + 1000) // 256 + 1)
+    size = len(content)
+
+    # Step 1: Start a session and send the first chunk only
+    session = admin_client._json(
+        "POST",
+        f"/api/cases/{case_id}/upload/sessions",
+        json={"fileName": "bundle.pdf", "fileType": "application/pdf", "size": size},
+    )
+    assert session["chunkSize"] == chunk_size
+    path = f"/api/cases/{case_id}/upload/sessions/{session['sessionId']}"
+    response = admin_client.request("PATCH", path, data=content[:chunk_size], headers={"Upload-Offset": "0"})
+    assert response.json() == {"offset": chunk_size, "size": size}
+
+    # Step 2: Resending from a stale offset is refused with the offset to resume from
+    response = admin_client.request("PATCH", path, data=content[:chunk_size], headers={"Upload-Offset": "0"})
+    assert response.status_code == 409
+    assert response.json()["offset"] == chunk_size
+
+    # Step 3: Another user cannot see or continue the session
+    with pytest.raises(ApiError) as excinfo:
+        user_client._json("GET", path)
+    assert excinfo.value.status_code == 403
+
+    # Step 4: The status call reports where to continue and the last chunk completes it
+    assert admin_client._json("GET", path)["offset"] == chunk_size
+    response = admin_client.request(
+        "PATCH", path, data=content[chunk_size:], headers={"Upload-Offset": str(chunk_size)}
+    )
+    progress = response.json()
+    assert progress["offset"] == size
+    assert progress["upload"]["fileName"] == "bundle.pdf"
+
+    # Asking again after completion returns the same upload instead of a duplicate
+    assert admin_client._json("GET", path)["upload"]["id"] == progress["upload"]["id"]
+
+def test_upload_session_ends_with_case_access(admin_client, user_client, new_case):
+    """Test a session cannot be continued once its case is assigned to someone else"""
+    case_id = new_case(user_client, title="Reassigned Upload Case")["id"]
+    session = user_client._json(
+        "POST",
+        f"/api/cases/{case_id}/upload/sessions",
+        json={"fileName": "brief.pdf", "fileType": "application/pdf", "size": 10},
+    )
+    path = f"/api/cases/{case_id}/upload/sessions/{session['sessionId']}"
+
+    # Step 1: The case moves to the admin before the file is sent
+    admin_client.assign_case(case_id, admin_client.get_session()["user"]["id"])
+
+    # Step 2: The signed session no longer lets the user upload to it
+    with pytest.raises(ApiError) as excinfo:
+        user_client._json("GET", path)
+    assert excinfo.value.status_code == 403
+    response = user_client.request("PATCH", path, data=b"%PDF-1.4 x", headers={"Upload-Offset": "0"})
+    assert response.status_code == 403
+
+def test_client_resumable_upload(admin_client, case_id):
+    """Test the client helper uploads a file across several chunks"""
+    content = b"x" * (2 * 6 * 1024 * 1024 + 17)
+    upload = admin_client.upload_file_resumable(case_id, "scan.pdf", io.BytesIO(content), len(content))
+    assert upload["fileName"] == "scan.pdf"
+    assert upload["caseId"] == case_id
@@ -1,44 +1,14 @@
-import requests
-import uuid
-
-# Utility functions for authentication
-def get_csrf_token(session):
-    """Get CSRF token for authentication"""
-    response = session.get("https://advocate-diary.vercel.app/api/auth/csrf")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "csrfToken" in data
-    return data["csrfToken"]
-
-def authenticate_user(session, email, password):
-    """Authenticate with NextAuth and return the session"""
-    csrf_token = get_csrf_token(session)
-    
-    login_data = {
-        "csrfToken": csrf_token,
-        "email": email,
-        "password": password,
-        "callbackUrl": "https://advocate-diary.vercel.app"
-    }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/auth/callback/credentials",
-        data=login_data
-    )
-    
-    assert response.status_code in [200, 302]
-    return session
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from advocate_diary import AdvocateDiaryClient, ApiError
 
 # Tests for user operations
-def test_add_and_delete_user():
+def test_add_and_delete_user(admin_client, created, namespace):
     """Test creating a new user and then deleting it"""
-    # Setup: Create a session and authenticate as admin
-    session = requests.Session()
-    authenticate_user(session, "admin@example.com", "password123")
-    
-    # Step 1: Create a new user with a unique identifier
-    unique_id = str(uuid.uuid4())[:8]
+    # Step 1: Create a new user with an identifier namespaced to this worker
+    unique_id = namespace.unique()
     test_email = f"test.user.{unique_id}@example.com"
     user_data = {
         "name": f"Test User {unique_id}",
@@ -46,54 +16,37 @@ def test_add_and_delete_user():
         "password": "password123",
         "role": "USER"
     }
-    
+
     # Send request to create user
-    create_response = session.post(
-        "https://advocate-diary.vercel.app/api/admin/users",
-        json=user_data
-    )
-    
+    create_response = admin_client.request("POST", "/api/admin/users", json=user_data)
+
     # Verify response
     assert create_response.status_code == 201
     created_user = create_response.json()
     assert "user" in created_user
-    user_id = created_user["user"]["id"]
-    
+    user_id = created.track_user(created_user["user"]["id"])
+
     # Verify the user was created with the correct data
     assert created_user["user"]["name"] == f"Test User {unique_id}"
     assert created_user["user"]["email"] == test_email
     assert created_user["user"]["role"] == "USER"
     assert "password" not in created_user["user"]  # Password should not be returned
-    
-    # Step 2: Verify the user exists by fetching all users
-    get_response = session.get("https://advocate-diary.vercel.app/api/admin/users")
-    assert get_response.status_code == 200
-    users = get_response.json()
-    
-    # Find our created user in the list
-    created_user_in_list = next((user for user in users if user["id"] == user_id), None)
-    assert created_user_in_list is not None
-    assert created_user_in_list["email"] == test_email
-    
+
+    # Step 2: Verify the user exists by fetching it directly; listing every
+    # user would race with other workers creating and deleting theirs
+    fetched_user = admin_client.get_user(user_id)
+    assert fetched_user["email"] == test_email
+
     # Step 3: Delete the user
-    delete_response = session.delete(f"https://advocate-diary.vercel.app/api/admin/users/{user_id}")
-    assert delete_response.status_code == 200
-    
+    admin_client.delete_user(user_id)
+
     # Step 4: Verify the user has been deleted
-    get_response = session.get("https://advocate-diary.vercel.app/api/admin/users")
-    assert get_response.status_code == 200
-    users = get_response.json()
-    
-    # Ensure the user is no longer in the list
-    deleted_user = next((user for user in users if user["id"] == user_id), None)
-    assert deleted_user is None
-
-def test_create_user_validation():
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.get_user(user_id)
+    assert excinfo.value.status_code == 404
+
+def test_create_user_validation(admin_client):
     """Test validation when creating a user"""
-    # Setup: Create a session and authenticate
-    session = requests.Session()
-    authenticate_user(session, "admin@example.com", "password123")
-    
     # Test 1: Create user with missing required fields
     invalid_user = {
         "name": "Invalid User",
@@ -101,15 +54,12 @@ def test_create_user_validation():
         "password": "password123",
         "role": "USER"
     }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/admin/users",
-        json=invalid_user
-    )
-    
+
     # Should fail validation
-    assert response.status_code == 400
-    
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.create_user(invalid_user)
+    assert excinfo.value.status_code == 400
+
     # Test 2: Create user with invalid role
     invalid_user = {
         "name": "Invalid User",
@@ -117,15 +67,12 @@ def test_create_user_validation():
         "password": "password123",
         "role": "INVALID_ROLE"  # Only USER and ADMIN are valid
     }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/admin/users",
-        json=invalid_user
-    )
-    
+
     # Should fail validation
-    assert response.status_code == 400
-    
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.create_user(invalid_user)
+    assert excinfo.value.status_code == 400
+
     # Test 3: Create user with short password
     invalid_user = {
         "name": "Invalid User",
@@ -133,27 +80,21 @@ def test_create_user_validation():
         "password": "short",  # Too short
         "role": "USER"
     }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/admin/users",
-        json=invalid_user
-    )
-    
+
     # Should fail validation
-    assert response.status_code == 400
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.create_user(invalid_user)
+    assert excinfo.value.status_code == 400
 
-def test_user_permissions():
+def test_user_permissions(user_client):
     """Test that regular users cannot access admin functions"""
-    # Create a session and authenticate as a regular user
-    session = requests.Session()
-    authenticate_user(session, "user1@example.com", "password123")
-    
     # Try to access admin-only endpoints
-    
+
     # Try to list all users
-    response = session.get("https://advocate-diary.vercel.app/api/admin/users")
-    assert response.status_code == 401
-    
+    with pytest.raises(ApiError) as excinfo:
+        user_client.list_users()
+    assert excinfo.value.status_code == 401
+
     # Try to create a new user
     user_data = {
         "name": "Unauthorized User",
@@ -161,10 +102,197 @@ def test_user_permissions():
         "password": "password123",
         "role": "USER"
     }
-    
-    response = session.post(
-        "https://advocate-diary.vercel.app/api/admin/users",
-        json=user_data
+
+    with pytest.raises(ApiError) as excinfo:
+        user_client.create_user(user_data)
+    assert excinfo.value.status_code == 401
+
+def test_admin_stats_follow_case_writes(admin_client, user_client, created, registrations, namespace):
+    """Test per-user, per-court and hearing statistics track case writes"""
+    unique_id = namespace.unique()
+    court = f"Stats Court {unique_id}"
+    owner = admin_client.create_user({
+        "name": f"Stats User {unique_id}",
+        "email": f"stats.{unique_id}@example.com",
+        "password": "password123",
+        "role": "USER",
+    })
+    owner_id = created.track_user(owner["id"])
+
+    def owner_stats():
+        stats = admin_client.admin_stats()
+        entry = next(u for u in stats["casesByUser"] if u["id"] == owner_id)
+        courts = {row["courtName"]: row["count"] for row in stats["casesByCourt"]}
+        return entry, courts.get(court, 0), stats
+
+    # Step 1: A new user starts with no cases
+    entry, court_count, _ = owner_stats()
+    assert (entry["caseCount"], entry["activeCount"], entry["completedCount"]) == (0, 0, 0)
+    assert court_count == 0
+
+    # Step 2: Two cases assigned to the user are counted at once
+    case_ids = []
+    for _ in range(2):
+        case = admin_client.create_case({
+            "caseType": "CIVIL",
+            "registrationNum": registrations.next(),
+            "registrationYear": 2023,
+            "title": f"Stats Case {unique_id}",
+            "courtName": court,
+            "userId": owner_id,
+            "petitioners": [{"name": "Petitioner"}],
+            "respondents": [{"name": "Respondent"}],
+        })
+        case_ids.append(created.track_case(case["id"]))
+    entry, court_count, _ = owner_stats()
+    assert (entry["caseCount"], entry["activeCount"], entry["completedCount"]) == (2, 2, 0)
+    assert court_count == 2
+
+    # Step 3: Completing one case moves it between the active and completed counts
+    admin_client.set_case_completed(case_ids[0], True)
+    entry, _, _ = owner_stats()
+    assert (entry["caseCount"], entry["activeCount"], entry["completedCount"]) == (2, 1, 1)
+
+    # Step 4: A hearing due tomorrow on the active case is counted (the total
+    # is firm-wide, so other workers' cases may add to it)
+    tomorrow = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    admin_client.add_hearing(case_ids[1], datetime.now(timezone.utc).isoformat(), next_date=tomorrow)
+    _, _, stats = owner_stats()
+    assert stats["totals"]["hearingsDueThisWeek"] >= 1
+
+    # Step 5: A closed PERSONAL case only counts towards the closed total
+    personal = admin_client.create_case({
+        "caseType": "PERSONAL",
+        "registrationNum": registrations.next(),
+        "registrationYear": 2023,
+        "title": f"Stats Personal {unique_id}",
+        "courtName": court,
+        "userId": owner_id,
+        "petitioners": [{"name": "Petitioner"}],
+        "respondents": [{"name": "Respondent"}],
+    })
+    admin_client.set_case_completed(created.track_case(personal["id"]), True)
+    entry, court_count, stats = owner_stats()
+    assert (entry["caseCount"], entry["activeCount"], entry["completedCount"]) == (2, 1, 1)
+    assert court_count == 2
+    assert stats["totals"]["closedCases"] >= stats["totals"]["completedCases"] + 1
+
+    # Step 6: Statistics are for admins only
+    with pytest.raises(ApiError) as excinfo:
+        user_client.admin_stats()
+    assert excinfo.value.status_code == 403
+
+def test_users_with_info_pages_and_caps_uploads(admin_client, api_base_url, latency_recorder, created, registrations, namespace):
+    """Test upload counts, the per-user upload cap and paging through users"""
+    unique_id = namespace.unique()
+    email = f"info.{unique_id}@example.com"
+    owner_id = created.track_user(admin_client.create_user({
+        "name": f"Info User {unique_id}",
+        "email": email,
+        "password": "password123",
+        "role": "USER",
+    })["id"])
+
+    # Step 1: The user uploads three case files and one personal file
+    with AdvocateDiaryClient(api_base_url, recorder=latency_recorder) as owner:
+        owner.login(email, "password123")
+        case_ids = []
+        for case_type in ("CIVIL", "PERSONAL"):
+            num = registrations.next()
+            case_ids.append(created.track_case(owner.create_case({
+                "caseType": case_type,
+                "registrationNum": num,
+                "registrationYear": 2023,
+                "title": f"{case_type} files",
+                "courtName": "Test Court",
+                "petitioners": [{"name": f"Petitioner {num}"}],
+                "respondents": [{"name": f"Respondent {num}"}],
+            })["id"]))
+        owner.upload_files(case_ids[0], [(f"doc{i}.pdf", b"%PDF-1.4", "application/pdf") for i in range(3)])
+        owner.upload_file(case_ids[1], "id-card.png", b"\x89PNG", "image/png")
+
+    # Step 2: Page through users until ours turns up, with two uploads each at most
+    seen = set()
+    entry = None
+    cursor = None
+    while True:
+        page = admin_client.users_with_info_page(cursor=cursor, limit=2, uploads=2)
+        assert len(page["users"]) <= 2
+        for user in page["users"]:
+            assert user["id"] not in seen
+            seen.add(user["id"])
+            if user["id"] == owner_id:
+                entry = user
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+
+    assert entry is not None
+    assert (entry["uploadCount"], entry["personalFileCount"]) == (4, 1)
+    assert len(entry["uploads"]) == 2
+    assert entry["uploads"][0]["fileName"] == "id-card.png"
+    assert entry["uploads"][0]["case"]["caseType"] == "PERSONAL"
+
+    # Step 3: Counts-only pages carry the counts without any upload rows
+    counts = admin_client.users_with_info_page(limit=200, counts_only=True)
+    assert all(user["uploads"] == [] for user in counts["users"])
+
+def test_bulk_reassignment_runs_as_a_job(admin_client, user_client, created, registrations, namespace):
+    """Test reassigning every case of a user through a background job"""
+    unique_id = namespace.unique()
+    source_id, target_id = (
+        created.track_user(admin_client.create_user({
+            "name": f"Reassign {label} {unique_id}",
+            "email": f"reassign.{label}.{unique_id}@example.com",
+            "password": "password123",
+            "role": "USER",
+        })["id"])
+        for label in ("source", "target")
     )
-    
-    assert response.status_code == 401 
\ No newline at end of file
+
+    # Step 1: A user with no cases has nothing to move, and no job is started
+    result = admin_client.reassign_cases(source_id, target_id)
+    assert result["count"] == 0
+    assert "job" not in result
+
+    # Step 2: Three cases of the source user are moved by a job
+    case_ids = [
+        created.track_case(admin_client.create_case({
+            "caseType": "CIVIL",
+            "registrationNum": registrations.next(),
+            "registrationYear": 2023,
+            "title": f"Reassign Case {unique_id}",
+            "courtName": "High Court",
+            "userId": source_id,
+            "petitioners": [{"name": "Petitioner"}],
+            "respondents": [{"name": "Respondent"}],
+        })["id"])
+        for _ in range(3)
+    ]
+    result = admin_client.reassign_cases(source_id, target_id)
+    job = result["job"]
+    assert job["total"] == 3
+    assert job["status"] in ("queued", "running", "completed")
+
+    job = admin_client.wait_for_reassign(job["id"])
+    assert job["status"] == "completed"
+    assert job["moved"] == 3
+    assert job["completedAt"]
+
+    # Step 3: The target owns the cases, and the counts follow
+    for case_id in case_ids:
+        assert admin_client.get_case(case_id)["userId"] == target_id
+    counts = {u["id"]: u["caseCount"] for u in admin_client.list_users_with_case_counts()}
+    assert counts[source_id] == 0
+    assert counts[target_id] == 3
+
+    # Step 4: Moving cases to their own owner is refused, and only admins may reassign
+    with pytest.raises(ApiError) as excinfo:
+        admin_client.reassign_cases(target_id, target_id)
+    assert excinfo.value.status_code == 400
+    with pytest.raises(ApiError) as excinfo:
+        user_client.reassign_cases(target_id, source_id)
+    assert excinfo.value.status_code == 403
+    with pytest.raises(ApiError) as excinfo:
+        user_client.reassign_job(job["id"])
+    assert excinfo.value.status_code == 403